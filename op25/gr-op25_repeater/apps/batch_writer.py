@@ -0,0 +1,101 @@
+# Bounded queue drained in batches by a background thread
+#
+# Copyright 2025 Graham J. Norbury - gnorbury@bondcar.com
+#
+# This file is part of OP25
+#
+# OP25 is free software; you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# OP25 is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OP25; see the file COPYING. If not, write to the Free
+# Software Foundation, Inc., 51 Franklin Street, Boston, MA
+# 02110-1301, USA.
+#
+# Shared by log_ring and event_store.  Producers append items without
+# blocking; a writer thread hands them to write_batch() in lists of at
+# most batch_size items, either when that many are waiting or every
+# flush_interval seconds.  Items arriving while the queue is full are
+# dropped and counted per category, and report_dropped() is called from
+# the writer thread when the count changes.
+#
+
+import threading
+from collections import deque
+
+class batch_writer(object):
+    def __init__(self, size, batch_size, flush_interval):
+        self.size = size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = deque()        # append/popleft are atomic, so producers never take a lock
+        self.dropped = {}           # category -> items dropped (best effort count under contention)
+        self.dropped_reported = 0
+        self.wakeup = threading.Event()
+        self.keep_running = True
+        self.writer = None
+
+    def start_writer(self):         # called by subclasses once they are fully initialized
+        self.writer = threading.Thread(target=self.run)
+        self.writer.daemon = True
+        self.writer.start()
+
+    def put_item(self, item, category=None):
+        if len(self.queue) >= self.size:
+            self.dropped[category] = self.dropped.get(category, 0) + 1
+            return
+        self.queue.append(item)
+        if len(self.queue) >= self.batch_size:
+            self.wakeup.set()
+
+    def full(self):
+        return len(self.queue) >= self.size
+
+    def run(self):
+        while self.keep_running:
+            if self.wakeup.wait(self.flush_interval):
+                self.wakeup.clear()
+            self.drain()
+        self.drain()
+        self.writer_done()
+
+    def drain(self):
+        while len(self.queue) > 0:
+            batch = []
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self.queue.popleft())
+            except IndexError:
+                pass
+            self.write_batch(batch)
+        dropped = sum(self.dropped.values())
+        if dropped != self.dropped_reported:
+            self.report_dropped(dropped - self.dropped_reported)
+            self.dropped_reported = dropped
+
+    def write_batch(self, batch):   # override; runs on the writer thread
+        pass
+
+    def report_dropped(self, count):
+        pass
+
+    def writer_done(self):          # override; runs on the writer thread after the final drain
+        pass
+
+    def close(self, timeout):
+        if not self.keep_running:
+            return
+        self.keep_running = False
+        self.wakeup.set()
+        if self.writer is not None:
+            self.writer.join(timeout)
+            if not self.writer.is_alive():  # pick up anything put after the writer's final drain
+                self.drain()
+                self.writer_done()
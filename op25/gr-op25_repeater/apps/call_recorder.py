@@ -0,0 +1,275 @@
+# Per-call audio recording
+#
+# Copyright 2025 Graham J. Norbury - gnorbury@bondcar.com
+#
+# This file is part of OP25
+#
+# OP25 is free software; you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# OP25 is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OP25; see the file COPYING. If not, write to the Free
+# Software Foundation, Inc., 51 Franklin Street, Boston, MA
+# 02110-1301, USA.
+#
+#
+# Records the audio of each trunked voice call to its own file.  The
+# frame_assembler of a recorded channel sends its udp audio to a port owned
+# by the recorder, which forwards every datagram unchanged to the channel's
+# configured udp destination (if any) and, while the trunking module has a
+# call in progress on that receiver, appends the PCM to the call's buffer.
+# Call start (tune_voice), source id updates (log_call) and call end
+# (expire_talkgroup) only update dictionaries under a lock; completed calls
+# are queued to a pool of worker threads that encode them (wav, or flac and
+# opus through the flac and opusenc command line encoders) and write
+#     <directory>/<sysname>/<YYYYMMDD>/<tgid>-<YYYYMMDD-HHMMSS>.<format>
+# with a JSON sidecar of the same name holding the call details.
+#
+
+import os
+import re
+import io
+import sys
+import time
+import json
+import wave
+import queue
+import shutil
+import select
+import socket
+import threading
+import subprocess
+from log_ts import log_ts
+from helper_funcs import from_dict
+
+PCM_RATE = 8000             # audio sample rate (Hz), 16 bit mono
+MAX_DATAGRAM = 2048         # largest udp datagram relayed
+UDP_PORT = 23700            # Default first recorder port
+PORTS_PER_RECEIVER = 3      # frame_assembler audio port, second slot audio port, second slot flag port
+MIN_CALL_TIME = 1.0         # Default seconds of audio below which a call is not written
+MAX_CALL_TIME = 600.0       # Default seconds of audio after which a call is written and continued in a new part
+WORKERS = 2                 # Default number of encoding threads
+WORKER_JOIN_TIME = 10.0     # Seconds allowed at shutdown for queued calls to be written
+
+ENCODERS = {'wav':  None,   # command lines reading a wav file on stdin
+            'flac': ['flac', '--silent', '--force', '-o', '%(out)s', '-'],
+            'opus': ['opusenc', '--quiet', '-', '%(out)s']}
+
+class recorded_call(object):
+    def __init__(self, rcvr, sysname, tgid, tag, freq, slot, rid, part=0, start=None):
+        self.rcvr = rcvr
+        self.sysname = sysname
+        self.tgid = tgid
+        self.tag = tag
+        self.freq = freq
+        self.slot = slot
+        self.rids = []
+        self.part = part
+        self.start = time.time() if start is None else start
+        self.end = None
+        self.pcm = []
+        self.nbytes = 0
+        self.add_rid(rid, "")
+
+    def add_rid(self, rid, tag):
+        if rid is not None and rid > 0 and rid not in [r['rid'] for r in self.rids]:
+            self.rids.append({'rid': rid, 'tag': tag, 'time': time.time()})
+
+    def duration(self):
+        return self.nbytes / 2.0 / PCM_RATE
+
+    def sidecar(self, filename):
+        return {'file': filename, 'sysname': self.sysname, 'rcvr': self.rcvr, 'tgid': self.tgid, 'tgtag': self.tag,
+                'rid': self.rids[0]['rid'] if len(self.rids) > 0 else None, 'rids': self.rids,
+                'freq': self.freq, 'slot': self.slot, 'start': self.start, 'end': self.end,
+                'duration': round(self.duration(), 3), 'part': self.part}
+
+class call_recorder(object):
+    def __init__(self, config):
+        self.directory = str(from_dict(config, 'directory', "recordings"))
+        self.format = str(from_dict(config, 'format', "wav")).lower()
+        self.udp_port = int(from_dict(config, 'udp_port', UDP_PORT))
+        self.min_bytes = int(float(from_dict(config, 'min_call_time', MIN_CALL_TIME)) * PCM_RATE) * 2
+        self.max_bytes = int(float(from_dict(config, 'max_call_time', MAX_CALL_TIME)) * PCM_RATE) * 2
+        if self.format not in ENCODERS:
+            sys.stderr.write("%s Unknown recording format %s, using wav\n" % (log_ts.get(), self.format))
+            self.format = 'wav'
+        if ENCODERS[self.format] is not None and shutil.which(ENCODERS[self.format][0]) is None:
+            sys.stderr.write("%s Recording encoder %s not found, using wav\n" % (log_ts.get(), ENCODERS[self.format][0]))
+            self.format = 'wav'
+        self.lock = threading.Lock()    # calls are updated from the trunking and relay threads
+        self.calls = {}                 # receiver msgq_id -> recorded_call in progress
+        self.socks = []
+        self.sock_map = {}              # socket -> (msgq_id, port offset, forwarding address or None)
+        self.fwd_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.buf = bytearray(MAX_DATAGRAM)
+        self.written = 0
+        self.skipped = 0
+        self.failed = 0
+        self.keep_running = True
+        self.queue = queue.Queue()
+        self.workers = []
+        for i in range(max(1, int(from_dict(config, 'workers', WORKERS)))):
+            worker = threading.Thread(target=self.run_worker)
+            worker.daemon = True
+            worker.start()
+            self.workers.append(worker)
+        self.relay = None
+        sys.stderr.write("%s Recording calls to %s (%s)\n" % (log_ts.get(), self.directory, self.format))
+
+    def add_receiver(self, msgq_id, destination):
+        """ Returns the frame_assembler destination of a recorded receiver: its udp destination, if any,
+            is replaced by a recorder port and the recorder forwards all datagrams to it """
+        forward = None
+        dests = []
+        for dest in destination.split(','):
+            dest = dest.strip()
+            if dest.startswith('udp://'):
+                host, port = dest[6:].rsplit(':', 1)
+                forward = (socket.gethostbyname(host), int(port))
+            elif dest != "":
+                dests.append(dest)
+        port = self.udp_port + PORTS_PER_RECEIVER * (len(self.socks) // PORTS_PER_RECEIVER)
+        for k in range(PORTS_PER_RECEIVER):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setblocking(0)
+            sock.bind(('127.0.0.1', port + k))
+            self.sock_map[sock] = (msgq_id, k, forward)
+            self.socks.append(sock)
+        if self.relay is None:
+            self.relay = threading.Thread(target=self.run_relay)
+            self.relay.daemon = True
+            self.relay.start()
+        sys.stderr.write("%s [%d] Recording calls from udp port %d%s\n" % (log_ts.get(), msgq_id, port, "" if forward is None else (", forwarding to %s:%d" % forward)))
+        return ", ".join(["udp://127.0.0.1:%d" % port] + dests)
+
+    def call_start(self, rcvr, sysname, tgid, tag, freq, slot, rid=None):
+        with self.lock:
+            call = self.calls.get(rcvr)
+            if call is not None and call.tgid == tgid and call.freq == freq and call.slot == slot:
+                call.add_rid(rid, "")
+                return
+            if call is not None:
+                self.finish(call)
+            self.calls[rcvr] = recorded_call(rcvr, sysname, tgid, tag, freq, slot, rid)
+
+    def call_update(self, rcvr, tgid, rid, tag=""):
+        with self.lock:
+            call = self.calls.get(rcvr)
+            if call is not None and call.tgid == tgid:
+                call.add_rid(rid, tag)
+
+    def call_end(self, rcvr):
+        with self.lock:
+            call = self.calls.pop(rcvr, None)
+            if call is not None:
+                self.finish(call)
+
+    def finish(self, call):     # caller holds self.lock
+        call.end = time.time()
+        if call.nbytes < self.min_bytes:
+            self.skipped += 1
+            return
+        self.queue.put(call)
+
+    def run_relay(self):
+        while self.keep_running:
+            socks = list(self.socks)
+            readable, writable, exceptional = select.select(socks, [], [], 1.0)
+            for sock in readable:
+                msgq_id, k, forward = self.sock_map[sock]
+                try:
+                    n = sock.recv_into(self.buf)
+                except socket.error:
+                    continue
+                if forward is not None:
+                    try:
+                        self.fwd_sock.sendto(memoryview(self.buf)[:n], (forward[0], forward[1] + k))
+                    except socket.error:
+                        pass
+                if k != 0 or n <= 2:    # second slot, or a drain/drop flag
+                    continue
+                with self.lock:
+                    call = self.calls.get(msgq_id)
+                    if call is None:
+                        continue
+                    call.pcm.append(bytes(self.buf[:n]))
+                    call.nbytes += n
+                    if call.nbytes >= self.max_bytes:   # write what we have and continue the call in a new part
+                        self.finish(call)
+                        self.calls[msgq_id] = recorded_call(call.rcvr, call.sysname, call.tgid, call.tag, call.freq, call.slot, None, part=call.part + 1, start=call.end)
+                        self.calls[msgq_id].rids = list(call.rids)
+
+    def run_worker(self):
+        while True:
+            call = self.queue.get()
+            if call is None:
+                return
+            try:
+                self.write_call(call)
+                self.written += 1
+            except Exception as ex:
+                self.failed += 1
+                sys.stderr.write("%s Unable to write recording of tgid %d: %s\n" % (log_ts.get(), call.tgid, ex))
+
+    def write_call(self, call):
+        start = time.localtime(call.start)
+        directory = os.path.join(self.directory, re.sub(r'[^\w.-]', '_', str(call.sysname)), time.strftime("%Y%m%d", start))
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:     # created by another worker
+                if not os.path.isdir(directory):
+                    raise
+        name = "%d-%s" % (call.tgid, time.strftime("%Y%m%d-%H%M%S", start))
+        if call.part > 0:
+            name += "-%d" % call.part
+        path = os.path.join(directory, name + "." + self.format)
+
+        wav = io.BytesIO()
+        w = wave.open(wav, 'wb')
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(PCM_RATE)
+        w.writeframes(b''.join(call.pcm))
+        w.close()
+
+        tmp = path + ".part"
+        if ENCODERS[self.format] is None:
+            with open(tmp, 'wb') as fp:
+                fp.write(wav.getvalue())
+        else:
+            cmd = [arg % {'out': tmp} for arg in ENCODERS[self.format]]
+            p = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            out, err = p.communicate(wav.getvalue())
+            if p.returncode != 0:
+                raise IOError("%s exited with %d: %s" % (cmd[0], p.returncode, err.decode('utf-8', 'replace').strip()))
+        os.rename(tmp, path)
+        with open(os.path.join(directory, name + ".json"), 'w') as fp:
+            json.dump(call.sidecar(os.path.basename(path)), fp, indent=1)
+
+    def close(self):
+        if not self.keep_running:
+            return
+        self.keep_running = False
+        with self.lock:
+            for rcvr in list(self.calls.keys()):
+                self.finish(self.calls.pop(rcvr))
+        for worker in self.workers:
+            self.queue.put(None)
+        t_end = time.time() + WORKER_JOIN_TIME
+        for worker in self.workers:
+            worker.join(max(0.0, t_end - time.time()))
+        if self.relay is not None:
+            self.relay.join(2.0)
+        for sock in self.socks:
+            sock.close()
+        self.fwd_sock.close()
+        sys.stderr.write("%s Recorded %d calls (%d too short, %d failed) to %s\n" % (log_ts.get(), self.written, self.skipped, self.failed, self.directory))
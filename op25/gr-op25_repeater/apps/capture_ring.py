@@ -0,0 +1,279 @@
+# IQ capture ring
+#
+# Copyright 2025 Graham J. Norbury - gnorbury@bondcar.com
+#
+# This file is part of OP25
+#
+# OP25 is free software; you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# OP25 is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OP25; see the file COPYING. If not, write to the Free
+# Software Foundation, Inc., 51 Franklin Street, Boston, MA
+# 02110-1301, USA.
+#
+# Rolling capture of the complex samples of a receive device.  Samples are
+# converted to interleaved signed 16 bit I/Q (op25_iqsrc iq_size 2, iq_signed
+# true) and written by a file_sink to preallocated segment files
+# <directory>/<prefix>-<sequence>.iq, each with a side index
+# <prefix>-<sequence>.idx of tab separated lines
+#     <time> <byte offset> <sample rate> <center frequency> <device frequency>
+# written when the segment starts and ends, whenever the device is retuned
+# and every INDEX_INTERVAL seconds, and
+#     <time> <byte offset> <msgq_id> <tuned frequency>
+# written whenever a channel on the device is tuned, and for every channel
+# when the segment starts, so a call can be found from the channel and
+# frequency it was received on.
+#
+# The samples never pass through Python: a thread reads the sink's item count
+# every CHECK_INTERVAL seconds and, once the segment has reached its size,
+# switches the sink to the next file with file_sink.open().  A segment can
+# therefore run up to CHECK_INTERVAL seconds of samples past its size,
+# beyond the preallocation.  The switch takes effect at the sink's next
+# work() call, so segment boundaries and offsets are exact to within one
+# call's worth of samples; the unused part of the preallocation is released
+# once the sink has moved on.  When more than the configured number of
+# segments exist the oldest is deleted along with its index.
+#
+# locate() maps a time to a segment and byte offset so op25_iqsrc can replay
+# from any time still held in the ring (iq_ring_dir, iq_ring_start).
+#
+
+import os
+import sys
+import time
+import glob
+import threading
+from gnuradio import gr, blocks
+from log_ts import log_ts
+
+SAMPLE_BYTES = 4            # one complex sample: signed 16 bit I and Q
+SAMPLE_SCALE = 32767.5      # iqfile_source scale of signed 16 bit samples
+INDEX_INTERVAL = 1.0        # Seconds between index entries while the tuning is unchanged
+CHECK_INTERVAL = 0.1        # Seconds between checks of the segment size
+SEGMENT_SIZE = 256          # Default segment size in MB
+SEGMENTS = 8                # Default number of segments kept
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"   # local time accepted by parse_time() in addition to seconds since the epoch
+
+def segment_file(directory, prefix, seq, ext):
+    return os.path.join(directory, "%s-%06d.%s" % (prefix, seq, ext))
+
+def list_segments(directory, prefix):   # sequence numbers of the segments present, oldest first
+    seqs = []
+    for f in glob.glob(os.path.join(glob.escape(directory), glob.escape(prefix) + "-*.iq")):
+        seq = os.path.basename(f)[len(prefix) + 1 : -3]
+        if seq.isdigit():
+            seqs.append(int(seq))
+    return sorted(seqs)
+
+def preallocate(filename, size):
+    fd = os.open(filename, os.O_WRONLY)
+    try:
+        if hasattr(os, 'posix_fallocate'):
+            try:
+                os.posix_fallocate(fd, 0, size)
+                return
+            except OSError:     # not supported by the filesystem
+                pass
+        os.ftruncate(fd, size)
+    finally:
+        os.close(fd)
+
+def read_index(filename):   # [(time, byte offset, rate, center, freq)]
+    entries = []
+    try:
+        with open(filename) as fp:
+            for line in fp:
+                fields = line.split('\t')
+                if len(fields) != 5:    # partial line left by an unclean shutdown
+                    continue
+                entries.append((float(fields[0]), int(fields[1]), float(fields[2]), int(fields[3]), int(fields[4])))
+    except IOError:
+        pass
+    return entries
+
+def read_tunes(filename):   # [(time, byte offset, msgq_id, freq)] channel tune entries
+    entries = []
+    try:
+        with open(filename) as fp:
+            for line in fp:
+                fields = line.split('\t')
+                if len(fields) != 4 or not fields[3].endswith('\n'):   # partial line left by an unclean shutdown
+                    continue
+                entries.append((float(fields[0]), int(fields[1]), int(fields[2]), int(fields[3])))
+    except IOError:
+        pass
+    return entries
+
+def read_ring(directory, prefix):   # [(seq, iq file, index entries)] oldest first, segments without an index are skipped
+    segments = []
+    for seq in list_segments(directory, prefix):
+        entries = read_index(segment_file(directory, prefix, seq, "idx"))
+        if len(entries) > 0:
+            segments.append((seq, segment_file(directory, prefix, seq, "iq"), entries))
+    return segments
+
+def parse_time(s):
+    try:
+        return float(s)
+    except ValueError:
+        return time.mktime(time.strptime(str(s), TIME_FORMAT))
+
+def locate(directory, prefix, ts):
+    """ Find the sample captured at time ts.  Returns a dict of the segment 'seq', 'file', the sample's byte
+        'offset', the 'length' in bytes from there to the end of the segment's data, and the 'ts', 'rate',
+        'center' and 'freq' in effect at that point """
+    for (seq, iq_file, entries) in read_ring(directory, prefix):
+        if ts < entries[0][0] or ts > entries[-1][0]:
+            continue
+        i = 0
+        while i + 1 < len(entries) and entries[i + 1][0] <= ts:
+            i += 1
+        e_ts, e_offset, rate, center, freq = entries[i]
+        offset = e_offset + int((ts - e_ts) * rate) * SAMPLE_BYTES
+        if i + 1 < len(entries):    # sample clock and wall clock drift apart between index entries
+            offset = min(offset, entries[i + 1][1])
+        end = entries[-1][1]
+        if offset >= end:
+            continue
+        return {'seq': seq, 'file': iq_file, 'offset': offset, 'length': end - offset,
+                'ts': e_ts + float(offset - e_offset) / SAMPLE_BYTES / rate, 'rate': rate, 'center': center, 'freq': freq}
+    raise ValueError("%s: no %s segment holds time %s" % (directory, prefix, time.strftime(TIME_FORMAT, time.localtime(ts))))
+
+class iq_ring(gr.hier_block2):
+    def __init__(self, directory, prefix, rate, center, freq, segment_size = SEGMENT_SIZE * 1048576, segments = SEGMENTS):
+        gr.hier_block2.__init__(self, "iq_ring",
+                                gr.io_signature(1, 1, gr.sizeof_gr_complex),  # Input signature
+                                gr.io_signature(0, 0, 0))                     # Output signature
+        self.directory = directory
+        self.prefix = prefix
+        self.rate = float(rate)
+        self.center = int(center)
+        self.freq = int(freq)
+        self.segment_size = max(SAMPLE_BYTES, segment_size - (segment_size % SAMPLE_BYTES))
+        self.segments = max(1, segments)
+        self.lock = threading.Lock()    # retune(), tune() and close() are called from outside the ring thread
+        self.idx = None
+        self.base = 0                   # sink items written before the current segment
+        self.tunes = {}                 # msgq_id -> tuned frequency of each channel on the device
+        self.release = None             # (previous segment file, bytes of data) to trim once the sink has switched
+        self.last_index = 0.0
+        self.keep_running = True
+        self.wakeup = threading.Event()
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        seqs = list_segments(directory, prefix)
+        self.seq = seqs[-1] + 1 if len(seqs) > 0 else 0
+        sys.stderr.write("%s Capturing IQ to ring: %s %d x %d bytes, rate %d\n" % (log_ts.get(), segment_file(directory, prefix, self.seq, "iq"), self.segments, self.segment_size, self.rate))
+
+        self.to_short = blocks.complex_to_interleaved_short(True, SAMPLE_SCALE)     # one (I, Q) vector per sample
+        self.sink = blocks.file_sink(SAMPLE_BYTES, segment_file(directory, prefix, self.seq, "iq"))
+        self.sink.set_unbuffered(False)
+        self.connect(self, self.to_short, self.sink)
+        preallocate(segment_file(directory, prefix, self.seq, "iq"), self.segment_size)
+        self.open_segment(time.time())
+
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def get_offset(self):           # bytes written to the current segment
+        return (self.sink.nitems_read(0) - self.base) * SAMPLE_BYTES
+
+    def open_segment(self, ts):
+        self.idx = open(segment_file(self.directory, self.prefix, self.seq, "idx"), 'w')
+        self.add_index(ts, 0)
+        for msgq_id in sorted(self.tunes):      # each segment carries the tuning of every channel
+            self.add_tune(ts, 0, msgq_id)
+        seqs = list_segments(self.directory, self.prefix)
+        for seq in seqs[: max(0, len(seqs) - self.segments)]:  # oldest segments beyond the ring size
+            for ext in ("iq", "idx"):
+                try:
+                    os.remove(segment_file(self.directory, self.prefix, seq, ext))
+                except OSError:
+                    pass
+
+    def close_segment(self, ts, offset):
+        self.add_index(ts, offset)
+        self.idx.close()
+        self.idx = None
+
+    def add_index(self, ts, offset):
+        self.idx.write("%f\t%d\t%f\t%d\t%d\n" % (ts, offset, self.rate, self.center, self.freq))
+        self.idx.flush()
+        self.last_index = ts
+
+    def add_tune(self, ts, offset, msgq_id):
+        self.idx.write("%f\t%d\t%d\t%d\n" % (ts, offset, msgq_id, self.tunes[msgq_id]))
+        self.idx.flush()
+
+    def release_segment(self):      # trim the previous segment's unused preallocation
+        if self.release is None:
+            return
+        filename, size = self.release
+        self.release = None
+        try:
+            if os.path.getsize(filename) > size:
+                os.truncate(filename, size)
+        except OSError:             # already deleted from the ring
+            pass
+
+    def next_segment(self, ts):
+        items = self.sink.nitems_read(0)
+        offset = (items - self.base) * SAMPLE_BYTES
+        self.close_segment(ts, offset)
+        self.release = (segment_file(self.directory, self.prefix, self.seq, "iq"), offset)
+        self.seq += 1
+        self.base = items
+        self.sink.open(segment_file(self.directory, self.prefix, self.seq, "iq"))
+        preallocate(segment_file(self.directory, self.prefix, self.seq, "iq"), self.segment_size)
+        self.open_segment(ts)
+
+    def retune(self, center, freq):     # device center frequency
+        with self.lock:
+            if int(center) == self.center and int(freq) == self.freq:
+                return
+            self.center = int(center)
+            self.freq = int(freq)
+            if self.idx is not None:
+                self.add_index(time.time(), self.get_offset())
+
+    def tune(self, msgq_id, freq):      # channel tuned within the device's band
+        with self.lock:
+            self.tunes[msgq_id] = int(freq)
+            if self.idx is not None:
+                self.add_tune(time.time(), self.get_offset(), msgq_id)
+
+    def run(self):
+        while self.keep_running:
+            self.wakeup.wait(CHECK_INTERVAL)
+            with self.lock:
+                if self.idx is None:
+                    break
+                self.release_segment()  # the sink has switched files since the last check
+                now = time.time()
+                if self.get_offset() >= self.segment_size:
+                    self.next_segment(now)
+                elif now - self.last_index >= INDEX_INTERVAL:
+                    self.add_index(now, self.get_offset())
+
+    def close(self):
+        with self.lock:
+            if self.idx is None:
+                return
+            self.keep_running = False
+            offset = self.get_offset()
+            self.close_segment(time.time(), offset)
+            self.sink.close()
+            self.release_segment()      # previous segment, if the ring thread has not trimmed it yet
+            self.release = (segment_file(self.directory, self.prefix, self.seq, "iq"), offset)
+            self.release_segment()
+        self.wakeup.set()
+        sys.stderr.write("%s Ending IQ ring capture: %s\n" % (log_ts.get(), segment_file(self.directory, self.prefix, self.seq, "iq")))
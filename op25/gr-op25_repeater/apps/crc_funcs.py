@@ -0,0 +1,66 @@
+# CRC functions
+#
+# Copyright 2025 Graham J. Norbury - gnorbury@bondcar.com
+#
+# This file is part of OP25
+#
+# OP25 is free software; you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# OP25 is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OP25; see the file COPYING. If not, write to the Free
+# Software Foundation, Inc., 51 Franklin Street, Boston, MA
+# 02110-1301, USA.
+#
+# Table driven (one octet per step) msb-first CRCs shared by the trunking
+# decoders and tx/p25craft.py.  Message data is passed as an integer and a
+# length in bits, matching the way the decoders hold message fields; any
+# leading bits that do not fill a whole octet are processed one at a time.
+#
+
+class crc(object):
+    def __init__(self, width, poly, init=0, xorout=0):
+        assert width >= 8
+        self.width = width
+        self.poly = poly
+        self.init = init
+        self.xorout = xorout
+        self.mask = (1 << width) - 1
+        self.top = width - 8
+        self.table = tuple([self.step(i << self.top, 8) for i in range(256)])
+
+    def step(self, crc, n_bits):    # shift n_bits zero bits through the register
+        for i in range(n_bits):
+            if crc & (1 << (self.width - 1)):
+                crc = ((crc << 1) ^ self.poly) & self.mask
+            else:
+                crc = (crc << 1) & self.mask
+        return crc
+
+    def compute(self, data, n_bits=None):   # data is an integer of n_bits bits, or an octet string
+        if not isinstance(data, int):
+            n_bits = len(data) * 8
+            data = int.from_bytes(data, 'big')
+        crc = self.init
+        lead = n_bits & 0x7
+        if lead:
+            for i in range(n_bits - 1, n_bits - 1 - lead, -1):
+                crc = self.step(crc ^ (((data >> i) & 1) << (self.width - 1)), 1)
+        data &= (1 << (n_bits - lead)) - 1     # bits above n_bits are ignored
+        table = self.table
+        mask = self.mask
+        top = self.top
+        for octet in data.to_bytes((n_bits - lead) >> 3, 'big'):
+            crc = ((crc << 8) & mask) ^ table[((crc >> top) ^ octet) & 0xff]
+        return crc ^ self.xorout
+
+CRC16_CCITT = crc(16, 0x1021, 0x0000, 0xffff)           # x^16 + x^12 + x^5 + 1 (TSBK, PDU header, MOT talker alias)
+CRC9        = crc(9, 0x059, 0x000, 0x1ff)               # x^9 + x^6 + x^4 + x^3 + 1 (confirmed data blocks)
+CRC32       = crc(32, 0x04c11db7, 0x00000000, 0xffffffff) # packet data crc
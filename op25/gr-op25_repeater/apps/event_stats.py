@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+
+# Trunking event statistics
+#
+# Copyright 2025 Graham J. Norbury - gnorbury@bondcar.com
+#
+# This file is part of OP25
+#
+# OP25 is free software; you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# OP25 is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OP25; see the file COPYING. If not, write to the Free
+# Software Foundation, Inc., 51 Franklin Street, Boston, MA
+# 02110-1301, USA.
+#
+# Generates the op25_stats.sh reports from the event database recorded
+# when the trunking section of the config file contains "event_db".
+# Unlike op25_stats.sh no verbose (-v 5) log is required.
+#
+# Example usage:
+# ./event_stats.py -d events.db -t tags.tsv            (write all op25-*.txt report files)
+# ./event_stats.py -d events.db -t tags.tsv -r tgid    (print one report to stdout)
+#
+
+import sys
+import os
+import csv
+import time
+import sqlite3
+from optparse import OptionParser
+
+from helper_funcs import decomment, utf_ascii
+from event_store import EV_NEW_FREQ, EV_SET_TGID, EV_NEW_TGID, EV_ENCRYPT, EV_CONTROL_CHANNEL
+
+ACTIVITY_INTERVAL = 300     # Seconds per activity histogram bucket
+
+def read_tags(tags_file):   # tgid -> tag from a talkgroup tags tsv file
+    tags = {}
+    if tags_file is None:
+        return tags
+    with open(tags_file, 'r', encoding='utf-8-sig') as csvfile:
+        sreader = csv.reader(decomment(csvfile), delimiter='\t', quotechar='"', quoting=csv.QUOTE_ALL)
+        for row in sreader:
+            if len(row) < 2:
+                continue
+            try:
+                tags[int(row[0])] = utf_ascii(row[1]).strip()
+            except ValueError:
+                continue
+    return tags
+
+class event_stats(object):
+    def __init__(self, filename, sysname=None, tags={}):
+        self.conn = sqlite3.connect("file:%s?mode=ro" % filename, uri=True)
+        self.sysname = sysname
+        self.tags = tags
+
+    def query(self, event, columns, order=None, group=None):
+        sql = "SELECT %s FROM events WHERE event = ?" % columns
+        args = [event]
+        if self.sysname is not None:
+            sql += " AND sysname = ?"
+            args.append(self.sysname)
+        if group is not None:
+            sql += " GROUP BY %s" % group
+        if order is not None:
+            sql += " ORDER BY %s" % order
+        return self.conn.execute(sql, args).fetchall()
+
+    def freqs_used(self):
+        return ["%f" % (freq / 1e6) for (freq,) in self.query(EV_NEW_FREQ, "freq", order="freq")]
+
+    def cc_used(self):
+        return ["%f" % (freq / 1e6) for (freq,) in self.query(EV_CONTROL_CHANNEL, "freq", order="ts")]
+
+    def new_tgids(self):
+        return ["%d %s prio %d" % (tgid, tag, prio) for (tgid, tag, prio) in self.query(EV_NEW_TGID, "tgid, tag, prio", order="tgid")]
+
+    def enc_used(self):
+        return ["tg=%d algid=0x%x keyid=0x%x" % row for row in self.query(EV_ENCRYPT, "DISTINCT tgid, algid, keyid", order="tgid, algid, keyid")]
+
+    def tgid_counts(self):  # [(pct, count, tgid)] by descending count
+        counts = self.query(EV_SET_TGID, "tgid, COUNT(*)", group="tgid")
+        total = sum([count for (tgid, count) in counts])
+        counts.sort(key=lambda c: (-c[1], c[0]))
+        return [((count * 100.0) / total, count, tgid) for (tgid, count) in counts]
+
+    def tgid_frequency(self):
+        return [("%2.3f\t%d\t%d\t%s" % (pct, count, tgid, self.tags.get(tgid, ""))).rstrip() for (pct, count, tgid) in self.tgid_counts()]
+
+    def tagless_frequency(self):
+        return ["%2.3f\t%d\t%d" % (pct, count, tgid) for (pct, count, tgid) in self.tgid_counts() if not self.tags.get(tgid, "")]
+
+    def tagless_numeric(self):
+        return ["%d\t%2.3f\t%d" % (tgid, pct, count) for (pct, count, tgid) in sorted(self.tgid_counts(), key=lambda c: c[2]) if not self.tags.get(tgid, "")]
+
+    def activity(self):
+        rows = self.query(EV_SET_TGID, "CAST(ts / %d AS INTEGER) AS bucket, COUNT(*)" % ACTIVITY_INTERVAL, group="bucket", order="bucket")
+        if len(rows) == 0:
+            return []
+        return ["# Starting time (Unix epoch): %d" % (rows[0][0] * ACTIVITY_INTERVAL), ""] + ["%d %d" % (bucket * ACTIVITY_INTERVAL, count) for (bucket, count) in rows]
+
+# report name: (output file, header lines, event_stats method)
+REPORTS = [ ('freqs',    ("op25-freqs-used.txt",        ["# Frequencies Used"], event_stats.freqs_used)),
+            ('cc',       ("op25-cc-used.txt",           ["# Control Channels Used"], event_stats.cc_used)),
+            ('newtgids', ("op25-new-tgids.txt",         ["# Newly Seen Talkgroups"], event_stats.new_tgids)),
+            ('enc',      ("op25-enc-used.txt",          ["# Encryption algids and keyids"], event_stats.enc_used)),
+            ('tgid',     ("op25-tgid-frequency.txt",    ["# Talkgroup Frequency Analysis", "# PCT   Count   TGID    Description"], event_stats.tgid_frequency)),
+            ('tagless',  ("op25-tagless-frequency.txt", ["# Talkgroups without tags", "# PCT   Count   TGID"], event_stats.tagless_frequency)),
+            ('numeric',  ("op25-tagless-numeric.txt",   ["# Tagless talkgroups sorted numerically", "# TGID  PCT     Count"], event_stats.tagless_numeric)),
+            ('activity', ("op25-activity.txt",          ["# Commands sent in prior 5 minutes (300 seconds)"], event_stats.activity)) ]
+
+def main():
+    parser = OptionParser()
+    parser.add_option("-d", "--database", type="string", default=None, help="event database file name")
+    parser.add_option("-t", "--tags-file", type="string", default=None, help="talkgroup tags tsv file")
+    parser.add_option("-s", "--sysname", type="string", default=None, help="restrict reports to one trunking system")
+    parser.add_option("-r", "--report", type="string", default=None, help="print one report to stdout: %s" % ", ".join([name for (name, r) in REPORTS]))
+    parser.add_option("-o", "--output-dir", type="string", default=".", help="directory for report files")
+    (options, args) = parser.parse_args()
+    if options.database is None:
+        parser.print_help()
+        sys.exit(1)
+
+    stats = event_stats(options.database, options.sysname, read_tags(options.tags_file))
+    reports = dict(REPORTS)
+    if options.report is not None:
+        if options.report not in reports:
+            sys.stderr.write("unknown report: %s\n" % options.report)
+            sys.exit(1)
+        filename, header, report = reports[options.report]
+        sys.stdout.write("\n".join(header + report(stats)) + "\n")
+        return
+
+    for (name, (filename, header, report)) in REPORTS:
+        t0 = time.time()
+        lines = report(stats)
+        with open(os.path.join(options.output_dir, filename), 'w') as f:
+            f.write("\n".join(header + lines) + "\n")
+        sys.stderr.write("Writing %s: %d lines (%.1f ms)\n" % (filename, len(lines), (time.time() - t0) * 1e3))
+
+if __name__ == "__main__":
+    main()
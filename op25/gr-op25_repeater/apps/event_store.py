@@ -0,0 +1,108 @@
+# Trunking call event store
+#
+# Copyright 2025 Graham J. Norbury - gnorbury@bondcar.com
+#
+# This file is part of OP25
+#
+# OP25 is free software; you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# OP25 is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OP25; see the file COPYING. If not, write to the Free
+# Software Foundation, Inc., 51 Franklin Street, Boston, MA
+# 02110-1301, USA.
+#
+# Append-only SQLite (WAL mode) store of typed trunking events, written
+# in batches by a background thread.  Statistics are produced from the
+# database by event_stats.py instead of scraping a verbose stderr log.
+#
+
+import sys
+import time
+import sqlite3
+from log_ts import log_ts
+from batch_writer import batch_writer
+
+EVENT_QUEUE_MAX = 100000     # Maximum number of events waiting to be written
+EVENT_BATCH_SIZE = 1000      # Maximum number of events inserted per transaction
+EVENT_FLUSH_INTERVAL = 1.0   # Seconds between writer wakeups when the queue is not filling
+
+# event types
+EV_CALL            = 1      # call log entry (rx_ctl.log_call)
+EV_NEW_FREQ        = 2      # voice frequency seen for the first time
+EV_SET_TGID        = 3      # talkgroup activity on a voice frequency (grant or update)
+EV_NEW_TGID        = 4      # talkgroup seen for the first time
+EV_REGISTER        = 5      # subscriber unit registration
+EV_ENCRYPT         = 6      # talkgroup encryption algid/keyid changed
+EV_CONTROL_CHANNEL = 7      # receiver tuned to control channel
+
+EVENT_TYPES = { EV_CALL:            'call',
+                EV_NEW_FREQ:        'new_freq',
+                EV_SET_TGID:        'set_tgid',
+                EV_NEW_TGID:        'new_tgid',
+                EV_REGISTER:        'register',
+                EV_ENCRYPT:         'encrypt',
+                EV_CONTROL_CHANNEL: 'control_channel' }
+
+EVENT_FIELDS = ('ts', 'event', 'sysname', 'rcvr', 'freq', 'slot', 'tgid', 'srcaddr', 'prio', 'svcopts', 'algid', 'keyid', 'tag')
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS events (ts REAL NOT NULL, event INTEGER NOT NULL, sysname TEXT, rcvr INTEGER, freq INTEGER, slot INTEGER, tgid INTEGER, srcaddr INTEGER, prio INTEGER, svcopts INTEGER, algid INTEGER, keyid INTEGER, tag TEXT)",
+    "CREATE INDEX IF NOT EXISTS events_event_ts ON events (event, ts)",
+    "CREATE INDEX IF NOT EXISTS events_event_tgid ON events (event, tgid)",
+    "CREATE TABLE IF NOT EXISTS event_types (event INTEGER PRIMARY KEY, name TEXT)",
+]
+
+def open_db(filename):
+    conn = sqlite3.connect(filename)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    with conn:
+        for stmt in SCHEMA:
+            conn.execute(stmt)
+        conn.executemany("INSERT OR REPLACE INTO event_types (event, name) VALUES (?, ?)", sorted(EVENT_TYPES.items()))
+    return conn
+
+class event_store(batch_writer):
+    def __init__(self, filename):
+        batch_writer.__init__(self, EVENT_QUEUE_MAX, EVENT_BATCH_SIZE, EVENT_FLUSH_INTERVAL)
+        self.filename = filename
+        self.count = 0
+        self.conn = None            # opened by the writer thread, sqlite connections belong to the thread that created them
+        open_db(filename).close()   # create schema up front so configuration errors show at startup
+        self.start_writer()
+        sys.stderr.write("%s Recording trunking events to database: %s\n" % (log_ts.get(), filename))
+
+    def put(self, event, sysname, rcvr=None, freq=None, slot=None, tgid=None, srcaddr=None, prio=None, svcopts=None, algid=None, keyid=None, tag=None):
+        self.put_item((time.time(), event, sysname, rcvr, freq, slot, tgid, srcaddr, prio, svcopts, algid, keyid, tag))
+
+    def write_batch(self, batch):
+        try:
+            if self.conn is None:
+                self.conn = sqlite3.connect(self.filename)
+            with self.conn:
+                self.conn.executemany("INSERT INTO events (%s) VALUES (%s)" % (", ".join(EVENT_FIELDS), ", ".join(["?"] * len(EVENT_FIELDS))), batch)
+            self.count += len(batch)
+        except sqlite3.Error as e:
+            sys.stderr.write("%s event_store: failed to write %d events: %s\n" % (log_ts.get(), len(batch), e))
+
+    def report_dropped(self, count):
+        sys.stderr.write("%s event_store: %d events dropped\n" % (log_ts.get(), count))
+
+    def writer_done(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def close(self):
+        if not self.keep_running:
+            return
+        batch_writer.close(self, 5.0)
+        sys.stderr.write("%s Recorded %d trunking events to database: %s\n" % (log_ts.get(), self.count, self.filename))
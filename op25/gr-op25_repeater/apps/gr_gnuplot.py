@@ -57,6 +57,7 @@ class wrap_gp(object):
         self.avg_pwr = np.zeros(FFT_BINS)
         self.min_y = -100.0
         self.buf = []
+        self.data_fmts = {}
         self.plot_count = 0
         self.last_plot = 0
         self.plot_interval = None
@@ -98,6 +99,13 @@ class wrap_gp(object):
             if (sleep_count % 5) == 0:
                 self.gp.kill()
 
+    def format_data(self, ncols, nrows, values, nplots=1):
+        # gnuplot inline data in one formatting pass; format strings are cached per plot geometry
+        key = (ncols, nrows, nplots)
+        if key not in self.data_fmts:
+            self.data_fmts[key] = (('\t'.join(['%f'] * ncols) + '\n') * nrows + 'e\n') * nplots
+        return self.data_fmts[key] % tuple(np.ravel(values).tolist())
+
     def set_interval(self, v):
         self.plot_interval = v
 
@@ -120,65 +128,45 @@ class wrap_gp(object):
         plot_data = { "json_type": "plot", "chan": self.chan, "mode": mode, "data": [] }
         plots = []
         s = ''
-        while(len(self.buf)):
-            if mode == 'eye':
-                if len(self.buf) < self.sps:
-                    break
-                for i in range(self.sps):
-                    s += '%f\n' % self.buf[i]
-                    plot_data['data'].append( (i, self.buf[i]) )
-                s += 'e\n'
-                self.buf=self.buf[self.sps:]
-                plots.append('"-" with lines')
-            elif mode == 'constellation':
-                for b in self.buf:
-                    s += '%f\t%f\n' % (b.real, b.imag)
-                    plot_data['data'].append( (b.real, b.imag) )
-                s += 'e\n'
-                self.buf = []
-                plots.append('"-" with points')
-            elif mode == 'symbol':
-                idx = 0
-                for b in self.buf:
-                    s += '%f\n' % (b)
-                    plot_data['data'].append( (idx, b) )
-                    idx += 1
-                s += 'e\n'
-                self.buf = []
-                plots.append('"-" with points')
-            elif mode == 'fft' or mode == 'mixer' or mode == 'fll':
-                sum_pwr = 0.0
-                self.ffts = np.fft.fft((self.buf * np.blackman(BUFSZ)), BUFSZ , 0) / (0.42 * BUFSZ)
-                self.ffts = np.fft.fftshift(self.ffts)
-                self.freqs = np.fft.fftfreq(len(self.ffts))
-                self.freqs = np.fft.fftshift(self.freqs)
-                tune_freq = (self.center_freq - self.relative_freq) / 1e6
-                if self.center_freq and self.width:
-                                    self.freqs = ((self.freqs * self.width) + self.center_freq + self.offset_freq) / 1e6
-                elif self.width:
-                                    self.freqs = (self.freqs * self.width)
-                for i in range(len(self.ffts)):
-                    if mode == 'fft':
-                        self.avg_pwr[i] = ((1.0 - FFT_AVG) * self.avg_pwr[i]) + (FFT_AVG * np.abs(self.ffts[i]))
-                    else:
-                        self.avg_pwr[i] = ((1.0 - MIX_AVG) * self.avg_pwr[i]) + (MIX_AVG * np.abs(self.ffts[i]))
-                    if self.avg_pwr[i] == 0: # guard against divide by zero
-                        break
-                    y_val = 20 * np.log10(self.avg_pwr[i])
-                    s += '%f\t%f\n' % (self.freqs[i], y_val)
-                    plot_data['data'].append( (self.freqs[i], y_val) )
-                    if ((mode == 'mixer') or (mode == 'fll')) and (self.avg_pwr[i] > 1e-5):
-                        if (self.freqs[i] - self.center_freq) < 0:
-                            sum_pwr -= self.avg_pwr[i]
-                        elif (self.freqs[i] - self.center_freq) > 0:
-                            sum_pwr += self.avg_pwr[i]
-                s += 'e\n'
-                self.buf = []
-                plots.append('"-" with lines')
-                if min(self.avg_pwr) == 0: # plot is broken, probably because source device was missing
-                    return consumed
-                min_y = 20 * np.log10(min(self.avg_pwr))
-                self.min_y = ((1.0 - Y_AVG) * self.min_y) + (Y_AVG * min_y) 
+        if mode == 'eye':
+            nplots = len(self.buf) // self.sps
+            if nplots > 0:
+                eye = self.buf[:nplots * self.sps]
+                s = self.format_data(1, self.sps, eye, nplots)
+                plot_data['data'] = list(zip(list(range(self.sps)) * nplots, eye.tolist()))
+                plots = ['"-" with lines'] * nplots
+        elif mode == 'constellation':
+            s = self.format_data(2, len(self.buf), np.column_stack((self.buf.real, self.buf.imag)))
+            plot_data['data'] = list(zip(self.buf.real.tolist(), self.buf.imag.tolist()))
+            plots.append('"-" with points')
+        elif mode == 'symbol':
+            s = self.format_data(1, len(self.buf), self.buf)
+            plot_data['data'] = list(enumerate(self.buf.tolist()))
+            plots.append('"-" with points')
+        elif mode == 'fft' or mode == 'mixer' or mode == 'fll':
+            self.ffts = np.fft.fft((self.buf * np.blackman(BUFSZ)), BUFSZ , 0) / (0.42 * BUFSZ)
+            self.ffts = np.fft.fftshift(self.ffts)
+            self.freqs = np.fft.fftfreq(len(self.ffts))
+            self.freqs = np.fft.fftshift(self.freqs)
+            if self.center_freq and self.width:
+                                self.freqs = ((self.freqs * self.width) + self.center_freq + self.offset_freq) / 1e6
+            elif self.width:
+                                self.freqs = (self.freqs * self.width)
+            avg = FFT_AVG if mode == 'fft' else MIX_AVG
+            self.avg_pwr = ((1.0 - avg) * self.avg_pwr) + (avg * np.abs(self.ffts))
+            nbins = len(self.avg_pwr)
+            zero_bins = np.flatnonzero(self.avg_pwr == 0)
+            if len(zero_bins) > 0: # guard against divide by zero
+                nbins = int(zero_bins[0])
+            y_vals = 20 * np.log10(self.avg_pwr[:nbins])
+            s = self.format_data(2, nbins, np.column_stack((self.freqs[:nbins], y_vals)))
+            plot_data['data'] = list(zip(self.freqs[:nbins].tolist(), y_vals.tolist()))
+            self.buf = []
+            plots.append('"-" with lines')
+            if nbins < len(self.avg_pwr): # plot is broken, probably because source device was missing
+                return consumed
+            min_y = 20 * np.log10(np.min(self.avg_pwr))
+            self.min_y = ((1.0 - Y_AVG) * self.min_y) + (Y_AVG * min_y) 
         self.buf = []
 
         # FFT processing needs to be completed to maintain the weighted average buckets
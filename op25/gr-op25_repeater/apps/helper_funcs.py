@@ -21,12 +21,14 @@
 #
 
 import sys
+import time
 import json
 import ast
 from threading import Lock
 from urllib.parse import urlparse
 from urllib.parse import urlunparse
 from log_ts import log_ts
+from crc_funcs import CRC16_CCITT
 
 #################
 # Helper functions
@@ -37,17 +39,32 @@ def utf_ascii(ustr):
         return ustr
 
 def get_ordinals(s):
-    t = 0
-    if type(s) is int:                                  # integer
+    if type(s) is bytes:                                # byte list
+        return int.from_bytes(s, 'big')
+    elif type(s) is int:                                # integer
         return s
-    elif type(s) is not str and isinstance(s, bytes):   # byte list
-        for c in s:
-            t = (t << 8) + c
-    else:                                               # string list
-        for c in s:
-            t = (t << 8) + ord(c)
+    elif isinstance(s, (bytes, bytearray)):
+        return int.from_bytes(s, 'big')
+    t = 0
+    for c in s:                                         # string list
+        t = (t << 8) + ord(c)
     return t
 
+class bit_struct(object):   # struct.Struct style unpacking of msb-first bit fields from an octet string
+    def __init__(self, n_octets, fields):   # fields is a list of (bit offset, width) counted from the msb
+        self.size = n_octets
+        self.fields = tuple([((n_octets * 8) - offset - width, (1 << width) - 1) for (offset, width) in fields])
+
+        # generate a straight line unpack(s) returning a tuple with one integer per field; short strings are zero filled
+        src = ['def unpack(s):',
+               '    value = int.from_bytes(s[:%d], "big")' % n_octets,
+               '    if len(s) < %d:' % n_octets,
+               '        value <<= (%d - len(s)) * 8' % n_octets,
+               '    return (%s,)' % ', '.join(['(value >> %d) & 0x%x' % (shift, mask) for (shift, mask) in self.fields])]
+        ns = {}
+        exec('\n'.join(src), ns)
+        self.unpack = ns['unpack']
+
 def get_frequency( f):    # return frequency in Hz
     if str(f).find('.') == -1:    # assume in Hz
         return int(f)
@@ -110,35 +127,16 @@ def from_dict(d, key, def_val):
     else:
         return def_val
 
-def crc16(dat, len):    # slow version
-    poly = (1<<12) + (1<<5) + (1<<0)
-    crc = 0
-    for i in range(len):
-        bits = (dat >> (((len-1)-i)*8)) & 0xff
-        for j in range(8):
-            bit = (bits >> (7-j)) & 1
-            crc = ((crc << 1) | bit) & 0x1ffff
-            if crc & 0x10000:
-                crc = (crc & 0xffff) ^ poly
-    crc = crc ^ 0xffff
-    return crc
+def crc16(dat, len):    # len octets with the received crc in the last two; returns 0 when the crc is good
+    # dividing the whole message (rather than the message shifted by 16 bits) leaves the
+    # received crc xor'ed into the remainder of the leading octets
+    return CRC16_CCITT.compute(dat >> 16, (len - 2) * 8) ^ (dat & 0xffff)
 
 # This algorithm is derived from DSD-FME dmr_util.c
 # ComputeCrcCCITT16d(const uint8_t * buf, uint32_t len)
-# Not the most efficient but it seems to work
+# d_len is in bits
 def ComputeCrcCCITT16d(data, d_len):
-    i        = 0;
-    CRC      = 0x0000   # initialization value
-    Polynome = 0x1021   # Polynomial x^16 + x^12 + x^5 + 1
-
-    while i < d_len:
-        if (((CRC >> 15) & 1) ^ ((data >> (d_len - i - 1)) & 1)):
-            CRC = ((CRC << 1) ^ Polynome)
-        else:
-            CRC <<= 1
-        CRC &= 0xffff   # discard any overflow bits
-        i += 1
-    return (CRC ^ 0xffff)
+    return CRC16_CCITT.compute(data, d_len)
 
 def decomment(csvfile):
     for row in csvfile:
@@ -225,4 +223,38 @@ class TimeoutLock():
     def locked(self, *args, **kwargs):
         return self.lock.locked(*args, **kwargs)
 
+# sequence lock: writers serialize on a TimeoutLock, readers never block writers
+class SeqLock(TimeoutLock):
+    read_retries = 8    # optimistic read attempts before falling back to taking the lock
+
+    def __init__(self, timeout=None, *args, **kwargs):
+        TimeoutLock.__init__(self, timeout, *args, **kwargs)
+        self.seq = 0    # odd while a writer is inside the lock
+
+    def __enter__(self, *args, **kwargs):
+        rc = TimeoutLock.__enter__(self)
+        self.seq += 1
+        return rc
+
+    def __exit__(self, *args, **kwargs):
+        self.seq += 1
+        return TimeoutLock.__exit__(self)
+
+    # read calls fn() (which must not modify shared state) until it completes without a writer intervening
+    def read(self, fn):
+        for i in range(self.read_retries):
+            seq = self.seq
+            if seq & 1:
+                time.sleep(0)   # writer active; yield to let it finish
+                continue
+            try:
+                rc = fn()
+            except (KeyError, RuntimeError):    # torn read of a structure being modified
+                rc = None
+                seq = -1
+            if self.seq == seq:
+                return rc
+        with self:
+            return fn()
+
 
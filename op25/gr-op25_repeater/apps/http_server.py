@@ -25,61 +25,303 @@ import json
 import socket
 import traceback
 import threading
+import queue
+import gzip
+import hashlib
+import collections
+from email.utils import formatdate
 
 from gnuradio import gr
 from waitress.server import create_server
 
 import gnuradio.op25_repeater as op25_repeater
 
+try:
+    import brotli   # optional, used in addition to gzip for static file compression
+except ImportError:
+    brotli = None
+
 my_input_q = None
 my_output_q = None
 my_recv_q = None
 my_port = None
 
+HTTP_THREADS = 6            # waitress worker threads for static files and commands
+MAX_EVENT_CLIENTS = 8       # concurrent event stream clients, each holds one additional worker thread
+EVENT_QUEUE_SIZE = 32       # per-client event buffer, overflow triggers a resync from the snapshot
+EVENT_KEEPALIVE = 15.0      # seconds between keepalive comments so dead clients are noticed
+EVENT_UPDATE_INTERVAL = 1.0 # seconds between 'update' requests issued on behalf of event stream clients
+EVENT_DEDUP_TYPES = 'trunk_update channel_update change_freq terminal_config full_config ws_instances'.split()
+POST_REPLY_TIMEOUT = 0.2    # max wait for replies to a polled command
+POST_REPLY_SETTLE = 0.02    # replies to one command arrive as a burst, allow it to complete
+EVENT_UPDATE_TOKEN = 1      # reply token of 'update' requests issued by event_updater
+
+event_clients = []          # connected event stream clients
+event_trunk_version = 0     # trunk_update version held by event stream clients, 0 requests a full update
+event_snapshot = {}         # json_type -> latest event, replayed to new clients and used to skip unchanged updates
+event_lock = threading.Lock()
+post_reply = threading.Event()
+pending_replies = {}        # reply token -> trunk_update replies for the polling request that sent it
+reply_token = EVENT_UPDATE_TOKEN
+reply_lock = threading.Lock()
+
 """
 fake http and ajax server module
 TODO: make less fake
 """
 
+STATIC_DIR = '../www/www-static'
+IMAGE_DIR = '../www/images'
+CONTENT_TYPES = { 'png': 'image/png', 'jpeg': 'image/jpeg', 'jpg': 'image/jpeg', 'gif': 'image/gif', 'css': 'text/css', 'js': 'application/javascript', 'html': 'text/html', 'ico' : 'image/x-icon'}
+IMG_TYPES = 'png jpg jpeg gif'.split()
+COMPRESS_TYPES = 'css js html ico'.split()  # image formats are already compressed
+STATIC_CACHE_CONTROL = 'max-age=300'        # ui files only change when op25 is updated
+IMAGE_CACHE_CONTROL = 'no-cache'            # plots are rewritten continuously, always revalidate
+
+STATIC_CACHE_MAX = 4 * 1024 * 1024         # bytes of file bodies held in static_cache
+
+static_cache = collections.OrderedDict()    # pathname -> static_entry in lru order, reloaded when file mtime or size changes
+static_cache_lock = threading.Lock()
+
+class static_entry(object):
+    def __init__(self, pathname, st):
+        with open(pathname, 'rb') as f:
+            self.body = f.read()
+        self.mtime = st.st_mtime
+        self.size = st.st_size
+        self.etag = '"%s"' % hashlib.md5(self.body).hexdigest()
+        self.last_modified = formatdate(st.st_mtime, usegmt=True)
+        self.encoded = {}
+        if pathname.split('.')[-1] in COMPRESS_TYPES:
+            self.encoded['gzip'] = gzip.compress(self.body, 9)
+            if brotli is not None:
+                self.encoded['br'] = brotli.compress(self.body)
+        self.nbytes = len(self.body) + sum([len(body) for body in self.encoded.values()])
+
+def get_static_entry(pathname):
+    try:
+        st = os.stat(pathname)
+    except OSError:
+        with static_cache_lock:
+            static_cache.pop(pathname, None)
+        return None
+    with static_cache_lock:
+        entry = static_cache.get(pathname)
+        if entry is not None and entry.mtime == st.st_mtime and entry.size == st.st_size:
+            static_cache.move_to_end(pathname)
+            return entry
+    try:
+        entry = static_entry(pathname, st)
+    except (IOError, OSError):
+        return None
+    with static_cache_lock:
+        static_cache[pathname] = entry
+        static_cache.move_to_end(pathname)
+        prune_static_cache()
+    return entry
+
+def prune_static_cache():   # caller must hold static_cache_lock
+    # plot images are renamed every frame and the old files deleted, so drop entries whose
+    # file is gone and then evict least recently used entries down to STATIC_CACHE_MAX
+    for pathname in [pathname for pathname in static_cache if not os.path.exists(pathname)]:
+        del static_cache[pathname]
+    total = sum([entry.nbytes for entry in static_cache.values()])
+    while total > STATIC_CACHE_MAX and len(static_cache) > 1:
+        pathname, entry = static_cache.popitem(last=False)
+        total -= entry.nbytes
+
+def preload_static_files():
+    for filename in os.listdir(STATIC_DIR) if os.path.isdir(STATIC_DIR) else []:
+        if filename.split('.')[-1] in CONTENT_TYPES:
+            get_static_entry('%s/%s' % (STATIC_DIR, filename))
+
+def select_encoding(environ, entry):
+    accepted = [e.split(';')[0].strip() for e in environ.get('HTTP_ACCEPT_ENCODING', '').split(',')]
+    for encoding in ('br', 'gzip'):
+        if encoding in entry.encoded and encoding in accepted:
+            return encoding
+    return None
+
+def not_modified(environ, entry):
+    if 'HTTP_IF_NONE_MATCH' in environ:
+        return entry.etag in [t.strip() for t in environ['HTTP_IF_NONE_MATCH'].split(',')] or environ['HTTP_IF_NONE_MATCH'].strip() == '*'
+    if 'HTTP_IF_MODIFIED_SINCE' in environ:
+        return environ['HTTP_IF_MODIFIED_SINCE'].strip() == entry.last_modified
+    return False
+
 def static_file(environ, start_response):
-    content_types = { 'png': 'image/png', 'jpeg': 'image/jpeg', 'jpg': 'image/jpeg', 'gif': 'image/gif', 'css': 'text/css', 'js': 'application/javascript', 'html': 'text/html', 'ico' : 'image/x-icon'}
-    img_types = 'png jpg jpeg gif'.split()
     if environ['PATH_INFO'] == '/':
         filename = 'index.html'
     else:
         filename = re.sub(r'[^a-zA-Z0-9_.\-]', '', environ['PATH_INFO'])
     suf = filename.split('.')[-1]
-    pathname = '../www/www-static'
-    if suf in img_types:
-        pathname = '../www/images'
+    pathname = STATIC_DIR
+    cache_control = STATIC_CACHE_CONTROL
+    if suf in IMG_TYPES:
+        pathname = IMAGE_DIR
+        cache_control = IMAGE_CACHE_CONTROL
     pathname = '%s/%s' % (pathname, filename)
-    if suf not in list(content_types.keys()) or '..' in filename or not os.access(pathname, os.R_OK):
+    entry = None
+    if suf in list(CONTENT_TYPES.keys()) and '..' not in filename:
+        entry = get_static_entry(pathname)
+    headers = []
+    if entry is None:
         sys.stderr.write('404 %s\n' % pathname)
         status = '404 NOT FOUND'
         content_type = 'text/plain'
         output = status
+        return status, content_type, output, headers
+
+    content_type = CONTENT_TYPES[suf]
+    headers.append(('ETag', entry.etag))
+    headers.append(('Last-Modified', entry.last_modified))
+    headers.append(('Cache-Control', cache_control))
+    if entry.encoded:
+        headers.append(('Vary', 'Accept-Encoding'))
+    if not_modified(environ, entry):
+        status = '304 NOT MODIFIED'
+        output = b''
+        return status, content_type, output, headers
+
+    encoding = select_encoding(environ, entry)
+    if encoding is not None:
+        headers.append(('Content-Encoding', encoding))
+        output = entry.encoded[encoding]
     else:
-        with open(pathname, 'rb') as f:
-            output = f.read()
-        content_type = content_types[suf]
-        status = '200 OK'
-    return status, content_type, output
+        output = entry.body
+    status = '200 OK'
+    return status, content_type, output, headers
+
+class event_client(object):
+    def __init__(self):
+        self.q = queue.Queue(EVENT_QUEUE_SIZE)
+
+    def put(self, event):
+        try:
+            self.q.put_nowait(event)
+        except queue.Full:  # slow client, discard its backlog and resend current state
+            self.resync()
+
+    def resync(self):
+        global event_trunk_version
+        event_trunk_version = 0
+        try:
+            while True:
+                self.q.get_nowait()
+        except queue.Empty:
+            pass
+        for event in list(event_snapshot.values()):
+            self.q.put_nowait(event)
+
+    def get(self, timeout):
+        return self.q.get(timeout=timeout)
+
+def make_event(js):
+    return (''.join(['data: %s\n' % line for line in js.split('\n')]) + '\n').encode()
+
+def publish_trunk_update(js):   # reply to event_updater, computed against event_trunk_version
+    global event_trunk_version
+    d = json.loads(js)
+    event = make_event(js)
+    with event_lock:
+        if d.get('delta', False) and int(d.get('base', 0)) != event_trunk_version:
+            return      # requested before a resync reset the version; the next update is a full one
+        event_trunk_version = int(d.get('version', 0))
+        if not d.get('delta', False):
+            event_snapshot['trunk_update'] = event
+        for client in event_clients:
+            client.put(event)
+
+def publish_event(js):
+    m = re.search(r'"json_type":\s*"(\w+)"', js)
+    json_type = m.group(1) if m else None
+    event = make_event(js)
+    with event_lock:
+        if json_type in EVENT_DEDUP_TYPES:
+            if event_snapshot.get(json_type) == event:
+                return      # unchanged since last sent
+            event_snapshot[json_type] = event
+        for client in event_clients:
+            client.put(event)
+
+def event_stream(client):
+    try:
+        yield b'retry: 3000\n\n'
+        while True:
+            try:
+                event = client.get(EVENT_KEEPALIVE)
+            except queue.Empty:
+                event = b': keepalive\n\n'
+            yield event
+    finally:
+        with event_lock:
+            if client in event_clients:
+                event_clients.remove(client)
+
+def event_request(environ, start_response):
+    client = event_client()
+    with event_lock:
+        if len(event_clients) >= MAX_EVENT_CLIENTS:
+            client = None
+        else:
+            client.resync()
+            event_clients.append(client)
+    if client is None:
+        sys.stderr.write('event_request: too many event stream clients\n')
+        status = '503 SERVICE UNAVAILABLE'
+        start_response(status, [('Content-type', 'text/plain'), ('Content-Length', str(len(status)))])
+        return [status.encode()]
+    start_response('200 OK', [('Content-type', 'text/event-stream'),
+                              ('Cache-Control', 'no-cache'),
+                              ('X-Accel-Buffering', 'no')])
+    return event_stream(client)
+
+def new_reply_token():
+    global reply_token
+    with reply_lock:
+        reply_token = reply_token + 1 if reply_token < 0x7fffffff else EVENT_UPDATE_TOKEN + 1
+        pending_replies[reply_token] = []
+        return reply_token
+
+def request_full_update():      # an event stream client lost track of the trunk_update version
+    global event_trunk_version
+    with event_lock:
+        event_trunk_version = 0
 
 def post_req(environ, start_response, postdata):
     global my_input_q, my_output_q, my_recv_q, my_port
     valid_req = False
+    events = 'events' in environ.get('QUERY_STRING', '').split('&')   # replies go to the client's event stream
+    tokens = []
     try:
         data = json.loads(postdata)
+        post_reply.clear()
         for d in data:
-            msg = gr.message().make_from_string(str(d['command']), -2, d['arg1'], d['arg2'])
+            arg2 = d['arg2']
+            if str(d['command']) == 'update':   # trunk_update deltas are computed against this client's version
+                if events:
+                    request_full_update()
+                    continue
+                arg2 = new_reply_token()        # so the reply is routed back to this request only
+                tokens.append(arg2)
+            msg = gr.message().make_from_string(str(d['command']), -2, d['arg1'], arg2)
             if not my_output_q.full_p():
                 my_output_q.insert_tail(msg)
         valid_req = True
-        time.sleep(0.2)
+        if not events and post_reply.wait(POST_REPLY_TIMEOUT):
+            time.sleep(POST_REPLY_SETTLE)
+            deadline = time.time() + POST_REPLY_TIMEOUT
+            while time.time() < deadline and [token for token in tokens if not pending_replies.get(token)]:
+                time.sleep(POST_REPLY_SETTLE)
     except (json.JSONDecodeError, KeyError, TypeError):
         sys.stderr.write('post_req: error processing input: %s\n%s\n' % (postdata, traceback.format_exc()))
 
     resp_msg = []
+    with reply_lock:
+        for token in tokens:
+            resp_msg += [json.loads(js) for js in pending_replies.pop(token, [])]
+    if events:
+        return '200 OK', 'application/json', json.dumps(resp_msg)
     while not my_recv_q.empty_p():
         msg = my_recv_q.delete_head()
         if msg.type() == -4:
@@ -92,8 +334,11 @@ def post_req(environ, start_response, postdata):
     return status, content_type, output
 
 def http_request(environ, start_response):
-    if environ['REQUEST_METHOD'] == 'GET':
-        status, content_type, output = static_file(environ, start_response)
+    headers = []
+    if environ['REQUEST_METHOD'] == 'GET' and environ['PATH_INFO'] == '/events':
+        return event_request(environ, start_response)
+    elif environ['REQUEST_METHOD'] == 'GET':
+        status, content_type, output, headers = static_file(environ, start_response)
     elif environ['REQUEST_METHOD'] == 'POST':
         postdata = environ['wsgi.input'].read()
         status, content_type, output = post_req(environ, start_response, postdata)
@@ -103,9 +348,10 @@ def http_request(environ, start_response):
         output = status
         sys.stderr.write('http_request: unexpected input %s\n' % environ['PATH_INFO'])
     
-    response_headers = [('Content-type', content_type),
-                        ('Content-Length', str(len(output)))]
-    start_response(status, response_headers)
+    response_headers = [('Content-type', content_type)]
+    if not status.startswith('304'):
+        response_headers.append(('Content-Length', str(len(output))))
+    start_response(status, response_headers + headers)
 
     if sys.version[0] > '2':
         if type(output) is str:
@@ -124,12 +370,31 @@ def application(environ, start_response):
     return result
 
 def process_qmsg(msg):
+    if msg.type() == -4 and int(msg.arg2()) != 0:   # trunk_update answering a tagged 'update' request
+        s = msg.to_string()
+        if type(s) is not str and isinstance(s, bytes):
+            s = s.decode()
+        token = int(msg.arg2())
+        if token == EVENT_UPDATE_TOKEN:
+            publish_trunk_update(s)
+            return
+        with reply_lock:
+            if token in pending_replies:        # otherwise the request has already returned
+                pending_replies[token].append(s)
+        post_reply.set()
+        return
+    if msg.type() == -4:
+        s = msg.to_string()
+        if type(s) is not str and isinstance(s, bytes):
+            s = s.decode()
+        publish_event(s)
     if my_recv_q.full_p():
         my_recv_q.delete_head_nowait()   # ignores result
     if my_recv_q.full_p():
         return
     if not my_recv_q.full_p():
         my_recv_q.insert_tail(msg)
+        post_reply.set()
 
 class http_server(object):
     def __init__(self, input_q, output_q, endpoint, **kwds):
@@ -143,9 +408,11 @@ class http_server(object):
 
         my_recv_q = gr.msg_queue(10)
         self.q_watcher = queue_watcher(my_input_q, process_qmsg)
+        self.updater = event_updater(my_output_q)
+        preload_static_files()
 
         try:
-            self.server = create_server(application, host=host, port=my_port, threads=6)
+            self.server = create_server(application, host=host, port=my_port, threads=HTTP_THREADS + MAX_EVENT_CLIENTS)
         except (OSError, ValueError):
             sys.stderr.write('Failed to create http terminal server\n%s\n' % traceback.format_exc())
             sys.exit(1)
@@ -172,3 +439,20 @@ class queue_watcher(threading.Thread):
                     self.keep_running = False
             else: # empty queue
                 time.sleep(0.01)
+
+class event_updater(threading.Thread):    # one periodic update request serves all event stream clients
+    def __init__(self, output_q, **kwds):
+        threading.Thread.__init__ (self, **kwds)
+        self.setDaemon(1)
+        self.output_q = output_q
+        self.keep_running = True
+        self.start()
+
+    def run(self):
+        while(self.keep_running):
+            time.sleep(EVENT_UPDATE_INTERVAL)
+            if not event_clients:
+                continue
+            msg = gr.message().make_from_string('update', -2, event_trunk_version, EVENT_UPDATE_TOKEN)
+            if not self.output_q.full_p():
+                self.output_q.insert_tail(msg)
@@ -0,0 +1,120 @@
+# Buffered logging
+#
+# Copyright 2025 Graham J. Norbury - gnorbury@bondcar.com
+#
+# This file is part of OP25
+#
+# OP25 is free software; you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# OP25 is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OP25; see the file COPYING. If not, write to the Free
+# Software Foundation, Inc., 51 Franklin Street, Boston, MA
+# 02110-1301, USA.
+#
+# Log records (timestamp, category, tag, format, args) are appended to a
+# bounded ring and formatted and written to stderr in batches by a
+# background thread, so verbose logging does not block message processing.
+# Records arriving while the ring is full are dropped and counted; raw
+# stderr text (e.g. tracebacks) is written straight through instead.
+#
+# Until install() is called log_msg() writes synchronously to sys.stderr.
+#
+
+import sys
+import time
+import atexit
+from log_ts import log_ts
+from batch_writer import batch_writer
+
+LOG_RING_SIZE = 16384        # Maximum number of records waiting to be written
+LOG_BATCH_SIZE = 256         # Maximum number of records formatted per write
+LOG_FLUSH_INTERVAL = 0.1     # Seconds between writer wakeups when the ring is not filling
+
+_ring = None
+
+class log_ring(batch_writer):
+    def __init__(self, stream, size=LOG_RING_SIZE, levels={}):
+        batch_writer.__init__(self, size, LOG_BATCH_SIZE, LOG_FLUSH_INTERVAL)
+        self.stream = stream
+        self.levels = dict(levels)  # category -> highest level logged; categories not listed are unfiltered
+        self.start_writer()
+
+    def put(self, category, level, tag, fmt, args):
+        if level > self.levels.get(category, level):
+            return
+        self.put_item((time.time(), tag, fmt, args), category)
+
+    def write_batch(self, batch):
+        self.write([self.format(ts, tag, fmt, args) for (ts, tag, fmt, args) in batch])
+
+    def report_dropped(self, count):
+        self.write(["%s log_ring: %d records dropped %s\n" % (log_ts.get(), count, self.dropped)])
+
+    def format(self, ts, tag, fmt, args):
+        if args is None:    # raw text written to the stderr wrapper
+            return fmt
+        try:
+            return "%s [%s] %s\n" % (log_ts.get(ts), tag, fmt % args)
+        except (TypeError, ValueError) as e:
+            return "%s [%s] log_ring: bad record %r %r: %s\n" % (log_ts.get(ts), tag, fmt, args, e)
+
+    def write(self, lines):
+        if len(lines) == 0:
+            return
+        try:
+            self.stream.write("".join(lines))
+            self.stream.flush()
+        except (IOError, ValueError):
+            pass
+
+    def close(self):
+        batch_writer.close(self, 2.0)
+
+class ring_stderr(object):  # file-like stand-in for sys.stderr that queues text on the ring
+    def __init__(self, ring):
+        self.ring = ring
+
+    def write(self, s):
+        if self.ring.full():    # never drop raw text such as tracebacks, write it out of order instead
+            self.ring.write([s])
+        else:
+            self.ring.put('stderr', 0, None, s, None)
+        return len(s)
+
+    def flush(self):
+        self.ring.wakeup.set()
+
+    def __getattr__(self, name):
+        return getattr(self.ring.stream, name)
+
+def install(size=LOG_RING_SIZE, levels={}):
+    global _ring
+    if _ring is not None:
+        return _ring
+    _ring = log_ring(sys.stderr, size, levels)
+    sys.stderr = ring_stderr(_ring)
+    atexit.register(uninstall)
+    return _ring
+
+def uninstall():
+    global _ring
+    if _ring is None:
+        return
+    ring = _ring
+    _ring = None
+    sys.stderr = ring.stream
+    ring.close()
+
+def log_msg(category, level, tag, fmt, *args):  # writes "<timestamp> [<tag>] <fmt % args>"
+    if _ring is not None:
+        _ring.put(category, level, tag, fmt, args)
+    else:
+        sys.stderr.write("%s [%s] %s\n" % (log_ts.get(), tag, fmt % args))
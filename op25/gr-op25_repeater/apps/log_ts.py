@@ -20,21 +20,45 @@
 # Modify TS_FORMAT to control logger timestamp format
 # 0 = legacy epoch seconds
 # 1 = formatted mm/dd/yy hh:mm:ss.usec
+# The OP25_TS_FORMAT environment variable overrides this setting for both the
+# python apps and the C++ blocks (lib/log_ts.h) so that their output matches.
 TS_FORMAT = 1
 
+import os
 import time
-class log_ts(object):
-    @staticmethod
-    def get(supplied_ts=None):
+
+class ts_formatter(object):
+    def __init__(self, ts_format=TS_FORMAT):
+        self.ts_format = ts_format
+        self.cache = (None, "")     # (whole second, formatted prefix) replaced as a unit for thread safety
+
+    def get(self, supplied_ts=None):
         if supplied_ts is None:
             ts = time.time()
         else:
             ts = supplied_ts
 
-        if TS_FORMAT == 0:
-            formatted_ts = "{:.6f}".format(ts)
-        else:
-            formatted_ts = "{:s}{:s}".format(time.strftime("%m/%d/%y %H:%M:%S",time.localtime(ts)),"{:.6f}".format(ts - int(ts)).lstrip("0"))
+        if self.ts_format == 0:
+            return "%.6f" % ts
 
-        return formatted_ts
+        sec = int(ts)
+        usec = int(round((ts - sec) * 1e6))
+        if usec >= 1000000:
+            sec += 1
+            usec -= 1000000
+        cached_sec, prefix = self.cache
+        if sec != cached_sec:       # strftime/localtime only once per second
+            prefix = time.strftime("%m/%d/%y %H:%M:%S", time.localtime(sec))
+            self.cache = (sec, prefix)
+        return "%s.%06d" % (prefix, usec)
 
+def env_ts_format():
+    try:
+        return int(os.environ.get('OP25_TS_FORMAT', TS_FORMAT))
+    except ValueError:
+        return TS_FORMAT
+
+_formatter = ts_formatter(env_ts_format())
+
+class log_ts(object):
+    get = staticmethod(_formatter.get)  # log_ts.get(supplied_ts=None) returns the formatted timestamp string
@@ -62,7 +62,14 @@ import gnuradio.op25_repeater as op25_repeater
 import p25_demodulator_dev as p25_demodulator
 import op25_nbfm
 import op25_iqsrc
+import capture_ring
 import op25_wavsrc
+from qmsg_capture import qmsg_capture
+from event_store import event_store
+from call_recorder import call_recorder
+from sample_clock import sample_clock
+import symbol_file
+import log_ring
 from log_ts import log_ts
 from helper_funcs import *
 
@@ -80,6 +87,8 @@ os.environ['IMBE'] = 'soft'
 
 _def_symbol_rate = 4800
 _def_capture_file = "capture.bin"
+_def_channelizer_bw = 25000         # channel bandwidth kept free of aliasing anywhere within a channelizer bin
+_def_channelizer_oversample = 2     # channelizer output rate as a multiple of the bin spacing
 
 # The P25 receiver
 #
@@ -91,6 +100,7 @@ class device(object):
         self.name = config['name']
         self.args = config['args']
         self.tunable = bool(from_dict(config, 'tunable', False))
+        self.iq_ring = None
 
         sys.stderr.write('device: %s\n' % config)
         if config['args'] == 'iqsrc':
@@ -101,6 +111,10 @@ class device(object):
                 self.frequency = self.src.get_center_freq()
                 self.sample_rate = self.src.get_sample_rate()
                 self.offset = 600000
+            elif self.src.is_ring():        # capture ring segment: rate and center frequency come from its index
+                self.frequency = self.src.get_center_freq()
+                self.sample_rate = self.src.get_sample_rate()
+                self.offset = 0
             else:
                 self.frequency = int(from_dict(config, 'frequency', 800000000))
                 self.sample_rate = config['rate']
@@ -164,6 +178,41 @@ class device(object):
             self.src.set_center_freq(self.frequency + self.offset)
             self.usable_bw = float(from_dict(config, 'usable_bw_pct', 1.0))
 
+        self.channelizer = None
+        self.channelizer_connected = False
+        self.chan_bins = int(from_dict(config, 'channelizer', 0))
+        if self.chan_bins > 0:
+            self.setup_channelizer()
+
+    def setup_channelizer(self):    # polyphase filterbank shared by all channels attached to this device
+        if (self.src is None) or (self.args == 'wavsrc'):
+            sys.stderr.write("channelizer not supported for device %s - ignoring\n" % self.name)
+            return
+        self.chan_spacing = float(self.sample_rate) / self.chan_bins
+        if (self.chan_bins <= _def_channelizer_oversample) or (self.chan_bins % _def_channelizer_oversample) or (self.chan_spacing < 2 * _def_channelizer_bw):
+            sys.stderr.write("channelizer: %d bins not usable at sample rate %d for device %s - ignoring\n" % (self.chan_bins, self.sample_rate, self.name))
+            sys.stderr.write("number of bins must be a multiple of %d greater than %d, with bin spacing of at least %d Hz\n" % (_def_channelizer_oversample, _def_channelizer_oversample, 2 * _def_channelizer_bw))
+            return
+        self.chan_rate = self.chan_spacing * _def_channelizer_oversample
+
+        # passband covers a full channel placed anywhere within +/- half a bin of the bin center,
+        # stopband starts where the oversampled output would alias back into that region
+        taps = filter.firdes.low_pass(1.0, self.sample_rate, self.chan_spacing, self.chan_spacing - _def_channelizer_bw)
+        self.channelizer = filter.pfb.channelizer_ccf(self.chan_bins, taps, _def_channelizer_oversample)
+        sys.stderr.write("channelizer: device %s, bins=%d, spacing=%d, output rate=%d, taps=%d\n" % (self.name, self.chan_bins, self.chan_spacing, self.chan_rate, len(taps)))
+
+    def get_channelizer_bin(self, freq):    # map relative tuning freq to (bin index, freq relative to bin center)
+        if abs(freq) > (((self.sample_rate * self.usable_bw) / 2) - (_def_channelizer_bw / 2)):
+            return None
+        k = int(round(-freq / self.chan_spacing))   # channelizer output n is centered on n * spacing, wrapping to negative frequencies
+        return (k % self.chan_bins, freq + (k * self.chan_spacing))
+
+    def get_capture_center(self):   # center frequency of the samples delivered by the source
+        return self.frequency + self.offset + self.fractional_corr
+
+    def start_iq_ring(self, directory, prefix, segment_size, segments):
+        self.iq_ring = capture_ring.iq_ring(directory, prefix, self.sample_rate, self.get_capture_center(), self.frequency, segment_size = segment_size, segments = segments)
+
     def get_ppm(self):
         return self.ppm
 
@@ -182,6 +231,7 @@ class channel(object):
         self.tb = tb
         self.raw_sink = None
         self.raw_file = None
+        self.raw_unpack = None
         self.throttle = None
         self.nbfm = None
         self.nbfm_mode = 0
@@ -191,11 +241,22 @@ class channel(object):
         self.chan_idle = False
         self.sinks = {}
         self.tdma_state = False
-        self.xor_cache = {}
         self.config = config
         self.symbol_rate = int(from_dict(config, 'symbol_rate', _def_symbol_rate))
         self.channel_rate = self.symbol_rate
         self.ws_instance = get_ws_instance(from_dict(config, 'destination', ""))
+        self.selector = None
+        self.bin = 0
+        self.bin_offset = 0
+        if dev.channelizer is not None:    # demod input is one bin of the shared device channelizer
+            self.selector = blocks.selector(gr.sizeof_gr_complex, 0, 0)
+            input_rate = dev.chan_rate
+            usable_bw = 1.0
+            relative_freq = 0
+        else:
+            input_rate = dev.sample_rate
+            usable_bw = dev.usable_bw if dev.args != 'wavsrc' else 1.0
+            relative_freq = (dev.frequency + dev.offset + dev.fractional_corr) - self.frequency
         if dev.args == 'wavsrc':
             self.demod = p25_demodulator.p25_demod_fb(
                              msgq_id = self.msgq_id,
@@ -211,12 +272,12 @@ class channel(object):
             self.demod = p25_demodulator.p25_demod_cb(
                              msgq_id = self.msgq_id,
                              debug = self.verbosity,
-                             input_rate = dev.sample_rate,
+                             input_rate = input_rate,
                              demod_type = 'fsk4',
                              filter_type = filter_type,
-                             usable_bw = self.device.usable_bw,
+                             usable_bw = usable_bw,
                              excess_bw = float(from_dict(config, 'excess_bw', 0.2)),
-                             relative_freq = ((dev.frequency + dev.offset + dev.fractional_corr) - self.frequency),
+                             relative_freq = relative_freq,
                              offset = dev.offset,
                              if_rate = config['if_rate'],
                              symbol_rate = self.symbol_rate)
@@ -224,12 +285,12 @@ class channel(object):
             self.demod = p25_demodulator.p25_demod_cb(
                              msgq_id = self.msgq_id,
                              debug = self.verbosity,
-                             input_rate = dev.sample_rate,
+                             input_rate = input_rate,
                              demod_type = config['demod_type'],
                              filter_type = config['filter_type'],
-                             usable_bw = self.device.usable_bw,
+                             usable_bw = usable_bw,
                              excess_bw = float(from_dict(config, 'excess_bw', 0.2)),
-                             relative_freq = ((dev.frequency + dev.offset + dev.fractional_corr) - self.frequency),
+                             relative_freq = relative_freq,
                              offset = dev.offset,
                              if_rate = config['if_rate'],
                              symbol_rate = self.symbol_rate)
@@ -249,7 +310,7 @@ class channel(object):
             sys.stderr.write("%s [%d] crypt behavior: %d\n" % (log_ts.get(), self.msgq_id, int(crypt_behavior)))
         
         # Relative-tune the demodulator
-        if not self.demod.set_relative_frequency((dev.frequency + dev.offset + dev.fractional_corr) - self.frequency):
+        if not self.set_relative_frequency((dev.frequency + dev.offset + dev.fractional_corr) - self.frequency):
             sys.stderr.write("%s [%d] Unable to initialize demod to freq: %d, using device freq: %d\n" % (log_ts.get(), self.msgq_id, self.frequency, dev.frequency))
             self.frequency = dev.frequency
 
@@ -398,10 +459,7 @@ class channel(object):
             sink = fft_sink_c(plot_name=("Ch:%s" % self.name), chan=self.msgq_id, out_q=self.tb.ui_in_q)
             self.sinks['fft'] = (sink, self.toggle_fft_plot)
             self.set_plot_destination('fft')
-            sink.set_offset(self.device.offset)
-            sink.set_center_freq(self.device.frequency)
-            sink.set_relative_freq(self.device.frequency - self.frequency)
-            sink.set_width(self.device.sample_rate)
+            self.set_fft_tuning(sink)
             self.tb.lock()
             self.demod.connect_complex('src', sink)
             self.tb.unlock()
@@ -445,6 +503,28 @@ class channel(object):
             self.tb.unlock()
             sink.kill()
 
+    def set_fft_tuning(self, sink):  # fft input is the full device spectrum, or just the selected channelizer bin
+        center_freq = self.device.frequency + self.bin_offset
+        sink.set_offset(self.device.offset)
+        sink.set_center_freq(center_freq)
+        sink.set_relative_freq(center_freq - self.frequency)
+        sink.set_width(self.device.sample_rate if self.selector is None else self.device.chan_rate)
+
+    def set_relative_frequency(self, freq):
+        if self.selector is None:
+            return self.demod.set_relative_frequency(freq)
+        chan_bin = self.device.get_channelizer_bin(freq)
+        if chan_bin is None:
+            return False
+        idx, bin_freq = chan_bin
+        if not self.demod.set_relative_frequency(bin_freq):
+            return False
+        if idx != self.bin:
+            self.selector.set_input_index(idx)
+            self.bin = idx
+        self.bin_offset = bin_freq - freq
+        return True
+
     def set_freq(self, freq):
         if self.frequency == freq:
             return True
@@ -452,17 +532,17 @@ class channel(object):
         old_freq = self.frequency
         self.frequency = freq
 
-        if not self.demod.set_relative_frequency(self.device.offset + self.device.frequency + self.device.fractional_corr - freq): # First attempt relative tune
+        if not self.set_relative_frequency(self.device.offset + self.device.frequency + self.device.fractional_corr - freq): # First attempt relative tune
             if self.device.tunable:                                                                  # then hard tune if allowed
                 self.device.frequency = self.frequency
                 if self.device.src is not None:
                     self.device.src.set_center_freq(self.frequency + self.device.offset)
                 self.device.fractional_corr = int((int(round(self.device.ppm)) - self.device.ppm) * (self.device.frequency/1e6))        # Calc frac ppm using new freq
-                self.demod.set_relative_frequency(self.device.offset + self.device.frequency + self.device.fractional_corr - freq)
+                self.set_relative_frequency(self.device.offset + self.device.frequency + self.device.fractional_corr - freq)
                 if self.verbosity >= 9:
                     sys.stderr.write("%s [%d] Hardware tune: dev_freq(%d), dev_off(%d), dev_frac(%d), tune_freq(%d)\n" % (log_ts.get(), self.msgq_id, self.device.frequency, self.device.offset, self.device.fractional_corr, (self.device.frequency - (self.device.offset + self.device.frequency + self.device.fractional_corr - freq))))
             else:                                                                                    # otherwise fail and reset to prev freq
-                self.demod.set_relative_frequency(self.device.offset + self.device.frequency + self.device.fractional_corr - old_freq)
+                self.set_relative_frequency(self.device.offset + self.device.frequency + self.device.fractional_corr - old_freq)
                 self.frequency = old_freq
                 if self.verbosity:
                     sys.stderr.write("%s [%d] Unable to tune %s to frequency %f\n" % (log_ts.get(), self.msgq_id, self.name, (freq/1e6)))
@@ -471,12 +551,14 @@ class channel(object):
             if self.verbosity >= 9:
                 sys.stderr.write("%s [%d] Relative tune: dev_freq(%d), dev_off(%d), dev_frac(%d), tune_freq(%d)\n" % (log_ts.get(), self.msgq_id, self.device.frequency, self.device.offset, self.device.fractional_corr, (self.device.frequency - (self.device.offset + self.device.frequency + self.device.fractional_corr - freq))))
         if 'fft' in self.sinks:
-                self.sinks['fft'][0].set_center_freq(self.device.frequency)
-                self.sinks['fft'][0].set_relative_freq(self.device.frequency - freq)
+                self.set_fft_tuning(self.sinks['fft'][0])
         if self.verbosity >= 9:
             sys.stderr.write("%s [%d] Tuning to frequency %f\n" % (log_ts.get(), self.msgq_id, (freq/1e6)))
         #self.demod.reset()          # reset gardner-costas tracking loop NOTE: tuning appears to be faster without this step
         self.decoder.control(json.dumps({'tuner': self.msgq_id, 'cmd': 'sync_reset'}))
+        if self.device.iq_ring is not None:
+            self.device.iq_ring.retune(self.device.get_capture_center(), self.device.frequency)
+            self.device.iq_ring.tune(self.msgq_id, self.frequency)
         return True
 
     def adj_tune(self, adjustment): # ideally this would all be done at the device level but the demod belongs to the channel object
@@ -485,8 +567,10 @@ class channel(object):
             self.device.src.set_freq_corr(int(round(self.device.ppm)))
             self.device.src.set_center_freq(self.device.frequency + self.device.offset)
         self.device.fractional_corr = int((int(round(self.device.ppm)) - self.device.ppm) * (self.device.frequency/1e6))
-        self.demod.set_relative_frequency(self.device.offset + self.device.frequency + self.device.fractional_corr - self.frequency)
+        self.set_relative_frequency(self.device.offset + self.device.frequency + self.device.fractional_corr - self.frequency)
         self.demod.reset()          # reset gardner-costas tracking loop
+        if self.device.iq_ring is not None:
+            self.device.iq_ring.retune(self.device.get_capture_center(), self.device.frequency)
 
     def configure_p25_tdma(self, params):
         set_tdma = False
@@ -498,27 +582,28 @@ class channel(object):
             return
         self.tdma_state = set_tdma
         if set_tdma:
-            self.decoder.control(json.dumps({'tuner': self.msgq_id, 'cmd': 'set_xormask', 'xormask': self.xor_cache[self.get_hash(params)]}))
+            self.decoder.control(json.dumps({'tuner': self.msgq_id, 'cmd': 'set_xormask', 'xormask': self.get_xormask(params)}))
             rate = 6000
         else:
             rate = self.channel_rate
 
         self.symbol_rate = rate
         self.demod.set_omega(rate)
+        if self.tb.clock is not None:
+            self.tb.clock.set_rate(self.name, rate)
         if 'eye' in self.sinks:
             self.sinks['eye'][0].set_sps(self.config['if_rate'] / rate)
 
-    def get_hash(self, params):
-        hash = '%x%x%x' % (params['nac'], params['sysid'], params['wacn'])
-        if hash not in self.xor_cache:
-            self.xor_cache[hash] = lfsr.p25p2_lfsr(params['nac'], params['sysid'], params['wacn']).xor_chars
-            if self.verbosity >= 5:
-                sys.stderr.write("%s [%d] Caching TDMA xor mask for NAC: 0x%x, SYSID: 0x%x, WACN: 0x%x\n" % (log_ts.get(), self.msgq_id, params['nac'], params['sysid'], params['wacn']))
-        return hash
+    def get_xormask(self, params):  # masks are cached by lfsr for every channel in the process
+        if self.verbosity >= 5 and not lfsr.is_cached(params['nac'], params['sysid'], params['wacn']):
+            sys.stderr.write("%s [%d] Caching TDMA xor mask for NAC: 0x%x, SYSID: 0x%x, WACN: 0x%x\n" % (log_ts.get(), self.msgq_id, params['nac'], params['sysid'], params['wacn']))
+        return lfsr.xor_chars(params['nac'], params['sysid'], params['wacn'])
 
     def set_rate(self, rate):
         self.symbol_rate = rate
         self.demod.set_omega(rate)
+        if self.tb.clock is not None:
+            self.tb.clock.set_rate(self.name, rate)
         if 'eye' in self.sinks:
             self.sinks['eye'][0].set_sps(self.config['if_rate'] / rate)
 
@@ -529,7 +614,7 @@ class channel(object):
             if params['cmd'] == "set_slotid":
                 self.chan_idle = True if (params['slotid'] == 4) else False
             elif params['cmd'] == "set_xormask":
-                self.decoder.control(json.dumps({'tuner': self.msgq_id, 'cmd': 'set_xormask', 'xormask': self.xor_cache[self.get_hash(params)]}))
+                self.decoder.control(json.dumps({'tuner': self.msgq_id, 'cmd': 'set_xormask', 'xormask': self.get_xormask(params)}))
                 return
         self.decoder.control(json.dumps(params))
         self.demod.control(not self.chan_idle)
@@ -551,9 +636,10 @@ class rx_block (gr.top_block):
 
     # Initialize the receiver
     #
-    def __init__(self, verbosity, config):
+    def __init__(self, verbosity, config, fast_forward=False):
         self.config = config
         self.verbosity = verbosity
+        self.clock = sample_clock() if fast_forward else None   # fast forward replay: timers follow the sample count
         self.devices = []
         self.channels = []
         self.terminal = None
@@ -565,8 +651,11 @@ class rx_block (gr.top_block):
         self.metadata = None
         self.meta_streams = {}
         self.trunking = None
+        self.trunk_capture = None
+        self.trunk_events = None
+        self.call_recorder = None
         self.du_watcher = None
-        self.rx_q = gr.msg_queue(100)
+        self.rx_q = gr.msg_queue(100 if self.clock is None else 0)   # unbounded for fast forward replay, which paces on its depth instead
         self.ui_in_q = gr.msg_queue(100)
         self.ui_out_q = gr.msg_queue(100)
         self.ui_timeout = 5.0
@@ -575,6 +664,8 @@ class rx_block (gr.top_block):
         gr.top_block.__init__(self)
         self.device_id_by_name = {}
 
+        self.configure_devices(config['devices'])  # before trunking so that the sample clock knows its start time
+
         if "audio" in config:
             self.configure_audio(config['audio'])
 
@@ -587,7 +678,6 @@ class rx_block (gr.top_block):
             self.config['trunking'] = {"module": "tk_p25.py", "chans": []}
             self.configure_trunking(self.config['trunking']) # add default module for P25 Conventional terminal support
 
-        self.configure_devices(config['devices'])
         self.configure_channels(config['channels'])
 
         if self.trunking is not None: # post-initialization after channels and devices created
@@ -676,11 +766,41 @@ class rx_block (gr.top_block):
             sys.stderr.write("Error: unable to import trunking module: %s\n%s\n" % (config['module'], e))
             self.trunking = None
 
+        if self.clock is not None:
+            self.clock.install([self.trunking])
+
         if self.trunking is not None:
             self.trunk_rx = self.trunking.rx_ctl(frequency_set = self.change_freq, nbfm_ctrl = self.nbfm_control, fa_ctrl = self.fa_control, debug = self.verbosity, chans = config['chans'])
-            self.du_watcher = du_queue_watcher(self.rx_q, self.trunk_rx.process_qmsg)
+            capture_file = str(from_dict(config, 'capture_file', ""))
+            if capture_file != "":   # record signaling for offline replay by util/tk-replay.py
+                self.trunk_capture = qmsg_capture(capture_file)
+                self.du_watcher = du_queue_watcher(self.rx_q, self.capture_qmsg, timestamped=True, pacer=self.clock)
+            else:
+                self.du_watcher = du_queue_watcher(self.rx_q, self.trunk_rx.process_qmsg, timestamped=True, pacer=self.clock)
+            if bool(from_dict(config, 'system_workers', False)):   # one processing thread per trunking_sysname
+                if hasattr(self.trunk_rx, 'start_workers'):
+                    self.trunk_rx.start_workers()
+                else:
+                    sys.stderr.write("Trunking module %s does not support system_workers\n" % config['module'])
+            event_db = str(from_dict(config, 'event_db', ""))
+            if event_db != "":      # record call events for event_stats.py
+                if hasattr(self.trunk_rx, 'set_event_store'):
+                    self.trunk_events = event_store(event_db)
+                    self.trunk_rx.set_event_store(self.trunk_events)
+                else:
+                    sys.stderr.write("Trunking module %s does not support event_db\n" % config['module'])
+            if 'recording' in config:   # per-call audio files
+                if hasattr(self.trunk_rx, 'set_call_recorder'):
+                    self.call_recorder = call_recorder(config['recording'])
+                    self.trunk_rx.set_call_recorder(self.call_recorder)
+                else:
+                    sys.stderr.write("Trunking module %s does not support recording\n" % config['module'])
             sys.stderr.write("Enabled trunking module: %s\n" % config['module'])
 
+    def capture_qmsg(self, msg):
+        self.trunk_capture.write(msg)
+        self.trunk_rx.process_qmsg(msg)
+
     def configure_metadata(self, config):
         meta_mod = config['module']
         if meta_mod.endswith('.py'):
@@ -713,7 +833,20 @@ class rx_block (gr.top_block):
         self.devices = []
         for cfg in config:
             self.device_id_by_name[cfg['name']] = len(self.devices)
-            self.devices.append(device(cfg))
+            dev = device(cfg)
+            self.devices.append(dev)
+            iq_ring_dir = str(from_dict(cfg, 'iq_ring_dir', ""))
+            if iq_ring_dir != "" and (dev.src is None or dev.args == 'wavsrc'):
+                sys.stderr.write("%s IQ ring capture is not available for %s devices\n" % (log_ts.get(), dev.args))
+            elif iq_ring_dir != "" and dev.args != 'iqsrc':    # an iqsrc device replays from its iq_ring_dir instead
+                dev.start_iq_ring(iq_ring_dir, str(from_dict(cfg, 'iq_ring_prefix', "dev%d" % (len(self.devices) - 1))),
+                                  segment_size = int(float(from_dict(cfg, 'iq_ring_segment_size', capture_ring.SEGMENT_SIZE)) * 1048576),
+                                  segments = int(from_dict(cfg, 'iq_ring_segments', capture_ring.SEGMENTS)))
+                self.connect(dev.src, dev.iq_ring)
+            if self.clock is not None and dev.args == 'iqsrc':
+                self.clock.set_start(dev.src.get_start_ts())
+                self.clock.add_throttle(dev.src.throttle, dev.src.get_sample_rate())
+                self.set_interactive(False)
 
     def find_device(self, chan):
         if 'device' in chan and (chan['device'] != "") and (chan['device'] in self.device_id_by_name):
@@ -755,6 +888,8 @@ class rx_block (gr.top_block):
                 meta_s, meta_q = self.meta_streams[cfg['meta_stream_name']]
             if self.trunking is not None:
                 msgq_id = len(self.channels)
+                if self.call_recorder is not None and from_dict(cfg, 'trunking_sysname', "") != "" and bool(from_dict(cfg, 'record', True)):
+                    cfg['destination'] = self.call_recorder.add_receiver(msgq_id, str(from_dict(cfg, 'destination', "")))
                 chan = channel(cfg, dev, self.verbosity, msgq_id, self.rx_q, self)
                 self.channels.append(chan)
                 self.trunk_rx.add_receiver(msgq_id, config=cfg, meta_q=meta_q, freq=chan.frequency)
@@ -764,21 +899,49 @@ class rx_block (gr.top_block):
                 self.channels.append(chan)
             if ("raw_input" in cfg) and (cfg['raw_input'] != ""):
                 sys.stderr.write("%s Reading raw symbols from file: %s\n" % (log_ts.get(), cfg['raw_input']))
-                chan.raw_file = blocks.file_source(gr.sizeof_char, str(cfg['raw_input']), False)
+                raw_input = str(cfg['raw_input'])
+                chan.raw_file = blocks.file_source(gr.sizeof_char, raw_input, False)
+                symbols_per_byte = 1
+                if symbol_file.identify_file(raw_input) == symbol_file.FMT_SDRTRUNK:   # four packed dibits per byte, msb first
+                    sys.stderr.write("%s Unpacking SDRTrunk symbol file: %s\n" % (log_ts.get(), raw_input))
+                    chan.raw_unpack = blocks.packed_to_unpacked_bb(2, gr.GR_MSB_FIRST)
+                    symbols_per_byte = 4
                 if ("raw_seek" in cfg) and (cfg['raw_seek'] != 0):
-                    chan.raw_file.seek(int(cfg['raw_seek']) * 4800, 0)
+                    chan.raw_file.seek(int(cfg['raw_seek']) * 4800 // symbols_per_byte, 0)
                 chan.throttle = blocks.throttle(gr.sizeof_char, chan.symbol_rate)
-                chan.throttle.set_max_noutput_items(int(chan.symbol_rate/50));
-                self.connect(chan.raw_file, chan.throttle)
+                if self.clock is not None:
+                    self.clock.add_throttle(chan.throttle, chan.symbol_rate)
+                    self.clock.add_source(chan.name, chan.decoder, chan.symbol_rate, self.clock.start + int(from_dict(cfg, 'raw_seek', 0)))
+                else:
+                    chan.throttle.set_max_noutput_items(int(chan.symbol_rate/50));
+                if chan.raw_unpack is not None:
+                    self.connect(chan.raw_file, chan.raw_unpack, chan.throttle)
+                else:
+                    self.connect(chan.raw_file, chan.throttle)
                 self.connect(chan.throttle, chan.decoder)
                 self.set_interactive(False) # this is non-interactive 'replay' session 
             else:
-                self.connect(dev.src, chan.demod, chan.decoder)
+                if chan.selector is not None:
+                    self.connect_channelizer(dev, chan)
+                    self.connect(chan.selector, chan.demod, chan.decoder)
+                else:
+                    self.connect(dev.src, chan.demod, chan.decoder)
+                if self.clock is not None and dev.args == 'iqsrc':
+                    self.clock.add_source(chan.name, chan.decoder, chan.symbol_rate, dev.src.get_start_ts())
+                if dev.iq_ring is not None:
+                    dev.iq_ring.tune(chan.msgq_id, chan.frequency)
                 if ("raw_output" in cfg) and (cfg['raw_output'] != ""):
                     sys.stderr.write("%s Saving raw symbols to file: %s\n" % (log_ts.get(), cfg['raw_output']))
                     chan.raw_sink = blocks.file_sink(gr.sizeof_char, str(cfg['raw_output']))
                     self.connect(chan.demod, chan.raw_sink)
 
+    def connect_channelizer(self, dev, chan):    # every bin feeds the channel selector so retuning never reconfigures the flowgraph
+        if not dev.channelizer_connected:
+            self.connect(dev.src, dev.channelizer)
+            dev.channelizer_connected = True
+        for idx in range(dev.chan_bins):
+            self.connect((dev.channelizer, idx), (chan.selector, idx))
+
     def scan_channels(self):
         for chan in self.channels:
             sys.stderr.write('scan %s: error %d\n' % (chan.config['frequency'], chan.demod.get_freq_error()))
@@ -844,8 +1007,8 @@ class rx_block (gr.top_block):
             self.ui_calllog_update()
             if self.trunking is None or self.trunk_rx is None:
                 return False
-            js = self.trunk_rx.to_json()        # extract data from trunking module
-            msg = gr.message().make_from_string(js, -4, 0, 0)
+            js = self.trunk_rx.to_json(int(msg.arg1()))   # extract data from trunking module, arg1 is client's last trunk_update version
+            msg = gr.message().make_from_string(js, -4, 0, msg.arg2())  # arg2 routes the reply back to the requesting client
             if not self.ui_in_q.full_p():
                 self.ui_in_q.insert_tail(msg)   # send info back to UI as long as queue not full
             self.ui_plot_update()
@@ -892,6 +1055,8 @@ class rx_block (gr.top_block):
                 self.ui_in_q.insert_tail(msg)
         elif s == 'dump_tgids':
             self.trunk_rx.dump_tgids()
+            if self.du_watcher is not None:
+                self.du_watcher.dump_stats()
         elif s == 'capture':
             if not self.get_interactive():
                 sys.stderr.write("%s Cannot start capture for non-realtime (replay) sessions\n" % log_ts.get())
@@ -962,6 +1127,22 @@ class rx_block (gr.top_block):
             chan.decoder.control(json.dumps({'tuner': chan.msgq_id, 'cmd': 'stop'}))
             chan.kill()
 
+        for dev in self.devices:
+            if dev.iq_ring is not None:
+                dev.iq_ring.close()
+
+        if self.du_watcher is not None:
+            self.du_watcher.kill()
+
+        if self.trunk_capture is not None:
+            self.trunk_capture.close()
+
+        if self.trunk_events is not None:
+            self.trunk_events.close()
+
+        if self.call_recorder is not None:
+            self.call_recorder.close()
+
         for instance in self.audio_instances:
             if self.audio_instances[instance] is not None:
                 self.audio_instances[instance].stop()
@@ -973,40 +1154,88 @@ class rx_block (gr.top_block):
         if self.terminal is not None:
             self.terminal.end_terminal()
 
+    def end_replay(self):                   # fast forward replay reached the end of its files
+        self.clock.run_end()
+        t_end = time.time() + REPLAY_DRAIN_TIME
+        while self.rx_q.count() > 0 and time.time() < t_end:    # let the trunking module catch up
+            time.sleep(0.1)
+        for (name, items, rate, speedup) in self.clock.stats():
+            sys.stderr.write("%s Fast forward replay %s: %d symbols, %.0f symbols/sec, %.1fx real time\n" % (log_ts.get(), name, items, rate, speedup))
+        sys.stderr.write("%s Fast forward replay: receive queue peak depth %d, sources slowed %d times, %d messages dropped\n" % (log_ts.get(), self.clock.peak_depth, self.clock.pauses, self.rx_q.count()))
+        self.kill()
+
     def stop(self):
         sys.stderr.write("%s rx_block::stop() flowgraph stop called\n" % log_ts.get())
         self.kill()
         time.sleep(0.5) # allow a little time for processes and ports to end gracefully
         gr.top_block.stop(self)
 
+REPLAY_DRAIN_TIME = 10.0                            # Seconds allowed for queued messages to be processed after a fast forward replay
+
 # data unit receive queue
 #
+DU_DEPTH_BUCKETS = [0, 1, 2, 5, 10, 20, 50, 100]    # Queue depth histogram bucket lower bounds
+DU_LATENCY_BUCKETS = [0, 1, 2, 5, 10, 20, 50, 100]  # Dispatch latency histogram bucket lower bounds (ms)
+
 class du_queue_watcher(threading.Thread):
 
-    def __init__(self, msgq,  callback, **kwds):
+    def __init__(self, msgq,  callback, timestamped=False, pacer=None, **kwds):
         threading.Thread.__init__ (self, **kwds)
         self.daemon = True
         self.msgq = msgq
         self.callback = callback
+        self.timestamped = timestamped              # msg.arg2() carries the frame_assembler receive timestamp
+        self.pacer = pacer                          # fast forward replay sample_clock, paced on the queue depth
+        self.depth_hist = [0] * len(DU_DEPTH_BUCKETS)
+        self.latency_hist = [0] * len(DU_LATENCY_BUCKETS)
+        self.msg_count = 0
         self.keep_running = True
         self.start()
 
     def run(self):
         try:
             while(self.keep_running):
-                if not self.msgq.empty_p(): # check queue before trying to read a message to avoid deadlock at startup
-                    msg = self.msgq.delete_head()
-                    if msg is not None:
-                        self.callback(msg)
-                    else:
-                        self.keep_running = False
-                else: # empty queue
-                    time.sleep(0.01)
+                msg = self.msgq.delete_head()   # blocks with the GIL released until a message arrives
+                if msg is None or not self.keep_running:   # kill() inserts a message to end the wait
+                    break
+                depth = self.msgq.count()
+                self.record_stats(depth + 1, msg)
+                if self.pacer is not None:
+                    self.pacer.pace(depth)
+                self.callback(msg)
         except KeyboardInterrupt:
-            self.keep_running = False
+            pass
+        self.keep_running = False
+
+    def record_stats(self, depth, msg):
+        self.msg_count += 1
+        self.depth_hist[self.bucket(DU_DEPTH_BUCKETS, depth - 1)] += 1
+        if self.timestamped:
+            latency = (time.time() - float(msg.arg2())) * 1000.0
+            if latency >= 0:
+                self.latency_hist[self.bucket(DU_LATENCY_BUCKETS, latency)] += 1
+
+    def bucket(self, buckets, val):
+        idx = 0
+        while (idx + 1) < len(buckets) and val >= buckets[idx + 1]:
+            idx += 1
+        return idx
+
+    def dump_stats(self):
+        sys.stderr.write("%s du_queue_watcher: %d messages dispatched, queue depth %d {\n" % (log_ts.get(), self.msg_count, self.msgq.count()))
+        for idx in range(len(DU_DEPTH_BUCKETS)):
+            sys.stderr.write("depth >= %3d:\t%d\n" % (DU_DEPTH_BUCKETS[idx], self.depth_hist[idx]))
+        if self.timestamped:
+            for idx in range(len(DU_LATENCY_BUCKETS)):
+                sys.stderr.write("latency >= %3dms:\t%d\n" % (DU_LATENCY_BUCKETS[idx], self.latency_hist[idx]))
+        sys.stderr.write("}\n")
 
     def kill(self):
+        if not self.keep_running:
+            return
         self.keep_running = False
+        if not self.msgq.full_p():   # a full queue wakes the watcher anyway
+            self.msgq.insert_tail(gr.message().make_from_string("shutdown", -2, 0, 0))
 
 class rx_main(object):
     def __init__(self):
@@ -1031,6 +1260,7 @@ class rx_main(object):
         parser.add_option("-v", "--verbosity", type="int", default=0, help="message debug level")
         parser.add_option("-p", "--pause", action="store_true", default=False, help="block on startup")
         parser.add_option("-d", "--dev-mode", action="store_true", default=False, help="enable developer mode")
+        parser.add_option("-f", "--fast-forward", action="store_true", default=False, help="replay iqsrc and raw_input files as fast as possible")
         (options, args) = parser.parse_args()
 
         #if options.dev_mode:
@@ -1057,7 +1287,13 @@ class rx_main(object):
                 config = json.loads(open(options.config_file).read())
             else:
                 config = json.loads(open(options.config_file, encoding="utf-8-sig").read())
-        self.tb = rx_block(options.verbosity, config = byteify(config))
+        if "log" in config:
+            log_cfg = config['log']
+        else:
+            log_cfg = {}
+        if from_dict(log_cfg, 'buffered', True):    # batch log output on a background writer thread
+            log_ring.install(int(from_dict(log_cfg, 'ring_size', log_ring.LOG_RING_SIZE)), from_dict(log_cfg, 'levels', {}))
+        self.tb = rx_block(options.verbosity, config = byteify(config), fast_forward = options.fast_forward)
         self.q_watcher = du_queue_watcher(self.tb.ui_out_q, self.process_qmsg)
         sys.stderr.write('python version detected: %s\n' % sys.version)
 
@@ -1068,6 +1304,8 @@ class rx_main(object):
 
     def run(self):
         try:
+            if self.tb.clock is not None:
+                self.tb.clock.run_start()
             self.tb.start()
             if self.tb.get_interactive():
                 while self.keep_running:
@@ -1077,6 +1315,8 @@ class rx_main(object):
                        self.tb.ui_out_q.insert_tail(msg)
             else:
                 self.tb.wait() # curiously wait() matures when a flowgraph gets locked
+                if self.tb.clock is not None:
+                    self.tb.end_replay()
             sys.stderr.write('Flowgraph complete. Exiting\n')
         except (KeyboardInterrupt):
             sys.stderr.write("Ctrl-C detected\n")
@@ -25,10 +25,12 @@ OP25 IQ File Source Block
 """
 
 import sys
+import time
 from gnuradio import gr
 from gnuradio import blocks
 import gnuradio.op25_repeater as op25_repeater
 from log_ts import log_ts
+import capture_ring
 
 
 def from_dict(d, key, def_val):
@@ -47,6 +49,7 @@ class op25_iqsrc_c(gr.hier_block2):
         self.config = config
         self.name = name
         self.is_dsd_file = False
+        self.is_ring_file = False
         self.freq = 0
         self.ts = 0
 
@@ -58,9 +61,30 @@ class op25_iqsrc_c(gr.hier_block2):
         self.iq_size = int(from_dict(config, 'iq_size', 1))
         self.iq_signed  = bool(from_dict(config, 'iq_signed', False))
         self.rate = int(from_dict(config, 'rate', 2400000))
+        self.iq_len = 0
+        self.ring_dir = str(from_dict(config, 'iq_ring_dir', ""))
+
+        # Replay from a multi_rx capture ring: the ring index gives the segment, offset, rate and center frequency
+        if self.ring_dir != "":
+            seg = capture_ring.locate(self.ring_dir, str(from_dict(config, 'iq_ring_prefix', "dev0")), capture_ring.parse_time(from_dict(config, 'iq_ring_start', 0)))
+            length = seg['length']
+            duration = float(from_dict(config, 'iq_ring_duration', 0))
+            if duration > 0:
+                length = min(length, int(duration * seg['rate']) * capture_ring.SAMPLE_BYTES)
+            self.is_ring_file = True
+            self.iq_file = seg['file']
+            self.iq_size = capture_ring.SAMPLE_BYTES // 2
+            self.iq_signed = True
+            self.iq_seek = seg['offset'] // self.iq_size
+            self.iq_len = length // self.iq_size
+            self.rate = seg['rate']
+            self.freq = seg['center']
+            self.ts = seg['ts']
+            sys.stderr.write("%s [%s] Replaying IQ ring %s from offset %d (%s), center freq %f, tuned freq %f\n" % (log_ts.get(), name, self.iq_file, seg['offset'],
+                             time.strftime(capture_ring.TIME_FORMAT, time.localtime(self.ts)), self.freq / 1e6, seg['freq'] / 1e6))
 
         # Create the source block
-        self.iqsrc = op25_repeater.iqfile_source(self.iq_size, self.iq_file, self.iq_signed, self.iq_seek, 0)
+        self.iqsrc = op25_repeater.iqfile_source(self.iq_size, self.iq_file, self.iq_signed, self.iq_seek, self.iq_len)
         if self.iqsrc.is_dsd():
             self.is_dsd_file = True
             self.rate = self.iqsrc.get_dsd_rate()
@@ -92,6 +116,16 @@ class op25_iqsrc_c(gr.hier_block2):
     def get_ts(self):
         return self.ts
 
+    def get_start_ts(self):     # timestamp of the first sample read, None if the file has no DSD header
+        if self.is_ring_file:
+            return self.ts
+        if not self.is_dsd_file:
+            return None
+        return self.ts + float(self.iq_seek) / 2.0 / self.rate     # iq_seek counts I and Q items separately
+
     def is_dsd(self):
         return self.is_dsd_file
 
+    def is_ring(self):
+        return self.is_ring_file
+
@@ -0,0 +1,80 @@
+# Trunking message queue capture
+#
+# Copyright 2025 Graham J. Norbury - gnorbury@bondcar.com
+#
+# This file is part of OP25
+#
+# OP25 is free software; you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# OP25 is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OP25; see the file COPYING. If not, write to the Free
+# Software Foundation, Inc., 51 Franklin Street, Boston, MA
+# 02110-1301, USA.
+#
+# Records the gr.message stream posted by frame_assembler to the trunking
+# module so that it can be replayed offline (see util/tk-replay.py).
+#
+# File format: CAPTURE_MAGIC followed by records of
+#     <receive time (double)> <type (int64)> <arg1 (double)> <arg2 (double)> <length (uint32)> <payload>
+# all little-endian.
+#
+
+import sys
+import time
+import struct
+import threading
+from log_ts import log_ts
+
+CAPTURE_MAGIC = b'OP25QMSG\x01\x00\x00\x00'   # format identifier and version
+CAPTURE_HDR = struct.Struct('<dqddI')         # per-message record header
+
+class qmsg_capture(object):
+    def __init__(self, filename):
+        self.filename = filename
+        self.count = 0
+        self.lock = threading.Lock()   # close() is called from the flowgraph thread while the queue watcher writes
+        self.fp = open(filename, 'wb')
+        self.fp.write(CAPTURE_MAGIC)
+        sys.stderr.write("%s Capturing trunking messages to file: %s\n" % (log_ts.get(), filename))
+
+    def write(self, msg):
+        s = msg.to_string()
+        if not isinstance(s, bytes):
+            s = s.encode('latin-1')
+        hdr = CAPTURE_HDR.pack(time.time(), int(msg.type()), float(msg.arg1()), float(msg.arg2()), len(s))
+        with self.lock:
+            if self.fp is None:
+                return
+            self.fp.write(hdr)
+            self.fp.write(s)
+            self.count += 1
+
+    def close(self):
+        with self.lock:
+            if self.fp is None:
+                return
+            self.fp.close()
+            self.fp = None
+        sys.stderr.write("%s Captured %d trunking messages to file: %s\n" % (log_ts.get(), self.count, self.filename))
+
+def read_capture(filename):    # generator yielding (ts, type, arg1, arg2, payload) tuples
+    with open(filename, 'rb') as fp:
+        if fp.read(len(CAPTURE_MAGIC)) != CAPTURE_MAGIC:
+            raise ValueError("%s is not a trunking message capture file" % filename)
+        while True:
+            hdr = fp.read(CAPTURE_HDR.size)
+            if len(hdr) < CAPTURE_HDR.size:     # end of file, or truncated by an unclean shutdown
+                return
+            ts, m_type, arg1, arg2, length = CAPTURE_HDR.unpack(hdr)
+            s = fp.read(length)
+            if len(s) < length:
+                return
+            yield (ts, m_type, arg1, arg2, s)
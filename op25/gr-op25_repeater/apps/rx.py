@@ -296,7 +296,6 @@ class p25_rx_block (gr.top_block):
             udp_port = self.options.wireshark_port
 
         self.tdma_state = False
-        self.xor_cache = {}
 
         self.fft_state  = False
         self.c4fm_state = False
@@ -378,7 +377,7 @@ class p25_rx_block (gr.top_block):
 
         self.trunk_rx = trunking.rx_ctl(frequency_set = self.change_freq, fa_ctrl = self.control, debug = self.options.verbosity, conf_file = self.options.trunk_conf_file, logfile_workers=logfile_workers, meta_update = self.meta_update, crypt_behavior = self.options.crypt_behavior)
 
-        self.du_watcher = du_queue_watcher(self.rx_q, self.trunk_rx.process_qmsg)
+        self.du_watcher = du_queue_watcher(self.rx_q, self.trunk_rx.process_qmsg, timestamped=True)
 
         # Dowload encryption keys if provided
         if self.options.crypt_keys is not None:
@@ -434,10 +433,7 @@ class p25_rx_block (gr.top_block):
             return    # already in desired state
         self.tdma_state = set_tdma
         if set_tdma:
-            hash = '%x%x%x' % (params['nac'], params['sysid'], params['wacn'])
-            if hash not in self.xor_cache:
-                self.xor_cache[hash] = lfsr.p25p2_lfsr(params['nac'], params['sysid'], params['wacn']).xor_chars
-            self.decoder.control({'tuner': 0, 'cmd': 'set_xormask', 'xormask': self.xor_cache[hash]})
+            self.decoder.control({'tuner': 0, 'cmd': 'set_xormask', 'xormask': lfsr.xor_chars(params['nac'], params['sysid'], params['wacn'])})
             rate = 6000
         else:
             rate = self.symbol_rate
@@ -950,7 +946,7 @@ class p25_rx_block (gr.top_block):
             if self.trunk_rx is None:
                 return False    ## possible race cond - just ignore
             js = self.trunk_rx.to_json()
-            msg = gr.message().make_from_string(js, -4, 0, 0)
+            msg = gr.message().make_from_string(js, -4, 0, msg.arg2())  # arg2 routes the reply back to the requesting client
             if not self.input_q.full_p():
                 self.input_q.insert_tail(msg)
             self.process_ajax()
@@ -970,6 +966,7 @@ class p25_rx_block (gr.top_block):
             self.toggle_plot(plot_type)
         elif s == 'dump_tgids':
             self.trunk_rx.dump_tgids()
+            self.du_watcher.dump_stats()
         elif s == 'add_default_config':
             nac = msg.arg1()
             self.trunk_rx.add_default_config(int(nac))
@@ -991,26 +988,64 @@ class p25_rx_block (gr.top_block):
 
 # data unit receive queue
 #
+DU_DEPTH_BUCKETS = [0, 1, 2, 5, 10, 20, 50, 100]    # Queue depth histogram bucket lower bounds
+DU_LATENCY_BUCKETS = [0, 1, 2, 5, 10, 20, 50, 100]  # Dispatch latency histogram bucket lower bounds (ms)
+
 class du_queue_watcher(threading.Thread):
 
-    def __init__(self, msgq,  callback, **kwds):
+    def __init__(self, msgq,  callback, timestamped=False, **kwds):
         threading.Thread.__init__ (self, **kwds)
         self.daemon = True
         self.msgq = msgq
         self.callback = callback
+        self.timestamped = timestamped              # msg.arg2() carries the frame_assembler receive timestamp
+        self.depth_hist = [0] * len(DU_DEPTH_BUCKETS)
+        self.latency_hist = [0] * len(DU_LATENCY_BUCKETS)
+        self.msg_count = 0
         self.keep_running = True
         self.start()
 
     def run(self):
-        while(self.keep_running):
-            if not self.msgq.empty_p(): # check queue before trying to read a message to avoid deadlock at startup
-                msg = self.msgq.delete_head()
-                if msg is not None:
-                    self.callback(msg)
-                else:
-                    self.keep_running = False
-            else: # empty queue
-                time.sleep(0.01)            
+        try:
+            while(self.keep_running):
+                msg = self.msgq.delete_head()   # blocks with the GIL released until a message arrives
+                if msg is None or not self.keep_running:   # kill() inserts a message to end the wait
+                    break
+                self.record_stats(self.msgq.count() + 1, msg)
+                self.callback(msg)
+        except KeyboardInterrupt:
+            pass
+        self.keep_running = False
+
+    def record_stats(self, depth, msg):
+        self.msg_count += 1
+        self.depth_hist[self.bucket(DU_DEPTH_BUCKETS, depth - 1)] += 1
+        if self.timestamped:
+            latency = (time.time() - float(msg.arg2())) * 1000.0
+            if latency >= 0:
+                self.latency_hist[self.bucket(DU_LATENCY_BUCKETS, latency)] += 1
+
+    def bucket(self, buckets, val):
+        idx = 0
+        while (idx + 1) < len(buckets) and val >= buckets[idx + 1]:
+            idx += 1
+        return idx
+
+    def dump_stats(self):
+        sys.stderr.write("%s du_queue_watcher: %d messages dispatched, queue depth %d {\n" % (log_ts.get(), self.msg_count, self.msgq.count()))
+        for idx in range(len(DU_DEPTH_BUCKETS)):
+            sys.stderr.write("depth >= %3d:\t%d\n" % (DU_DEPTH_BUCKETS[idx], self.depth_hist[idx]))
+        if self.timestamped:
+            for idx in range(len(DU_LATENCY_BUCKETS)):
+                sys.stderr.write("latency >= %3dms:\t%d\n" % (DU_LATENCY_BUCKETS[idx], self.latency_hist[idx]))
+        sys.stderr.write("}\n")
+
+    def kill(self):
+        if not self.keep_running:
+            return
+        self.keep_running = False
+        if not self.msgq.full_p():   # a full queue wakes the watcher anyway
+            self.msgq.insert_tail(gr.message().make_from_string("shutdown", -2, 0, 0))
 
 class rx_main(object):
     def __init__(self):
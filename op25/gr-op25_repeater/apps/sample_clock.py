@@ -0,0 +1,131 @@
+# Sample clock for fast forward replay
+#
+# Copyright 2025 Graham J. Norbury - gnorbury@bondcar.com
+#
+# This file is part of OP25
+#
+# OP25 is free software; you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# OP25 is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OP25; see the file COPYING. If not, write to the Free
+# Software Foundation, Inc., 51 Franklin Street, Boston, MA
+# 02110-1301, USA.
+#
+# When IQ or symbol files are replayed faster than real time (multi_rx.py
+# --fast-forward) the trunking timers must follow the recording rather than
+# the wall clock.  A sample_clock stands in for the time module of the
+# trunking and logging modules; its time() is the timestamp of the first
+# sample of each file (the DSD header timestamp where there is one) plus the
+# number of symbols each channel's decoder has consumed divided by its
+# symbol rate.  The decoder count is used rather than the file source
+# position because the source reads several seconds ahead into the flowgraph
+# buffers.  With several channels the clock follows the one furthest behind.
+#
+# The decoders run far ahead of the trunking module, so the file sources are
+# paced on the depth of the receive queue: pace() is called for every message
+# dispatched and drops the source throttles to real time while the backlog is
+# above REPLAY_QUEUE_HIGH, opening them again once it has drained below
+# REPLAY_QUEUE_LOW.  The backlog also bounds how far the clock can lead the
+# message being processed.  The receive queue itself is unbounded in this
+# mode, so the decoders never drop a message while the sources are slowed.
+#
+
+import sys
+import time
+
+# modules whose time.time() calls are redirected to the sample clock in addition to the trunking module
+CLOCK_MODULES = ['log_ts', 'log_ring', 'event_store', 'qmsg_capture', 'call_recorder']
+
+REPLAY_QUEUE_HIGH = 50          # Receive queue depth at which the file sources are slowed to real time
+REPLAY_QUEUE_LOW = 10           # Receive queue depth at which they are released again
+REPLAY_MAX_SPEEDUP = 1000.0     # Throttle rate of a released source as a multiple of real time
+
+class sample_clock(object):
+    def __init__(self):
+        self.start = time.time()    # stream time of sources without a recorded timestamp
+        self.start_set = False
+        self.wall_start = None
+        self.wall_end = None
+        self.sources = {}           # name -> [block, items per second, timestamp at base_items, base_items, timestamp of first item]
+        self.throttles = []         # [throttle, items per second]
+        self.paused = False
+        self.pauses = 0
+        self.peak_depth = 0
+
+    def set_start(self, ts):        # recorded time of the first sample of a device, read until its decoders are attached
+        if ts is None:
+            return
+        self.start = float(ts) if not self.start_set else min(self.start, float(ts))
+        self.start_set = True
+
+    def add_source(self, name, block, rate, start_ts=None):     # block is the decoder; its nitems_read(0) is the stream position
+        start_ts = self.start if start_ts is None else float(start_ts)
+        self.sources[name] = [block, float(rate), start_ts, 0, start_ts]
+
+    def set_rate(self, name, rate):     # symbol rate change (p25 tdma): rebase so earlier items keep their old duration
+        if name not in self.sources:
+            return
+        src = self.sources[name]
+        items = src[0].nitems_read(0)
+        src[2] += (items - src[3]) / src[1]
+        src[3] = items
+        src[1] = float(rate)
+
+    def add_throttle(self, block, rate):
+        self.throttles.append([block, float(rate)])
+        block.set_sample_rate(rate * REPLAY_MAX_SPEEDUP)
+
+    def install(self, modules):     # replace the time module of each module with this clock
+        for mod in modules + [sys.modules[name] for name in CLOCK_MODULES if name in sys.modules]:
+            if mod is not None and hasattr(mod, 'time'):
+                mod.time = self
+
+    def time(self):
+        if len(self.sources) == 0:   # nothing being replayed yet
+            return self.start if self.start_set else time.time()
+        return min([self.source_time(src) for src in self.sources.values()])
+
+    def source_time(self, src):
+        (block, rate, base_ts, base_items, start_ts) = src
+        return base_ts + (block.nitems_read(0) - base_items) / rate
+
+    def pace(self, depth):          # called for each message taken from the receive queue
+        if depth > self.peak_depth:
+            self.peak_depth = depth
+        if not self.paused and depth >= REPLAY_QUEUE_HIGH:
+            self.paused = True
+            self.pauses += 1
+            for (block, rate) in self.throttles:
+                block.set_sample_rate(rate)
+        elif self.paused and depth <= REPLAY_QUEUE_LOW:
+            self.paused = False
+            for (block, rate) in self.throttles:
+                block.set_sample_rate(rate * REPLAY_MAX_SPEEDUP)
+
+    def run_start(self):
+        self.wall_start = time.time()
+
+    def run_end(self):
+        self.wall_end = time.time()
+
+    def stats(self):                # [(name, items, items per second of wall time, speedup over real time)]
+        if self.wall_start is None:
+            return []
+        elapsed = max((self.wall_end or time.time()) - self.wall_start, 1e-6)
+        stats = []
+        for name in sorted(self.sources):
+            src = self.sources[name]
+            items = src[0].nitems_read(0)
+            stats.append((name, items, items / elapsed, (self.source_time(src) - src[4]) / elapsed))
+        return stats
+
+    def __getattr__(self, name):    # everything other than time() comes from the time module
+        return getattr(time, name)
@@ -37,6 +37,8 @@ PCM_RATE = 8000             # audio sample rate (Hz)
 PCM_BUFFER_SIZE = 4000      # size of ALSA buffer in frames
 
 MAX_SUPERFRAME_SIZE = 320   # maximum size of incoming UDP audio buffer
+MAX_BATCH_FRAMES = 8        # maximum number of queued audio frames coalesced into one pcm write
+GAIN_SHIFT = 16             # fractional bits of fixed-point audio gain
 
 # Debug
 LOG_AUDIO_XRUNS = True      # log audio underruns to stderr
@@ -108,6 +110,12 @@ SND_PCM_ACCESS_LAST = SND_PCM_ACCESS_RW_NONINTERLEAVED
 PA_STREAM_PLAYBACK = 1
 PA_SAMPLE_S16LE = 3
 
+# Return a ctypes pointer and byte length for pcm data without copying numpy sample buffers
+def pcm_buffer(pcm_data):
+    if isinstance(pcm_data, np.ndarray):
+        return pcm_data.ctypes.data_as(c_void_p), pcm_data.nbytes
+    return c_char_p(bytes(pcm_data)), len(pcm_data)
+
 # Python CTypes wrapper to Alsa libasound2
 class alsasound(object):
     def __init__(self):
@@ -196,26 +204,25 @@ class alsasound(object):
         return ret
 
     def write(self, pcm_data):
-        datalen = len(pcm_data)
+        c_data, datalen = pcm_buffer(pcm_data)
         n_frames = c_ulong(datalen // self.framesize)
-        c_data = c_char_p(pcm_data)
         ret = 0
 
         if (self.c_pcm.value == None):
             sys.stderr.write("PCM device is closed\n")
             return -1
 
-        ret = self.libasound.snd_pcm_writei(self.c_pcm, cast(c_data, POINTER(c_void_p)), n_frames)
+        ret = self.libasound.snd_pcm_writei(self.c_pcm, c_data, n_frames)
         if (ret < 0):
             if (ret == -errno.EPIPE): # underrun
                 if (LOG_AUDIO_XRUNS):
                     sys.stderr.write("%s PCM underrun\n" % log_ts.get())
                 ret = self.libasound.snd_pcm_recover(self.c_pcm, ret, 1)
                 if (ret >= 0):
-                    ret = self.libasound.snd_pcm_writei(self.c_pcm, cast(c_data, POINTER(c_void_p)), n_frames)
+                    ret = self.libasound.snd_pcm_writei(self.c_pcm, c_data, n_frames)
                 else:
                     ret = self.libasound.snd_pcm_prepare(self.c_pcm)
-                    ret = self.libasound.snd_pcm_writei(self.c_pcm, cast(c_data, POINTER(c_void_p)), n_frames)
+                    ret = self.libasound.snd_pcm_writei(self.c_pcm, c_data, n_frames)
             elif (ret == -errno.ESTRPIPE): # suspended
                 while True:
                     ret = self.libasound.snd_pcm_resume(self.c_pcm)
@@ -316,7 +323,8 @@ class pa_sound(object):
     def write(self, pcm_data):
         if self.out is None:
             return -1
-        self.libpa.pa_simple_write(c_void_p(self.out), pcm_data, len(pcm_data), byref(self.error))
+        c_data, datalen = pcm_buffer(pcm_data)
+        self.libpa.pa_simple_write(c_void_p(self.out), c_data, c_size_t(datalen), byref(self.error))
         return self.error
 
     def drain(self):
@@ -394,6 +402,18 @@ class socket_audio(object):
         self.sock_a = None
         self.sock_b = None
         self.pcm = None
+
+        # Preallocated buffers so the per-frame audio path does not allocate or copy
+        self.gain_q = int(round(audio_gain * (1 << GAIN_SHIFT)))
+        self.rx_buf_a = bytearray(MAX_SUPERFRAME_SIZE)
+        self.rx_buf_b = bytearray(MAX_SUPERFRAME_SIZE)
+        self.rx_arr_a = np.frombuffer(self.rx_buf_a, dtype=np.int16)
+        self.rx_arr_b = np.frombuffer(self.rx_buf_b, dtype=np.int16)
+        self.scratch = np.zeros(MAX_SUPERFRAME_SIZE // 2, dtype=np.int64)
+        self.negative = np.zeros(MAX_SUPERFRAME_SIZE // 2, dtype=bool)
+        self.out_frames = MAX_BATCH_FRAMES * (MAX_SUPERFRAME_SIZE // 2)
+        self.out_buf = np.zeros(self.out_frames * 2, dtype=np.int16)
+
         if dest_stdout:
             pcm_device = "stdout"
             sys.stdout = os.fdopen(sys.stdout.fileno(), 'wb', 0) # reopen stdout with buffering disabled
@@ -425,92 +445,99 @@ class socket_audio(object):
         rc = 0
         while self.keep_running and (rc >= 0):
             readable, writable, exceptional = select.select( [self.sock_a, self.sock_b], [], [self.sock_a, self.sock_b], 5.0)
-            in_a = None
-            in_b = None
-            data_a = bytearray()
-            data_b = bytearray()
-            flag_a = -1
-            flag_b = -1
 
             # Check for select() polling timeout and pcm self-check
             if (not readable) and (not writable) and (not exceptional):
-                rc = self.pcm.check()
-                if isinstance(rc, ctypes.c_int):
-                    rc = rc.value
+                rc = self.pcm_rc(self.pcm.check())
                 continue
 
-            # Data received on the udp port is 320 bytes for an audio frame or 2 bytes for a flag
-            if self.sock_a in readable:
-                in_a = self.sock_a.recvfrom(MAX_SUPERFRAME_SIZE)
-
-            if self.sock_b in readable:
-                in_b = self.sock_b.recvfrom(MAX_SUPERFRAME_SIZE)
-
-            if in_a is not None:
-                len_a = len(in_a[0])
-                if len_a == 2:
-                    flag_a = np.frombuffer(in_a[0], dtype=np.int16)[0]
-                elif len_a > 0:
-                    data_a = in_a[0]
-
-            if in_b is not None:
-                len_b = len(in_b[0])
-                if len_b == 2:
-                    flag_b = np.frombuffer(in_b[0], dtype=np.int16)[0]
-                elif len_b > 0:
-                    data_b = in_b[0]
-
-            if (flag_a == 0) or (flag_b == 0):
-                rc = self.pcm.drain()
-                if isinstance(rc, ctypes.c_int):
-                    rc = rc.value
-                continue
+            # Coalesce frames into the output buffer for as long as the udp ports have more data queued
+            n_frames = 0
+            while readable and (rc >= 0):
+                len_a = None
+                len_b = None
+                flag_a = -1
+                flag_b = -1
+
+                # Data received on the udp port is 320 bytes for an audio frame or 2 bytes for a flag
+                if self.sock_a in readable:
+                    len_a = self.sock_a.recv_into(self.rx_buf_a) // 2
+                    if len_a == 1:
+                        flag_a = self.rx_arr_a[0]
+
+                if self.sock_b in readable:
+                    len_b = self.sock_b.recv_into(self.rx_buf_b) // 2
+                    if len_b == 1:
+                        flag_b = self.rx_arr_b[0]
+
+                if (flag_a == 0) or (flag_b == 0):
+                    rc = self.flush(n_frames)
+                    n_frames = 0
+                    if rc >= 0:
+                        rc = self.pcm_rc(self.pcm.drain())
+                    break
 
-            if (((flag_a == 1) and (flag_b == 1)) or
-                ((flag_a == 1) and (in_b is None)) or 
-                ((flag_b == 1) and (in_a is None))):
-                rc = self.pcm.drop()
-                if isinstance(rc, ctypes.c_int):
-                    rc = rc.value
-                continue
+                if (((flag_a == 1) and (flag_b == 1)) or
+                    ((flag_a == 1) and (len_b is None)) or 
+                    ((flag_b == 1) and (len_a is None))):
+                    rc = self.flush(n_frames)
+                    n_frames = 0
+                    if rc >= 0:
+                        rc = self.pcm_rc(self.pcm.drop())
+                    break
 
-            if not self.two_channels:
-                data_a = self.scale(data_a)
-                rc = self.pcm.write(self.interleave(data_a, data_a))
-                if isinstance(rc, ctypes.c_int):
-                    rc = rc.value
-            else:
-                data_a = self.scale(data_a)
-                data_b = self.scale(data_b)
-                rc = self.pcm.write(self.interleave(data_a, data_b))
-                if isinstance(rc, ctypes.c_int):
-                    rc = rc.value
+                samples_a = self.rx_arr_a[:len_a] if (flag_a == -1) and len_a else self.rx_arr_a[:0]
+                samples_b = self.rx_arr_b[:len_b] if (flag_b == -1) and len_b else self.rx_arr_b[:0]
+                if not self.two_channels:
+                    samples_b = samples_a
+                n_frames += self.interleave(n_frames, samples_a, samples_b)
+
+                if (n_frames + (MAX_SUPERFRAME_SIZE // 2)) > self.out_frames:
+                    break
+                readable, writable, exceptional = select.select( [self.sock_a, self.sock_b], [], [], 0)
+
+            if n_frames > 0:
+                rc = self.flush(n_frames)
 
         self.close_sockets()
         self.close_pcm()
         return
 
-    def scale(self, data):  # crude amplitude scaler (volume) for S16_LE samples
-        arr = np.array(np.frombuffer(data, dtype=np.int16), dtype=np.float32)
-        result = np.zeros(len(arr), dtype=np.int16)
-        if sys.version[0] == '2':
-            arr = np.clip(arr*self.audio_gain, -32767, 32766, out=result)
-        else:
-            arr = np.clip(arr*self.audio_gain, -32767, 32766, out=result, casting='unsafe')
-        return result.tobytes('C')
+    def pcm_rc(self, rc):
+        if isinstance(rc, ctypes.c_int):
+            rc = rc.value
+        return rc
+
+    def flush(self, n_frames):  # write interleaved frames accumulated in the output buffer
+        if n_frames == 0:
+            return 0
+        return self.pcm_rc(self.pcm.write(self.out_buf[:n_frames*2]))
 
-    def interleave(self, data_a, data_b):
-        arr_a = np.frombuffer(data_a, dtype=np.int16)
-        arr_b = np.frombuffer(data_b, dtype=np.int16)
+    def scale(self, src, dst):  # fixed-point amplitude scaler (volume) for S16_LE samples
+        if self.gain_q == (1 << GAIN_SHIFT):
+            np.clip(src, -32767, 32766, out=dst)
+            return
+        tmp = self.scratch[:len(src)]
+        neg = self.negative[:len(src)]
+        tmp[:] = src
+        tmp *= self.gain_q
+        np.less(tmp, 0, out=neg)    # shift toward zero, as the float to int16 cast did
+        np.add(tmp, (1 << GAIN_SHIFT) - 1, out=tmp, where=neg)
+        tmp >>= GAIN_SHIFT
+        np.clip(tmp, -32767, 32766, out=dst, casting='unsafe')
+
+    def interleave(self, offset, arr_a, arr_b):  # scale channels into output buffer, returns frames added
         d_len = max(len(arr_a), len(arr_b))
-        result = np.zeros(d_len*2, dtype=np.int16)
+        result = self.out_buf[offset*2:(offset+d_len)*2]
+        if (len(arr_a) < d_len) or (len(arr_b) < d_len):
+            result.fill(0)
         if len(arr_a):
             # copy arr_a to result[0,2,4, ...]
-            result[ range(0, len(arr_a)*2, 2) ] = arr_a
+            self.scale(arr_a, result[0:len(arr_a)*2:2])
         if len(arr_b):
             # copy arr_b to result[1,3,5, ...]
-            result[ range(1, len(arr_b)*2, 2) ] = arr_b
-        return result.tobytes('C')
+            self.scale(arr_b, result[1:len(arr_b)*2:2])
+        return d_len
 
     def stop(self):
         self.keep_running = False
@@ -0,0 +1,74 @@
+# Raw symbol file formats
+#
+# Copyright 2025 Graham J. Norbury - gnorbury@bondcar.com
+#
+# This file is part of OP25
+#
+# OP25 is free software; you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# OP25 is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OP25; see the file COPYING. If not, write to the Free
+# Software Foundation, Inc., 51 Franklin Street, Boston, MA
+# 02110-1301, USA.
+#
+# OP25 raw symbol files (raw_output, raw_input) hold one dibit per byte in
+# the low order two bits; SDRTrunk packs four dibits per byte, most
+# significant first.  Conversion works through a memory map of the source
+# in fixed size chunks, so multi-GB captures take constant memory.
+#
+
+import os
+import time
+import numpy as np
+
+FMT_OP25 = 0            # one dibit per byte
+FMT_SDRTRUNK = 1        # four dibits per byte, msb first
+IDENTIFY_LEN = 64       # bytes examined by identify_file()
+CHUNK_SIZE = 1048576    # source bytes converted per step (a multiple of 4)
+
+def identify_file(src):     # FMT_SDRTRUNK if the start of the file holds anything other than dibits
+    with open(src, 'rb') as srcfile:
+        data = np.frombuffer(srcfile.read(IDENTIFY_LEN), dtype=np.uint8)
+    return FMT_SDRTRUNK if np.any(data >> 2) else FMT_OP25
+
+def pack_dibits(data):      # OP25 to SDRTrunk; a partial last byte is padded with zero dibits
+    bits = np.unpackbits((data & 3).reshape(-1, 1), axis=1)[:, 6:]
+    return np.packbits(bits.reshape(-1))
+
+def unpack_dibits(data):    # SDRTrunk to OP25
+    bits = np.unpackbits(data).reshape(-1, 2)
+    return (bits[:, 0] << 1) | bits[:, 1]
+
+def convert_file(mode, src, dst, chunk_size=CHUNK_SIZE, progress=None):
+    """ Convert src, in format mode, to the other format in dst.  Returns (bytes read, bytes written).
+        progress(bytes read, source size, elapsed seconds) is called after each chunk """
+    chunk_size -= chunk_size % 4
+    assert chunk_size > 0
+    total = os.path.getsize(src)
+    n_in = 0
+    n_out = 0
+    t_start = time.time()
+    with open(dst, 'wb') as dstfile:
+        if total > 0:       # numpy cannot map an empty file
+            data = np.memmap(src, dtype=np.uint8, mode='r')
+            for start in range(0, total, chunk_size):
+                chunk = data[start : start + chunk_size]
+                if mode == FMT_OP25:
+                    out = pack_dibits(chunk)
+                else:
+                    out = unpack_dibits(chunk)
+                dstfile.write(out.tobytes())
+                n_in += len(chunk)
+                n_out += len(out)
+                if progress is not None:
+                    progress(n_in, total, time.time() - t_start)
+            del data
+    return n_in, n_out
@@ -83,3 +83,21 @@ def find_sym(pattern, symbols):
         if chunk == pattern:
             return i
     return -1
+
+def find_sym_array(pattern, symbols, chunk=1048576):
+    """ find_sym() over a numpy array: each window of len(pattern) <= 32 symbols is packed into an integer """
+    n = len(pattern)
+    target = 0
+    for d in pattern:
+        target = (target << 2) | d
+    end = len(symbols) - 1   # last start position tried by find_sym() is len(symbols) - n - 1
+    for start in range(0, end - n + 1, chunk):
+        seg = symbols[start : min(start + chunk + n - 1, end)].astype(np.uint64)
+        m = len(seg) - n + 1
+        v = np.zeros(m, dtype=np.uint64)
+        for k in range(n):
+            v = (v << np.uint64(2)) | seg[k : k + m]
+        hits = np.flatnonzero(v == np.uint64(target))
+        if len(hits) > 0:
+            return start + int(hits[0])
+    return -1
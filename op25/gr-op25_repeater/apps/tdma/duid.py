@@ -50,9 +50,21 @@ class p25p2_duid(object):
 
         self.duid_map = mk_duid_lookup()
 
+        # burst type for each of the 256 values of the four duid dibits
+        self.duid_types = []
+        for v in range(256):
+            b = [0] * 180
+            b[10], b[47], b[132], b[169] = (v >> 6) & 3, (v >> 4) & 3, (v >> 2) & 3, v & 3
+            self.duid_types.append(self.decode_duid(b))
+
     def decode_duid(self, burst):
         try:
             b = self.duid_str[self.duid_map[extract_duid(burst)]]
         except: # FIXME: find closest matching codeword
             b = 'unknown' + extract_duid(burst)
         return b
+
+    def decode_duid_array(self, bursts):
+        """ (n, 180) array of bursts -> list of burst types as decode_duid() """
+        v = (bursts[:, 10].astype(np.int64) << 6) | (bursts[:, 47] << 4) | (bursts[:, 132] << 2) | bursts[:, 169]
+        return [self.duid_types[x] for x in v.tolist()]
@@ -58,3 +58,20 @@ class p25p2_isch(object):
             return chn, loc, fr, cnt
         # FIXME: if bit error(s), locate closest matching codeword
         return -1, -1, -1, -1
+
+    def decode_isch_array(self, syms):
+        """ (n, 20) array of dibits -> arrays of chn, loc, fr, cnt as decode_isch() """
+        v = np.zeros(len(syms), dtype=np.int64)
+        for k in range(20):
+            v = (v << 2) | syms[:, k]
+        codes = np.array(sorted([int(vp, 16) for vp in self.isch_map]), dtype=np.int64)
+        values = np.array([self.isch_map['%x' % c] for c in codes], dtype=np.int64)
+        idx = np.minimum(np.searchsorted(codes, v), len(codes) - 1)
+        found = codes[idx] == v
+        chn = np.where(found, (values[idx] >> 5) & 3, -1)
+        loc = np.where(found, (values[idx] >> 3) & 3, -1)
+        fr = np.where(found, (values[idx] >> 2) & 1, -1)
+        cnt = np.where(found, values[idx] & 3, -1)
+        sync = v == 0x575d57f7ff
+        chn[sync] = loc[sync] = fr[sync] = cnt[sync] = -2
+        return chn, loc, fr, cnt
@@ -18,16 +18,62 @@
 # Software Foundation, Inc., 51 Franklin Street, Boston, MA
 # 02110-1301, USA.
 
-import numpy as np
-from bit_utils import *
+import threading
+
+XOR_BITS = 4320                     # bits in the scrambling sequence (2160 dibits, one superframe)
+LFSR_BITS = 44
+LFSR_MASK = (1 << LFSR_BITS) - 1
+LFSR_TAPS = (1 << 40) | (1 << 35) | (1 << 29) | (1 << 24) | (1 << 10) | 1   # feedback added by cyc_reg() when the msb is set
+SEED_SHIFTS = (0, 4, 9, 15, 20, 34) # row i of the 44x44 seed matrix has ones in columns i + SEED_SHIFTS
+
+def cyc_nibble(v):                  # cyc_reg() applied four times to a register holding only v in its top four bits
+	reg = v << (LFSR_BITS - 4)
+	for i in range(4):
+		reg = ((reg << 1) & LFSR_MASK) ^ (LFSR_TAPS if reg >> (LFSR_BITS - 1) else 0)
+	return reg
+
+# the next four output bits are the top nibble of the register, which then advances four steps at once
+NIBBLE_FEEDBACK = tuple([cyc_nibble(v) for v in range(16)])
+NIBBLE_DIBITS = tuple([chr(v >> 2) + chr(v & 3) for v in range(16)])
+
+def seed_reg(nac, sysid, wacn):     # initial register: the 44 bit wacn/sysid/nac times the seed matrix
+	n = 16777216*wacn + 4096*sysid + nac
+	reg = 0
+	for shift in SEED_SHIFTS:
+		reg ^= n >> shift
+	return reg & LFSR_MASK
+
+def mk_xor_chars(nac, sysid, wacn): # scrambling sequence as a string of 2160 dibit characters
+	reg = seed_reg(nac, sysid, wacn)
+	low_mask = LFSR_MASK >> 4
+	feedback = NIBBLE_FEEDBACK
+	dibits = NIBBLE_DIBITS
+	s = []
+	for i in range(XOR_BITS // 4):
+		top = reg >> (LFSR_BITS - 4)
+		s.append(dibits[top])
+		reg = ((reg & low_mask) << 4) ^ feedback[top]
+	return ''.join(s)
+
+_xor_cache = {}                     # (nac, sysid, wacn) -> xor_chars, shared by every channel in the process
+_xor_cache_lock = threading.Lock()
+
+def xor_chars(nac, sysid, wacn):
+	key = (nac, sysid, wacn)
+	chars = _xor_cache.get(key)
+	if chars is None:
+		chars = mk_xor_chars(nac, sysid, wacn)
+		with _xor_cache_lock:
+			chars = _xor_cache.setdefault(key, chars)
+	return chars
+
+def is_cached(nac, sysid, wacn):
+	return (nac, sysid, wacn) in _xor_cache
 
 class p25p2_lfsr(object):
 	def __init__(self,nac,sysid,wacn):
-		xorbits = self.mk_xor_bits(nac,sysid,wacn)
-		self.xorsyms = [0] * (len(xorbits)//2)
-		for i in range(len(self.xorsyms)):
-			self.xorsyms[i] = (xorbits[i*2] << 1) + xorbits[i*2+1]
-		self.xor_chars = ''.join([chr(c) for c in self.xorsyms])
+		self.xor_chars = xor_chars(nac, sysid, wacn)
+		self.xorsyms = [ord(c) for c in self.xor_chars]
 
 	def asm_reg(self,s1,s2,s3,s4,s5,s6):
 		s1 = s1 & 0xf
@@ -75,13 +121,10 @@ class p25p2_lfsr(object):
 		return self.asm_reg(s1,s2,s3,s4,s5,s6)
 
 	def mk_xor_bits(self, nac,sysid,wacn):
-		reg = np.int64(mk_array(16777216*wacn + 4096*sysid + nac, 44))
-
-		M = np.array(np.asmatrix('1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 0 0 0 0 0 0; 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 0 0 0 0 0; 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 0 0 0 0; 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 0 0 0; 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 0 0; 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 0; 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0; 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0; 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0; 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0 0 0 0 1; 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0 1; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0 1; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0 1; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0 1; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1 0; 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 0 1'))
-		reg = mk_int(np.dot(reg,M))
+		reg = seed_reg(nac, sysid, wacn)
 
 		s = []
-		for i in range(4320):
+		for i in range(XOR_BITS):
 			s.append((reg >> 43) & 1)
 			reg = self.cyc_reg(reg)
 
@@ -90,14 +133,9 @@ class p25p2_lfsr(object):
 if __name__ == '__main__':
 	import sys
 
-	xor_cache = {}
 	params = {}
 	params['nac'] = 0x293
 	params['sysid'] = 0x18
 	params['wacn'] = 0x1
 
-	hash = '%x%x%x' % (params['nac'], params['sysid'], params['wacn'])
-	if hash not in xor_cache:
-		xor_cache[hash] = p25p2_lfsr(params['nac'], params['sysid'], params['wacn']).xor_chars
-
-	sys.stdout.write(xor_cache[hash])
+	sys.stdout.write(xor_chars(params['nac'], params['sysid'], params['wacn']))
@@ -1,4 +1,6 @@
 
+import numpy as np
+
 gly23127DecTbl = [
     0, 1, 1, 2, 1, 2, 2, 3, 1, 2, 2, 3, 2, 3, 3, 147459, 
     1, 2, 2, 3, 2, 3, 3, 4268035, 2, 3, 3, 1574915, 3, 2097155, 294915, 4099, 
@@ -135,7 +137,7 @@ def gly23127GetSyn (pattern) :
     while(pattern & 0xFFFFF800) != 0 :
         while (aux & pattern) == 0:
           aux = aux >> 1
-        pattern = pattern ^ (aux / 0x800 * 0xC75) #generator is C75
+        pattern = pattern ^ (aux // 0x800 * 0xC75) #generator is C75
 
     return pattern
 
@@ -152,3 +154,21 @@ def gly24128Dec (n) :
     correction = gly23127DecTbl[gly23127GetSyn(CW)]
     CW = (CW ^ correction) >> 11
     return CW, correction
+
+# Array versions for decoding many codewords at once.  The syndrome is
+# linear in the codeword, so it is the xor of the syndromes of its octets.
+
+def gly23127SynTbl (shift, bits) :
+    return np.array([gly23127GetSyn(b << shift) for b in range(1 << bits)], dtype=np.int64)
+
+gly23127SynTbls = [gly23127SynTbl(0, 8), gly23127SynTbl(8, 8), gly23127SynTbl(16, 7)]
+gly23127DecArr = np.array(gly23127DecTbl, dtype=np.int64)
+
+def gly23127DecArray (CW) :
+    syn = gly23127SynTbls[0][CW & 0xff] ^ gly23127SynTbls[1][(CW >> 8) & 0xff] ^ gly23127SynTbls[2][(CW >> 16) & 0x7f]
+    correction = gly23127DecArr[syn]
+    CW = (CW ^ correction) >> 11
+    return CW, correction
+
+def gly24128DecArray (n) :
+    return gly23127DecArray(n >> 1) #toss the parity bit
@@ -28,9 +28,15 @@ Optionally, dump the timeslot info (type, position, type of content)
 
 The input file must contain the demodulated symbols, one per character
 using the low-order two bits of each byte
+
+The whole file is decoded with array operations: the symbols are read into
+a numpy array, every superframe is descrambled at once and the ISCH, DUID
+and voice codewords of all timeslots are looked up together.  Decoding
+throughput in superframes/sec is written to stderr.
 """
 
 import sys
+import time
 import numpy as np
 from optparse import OptionParser
 
@@ -38,9 +44,11 @@ from bit_utils import *
 import isch
 import duid
 import lfsr
-from vf import process_v
+from vf import decode_vcw_array
 
 SUPERFRAME_LEN = 2160
+VOICE_CW_OFFSETS = {'2v': (11, 48), '4v': (11, 48, 96, 133)}  # start of each voice codeword within a burst
+VCW_BLOCK = 65536       # voice codewords decoded per array operation
 
 def main():
     parser = OptionParser()
@@ -59,60 +67,74 @@ def main():
     my_duid = duid.p25p2_duid()
     my_lfsr = lfsr.p25p2_lfsr(options.nac, options.sysid, options.wacn)
 
-    d = open(file).read()
-
-    symbols = []
-    for c in d:
-        symbols.append(ord(c))
+    t_start = time.time()
+    symbols = np.fromfile(file, dtype=np.uint8) & 3
 
     sync0= bits_to_dibits(mk_array(0x575d57f7ff,40))
-    sync_start = find_sym(sync0, symbols)
+    sync_start = find_sym_array(sync0, symbols)
     assert sync_start > 0   # unable to locate any sync sequence
     superframe = -1
-    for i in range(sync_start, sync_start + (180*32), 180):
-        chn, loc, fr, cnt = my_isch.decode_isch ( symbols [ i : i + 20 ])
-        if chn == 0 and loc == 0:
-            superframe = i
-            break
+    starts = np.arange(sync_start, min(sync_start + (180*32), len(symbols) - 20), 180)
+    chn, loc, fr, cnt = my_isch.decode_isch_array(symbols[starts[:, None] + np.arange(20)])
+    found = np.flatnonzero((chn == 0) & (loc == 0))
+    if len(found) > 0:
+        superframe = int(starts[found[0]])
     assert superframe > 0   # unable to locate start of superframe
 
-    errors = 0
-    for i in range(superframe,len(symbols)-SUPERFRAME_LEN,SUPERFRAME_LEN):
-        syms1 = symbols[i + 10: i + SUPERFRAME_LEN + 10]
-        syms2 = np.array(syms1) ^ my_lfsr.xorsyms
+    # every superframe whose trailing 10 symbols are in the file is decoded at once:
+    # one row per timeslot of the isch symbols, raw burst and descrambled burst
+    n_sf = (len(symbols) - superframe - 10) // SUPERFRAME_LEN
+    frames = symbols[superframe : superframe + n_sf * SUPERFRAME_LEN + 10]
+    isch_syms = frames[:n_sf * SUPERFRAME_LEN].reshape(n_sf * 12, 180)[:, :20]
+    bursts = frames[10:].reshape(n_sf, SUPERFRAME_LEN)
+    bursts_d = (bursts ^ np.array(my_lfsr.xorsyms, dtype=np.uint8)).reshape(n_sf * 12, 180)
+    bursts = bursts.reshape(n_sf * 12, 180)
+    chn, loc, fr, cnt = my_isch.decode_isch_array(isch_syms)
+    btypes = my_duid.decode_duid_array(bursts)
+
+    # successive unknown isch codewords at the end of each timeslot; decoding
+    # stops after the first superframe that ends with more than 6 of them
+    slots = np.arange(n_sf * 12)
+    errors = slots - np.maximum.accumulate(np.where(chn == -1, -1, slots))
+    too_many = np.flatnonzero(errors[11::12] > 6)
+    n_used = int(too_many[0]) + 1 if len(too_many) > 0 else n_sf
+
+    vcw_starts = []
+    for j in range(n_used * 12):
+        if btypes[j] == '2v' or btypes[j] == '4v':
+            vcw_starts.extend([j * 180 + k for k in VOICE_CW_OFFSETS[btypes[j]]])
+    vcw_starts = np.array(vcw_starts, dtype=np.int64)
+    flat = bursts_d.reshape(-1)
+    vcw = []
+    for k in range(0, len(vcw_starts), VCW_BLOCK):
+        b = decode_vcw_array(flat[vcw_starts[k : k + VCW_BLOCK, None] + np.arange(36)])
+        vcw.extend(["\t".join(['%s' % x for x in row]) for row in b.tolist()])
+
+    out = []
+    v = 0
+    for n in range(n_used):
+        i = superframe + n * SUPERFRAME_LEN
         for j in range(12):
+            s = n * 12 + j
             if options.verbose:
-                print('%s superframe %d timeslot %d %s' % ('=' * 20, i, j, '=' * 20))
-            chn, loc, fr, cnt = my_isch.decode_isch ( symbols [ i + (j*180) : i + (j*180) + 20 ])
-            if chn == -1:
-                if options.verbose:
-                    print('unknown isch codeword at %d' % (i + (j*180)))
-                errors += 1
-            elif chn == -2:
-                if options.verbose:
-                    print('sync isch codeword found at %d' % (i + (j*180)))
-                errors = 0
-            else:
-                if options.verbose:
-                    print("channel %d loc %d fr %d count %d" % (chn, loc, fr, cnt))
-                errors = 0
-
-            burst = syms1 [ (j*180) : (j*180) + 180 ]
-            burst_d= syms2 [ (j*180) : (j*180) + 180 ]
-            btype = my_duid.decode_duid(burst)
-            if options.verbose:
-                print('burst at %d type %s' % (i + (j*180), btype))
-            if btype == '2v' or btype == '4v':
-                process_v(burst_d, btype)
-            elif not btype.startswith('unknown'):
-                maybe_sync = burst[79:79+21]
-                if btype.endswith(' w'):    # scrambled
-                    burst = burst_d
-                # process_oemi(burst, btype)
-        if errors > 6:
-            if options.verbose:
-                print("too many successive errors, exiting at i=%d" % (i))
-            break
+                out.append('%s superframe %d timeslot %d %s' % ('=' * 20, i, j, '=' * 20))
+                if chn[s] == -1:
+                    out.append('unknown isch codeword at %d' % (i + (j*180)))
+                elif chn[s] == -2:
+                    out.append('sync isch codeword found at %d' % (i + (j*180)))
+                else:
+                    out.append("channel %d loc %d fr %d count %d" % (chn[s], loc[s], fr[s], cnt[s]))
+                out.append('burst at %d type %s' % (i + (j*180), btypes[s]))
+            if btypes[s] == '2v' or btypes[s] == '4v':
+                out.extend(vcw[v : v + len(VOICE_CW_OFFSETS[btypes[s]])])
+                v += len(VOICE_CW_OFFSETS[btypes[s]])
+    if len(too_many) > 0 and options.verbose:
+        out.append("too many successive errors, exiting at i=%d" % (superframe + (n_used - 1) * SUPERFRAME_LEN))
+    if len(out) > 0:
+        sys.stdout.write('\n'.join(out) + '\n')
+
+    elapsed = max(time.time() - t_start, 1e-6)
+    sys.stderr.write('%d superframes in %.3f sec, %.1f superframes/sec\n' % (n_used, elapsed, n_used / elapsed))
 
 if __name__ == "__main__":
     main()
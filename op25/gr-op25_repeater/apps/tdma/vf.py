@@ -22,7 +22,7 @@ import sys
 import numpy as np
 
 from bit_utils import *
-from rs import gly23127Dec, gly24128Dec
+from rs import gly23127Dec, gly24128Dec, gly23127DecArray, gly24128DecArray
 
 def process_vcw(vf):
     c0, c1, c2, c3 = extract_vcw(vf)
@@ -151,3 +151,34 @@ def extract_vcw(vf):
     c3[0] = vf[71]
 
     return c0, c1, c2, c3
+
+# bit positions in the 72 bit voice codeword of c0..c3, least significant bit first (as after rev_int)
+VCW_FIELDS = [np.array(c) for c in extract_vcw(list(range(72)))]
+
+def decode_vcw_array(dibits):
+    """ (n, 36) array of descrambled voice codeword dibits -> (n, 9) array of "B" vectors, as process_vcw() """
+    bits = np.empty((len(dibits), 72), dtype=np.int64)
+    bits[:, 0::2] = (dibits >> 1) & 1
+    bits[:, 1::2] = dibits & 1
+    c0, c1, c2, c3 = [(bits[:, pos] << np.arange(len(pos))).sum(axis=1) for pos in VCW_FIELDS]
+    u0, correction0 = gly24128DecArray(c0)
+    pr = 16 * u0
+    m1 = np.zeros_like(u0)
+    for n in range(23):
+        pr = (173*pr + 13849) & 0xffff
+        m1 = (m1 << 1) | ((pr >> 15) & 1)
+
+    u1, correction1 = gly23127DecArray(c1 ^ m1)
+    u2 = c2
+    u3 = c3
+    b = np.empty((len(dibits), 9), dtype=np.int64)
+    b[:, 0] = ((u0 >> 5) & 0x78) + ((u3 >> 9) & 0x7)
+    b[:, 1] = ((u0 >> 3) & 0x1e) + ((u3 >> 13) & 0x1)
+    b[:, 2] = ((u0 << 1) & 0x1e) + ((u3 >> 12) & 0x1)
+    b[:, 3] = ((u1 >> 3) & 0x1fe) + ((u3 >> 8) & 0x1)
+    b[:, 4] = ((u1 << 3) & 0x78) + ((u3 >> 5) & 0x7)
+    b[:, 5] = ((u2 >> 6) & 0x1e) + ((u3 >> 4) & 0x1)
+    b[:, 6] = ((u2 >> 3) & 0x0e) + ((u3 >> 3) & 0x1)
+    b[:, 7] = ( u2       & 0x0e) + ((u3 >> 2) & 0x1)
+    b[:, 8] = ((u2 << 2) & 0x04) + ( u3       & 0x3)
+    return b
@@ -22,14 +22,21 @@
 
 import sys
 import collections
+import copy
 import ctypes
 import time
 import json
 import codecs
 import ast
+import queue
+import threading
+import traceback
 from collections import deque
+from array import array
 from helper_funcs import *
 from log_ts import log_ts
+from log_ring import log_msg
+from event_store import EV_CALL, EV_NEW_FREQ, EV_SET_TGID, EV_NEW_TGID, EV_REGISTER, EV_ENCRYPT, EV_CONTROL_CHANNEL
 from gnuradio import gr
 import gnuradio.op25_repeater as op25_repeater
 
@@ -45,8 +52,14 @@ FREQ_EXPIRY_TIME = 1.2   # Number of seconds to allow freq to remain active with
 EXPIRY_TIMER = 0.2       # Number of seconds between checks for tgid/freq expiry
 PATCH_EXPIRY_TIME = 20.0 # Number of seconds until patch expiry
 WUID_EXPIRY_TIME = 14400 # Number of seconds until WUID registration expiry (4hrs, per TIA-102.AABD)
+RID_EXPIRY_TIME = 86400  # Number of seconds an untagged radio id is retained after it was last heard (0 = never expire)
+RID_MAX = 50000          # Maximum number of untagged radio ids retained; least recently heard are evicted first (0 = unlimited)
+RID_EXPIRY_TIMER = 300.0 # Number of seconds between checks for radio id expiry
 CLEANUP_TIMER = 0.5      # Number of seconds between cleanup intervals
 CALL_LOG_MAX_LEN = 10    # Maximum number of call_log entries to retain
+UI_DELTA_HISTORY = 30    # Number of trunk_update versions a client may lag and still receive a delta
+UI_DELTA_SECTIONS = ['frequencies', 'frequency_data', 'patch_data', 'wuid_data'] # trunk_update sections tracked per entry
+WORKER_QUEUE_MAX = 500   # Maximum number of messages waiting for a system worker thread
 
 #################
 # Helper functions
@@ -63,38 +76,67 @@ def meta_update(meta_q, tgid = None, tag = None, rid = None, rtag = None, msgq_i
     if not meta_q.full_p():
         meta_q.insert_tail(msg)
         if debug > 10:
-            sys.stderr.write("%s [%d] meta_update: queued[%d] msg: %s\n" % (log_ts.get(), msgq_id, meta_q.count(), json.dumps(d)))
+            log_msg('p25', 11, msgq_id, "meta_update: queued[%d] msg: %s", meta_q.count(), json.dumps(d))
     else:
         if debug > 10:
-            sys.stderr.write("%s [%d] meta_update: dropped[%d] msg: %s\n" % (log_ts.get(), msgq_id, meta_q.count(), json.dumps(d)))
+            log_msg('p25', 11, msgq_id, "meta_update: dropped[%d] msg: %s", meta_q.count(), json.dumps(d))
+
+class tgid_record(object):    # per-talkgroup state; __slots__ avoids a dict per talkgroup
+    __slots__ = ('tgid', 'order', 'counter', 'prio', 'tag', 'srcaddr', 'time', 'frequency', 'tdma_slot',
+                 'encrypted', 'svcopts', 'algid', 'keyid', 'receiver')
+
+    def __init__(self, tgid, order=0):
+        self.tgid = tgid
+        self.order = order          # position in the talkgroups dict; breaks ties between equal priorities
+        self.counter = 0
+        self.prio = TGID_DEFAULT_PRIO
+        self.tag = ""
+        self.srcaddr = 0
+        self.time = 0
+        self.frequency = None
+        self.tdma_slot = None
+        self.encrypted = 0
+        self.svcopts = 0x04
+        self.algid = -1
+        self.keyid = -1
+        self.receiver = None
+
+class rid_record(object):     # per-radio state; tgs holds interleaved (tgid, count) pairs once the radio is heard
+    __slots__ = ('rid', 'counter', 'tag', 'time', 'tgs')
+
+    def __init__(self, rid):
+        self.rid = rid
+        self.counter = 0
+        self.tag = ""
+        self.time = 0
+        self.tgs = None
+
+    def count_tgid(self, tgid):
+        if self.tgs is None:
+            self.tgs = array('I', (tgid, 1))
+            return
+        for i in range(0, len(self.tgs), 2):   # radios use few talkgroups, so a linear scan beats a dict per radio
+            if self.tgs[i] == tgid:
+                self.tgs[i + 1] += 1
+                return
+        self.tgs.extend((tgid, 1))
+
+    def get_tgs(self):
+        if self.tgs is None:
+            return {}
+        return dict(zip(self.tgs[0::2], self.tgs[1::2]))
 
 def add_default_tgid(tgs, tgid):
     if tgs is None:
         return
     if tgid not in tgs:
-        tgs[tgid] = {'counter':0}
-        tgs[tgid]['tgid'] = tgid
-        tgs[tgid]['prio'] = TGID_DEFAULT_PRIO
-        tgs[tgid]['tag'] = ""
-        tgs[tgid]['srcaddr'] = 0
-        tgs[tgid]['time'] = 0
-        tgs[tgid]['frequency'] = None
-        tgs[tgid]['tdma_slot'] = None
-        tgs[tgid]['encrypted'] = 0
-        tgs[tgid]['svcopts'] = 0x04
-        tgs[tgid]['algid'] = -1
-        tgs[tgid]['keyid'] = -1
-        tgs[tgid]['receiver'] = None
+        tgs[tgid] = tgid_record(tgid, len(tgs))
 
 def add_default_rid(srcids, rid):
     if srcids is None:
         return
     if rid not in srcids:
-        srcids[rid] = {'counter':0}
-        srcids[rid]['rid'] = rid
-        srcids[rid]['tag'] = ""
-        srcids[rid]['time'] = 0
-        srcids[rid]['tgs'] = {}
+        srcids[rid] = rid_record(rid)
 
 def get_slot(slot):
     if slot is not None:
@@ -108,6 +150,151 @@ def get_tgid(tgid):
     else:
         return ""
 
+#################
+# Control channel message layouts
+#
+# Each entry maps (opcode, mfid) to a handler method of p25_system and the
+# list of (field, bit offset, width) it needs; bit offsets count from the
+# msb of the message.  An mfid of None matches any manufacturer not listed
+# explicitly.  Layouts are compiled once at import into shift/mask tables
+# and a __slots__ record class, so decoding is a dict lookup followed by a
+# single pass over the fields.
+
+TSBK_BITS = 96      # 80 bit tsbk plus 16 bit crc (not transferred, zero filled)
+TDMA_OCTETS = 17    # Fixed length prefix of a tdma mac message covered by field layouts
+
+TSBK_LAYOUTS = {
+    (0x00, 0x90): ('tsbk_mot_grg_add_cmd',      [('sg', 16, 16), ('ga1', 32, 16), ('ga2', 48, 16), ('ga3', 64, 16)]),
+    (0x00, None): ('tsbk_grp_v_ch_grant',       [('opts', 16, 8), ('ch', 24, 16), ('ga', 40, 16), ('sa', 56, 24)]),
+    (0x01, 0x90): ('tsbk_mot_grg_del_cmd',      [('sg', 16, 16), ('ga1', 32, 16), ('ga2', 48, 16), ('ga3', 64, 16)]),
+    (0x02, 0x90): ('tsbk_mot_grg_ch_grant',     [('ch', 24, 16), ('sg', 40, 16), ('sa', 56, 24)]),
+    (0x02, None): ('tsbk_grp_v_ch_grant_up',    [('ch1', 16, 16), ('ga1', 32, 16), ('ch2', 48, 16), ('ga2', 64, 16)]),
+    (0x03, 0x90): ('tsbk_mot_grg_ch_grant_up',  [('ch1', 16, 16), ('sg1', 32, 16), ('ch2', 48, 16), ('sg2', 64, 16)]),
+    (0x03, 0x00): ('tsbk_grp_v_ch_grant_up_exp', [('opts', 16, 8), ('ch1', 32, 16), ('ch2', 48, 16), ('ga', 64, 16)]),
+    (0x0b, 0x90): ('tsbk_mot_bsi_grant',        [('bsi', 16, 48), ('ch', 64, 16)]),
+    (0x16, None): ('tsbk_sndcp_data_ch',        [('ch1', 32, 16), ('ch2', 48, 16)]),
+    (0x28, None): ('tsbk_grp_aff_rsp',          [('lg', 16, 1), ('gav', 22, 2), ('aga', 24, 16), ('ga', 40, 16), ('ta', 56, 24)]),
+    (0x29, None): ('tsbk_sccb_exp',             [('rfid', 16, 8), ('stid', 24, 8), ('ch1', 32, 16), ('ch2', 56, 16)]),
+    (0x2b, None): ('tsbk_loc_reg_rsp',          [('rv', 22, 2), ('ga', 24, 16), ('rfid', 40, 8), ('stid', 48, 8), ('ta', 56, 24)]),
+    (0x2c, None): ('tsbk_u_reg_rsp',            [('rv', 18, 2), ('syid', 20, 12), ('sid', 32, 24), ('sa', 56, 24)]),
+    (0x2f, None): ('tsbk_u_de_reg_ack',         [('wacn', 24, 20), ('syid', 44, 12), ('sid', 56, 24)]),
+    (0x30, 0xa4): ('tsbk_grg_exenc_cmd',        [('grg_t', 16, 1), ('grg_g', 17, 1), ('grg_a', 18, 1), ('grg_ssn', 19, 5), ('sg', 24, 16), ('keyid', 40, 16), ('rta', 56, 24)]),
+    (0x33, 0x00): ('tsbk_iden_up_tdma',         [('iden', 16, 4), ('channel_type', 20, 4), ('toff0', 24, 14), ('spac', 38, 10), ('f1', 48, 32)]),
+    (0x34, None): ('tsbk_iden_up_vu',           [('iden', 16, 4), ('bwvu', 20, 4), ('toff0', 24, 14), ('spac', 38, 10), ('freq', 48, 32)]),
+    (0x39, None): ('tsbk_sccb',                 [('rfid', 16, 8), ('stid', 24, 8), ('ch1', 32, 16), ('ch2', 56, 16)]),
+    (0x3a, None): ('tsbk_rfss_sts_bcst',        [('syid', 28, 12), ('rfid', 40, 8), ('stid', 48, 8), ('chan', 56, 16)]),
+    (0x3b, None): ('tsbk_net_sts_bcst',         [('wacn', 24, 20), ('syid', 44, 12), ('ch1', 56, 16)]),
+    (0x3c, None): ('tsbk_adj_sts_bcst',         [('rfid', 40, 8), ('stid', 48, 8), ('ch1', 56, 16)]),
+    (0x3d, None): ('tsbk_iden_up',              [('iden', 16, 4), ('bw', 20, 9), ('toff0', 29, 9), ('spac', 38, 10), ('freq', 48, 32)]),
+}
+
+TDMA_LAYOUTS = {
+    (0x01, None): ('tdma_grp_v_ch_usr_abbr',    [('opts', 8, 8), ('ga', 16, 16), ('sa', 32, 24)]),
+    (0x05, 0x90): ('tdma_grp_v_ch_grant_up_mult_imp', [('opt1', 8, 8), ('ch1', 16, 16), ('ga1', 32, 16), ('opt2', 48, 8), ('ch2', 56, 16), ('ga2', 72, 16), ('opt3', 88, 8), ('ch3', 96, 16), ('ga3', 112, 16)]),
+    (0x21, None): ('tdma_grp_v_ch_usr_ext',     [('opts', 8, 8), ('ga', 16, 16), ('sa', 32, 24), ('suid', 56, 56)]),
+    (0x25, None): ('tdma_grp_v_ch_grant_up_mult_exp', [('opt1', 8, 8), ('ch1t', 16, 16), ('ch1r', 32, 16), ('ga1', 48, 16), ('opt2', 64, 8), ('ch2t', 72, 16), ('ch2r', 88, 16), ('ga2', 104, 16)]),
+    (0x30, None): ('tdma_pwr_ctl_sig_qual',     [('ta', 8, 24), ('rf', 32, 4), ('ber', 36, 4)]),
+    (0x31, None): ('tdma_mac_release',          [('uf', 8, 1), ('ca', 9, 1), ('sa', 16, 24)]),
+    (0x40, None): ('tdma_grp_v_ch_grant_imp',   [('opts', 8, 8), ('ch', 16, 16), ('ga', 32, 16), ('sa', 48, 24)]),
+    (0x42, None): ('tdma_grp_v_ch_grant_up_imp', [('ch1', 8, 16), ('ga1', 24, 16), ('ch2', 40, 16), ('ga2', 56, 16)]),
+    (0x80, 0x90): ('tdma_mot_grg_v_ch_usr_abbr', [('sg', 24, 16), ('sa', 40, 24)]),
+    (0x81, 0x90): ('tdma_mot_grg_add_cmd',      [('wg_len', 18, 6), ('sg', 24, 16)]),
+    (0x83, 0x90): ('tdma_mot_grg_v_ch_up',      [('sg', 24, 16), ('ch', 40, 16)]),
+    (0x89, 0x90): ('tdma_mot_grg_del_cmd',      [('wg_len', 18, 6), ('sg', 24, 16)]),
+    (0x91, 0x90): ('tdma_mot_talker_alias_hdr', [('ta_len', 40, 8), ('bn', 56, 8), ('sn', 64, 4)]),
+    (0x95, 0x90): ('tdma_mot_talker_alias_blk', [('bn', 24, 8), ('sn', 32, 4)]),
+    (0xa0, 0x90): ('tdma_mot_grg_v_ch_usr_ext', [('sg', 32, 16), ('sa', 48, 24), ('ssuid', 72, 56)]),
+    (0xa3, 0x90): ('tdma_mot_grg_ch_grant_imp', [('ch', 32, 16), ('sg', 48, 16), ('sa', 64, 24)]),
+    (0xa4, 0x90): ('tdma_mot_grg_ch_grant_exp', [('ch1', 32, 16), ('ch2', 48, 16), ('sg', 64, 16), ('sa', 80, 24)]),
+    (0xa5, 0x90): ('tdma_mot_grg_ch_up',        [('ch1', 24, 16), ('sg1', 40, 16), ('ch2', 56, 16), ('sg2', 72, 16)]),
+    (0xb0, 0xa4): ('tdma_grg_exenc_cmd',        [('grg_len', 18, 6), ('grg_opt', 24, 3), ('grg_ssn', 27, 5), ('sg', 32, 16), ('keyid', 48, 16), ('algid', 64, 8)]),
+    (0xc0, None): ('tdma_grp_v_ch_grant_exp',   [('opts', 8, 8), ('ch1t', 16, 16), ('ch1r', 32, 16), ('ga', 48, 16), ('sa', 64, 24)]),
+    (0xc3, None): ('tdma_grp_v_ch_grant_up_exp', [('opts', 8, 8), ('ch1t', 16, 16), ('ch1r', 32, 16), ('ga', 48, 16)]),
+    (0xe9, None): ('tdma_sccb_exp',             [('rfid', 8, 8), ('stid', 16, 8), ('ch_t', 24, 16), ('ch_r', 40, 16)]),
+    (0xf3, None): ('tdma_iden_up_tdma',         [('iden', 16, 4), ('ch_type', 20, 4), ('tx_off', 24, 14), ('ch_spac', 38, 10), ('base_f', 48, 32), ('wacn_id', 80, 20), ('sys_id', 104, 8)]),
+    (0xfa, None): ('tdma_rfss_sts_bcst',        [('syid', 20, 12), ('rfid', 32, 8), ('stid', 40, 8), ('ch_t', 48, 16), ('ch_r', 64, 16)]),
+    (0xfb, None): ('tdma_net_sts_bcst',         [('wacn', 16, 20), ('syid', 36, 12), ('ch_t', 48, 16), ('ch_r', 64, 16)]),
+    (0xfc, None): ('tdma_adj_sts_bcst',         [('syid', 20, 12), ('rfid', 32, 8), ('stid', 40, 8), ('ch_t', 48, 16), ('ch_r', 64, 16)]),
+    (0xfe, None): ('tdma_adj_sts_bcst_ext',     [('syid', 20, 12), ('rfid', 32, 8), ('stid', 40, 8), ('ch_t', 48, 16), ('ch_r', 64, 16), ('wacn', 96, 20)]),
+}
+
+# Fixed layouts unpacked in one pass by bit_struct; (bit offset, width) from the msb
+MAC_PTT_FIELDS      = bit_struct(17, [(0, 72), (72, 8), (80, 16), (96, 24), (120, 16)]) # mi, algid, keyid, sa, ga
+LCW_GRP_V_CH_USR    = bit_struct(9,  [(16, 8), (31, 1), (32, 16), (48, 24)])            # opts, s, ga, sa
+LCW_GRP_V_CH_UP     = bit_struct(9,  [(8, 16), (24, 16), (40, 16), (56, 16)])           # ch1, ga1, ch2, ga2
+LCW_GRP_V_CH_UP_EXP = bit_struct(9,  [(16, 8), (24, 16), (40, 16), (56, 16)])           # opts, ga, ch1t, ch1r
+LCW_SOURCE_ID_EXT   = bit_struct(9,  [(16, 20), (36, 12), (48, 24)])                    # netid, syid, sid
+
+MBT_HANDLERS = {    # extended format mbt, fields are extracted by the handlers
+    0x00: 'mbt_grp_v_ch_grant',
+    0x02: 'mbt_grp_regrp_v_ch_grant',
+    0x28: 'mbt_grp_aff_rsp',
+    0x2c: 'mbt_u_reg_rsp',
+    0x3a: 'mbt_rfss_sts_bcst',
+    0x3b: 'mbt_net_sts_bcst',
+    0x3c: 'mbt_adj_sts_bcst',
+}
+
+class p25_msg(object):
+    """Decoded control channel message; subclasses generated by msg_layout add one slot per field"""
+    __slots__ = ('opcode', 'mfid', 'data')
+    handler = None
+
+    def __repr__(self):
+        fields = ' '.join(['%s: %d' % (name, getattr(self, name)) for name in self.__slots__])
+        return '%s(opcode: 0x%02x mfid: 0x%02x %s)' % (self.__class__.__name__, self.opcode, self.mfid, fields)
+
+class msg_layout(object):
+    def __init__(self, handler, fields, msg_bits):
+        self.fields = tuple([(name, msg_bits - offset - width, (1 << width) - 1) for (name, offset, width) in fields])
+        self.record = type(handler, (p25_msg,), {'__slots__': tuple([name for (name, offset, width) in fields]), 'handler': handler})
+
+        # generate a straight line extractor for this layout, avoiding a per-field loop at decode time
+        src = ['def unpack(opcode, mfid, data, value):',
+               '    m = record()',
+               '    m.opcode = opcode',
+               '    m.mfid = mfid',
+               '    m.data = data']
+        for name, shift, mask in self.fields:
+            src.append('    m.%s = (value >> %d) & 0x%x' % (name, shift, mask))
+        src.append('    return m')
+        ns = {'record': self.record}
+        exec('\n'.join(src), ns)
+        self.unpack = ns['unpack']
+
+def compile_layouts(layouts, msg_bits):   # returns dict keyed by (opcode << 8) + mfid with wildcard mfids expanded
+    msgs = {}
+    for (opcode, mfid), (handler, fields) in layouts.items():
+        if mfid is not None:
+            msgs[(opcode << 8) + mfid] = msg_layout(handler, fields, msg_bits)
+    for (opcode, mfid), (handler, fields) in layouts.items():
+        if mfid is None:
+            layout = msg_layout(handler, fields, msg_bits)
+            for i in range(256):
+                msgs.setdefault((opcode << 8) + i, layout)
+    return msgs
+
+TSBK_MSGS = compile_layouts(TSBK_LAYOUTS, TSBK_BITS)
+TDMA_MSGS = compile_layouts(TDMA_LAYOUTS, TDMA_OCTETS * 8)
+
+def parse_tsbk(tsbk):   # tsbk is 96 bits including (zero) crc; returns None for unhandled opcodes
+    key = (tsbk >> 80) & 0x3fff     # opcode and mfid are adjacent
+    layout = TSBK_MSGS.get(key)
+    if layout is None:
+        return None
+    return layout.unpack(key >> 8, key & 0xff, tsbk, tsbk)
+
+def parse_tdma(msg):    # msg is the mac message octet string; returns None for unhandled opcodes
+    value = int.from_bytes(msg[:TDMA_OCTETS].ljust(TDMA_OCTETS, b'\x00'), 'big')
+    opcode = value >> ((TDMA_OCTETS - 1) * 8)
+    mfid = 0
+    if (opcode >> 6) & 0x3 == 2:    # Manufacturer-specific opcode has MFID in second octet
+        mfid = (value >> ((TDMA_OCTETS - 2) * 8)) & 0xff
+    layout = TDMA_MSGS.get((opcode << 8) + mfid)
+    if layout is None:
+        return None
+    return layout.unpack(opcode, mfid, msg, value)
+
 #################
 # Main trunking class
 class rx_ctl(object):
@@ -122,6 +309,12 @@ class rx_ctl(object):
         self.cleanup_timer = time.time()
         self.call_log = deque(maxlen=CALL_LOG_MAX_LEN)
         self.call_log_mutex = TimeoutLock(timeout=1.0)
+        self.event_store = None  # optional event_store receiving typed call events
+        self.call_recorder = None  # optional call_recorder following voice calls
+        self.workers = {}        # sysname -> p25_system_worker when per-system worker threads are enabled
+        self.ui_version = 0      # trunk_update version counter
+        self.ui_items = {}       # (syid, section, key) -> [value, version last changed]
+        self.ui_removed = {}     # (syid, section, key) -> version removed
 
         for chan in self.chans:
             sysname = chan['sysname']
@@ -190,23 +383,15 @@ class rx_ctl(object):
 
         updated = 0
         if m_rxid in self.receivers and self.receivers[m_rxid]['rx_rcvr'] is not None:
-            if m_type in [7, 12, 18, 19]:                                                   # send signaling messages to p25_system object
-                updated += self.systems[self.receivers[m_rxid]['sysname']]['system'].process_qmsg(msg, curr_time)
-            else:
-                updated += self.receivers[m_rxid]['rx_rcvr'].process_qmsg(msg, curr_time)   # send in-call messaging to p25_receiver objects
-
-            if updated > 0:
-                # Check for voice receiver assignments
-                for rx in self.systems[self.receivers[m_rxid]['sysname']]['receivers']:
-                    rx.scan_for_talkgroups(curr_time)
-
-                # Check for control channel reassignment
-                self.check_cc_assignments()
+            if self.receivers[m_rxid]['sysname'] in self.workers:                          # hand off to the system's worker thread
+                self.workers[self.receivers[m_rxid]['sysname']].put(msg)
+                return
+            self.process_rcvr_qmsg(msg, m_type, m_rxid, curr_time)
 
         elif m_rxid in self.receivers and self.receivers[m_rxid]['conv_state'] is not None:
             cs = self.receivers[m_rxid]['conv_state']
             if self.debug >= 5:
-                sys.stderr.write("%s [%d] conv process_qmsg: type(%d)\n" % (log_ts.get(), m_rxid, m_type))
+                log_msg('p25', 5, m_rxid, "conv process_qmsg: type(%d)", m_type)
             if m_type == -1:                                        # channel idle/timeout
                 cs['tgid']       = None
                 cs['srcaddr']    = 0
@@ -221,7 +406,7 @@ class rx_ctl(object):
                 srcaddr   = from_dict(js, 'srcaddr',   0)
                 encrypted = from_dict(js, 'encrypted', 0)
                 if self.debug >= 5:
-                    sys.stderr.write("%s [%d] conv call data: grpaddr(%d) srcaddr(%d) encrypted(%d)\n" % (log_ts.get(), m_rxid, grpaddr, srcaddr, encrypted))
+                    log_msg('p25', 5, m_rxid, "conv call data: grpaddr(%d) srcaddr(%d) encrypted(%d)", grpaddr, srcaddr, encrypted)
                 if grpaddr != 0:
                     if cs['call_start'] is None or grpaddr != cs['tgid']:   # new call started
                         self.log_call(0, m_rxid, cs['freq'], 0, 0, grpaddr, '', srcaddr, '')
@@ -236,10 +421,9 @@ class rx_ctl(object):
                 pb_sf_lco = get_ordinals(lcw[0:1])
                 if not (pb_sf_lco & 0x80):                          # skip encrypted LCW format
                     if pb_sf_lco == 0x00:                           # Group Voice Channel User
-                        ga = get_ordinals(lcw[4:6])
-                        sa = get_ordinals(lcw[6:9])
+                        opts, s_flag, ga, sa = LCW_GRP_V_CH_USR.unpack(lcw)
                         if self.debug >= 5:
-                            sys.stderr.write("%s [%d] conv lcw(0x00): ga(%d) sa(%d)\n" % (log_ts.get(), m_rxid, ga, sa))
+                            log_msg('p25', 5, m_rxid, "conv lcw(0x00): ga(%d) sa(%d)", ga, sa)
                         if ga != 0:
                             if cs['call_start'] is None or ga != cs['tgid']:
                                 self.log_call(0, m_rxid, cs['freq'], 0, 0, ga, '', sa, '')
@@ -250,29 +434,53 @@ class rx_ctl(object):
 
         if curr_time > (self.cleanup_timer + CLEANUP_TIMER):
             for rcvr in self.receivers:
-                if self.receivers[rcvr]['rx_rcvr'] is not None:
+                if self.receivers[rcvr]['rx_rcvr'] is not None and self.receivers[rcvr]['sysname'] not in self.workers:
                     self.receivers[rcvr]['rx_rcvr'].check_expired_hold(time.time())
             self.cleanup_timer = curr_time
 
+    # process_rcvr_qmsg handles messages from receivers belonging to a trunked system
+    def process_rcvr_qmsg(self, msg, m_type, m_rxid, curr_time, worker_sysname = None):
+        updated = 0
+        if m_type in [7, 12, 18, 19]:                                                   # send signaling messages to p25_system object
+            updated += self.systems[self.receivers[m_rxid]['sysname']]['system'].process_qmsg(msg, curr_time)
+        else:
+            updated += self.receivers[m_rxid]['rx_rcvr'].process_qmsg(msg, curr_time)   # send in-call messaging to p25_receiver objects
+
+        if updated > 0:
+            # Check for voice receiver assignments
+            for rx in self.systems[self.receivers[m_rxid]['sysname']]['receivers']:
+                rx.scan_for_talkgroups(curr_time)
+
+            # Check for control channel reassignment
+            self.check_cc_assignments(worker_sysname)
+
+    # start_workers moves processing of each trunked system's messages onto its own thread
+    def start_workers(self):
+        for sysname in self.systems:
+            if sysname not in self.workers:
+                self.workers[sysname] = p25_system_worker(self, sysname)
+
     # Check for control channel assignments to idle receivers
-    def check_cc_assignments(self):
+    def check_cc_assignments(self, sysname = None):
         for p25_sysname in self.systems:
+            if sysname is not None and p25_sysname != sysname:
+                continue
             p25_system = self.systems[p25_sysname]['system']
             if p25_system.cc_msgq_id is None:
                 if self.debug >= 10:
-                    sys.stderr.write("%s [%s] needs control channel receiver\n" % (log_ts.get(), p25_sysname))
+                    log_msg('p25', 10, p25_sysname, "needs control channel receiver")
                 for rx in self.systems[p25_sysname]['receivers']:
                     if rx.tuner_idle:
                         if self.debug >= 10:
-                            sys.stderr.write("%s [%s] attempt to assign control channel receiver[%d]\n" % (log_ts.get(), p25_sysname, rx.msgq_id))
+                            log_msg('p25', 10, p25_sysname, "attempt to assign control channel receiver[%d]", rx.msgq_id)
                         rx.tune_cc(p25_system.get_cc(rx.msgq_id))
                         break
                     else:
                         if self.debug >= 10:
-                            sys.stderr.write("%s [%s] receiver[%d] not idle\n" % (log_ts.get(), p25_sysname, rx.msgq_id))
+                            log_msg('p25', 10, p25_sysname, "receiver[%d] not idle", rx.msgq_id)
             if p25_system.cc_msgq_id is None: # no receivers assigned
                 if self.debug >= 5:
-                    sys.stderr.write("%s [%s] has no idle receivers for control channel monitoring\n" % (log_ts.get(), p25_sysname))
+                    log_msg('p25', 5, p25_sysname, "has no idle receivers for control channel monitoring")
 
     # ui_command handles all requests from user interface
     def ui_command(self, cmd, data, msgq_id):
@@ -282,14 +490,58 @@ class rx_ctl(object):
         # Check for control channel reassignment
         self.check_cc_assignments()
 
-    def to_json(self):
-        d = {'json_type': 'trunk_update'}
+    # to_json returns the full trunk_update, or only the entries changed since version 'since' when that is recent enough
+    def to_json(self, since = 0):
+        self.ui_version += 1
+        version = self.ui_version
+        d = {'json_type': 'trunk_update', 'version': version}
+        seen = set()
         syid = 0;
         for system in self.systems:
-            d[syid] = json.loads(self.systems[system]['system'].to_json())
+            d[syid] = self.systems[system]['system'].to_dict()
+            for key, val in d[syid].items():
+                if key in UI_DELTA_SECTIONS:
+                    for k, v in val.items():
+                        self.track_ui_item((syid, key, k), v, version, seen)
+                else:
+                    self.track_ui_item((syid, None, key), val, version, seen)
             syid += 1
         d['nac'] = 0
-        return json.dumps(d)
+
+        for item in [item for item in self.ui_items if item not in seen]:
+            del self.ui_items[item]
+            self.ui_removed[item] = version
+        horizon = version - UI_DELTA_HISTORY
+        for item in [item for item in self.ui_removed if self.ui_removed[item] <= horizon]:
+            del self.ui_removed[item]
+
+        if since <= 0 or since <= horizon or since >= version:
+            return json.dumps(d)
+        return json.dumps(self.get_ui_delta(d, since))
+
+    def track_ui_item(self, item, val, version, seen):   # values are copied as some are live system structures
+        seen.add(item)
+        if item not in self.ui_items:
+            self.ui_items[item] = [copy.deepcopy(val), version]
+            self.ui_removed.pop(item, None)
+        elif self.ui_items[item][0] != val:
+            self.ui_items[item] = [copy.deepcopy(val), version]
+
+    def get_ui_delta(self, full, since):
+        d = {'json_type': 'trunk_update', 'version': full['version'], 'base': since, 'delta': True, 'nac': full['nac']}
+        for (syid, section, key), (val, changed) in self.ui_items.items():
+            if changed <= since:
+                continue
+            sd = d.setdefault(syid, {})
+            if section is None:
+                sd[key] = val
+            else:
+                sd.setdefault(section, {})[key] = val
+        for (syid, section, key), removed in self.ui_removed.items():
+            if removed <= since:
+                continue
+            d.setdefault(syid, {}).setdefault('removed', {}).setdefault(section or '', []).append(key)
+        return d
 
     def dump_tgids(self):
         for system in self.systems:
@@ -349,7 +601,23 @@ class rx_ctl(object):
             self.call_log.clear()
         return json.dumps(d)
 
+    def set_event_store(self, store):
+        self.event_store = store
+        for rx_sys in self.systems:
+            if self.systems[rx_sys]['system'] is not None:
+                self.systems[rx_sys]['system'].event_store = store
+
+    def set_call_recorder(self, recorder):
+        self.call_recorder = recorder
+        for rx_sys in self.systems:
+            if self.systems[rx_sys]['system'] is not None:
+                self.systems[rx_sys]['system'].call_recorder = recorder
+
     def log_call(self, sysid, rcvr, freq, slot, prio, tgid, tgtag, rid, rtag):
+        if self.call_recorder is not None:
+            self.call_recorder.call_update(rcvr, tgid, rid, rtag)
+        if self.event_store is not None:
+            self.event_store.put(EV_CALL, self.receivers[rcvr]['sysname'], rcvr=rcvr, freq=freq, slot=slot, tgid=tgid, srcaddr=rid, prio=prio, tag=tgtag)
         with self.call_log_mutex:
             self.call_log.append({ "time":    time.time(),
                                    "sysid":   sysid,
@@ -363,6 +631,44 @@ class rx_ctl(object):
                                    "rid":     rid,
                                    "rtag":    rtag })
 
+#################
+# Per-system worker thread
+class p25_system_worker(threading.Thread):
+    def __init__(self, rx_ctl, sysname):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.rx_ctl = rx_ctl
+        self.sysname = sysname
+        self.msgq = queue.Queue(WORKER_QUEUE_MAX)
+        self.dropped = 0
+        self.cleanup_timer = time.time()
+        self.start()
+        log_msg('p25', 0, sysname, "Started system worker thread")
+
+    def put(self, msg):
+        try:
+            self.msgq.put_nowait(msg)
+        except queue.Full:
+            self.dropped += 1
+            if self.rx_ctl.debug >= 5:
+                log_msg('p25', 5, self.sysname, "worker queue full, %d messages dropped", self.dropped)
+
+    def run(self):
+        while True:
+            msg = self.msgq.get()
+            curr_time = time.time()
+            try:
+                m_type = ctypes.c_int16(msg.type() & 0xffff).value
+                m_rxid = int(msg.arg1()) >> 1
+                self.rx_ctl.process_rcvr_qmsg(msg, m_type, m_rxid, curr_time, self.sysname)
+
+                if curr_time > (self.cleanup_timer + CLEANUP_TIMER):
+                    for rx in self.rx_ctl.systems[self.sysname]['receivers']:
+                        rx.check_expired_hold(time.time())
+                    self.cleanup_timer = curr_time
+            except Exception:
+                sys.stderr.write("%s [%s] system worker exception:\n%s\n" % (log_ts.get(), self.sysname, traceback.format_exc()))
+
 #################
 # P25 system class
 class p25_system(object):
@@ -370,18 +676,26 @@ class p25_system(object):
         self.config = config
         self.debug = debug
         self.rx_ctl = rx_ctl
+        self.event_store = None
+        self.call_recorder = None
         self.freq_table = {}
         self.voice_frequencies = {}
         self.talkgroups = {}
-        self.talkgroups_mutex = TimeoutLock(timeout=1.0)
+        self.talkgroups_mutex = SeqLock(timeout=1.0)
+        self.active_tgids = {}      # index of recently updated tgids scanned by find_talkgroup
+        self.filters_version = 0    # bumped when any receiver's skip/black/white lists change
+        self.receivers = []         # p25_receiver objects whose candidate indexes follow active_tgids
         self.sourceids = {}
         self.sourceid_history = rid_history(self.sourceids, 10)
+        self.rid_expiry = int(from_dict(config, "rid_expiry", RID_EXPIRY_TIME))
+        self.rid_max = int(from_dict(config, "rid_max", RID_MAX))
+        self.rid_expiry_check = time.time()
         self.registered_suids = {}
         self.registered_wuids = {}
         self.expire_registrations_check = time.time()
-        self.suids_mutex = TimeoutLock(timeout=1.0)
+        self.suids_mutex = SeqLock(timeout=1.0)
         self.patches = {}
-        self.patches_mutex = TimeoutLock(timeout=1.0)
+        self.patches_mutex = SeqLock(timeout=1.0)
         self.blacklist = {}
         self.whitelist = None
         self.crypt_behavior = 1
@@ -413,22 +727,22 @@ class p25_system(object):
         self.stats = {}
         self.stats['tsbk_count'] = 0
 
-        sys.stderr.write("%s [%s] Initializing P25 system\n" % (log_ts.get(), self.sysname))
+        log_msg('p25', 0, self.sysname, "Initializing P25 system")
 
         if 'tgid_tags_file' in self.config and self.config['tgid_tags_file'] != "":
-            sys.stderr.write("%s [%s] reading system tgid_tags_file: %s\n" % (log_ts.get(), self.sysname, self.config['tgid_tags_file']))
+            log_msg('p25', 0, self.sysname, "reading system tgid_tags_file: %s", self.config['tgid_tags_file'])
             self.read_tags_file(self.config['tgid_tags_file'])
 
         if 'rid_tags_file' in self.config and self.config['rid_tags_file'] != "":
-            sys.stderr.write("%s [%s] reading system rid_tags_file: %s\n" % (log_ts.get(), self.sysname, self.config['rid_tags_file']))
+            log_msg('p25', 0, self.sysname, "reading system rid_tags_file: %s", self.config['rid_tags_file'])
             self.read_rids_file(self.config['rid_tags_file'])
 
         if 'blacklist' in self.config and self.config['blacklist'] != "":
-            sys.stderr.write("%s [%s] reading system blacklist file: %s\n" % (log_ts.get(), self.sysname, self.config['blacklist']))
+            log_msg('p25', 0, self.sysname, "reading system blacklist file: %s", self.config['blacklist'])
             self.blacklist = get_int_dict(self.config['blacklist'], self.sysname)
 
         if 'whitelist' in self.config and self.config['whitelist'] != "":
-            sys.stderr.write("%s [%s] reading system whitelist file: %s\n" % (log_ts.get(), self.sysname, self.config['whitelist']))
+            log_msg('p25', 0, self.sysname, "reading system whitelist file: %s", self.config['whitelist'])
             self.whitelist = get_int_dict(self.config['whitelist'], self.sysname)
 
         if 'band_plan' in self.config:
@@ -459,7 +773,7 @@ class p25_system(object):
         self.debug = dbglvl
 
     def log_call(self, rcvr, freq, slot, prio, tgid, rid):
-        self.rx_ctl.log_call(self.ns_syid, rcvr, freq, slot, prio, tgid, self.talkgroups[tgid]['tag'], rid, self.get_rid_tag(rid))
+        self.rx_ctl.log_call(self.ns_syid, rcvr, freq, slot, prio, tgid, self.talkgroups[tgid].tag, rid, self.get_rid_tag(rid))
 
     def get_talkgroups(self):
         return self.talkgroups
@@ -531,10 +845,10 @@ class p25_system(object):
                     with self.talkgroups_mutex:
                         if tgid not in self.talkgroups:
                             add_default_tgid(self.talkgroups, tgid)
-                        self.talkgroups[tgid]['tag'] = tag
-                        self.talkgroups[tgid]['prio'] = prio
+                        self.talkgroups[tgid].tag = tag
+                        self.talkgroups[tgid].prio = prio
                     if self.debug > 1:
-                        sys.stderr.write("%s [%s] setting tgid(%d), prio(%d), tag(%s)\n" % (log_ts.get(), self.sysname, tgid, prio, tag))
+                        log_msg('p25', 2, self.sysname, "setting tgid(%d), prio(%d), tag(%s)", tgid, prio, tag)
         except (IOError) as ex:
             sys.stderr.write("read_tags_file: exception %s\n" % ex)
 
@@ -560,9 +874,9 @@ class p25_system(object):
 
                     if rid not in self.sourceids:
                         add_default_rid(self.sourceids, rid)
-                    self.sourceids[rid]['tag'] = tag
+                    self.sourceids[rid].tag = tag
                     if self.debug > 1:
-                        sys.stderr.write("%s [%s] setting rid(%d), tag(%s)\n" % (log_ts.get(), self.sysname, rid, tag))
+                        log_msg('p25', 2, self.sysname, "setting rid(%d), tag(%s)", rid, tag)
         except (IOError) as ex:
             sys.stderr.write("read_rid_file: exception %s\n" % ex)
 
@@ -573,7 +887,7 @@ class p25_system(object):
         if (self.cc_msgq_id is None) or (msgq_id == self.cc_msgq_id):
             self.cc_msgq_id = msgq_id
             if self.debug > 10:
-                sys.stderr.write("%s [%s] Assigning control channel to receiver[%d]\n" % (log_ts.get(), self.sysname, msgq_id))
+                log_msg('p25', 11, self.sysname, "Assigning control channel to receiver[%d]", msgq_id)
 
             assert self.cc_list[self.cc_index]
             return self.cc_list[self.cc_index]
@@ -593,7 +907,7 @@ class p25_system(object):
         if self.cc_msgq_id == msgq_id:
             self.cc_msgq_id = None
             if self.debug > 10:
-                sys.stderr.write("%s [%s] Releasing control channel from receiver[%d]\n" % (log_ts.get(), self.sysname, msgq_id))
+                log_msg('p25', 11, self.sysname, "Releasing control channel from receiver[%d]", msgq_id)
 
 
     def has_cc(self, msgq_id):
@@ -662,797 +976,655 @@ class p25_system(object):
             updated += self.decode_fdma_lcw(m_rxid, s, curr_time)
 
         updated += self.expire_patches()
+        self.expire_rids(curr_time)
         return updated
 
     def decode_mbt_data(self, m_rxid, opcode, src, header, mbt_data):
         self.cc_timeouts = 0
         self.last_tsbk = time.time()
         self.stats['tsbk_count'] += 1
+        handler = MBT_HANDLERS.get(opcode)
+        if handler is None:
+            if self.debug >= 10:
+                log_msg('mbt', 10, m_rxid, 'mbt(0x%02x) unhandled: %x', opcode, mbt_data)
+            return 0
+        return getattr(self, handler)(m_rxid, src, header, mbt_data)
+
+    def mbt_grp_v_ch_grant(self, m_rxid, src, header, mbt_data):
         updated = 0
-        if opcode == 0x0:  # grp voice channel grant
-            opts = (header >> 8)    & 0xff
-            ch1  = (mbt_data >> 64) & 0xffff
-            ch2  = (mbt_data >> 48) & 0xffff
-            ga   = (mbt_data >> 32) & 0xffff
+        opts = (header >> 8)    & 0xff
+        ch1  = (mbt_data >> 64) & 0xffff
+        ch2  = (mbt_data >> 48) & 0xffff
+        ga   = (mbt_data >> 32) & 0xffff
+        f = self.channel_id_to_frequency(ch1)
+        self.update_voice_frequency(f, tgid=ga, tdma_slot=self.get_tdma_slot(ch1), srcaddr=src, svcopts=opts)
+        if f:
+            updated += 1
+        if self.debug >= 10:
+            log_msg('mbt', 10, m_rxid, 'mbt(0x00) grp_v_ch__grant: opts: 0x%02x ch1: %x ch2: %x ga: %d', opts, ch1, ch2, ga)
+        return updated
+
+    def mbt_grp_regrp_v_ch_grant(self, m_rxid, src, header, mbt_data):
+        updated = 0
+        mfrid  = (mbt_data >> 168) & 0xff
+        if mfrid == 0x90:    # MOT_GRG_CN_GRANT_EXP
+            ch1  = (mbt_data >> 80) & 0xffff
+            ch2  = (mbt_data >> 64) & 0xffff
+            sg   = (mbt_data >> 48) & 0xffff
             f = self.channel_id_to_frequency(ch1)
-            self.update_voice_frequency(f, tgid=ga, tdma_slot=self.get_tdma_slot(ch1), srcaddr=src, svcopts=opts)
+            self.update_voice_frequency(f, tgid=sg, tdma_slot=self.get_tdma_slot(ch1), srcaddr=src)
             if f:
                 updated += 1
             if self.debug >= 10:
-                sys.stderr.write('%s [%d] mbt(0x00) grp_v_ch__grant: opts: 0x%02x ch1: %x ch2: %x ga: %d\n' %(log_ts.get(), m_rxid, opts, ch1, ch2, ga))
-        elif opcode == 0x02: # grp regroup voice channel grant
-            mfrid  = (mbt_data >> 168) & 0xff
-            if mfrid == 0x90:    # MOT_GRG_CN_GRANT_EXP
-                ch1  = (mbt_data >> 80) & 0xffff
-                ch2  = (mbt_data >> 64) & 0xffff
-                sg   = (mbt_data >> 48) & 0xffff
-                f = self.channel_id_to_frequency(ch1)
-                self.update_voice_frequency(f, tgid=sg, tdma_slot=self.get_tdma_slot(ch1), srcaddr=src)
-                if f:
-                    updated += 1
-                if self.debug >= 10:
-                    sys.stderr.write('%s [%d] mbt(0x02) mfid90_grg_cn_grant_exp: ch1: %x ch2: %x sg: %d\n' % (log_ts.get(), m_rxid, ch1, ch2, ga))
-        elif opcode == 0x28:  # grp_aff_rsp
-            ta    = src
-            mfrid = (header >> 56) & 0xff
-            wacn  = ((header << 4) & 0xffff0) + ((mbt_data >> 188) & 0xf) 
-            syid  = (mbt_data >> 176) & 0xfff
-            gid   = (mbt_data >> 160) & 0xffff
-            aga   = (mbt_data >> 144) & 0xffff
-            ga    = (mbt_data >> 128) & 0xffff
-            lg    = (mbt_data >> 127) & 0x1
-            gav   = (mbt_data >> 120) & 0x3
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] mbt(0x28) grp_aff_rsp: mfrid: 0x%x wacn: 0x%x syid: 0x%x lg: %d gav: %d aga: %d ga: %d ta: %d\n\n' %(log_ts.get(), m_rxid, mfrid, wacn, syid, lg, gav, aga, ga, ta))
-            if gav == 0:
-                self.affiliate_sgid(wacn, syid, gid, ga, aga, ta, self.last_tsbk)
-        elif opcode == 0x2c:  # u_reg_rsp
-            mfrid = (header >> 56) & 0xff
-            wacn  = ((header << 4) & 0xffff0) + ((mbt_data >> 92) & 0xf) 
-            syid  = (mbt_data >> 80) & 0xfff
-            sid   = (mbt_data >> 56) & 0xffffff
-            rv    = (mbt_data >> 48) & 0x3
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] mbt(0x2c) u_reg_rsp: mfid: 0x%x rv: %d wacn: 0x%x syid: 0x%x sid: %d sa: %d\n' % (log_ts.get(), m_rxid, mfrid, rv, wacn, syid, sid, src))
-            if rv == 0:
-                self.register_suid(wacn, syid, sid, src, self.last_tsbk)
-        elif opcode == 0x3c:  # adjacent status
-            syid = (header >> 48) & 0xfff
-            rfid = (header >> 24) & 0xff
-            stid = (header >> 16) & 0xff
-            ch1  = (mbt_data >> 80) & 0xffff
-            ch2  = (mbt_data >> 64) & 0xffff
-            f1 = self.channel_id_to_frequency(ch1)
-            f2 = self.channel_id_to_frequency(ch2)
-            if f1 and f2:
-                self.adjacent[f1] = 'rfid: %d stid:%d uplink:%f' % (rfid, stid, f2 / 1000000.0)
-                self.adjacent_data[f1] = {'rfid': rfid, 'stid':stid, 'uplink': f2, 'table': None}
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] mbt(0x3c) adj_sts_bcst: syid: %x rfid: %x stid: %x ch1: %x ch2: %x f1: %s f2: %s\n' % (log_ts.get(), m_rxid, syid, rfid, stid, ch1, ch2, self.channel_id_to_string(ch1), self.channel_id_to_string(ch2)))
-        elif opcode == 0x3b:  # network status
-            syid = (header >> 48) & 0xfff
-            wacn = (mbt_data >> 76) & 0xfffff
-            ch1  = (mbt_data >> 56) & 0xffff
-            ch2  = (mbt_data >> 40) & 0xffff
-            f1 = self.channel_id_to_frequency(ch1)
-            f2 = self.channel_id_to_frequency(ch2)
-            if f1 and f2:
-                self.ns_syid = syid
-                self.ns_wacn = wacn
-                self.ns_chan = f1
-                self.ns_valid = True
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] mbt(0x3b) net_sts_bcst: sys: %x wacn: %x ch1: %s ch2: %s\n' %(log_ts.get(), m_rxid, syid, wacn, self.channel_id_to_string(ch1), self.channel_id_to_string(ch2)))
-        elif opcode == 0x3a:  # rfss status
-            syid = (header >> 48) & 0xfff
-            rfid = (mbt_data >> 88) & 0xff
-            stid = (mbt_data >> 80) & 0xff
-            ch1  = (mbt_data >> 64) & 0xffff
-            ch2  = (mbt_data >> 48) & 0xffff
-            f1 = self.channel_id_to_frequency(ch1)
-            f2 = self.channel_id_to_frequency(ch2)
-            if f1 and f2:
-                self.rfss_syid = syid
-                self.rfss_rfid = rfid
-                self.rfss_stid = stid
-                self.rfss_chan = f1
-                self.rfss_txchan = f2
-                add_unique_freq(self.cc_list, f1)
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] mbt(0x3a) rfss_sts_bcst: sys: %x rfid: %x stid: %x ch1: %s ch2: %s\n' %(log_ts.get(), m_rxid, syid, rfid, stid, self.channel_id_to_string(ch1), self.channel_id_to_string(ch2)))
-        else:
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] mbt(0x%02x) unhandled: %x\n' %(log_ts.get(), m_rxid, opcode, mbt_data))
+                log_msg('mbt', 10, m_rxid, 'mbt(0x02) mfid90_grg_cn_grant_exp: ch1: %x ch2: %x sg: %d', ch1, ch2, sg)
         return updated
 
+    def mbt_grp_aff_rsp(self, m_rxid, src, header, mbt_data):
+        ta    = src
+        mfrid = (header >> 56) & 0xff
+        wacn  = ((header << 4) & 0xffff0) + ((mbt_data >> 188) & 0xf) 
+        syid  = (mbt_data >> 176) & 0xfff
+        gid   = (mbt_data >> 160) & 0xffff
+        aga   = (mbt_data >> 144) & 0xffff
+        ga    = (mbt_data >> 128) & 0xffff
+        lg    = (mbt_data >> 127) & 0x1
+        gav   = (mbt_data >> 120) & 0x3
+        if self.debug >= 10:
+            log_msg('mbt', 10, m_rxid, 'mbt(0x28) grp_aff_rsp: mfrid: 0x%x wacn: 0x%x syid: 0x%x lg: %d gav: %d aga: %d ga: %d ta: %d', mfrid, wacn, syid, lg, gav, aga, ga, ta)
+        if gav == 0:
+            self.affiliate_sgid(wacn, syid, gid, ga, aga, ta, self.last_tsbk)
+        return 0
+
+    def mbt_u_reg_rsp(self, m_rxid, src, header, mbt_data):
+        mfrid = (header >> 56) & 0xff
+        wacn  = ((header << 4) & 0xffff0) + ((mbt_data >> 92) & 0xf) 
+        syid  = (mbt_data >> 80) & 0xfff
+        sid   = (mbt_data >> 56) & 0xffffff
+        rv    = (mbt_data >> 48) & 0x3
+        if self.debug >= 10:
+            log_msg('mbt', 10, m_rxid, 'mbt(0x2c) u_reg_rsp: mfid: 0x%x rv: %d wacn: 0x%x syid: 0x%x sid: %d sa: %d', mfrid, rv, wacn, syid, sid, src)
+        if rv == 0:
+            self.register_suid(wacn, syid, sid, src, self.last_tsbk)
+        return 0
+
+    def mbt_adj_sts_bcst(self, m_rxid, src, header, mbt_data):
+        syid = (header >> 48) & 0xfff
+        rfid = (header >> 24) & 0xff
+        stid = (header >> 16) & 0xff
+        ch1  = (mbt_data >> 80) & 0xffff
+        ch2  = (mbt_data >> 64) & 0xffff
+        f1 = self.channel_id_to_frequency(ch1)
+        f2 = self.channel_id_to_frequency(ch2)
+        if f1 and f2:
+            self.adjacent[f1] = 'rfid: %d stid:%d uplink:%f' % (rfid, stid, f2 / 1000000.0)
+            self.adjacent_data[f1] = {'rfid': rfid, 'stid':stid, 'uplink': f2, 'table': None}
+        if self.debug >= 10:
+            log_msg('mbt', 10, m_rxid, 'mbt(0x3c) adj_sts_bcst: syid: %x rfid: %x stid: %x ch1: %x ch2: %x f1: %s f2: %s', syid, rfid, stid, ch1, ch2, self.channel_id_to_string(ch1), self.channel_id_to_string(ch2))
+        return 0
+
+    def mbt_net_sts_bcst(self, m_rxid, src, header, mbt_data):
+        syid = (header >> 48) & 0xfff
+        wacn = (mbt_data >> 76) & 0xfffff
+        ch1  = (mbt_data >> 56) & 0xffff
+        ch2  = (mbt_data >> 40) & 0xffff
+        f1 = self.channel_id_to_frequency(ch1)
+        f2 = self.channel_id_to_frequency(ch2)
+        if f1 and f2:
+            self.ns_syid = syid
+            self.ns_wacn = wacn
+            self.ns_chan = f1
+            self.ns_valid = True
+        if self.debug >= 10:
+            log_msg('mbt', 10, m_rxid, 'mbt(0x3b) net_sts_bcst: sys: %x wacn: %x ch1: %s ch2: %s', syid, wacn, self.channel_id_to_string(ch1), self.channel_id_to_string(ch2))
+        return 0
+
+    def mbt_rfss_sts_bcst(self, m_rxid, src, header, mbt_data):
+        syid = (header >> 48) & 0xfff
+        rfid = (mbt_data >> 88) & 0xff
+        stid = (mbt_data >> 80) & 0xff
+        ch1  = (mbt_data >> 64) & 0xffff
+        ch2  = (mbt_data >> 48) & 0xffff
+        f1 = self.channel_id_to_frequency(ch1)
+        f2 = self.channel_id_to_frequency(ch2)
+        if f1 and f2:
+            self.rfss_syid = syid
+            self.rfss_rfid = rfid
+            self.rfss_stid = stid
+            self.rfss_chan = f1
+            self.rfss_txchan = f2
+            add_unique_freq(self.cc_list, f1)
+        if self.debug >= 10:
+            log_msg('mbt', 10, m_rxid, 'mbt(0x3a) rfss_sts_bcst: sys: %x rfid: %x stid: %x ch1: %s ch2: %s', syid, rfid, stid, self.channel_id_to_string(ch1), self.channel_id_to_string(ch2))
+        return 0
+
     def decode_tsbk(self, m_rxid, tsbk):
         self.cc_timeouts = 0
         self.last_tsbk = time.time()
         self.stats['tsbk_count'] += 1
-        updated = 0
         tsbk = tsbk << 16    # for missing crc
-        opcode = (tsbk >> 88) & 0x3f
-        if opcode == 0x00:   # group voice chan grant
-            mfrid  = (tsbk >> 80) & 0xff
-            if mfrid == 0x90:    # MOT_GRG_ADD_CMD
-                sg   = (tsbk >> 64) & 0xffff
-                ga1  = (tsbk >> 48) & 0xffff
-                ga2  = (tsbk >> 32) & 0xffff
-                ga3  = (tsbk >> 16) & 0xffff
-                if self.debug >= 10:
-                    sys.stderr.write('%s [%d] tsbk(0x00) mfid90_grg_add_cmd: sg: %d ga1: %d ga2: %d ga3: %d\n' % (log_ts.get(), m_rxid, sg, ga1, ga2, ga3))
-                self.add_patch(sg, [ga1, ga2, ga3])
-            else:
-                opts = (tsbk >> 72) & 0xff
-                ch   = (tsbk >> 56) & 0xffff
-                ga   = (tsbk >> 40) & 0xffff
-                sa   = (tsbk >> 16) & 0xffffff
-                f = self.channel_id_to_frequency(ch)
-                self.update_voice_frequency(f, tgid=ga, tdma_slot=self.get_tdma_slot(ch), srcaddr=sa, svcopts=opts)
-                if f:
-                    updated += 1
-                if self.debug >= 10:
-                    sys.stderr.write('%s [%d] tsbk(0x00) grp_v_ch_grant: opts: 0x%02x freq: %s ga: %d sa: %d\n' % (log_ts.get(), m_rxid, opts, self.channel_id_to_string(ch), ga, sa))
-        elif opcode == 0x01:   # reserved
-            mfrid  = (tsbk >> 80) & 0xff
-            if mfrid == 0x90: #MOT_GRG_DEL_CMD
-                sg   = (tsbk >> 64) & 0xffff
-                ga1  = (tsbk >> 48) & 0xffff
-                ga2  = (tsbk >> 32) & 0xffff
-                ga3  = (tsbk >> 16) & 0xffff
-                if self.debug >= 10:
-                    sys.stderr.write('%s [%d] tsbk(0x01) mfid90_grg_del_cmd: sg: %d ga1: %d ga2: %d ga3: %d\n' % (log_ts.get(), m_rxid, sg, ga1, ga2, ga3))
-                self.del_patch(sg, [ga1, ga2, ga3])
-        elif opcode == 0x02:   # group voice chan grant update
-            mfrid  = (tsbk >> 80) & 0xff
-            if mfrid == 0x90:
-                ch  = (tsbk >> 56) & 0xffff
-                sg  = (tsbk >> 40) & 0xffff
-                sa  = (tsbk >> 16) & 0xffffff
-                f = self.channel_id_to_frequency(ch)
-                self.update_voice_frequency(f, tgid=sg, tdma_slot=self.get_tdma_slot(ch), srcaddr=sa)
-                if f:
-                    updated += 1
-                if self.debug >= 10:
-                    sys.stderr.write('%s [%d] tsbk(0x02) mfid90_grg_ch_grant: freq: %s sg: %d sa: %d\n' % (log_ts.get(), m_rxid, self.channel_id_to_string(ch), sg, sa))
-            else:
-                ch1  = (tsbk >> 64) & 0xffff
-                ga1  = (tsbk >> 48) & 0xffff
-                ch2  = (tsbk >> 32) & 0xffff
-                ga2  = (tsbk >> 16) & 0xffff
-                f1 = self.channel_id_to_frequency(ch1)
-                f2 = self.channel_id_to_frequency(ch2)
-                self.update_voice_frequency(f1, tgid=ga1, tdma_slot=self.get_tdma_slot(ch1))
-                if f1 != f2:
-                    self.update_voice_frequency(f2, tgid=ga2, tdma_slot=self.get_tdma_slot(ch2))
-                if f1:
-                    updated += 1
-                if f2:
-                    updated += 1
-                if self.debug >= 10:
-                    sys.stderr.write('%s [%d] tsbk(0x02) grp_v_ch_grant_up: ch1: %s ga1: %d ch2: %s ga2: %d\n' %(log_ts.get(), m_rxid, self.channel_id_to_string(ch1), ga1, self.channel_id_to_string(ch2), ga2))
-        elif opcode == 0x03:   # group voice chan grant update exp : TIA.102-AABC-B-2005 page 56
-            mfrid  = (tsbk >> 80) & 0xff
-            if mfrid == 0x90: #MOT_GRG_CN_GRANT_UPDT
-                ch1  = (tsbk >> 64) & 0xffff
-                sg1  = (tsbk >> 48) & 0xffff
-                ch2  = (tsbk >> 32) & 0xffff
-                sg2  = (tsbk >> 16) & 0xffff
-                f1 = self.channel_id_to_frequency(ch1)
-                f2 = self.channel_id_to_frequency(ch2)
-                self.update_voice_frequency(f1, tgid=sg1, tdma_slot=self.get_tdma_slot(ch1))
-                if f1 != f2:
-                    self.update_voice_frequency(f2, tgid=sg2, tdma_slot=self.get_tdma_slot(ch2))
-                if f1:
-                    updated += 1
-                if f2:
-                    updated += 1
-                if self.debug >= 10:
-                    sys.stderr.write('%s [%d] tsbk(0x03) mfid90_grg_ch_grant_up: freq1: %s sg1: %d freq2: %s sg2:%d\n' % (log_ts.get(), m_rxid, self.channel_id_to_string(ch1), sg1, self.channel_id_to_string(ch2), sg2))
-            elif mfrid == 0:
-                opts = (tsbk >> 72) & 0xff
-                ch1  = (tsbk >> 48) & 0xffff
-                ch2   = (tsbk >> 32) & 0xffff
-                ga  = (tsbk >> 16) & 0xffff
-                f = self.channel_id_to_frequency(ch1)
-                self.update_voice_frequency(f, tgid=ga, tdma_slot=self.get_tdma_slot(ch1), svcopts=opts)
-                if f:
-                    updated += 1
-                if self.debug >= 10:
-                    sys.stderr.write('%s [%d] tsbk(0x03) grp_v_ch_grant_up_exp: opts: 0x%02x freq-t: %s freq-r: %s ga: %d\n' % (log_ts.get(), m_rxid, opts, self.channel_id_to_string(ch1), self.channel_id_to_string(ch2), ga))
-        elif opcode == 0x0b:
-            mfrid  = (tsbk >> 80) & 0xff
-            if mfrid == 0x90: # MFID90 MOT_BSI_GRANT
-                bsi = ""
-                i = 74
-                while (i >= 32):
-                    bsi_char = (tsbk >> i) & 0x3f
-                    if bsi_char != 0x00:
-                        bsi += chr(bsi_char + 43)
-                    i -= 6
-                ch  = (tsbk >> 16) & 0xffff
-                if bsi != "": # Save bsi only if non-null
-                    self.callsign = bsi
-                    if self.debug >= 10:
-                        sys.stderr.write('%s [%d] tsbk(0x0b) mot_bsi_grant: bsi: %s ch: %x(%s)\n' % (log_ts.get(), m_rxid, bsi, ch, self.channel_id_to_string(ch)))
-        elif opcode == 0x16:   # sndcp data ch
-            ch1  = (tsbk >> 48) & 0xffff
-            ch2  = (tsbk >> 32) & 0xffff
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tsbk(0x16) sndcp_data_ch: ch1: %x ch2: %x\n' % (log_ts.get(), m_rxid, ch1, ch2))
-        elif opcode == 0x28:   # grp_aff_rsp
-            mfrid  = (tsbk >> 80) & 0xff
-            lg     = (tsbk >> 79) & 0x01
-            gav    = (tsbk >> 72) & 0x03
-            aga    = (tsbk >> 56) & 0xffff
-            ga     = (tsbk >> 40) & 0xffff
-            ta     = (tsbk >> 16) & 0xffffff
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tsbk(0x28) grp_aff_rsp: mfid: 0x%x gav: %d aga: %d ga: %d ta: %d\n' % (log_ts.get(), m_rxid, mfrid, gav, aga, ga, ta))
-            if gav == 0:
-                self.affiliate_sgid(self.ns_wacn, self.ns_syid, ga, ga, aga, ta, self.last_tsbk)
-        elif opcode == 0x29:   # secondary cc explicit form
-            mfrid = (tsbk >> 80) & 0xff
-            rfid  = (tsbk >> 72) & 0xff
-            stid  = (tsbk >> 64) & 0xff
-            ch1   = (tsbk >> 48) & 0xffff
-            ch2   = (tsbk >> 24) & 0xffff
-            f1 = self.channel_id_to_frequency(ch1)
-            if f1:
-                self.secondary[ f1 ] = 1
-                sorted_freqs = collections.OrderedDict(sorted(self.secondary.items()))
-                self.secondary = sorted_freqs
-                add_unique_freq(self.cc_list, f1)
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tsbk(0x29) sccb_exp: rfid: %x stid: %d ch1: %x(%s) ch2: %x(%s)\n' %(log_ts.get(), m_rxid, rfid, stid, ch1, self.channel_id_to_string(ch1), ch2, self.channel_id_to_string(ch2)))
-        elif opcode == 0x2b:   # loc_reg_rsp
-            mfrid  = (tsbk >> 80) & 0xff
-            rv     = (tsbk >> 72) & 0x3
-            ga     = (tsbk >> 56) & 0xffff
-            rfid   = (tsbk >> 48) & 0xff
-            stid   = (tsbk >> 40) & 0xff
-            ta     = (tsbk >> 16) & 0xffffff
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tsbk(0x2b) loc_reg_rsp: mfid: 0x%x rv: %d ga: %d rfid: 0x%x stid: 0x%x ta: %d\n' % (log_ts.get(), m_rxid, mfrid, rv, ga, rfid, stid, ta))
-            if rv == 0:
-                self.affiliate_sgid(self.ns_wacn, self.ns_syid, ga, ga, 0, ta, self.last_tsbk)
-        elif opcode == 0x2c:   # u_reg_rsp
-            mfrid  = (tsbk >> 80) & 0xff
-            rv     = (tsbk >> 76) & 0x3
-            syid   = (tsbk >> 64) & 0xfff
-            sid    = (tsbk >> 40) & 0xffffff
-            sa     = (tsbk >> 16) & 0xffffff
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tsbk(0x2c) u_reg_rsp: mfid: 0x%x rv: %d syid: 0x%x sid: %d sa: %d\n' % (log_ts.get(), m_rxid, mfrid, rv, syid, sid, sa))
-            if rv == 0:
-                self.register_suid(self.ns_wacn, syid, sid, sa, self.last_tsbk)
-        elif opcode == 0x2f:   # u_de_reg_ack
-            mfrid  = (tsbk >> 80) & 0xff
-            wacn   = (tsbk >> 52) & 0xfffff
-            syid   = (tsbk >> 40) & 0xfff
-            sid    = (tsbk >> 16) & 0xffffff
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tsbk(0x2f) u_de_reg_ack: mfid: 0x%x wacn: 0x%x syid: 0x%x sid: %d\n' % (log_ts.get(), m_rxid, mfrid, wacn, syid, sid))
-            self.deregister_suid(wacn, syid, sid)
-        elif opcode == 0x30:
-            mfrid  = (tsbk >> 80) & 0xff
-            if mfrid == 0xA4:  # GRG_EXENC_CMD
-                grg_t   = (tsbk >> 79) & 0x1
-                grg_g   = (tsbk >> 78) & 0x1
-                grg_a   = (tsbk >> 77) & 0x1
-                grg_ssn = (tsbk >> 72) & 0x1f # TODO: SSN should be stored and checked
-                sg      = (tsbk >> 56) & 0xffff
-                keyid   = (tsbk >> 40) & 0xffff
-                rta     = (tsbk >> 16) & 0xffffff
-                if self.debug >= 10:
-                    sys.stderr.write('%s [%d] tsbk(0x30) grg_exenc_cmd: grg_t: %d grg_g: %d, grg_a: %d, grg_ssn: %d, sg: %d, keyid: %d, rta: %d\n' % (log_ts.get(), m_rxid, grg_t, grg_g, grg_a, grg_ssn, sg, keyid, rta))
-                if grg_a == 1: # Activate
-                    if grg_g == 1: # Group request
-                        algid = (rta >> 16) & 0xff
-                        ga    =  rta        & 0xffff
-                        self.add_patch(sg, [ga])
-                    else:          # Unit request (currently unhandled)
-                        pass
-                else:          # Deactivate
-                    if grg_g == 1: # Group request
-                        algid = (rta >> 16) & 0xff
-                        ga    =  rta        & 0xffff
-                        self.del_patch(sg, [sg])
-                    else:          # Unit request (currently unhandled)
-                        pass
-        elif opcode == 0x34:   # iden_up vhf uhf
-            iden = (tsbk >> 76) & 0xf
-            bwvu = (tsbk >> 72) & 0xf
-            toff0 = (tsbk >> 58) & 0x3fff
-            spac = (tsbk >> 48) & 0x3ff
-            freq = (tsbk >> 16) & 0xffffffff
-            toff_sign = (toff0 >> 13) & 1
-            toff = toff0 & 0x1fff
-            if toff_sign == 0:
-                toff = 0 - toff
-            txt = ["mob Tx-", "mob Tx+"]
-            self.freq_table[iden] = {}
-            self.freq_table[iden]['offset'] = toff * spac * 125
-            self.freq_table[iden]['step'] = spac * 125
-            self.freq_table[iden]['frequency'] = freq * 5
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tsbk(0x34) iden_up_vu: id: %d toff: %f spac: %f freq: %f [%s]\n' % (log_ts.get(), m_rxid, iden, toff * spac * 0.125 * 1e-3, spac * 0.125, freq * 0.000005, txt[toff_sign]))
-        elif opcode == 0x33:   # iden_up_tdma
-            mfrid  = (tsbk >> 80) & 0xff
-            if mfrid == 0:
-                iden = (tsbk >> 76) & 0xf
-                channel_type = (tsbk >> 72) & 0xf
-                toff0 = (tsbk >> 58) & 0x3fff
-                spac = (tsbk >> 48) & 0x3ff
-                toff_sign = (toff0 >> 13) & 1
-                toff = toff0 & 0x1fff
-                if toff_sign == 0:
-                    toff = 0 - toff
-                f1   = (tsbk >> 16) & 0xffffffff
-                slots_per_carrier = [1,1,1,2,4,2,2,2,2,2,2,2,2,2,2,2] # values above 5 are reserved and not valid
-                self.freq_table[iden] = {}
-                self.freq_table[iden]['offset'] = toff * spac * 125
-                self.freq_table[iden]['step'] = spac * 125
-                self.freq_table[iden]['frequency'] = f1 * 5
-                self.freq_table[iden]['tdma'] = slots_per_carrier[channel_type]
-                if self.debug >= 10:
-                    sys.stderr.write('%s [%d] tsbk(0x33) iden_up_tdma: id: %d freq: %f toff: %f spac: %f slots/carrier: %d\n' % (log_ts.get(), m_rxid, iden, self.freq_table[iden]['frequency']/1e6, self.freq_table[iden]['offset']/1e6, self.freq_table[iden]['step']/1e3, self.freq_table[iden]['tdma']))
-        elif opcode == 0x3d:   # iden_up
-            iden = (tsbk >> 76) & 0xf
-            bw   = (tsbk >> 67) & 0x1ff
-            toff0 = (tsbk >> 58) & 0x1ff
-            spac = (tsbk >> 48) & 0x3ff
-            freq = (tsbk >> 16) & 0xffffffff
-            toff_sign = (toff0 >> 8) & 1
-            toff = toff0 & 0xff
-            if toff_sign == 0:
-                toff = 0 - toff
-            txt = ["mob xmit < recv", "mob xmit > recv"]
-            self.freq_table[iden] = {}
-            self.freq_table[iden]['offset'] = toff * 250000
-            self.freq_table[iden]['step'] = spac * 125
-            self.freq_table[iden]['frequency'] = freq * 5
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tsbk(0x3d) iden_up id: %d toff: %f spac: %f freq: %f\n' % (log_ts.get(), m_rxid, iden, toff * 0.25, spac * 0.125, freq * 0.000005))
-        elif opcode == 0x3a:   # rfss status
-            syid = (tsbk >> 56) & 0xfff
-            rfid = (tsbk >> 48) & 0xff
-            stid = (tsbk >> 40) & 0xff
-            chan = (tsbk >> 24) & 0xffff
-            f1 = self.channel_id_to_frequency(chan)
-            if f1:
-                self.rfss_syid = syid
-                self.rfss_rfid = rfid
-                self.rfss_stid = stid
-                self.rfss_chan = f1
-                self.rfss_txchan = f1 + self.freq_table[chan >> 12]['offset']
-                add_unique_freq(self.cc_list, f1)
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tsbk(0x3a) rfss_sts_bcst: syid: %x rfid: %x stid: %d ch1: %x(%s)\n' %(log_ts.get(), m_rxid, syid, rfid, stid, chan, self.channel_id_to_string(chan)))
-        elif opcode == 0x39:   # secondary cc
-            mfrid = (tsbk >> 80) & 0xff
-            rfid  = (tsbk >> 72) & 0xff
-            stid  = (tsbk >> 64) & 0xff
-            ch1   = (tsbk >> 48) & 0xffff
-            ch2   = (tsbk >> 24) & 0xffff
-            f1 = self.channel_id_to_frequency(ch1)
-            f2 = self.channel_id_to_frequency(ch2)
-            if f1 and f2:
-                self.secondary[ f1 ] = 1
-                self.secondary[ f2 ] = 1
-                sorted_freqs = collections.OrderedDict(sorted(self.secondary.items()))
-                self.secondary = sorted_freqs
-                add_unique_freq(self.cc_list, f1)
-                add_unique_freq(self.cc_list, f2)
+        m = parse_tsbk(tsbk)
+        if m is None:
             if self.debug >= 10:
-                sys.stderr.write('%s [%d] tsbk(0x39) sccb: rfid: %x stid: %d ch1: %x(%s) ch2: %x(%s)\n' %(log_ts.get(), m_rxid, rfid, stid, ch1, self.channel_id_to_string(ch1), ch2, self.channel_id_to_string(ch2)))
-        elif opcode == 0x3b:   # network status
-            wacn = (tsbk >> 52) & 0xfffff
-            syid = (tsbk >> 40) & 0xfff
-            ch1  = (tsbk >> 24) & 0xffff
-            f1 = self.channel_id_to_frequency(ch1)
-            if f1:
-                self.ns_syid = syid
-                self.ns_wacn = wacn
-                self.ns_chan = f1
-                self.ns_valid = True
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tsbk(0x3b) net_sts_bcst: wacn: %x syid: %x ch1: %x(%s)\n' %(log_ts.get(), m_rxid, wacn, syid, ch1, self.channel_id_to_string(ch1)))
-        elif opcode == 0x3c:   # adjacent status
-            rfid = (tsbk >> 48) & 0xff
-            stid = (tsbk >> 40) & 0xff
-            ch1  = (tsbk >> 24) & 0xffff
-            table = (ch1 >> 12) & 0xf
-            f1 = self.channel_id_to_frequency(ch1)
-            if f1 and table in self.freq_table:
-                self.adjacent[f1] = 'rfid: %d stid:%d uplink:%f tbl:%d' % (rfid, stid, (f1 + self.freq_table[table]['offset']) / 1000000.0, table)
-                self.adjacent_data[f1] = {'rfid': rfid, 'stid':stid, 'uplink': f1 + self.freq_table[table]['offset'], 'table': table}
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tsbk(0x3c) adj_sts_bcst: rfid: %x stid: %d ch1: %x(%s)\n' %(log_ts.get(), m_rxid, rfid, stid, ch1, self.channel_id_to_string(ch1)))
-                if table in self.freq_table:
-                    sys.stderr.write('%s [%d] tsbk(0x3c) adj_sts_bcst: base freq: %s step: %s\n' % (log_ts.get(), m_rxid, self.freq_table[table]['frequency'] , self.freq_table[table]['step'] ))
-        else:
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tsbk(0x%02x) unhandled: 0x%024x\n' % (log_ts.get(), m_rxid, opcode, tsbk))
+                log_msg('tsbk', 10, m_rxid, 'tsbk(0x%02x) unhandled: 0x%024x', (tsbk >> 88) & 0x3f, tsbk)
+            return 0
+        return getattr(self, m.handler)(m_rxid, m)
+
+    def tsbk_grp_v_ch_grant(self, m_rxid, m):
+        updated = 0
+        f = self.channel_id_to_frequency(m.ch)
+        self.update_voice_frequency(f, tgid=m.ga, tdma_slot=self.get_tdma_slot(m.ch), srcaddr=m.sa, svcopts=m.opts)
+        if f:
+            updated += 1
+        if self.debug >= 10:
+            log_msg('tsbk', 10, m_rxid, 'tsbk(0x00) grp_v_ch_grant: opts: 0x%02x freq: %s ga: %d sa: %d', m.opts, self.channel_id_to_string(m.ch), m.ga, m.sa)
         return updated
 
+    def tsbk_mot_grg_add_cmd(self, m_rxid, m):
+        if self.debug >= 10:
+            log_msg('tsbk', 10, m_rxid, 'tsbk(0x00) mfid90_grg_add_cmd: sg: %d ga1: %d ga2: %d ga3: %d', m.sg, m.ga1, m.ga2, m.ga3)
+        self.add_patch(m.sg, [m.ga1, m.ga2, m.ga3])
+        return 0
+
+    def tsbk_mot_grg_del_cmd(self, m_rxid, m):
+        if self.debug >= 10:
+            log_msg('tsbk', 10, m_rxid, 'tsbk(0x01) mfid90_grg_del_cmd: sg: %d ga1: %d ga2: %d ga3: %d', m.sg, m.ga1, m.ga2, m.ga3)
+        self.del_patch(m.sg, [m.ga1, m.ga2, m.ga3])
+        return 0
+
+    def tsbk_mot_grg_ch_grant(self, m_rxid, m):
+        updated = 0
+        f = self.channel_id_to_frequency(m.ch)
+        self.update_voice_frequency(f, tgid=m.sg, tdma_slot=self.get_tdma_slot(m.ch), srcaddr=m.sa)
+        if f:
+            updated += 1
+        if self.debug >= 10:
+            log_msg('tsbk', 10, m_rxid, 'tsbk(0x02) mfid90_grg_ch_grant: freq: %s sg: %d sa: %d', self.channel_id_to_string(m.ch), m.sg, m.sa)
+        return updated
+
+    def tsbk_grp_v_ch_grant_up(self, m_rxid, m):
+        updated = 0
+        f1 = self.channel_id_to_frequency(m.ch1)
+        f2 = self.channel_id_to_frequency(m.ch2)
+        self.update_voice_frequency(f1, tgid=m.ga1, tdma_slot=self.get_tdma_slot(m.ch1))
+        if f1 != f2:
+            self.update_voice_frequency(f2, tgid=m.ga2, tdma_slot=self.get_tdma_slot(m.ch2))
+        if f1:
+            updated += 1
+        if f2:
+            updated += 1
+        if self.debug >= 10:
+            log_msg('tsbk', 10, m_rxid, 'tsbk(0x02) grp_v_ch_grant_up: ch1: %s ga1: %d ch2: %s ga2: %d', self.channel_id_to_string(m.ch1), m.ga1, self.channel_id_to_string(m.ch2), m.ga2)
+        return updated
+
+    def tsbk_mot_grg_ch_grant_up(self, m_rxid, m):
+        updated = 0
+        f1 = self.channel_id_to_frequency(m.ch1)
+        f2 = self.channel_id_to_frequency(m.ch2)
+        self.update_voice_frequency(f1, tgid=m.sg1, tdma_slot=self.get_tdma_slot(m.ch1))
+        if f1 != f2:
+            self.update_voice_frequency(f2, tgid=m.sg2, tdma_slot=self.get_tdma_slot(m.ch2))
+        if f1:
+            updated += 1
+        if f2:
+            updated += 1
+        if self.debug >= 10:
+            log_msg('tsbk', 10, m_rxid, 'tsbk(0x03) mfid90_grg_ch_grant_up: freq1: %s sg1: %d freq2: %s sg2:%d', self.channel_id_to_string(m.ch1), m.sg1, self.channel_id_to_string(m.ch2), m.sg2)
+        return updated
+
+    def tsbk_grp_v_ch_grant_up_exp(self, m_rxid, m): # TIA.102-AABC-B-2005 page 56
+        updated = 0
+        f = self.channel_id_to_frequency(m.ch1)
+        self.update_voice_frequency(f, tgid=m.ga, tdma_slot=self.get_tdma_slot(m.ch1), svcopts=m.opts)
+        if f:
+            updated += 1
+        if self.debug >= 10:
+            log_msg('tsbk', 10, m_rxid, 'tsbk(0x03) grp_v_ch_grant_up_exp: opts: 0x%02x freq-t: %s freq-r: %s ga: %d', m.opts, self.channel_id_to_string(m.ch1), self.channel_id_to_string(m.ch2), m.ga)
+        return updated
+
+    def tsbk_mot_bsi_grant(self, m_rxid, m):
+        bsi = ""
+        i = 42
+        while (i >= 0):
+            bsi_char = (m.bsi >> i) & 0x3f
+            if bsi_char != 0x00:
+                bsi += chr(bsi_char + 43)
+            i -= 6
+        if bsi != "": # Save bsi only if non-null
+            self.callsign = bsi
+            if self.debug >= 10:
+                log_msg('tsbk', 10, m_rxid, 'tsbk(0x0b) mot_bsi_grant: bsi: %s ch: %x(%s)', bsi, m.ch, self.channel_id_to_string(m.ch))
+        return 0
+
+    def tsbk_sndcp_data_ch(self, m_rxid, m):
+        if self.debug >= 10:
+            log_msg('tsbk', 10, m_rxid, 'tsbk(0x16) sndcp_data_ch: ch1: %x ch2: %x', m.ch1, m.ch2)
+        return 0
+
+    def tsbk_grp_aff_rsp(self, m_rxid, m):
+        if self.debug >= 10:
+            log_msg('tsbk', 10, m_rxid, 'tsbk(0x28) grp_aff_rsp: mfid: 0x%x gav: %d aga: %d ga: %d ta: %d', m.mfid, m.gav, m.aga, m.ga, m.ta)
+        if m.gav == 0:
+            self.affiliate_sgid(self.ns_wacn, self.ns_syid, m.ga, m.ga, m.aga, m.ta, self.last_tsbk)
+        return 0
+
+    def tsbk_sccb_exp(self, m_rxid, m):
+        f1 = self.channel_id_to_frequency(m.ch1)
+        if f1:
+            self.secondary[ f1 ] = 1
+            sorted_freqs = collections.OrderedDict(sorted(self.secondary.items()))
+            self.secondary = sorted_freqs
+            add_unique_freq(self.cc_list, f1)
+        if self.debug >= 10:
+            log_msg('tsbk', 10, m_rxid, 'tsbk(0x29) sccb_exp: rfid: %x stid: %d ch1: %x(%s) ch2: %x(%s)', m.rfid, m.stid, m.ch1, self.channel_id_to_string(m.ch1), m.ch2, self.channel_id_to_string(m.ch2))
+        return 0
+
+    def tsbk_loc_reg_rsp(self, m_rxid, m):
+        if self.debug >= 10:
+            log_msg('tsbk', 10, m_rxid, 'tsbk(0x2b) loc_reg_rsp: mfid: 0x%x rv: %d ga: %d rfid: 0x%x stid: 0x%x ta: %d', m.mfid, m.rv, m.ga, m.rfid, m.stid, m.ta)
+        if m.rv == 0:
+            self.affiliate_sgid(self.ns_wacn, self.ns_syid, m.ga, m.ga, 0, m.ta, self.last_tsbk)
+        return 0
+
+    def tsbk_u_reg_rsp(self, m_rxid, m):
+        if self.debug >= 10:
+            log_msg('tsbk', 10, m_rxid, 'tsbk(0x2c) u_reg_rsp: mfid: 0x%x rv: %d syid: 0x%x sid: %d sa: %d', m.mfid, m.rv, m.syid, m.sid, m.sa)
+        if m.rv == 0:
+            self.register_suid(self.ns_wacn, m.syid, m.sid, m.sa, self.last_tsbk)
+        return 0
+
+    def tsbk_u_de_reg_ack(self, m_rxid, m):
+        if self.debug >= 10:
+            log_msg('tsbk', 10, m_rxid, 'tsbk(0x2f) u_de_reg_ack: mfid: 0x%x wacn: 0x%x syid: 0x%x sid: %d', m.mfid, m.wacn, m.syid, m.sid)
+        self.deregister_suid(m.wacn, m.syid, m.sid)
+        return 0
+
+    def tsbk_grg_exenc_cmd(self, m_rxid, m):  # TODO: SSN should be stored and checked
+        if self.debug >= 10:
+            log_msg('tsbk', 10, m_rxid, 'tsbk(0x30) grg_exenc_cmd: grg_t: %d grg_g: %d, grg_a: %d, grg_ssn: %d, sg: %d, keyid: %d, rta: %d', m.grg_t, m.grg_g, m.grg_a, m.grg_ssn, m.sg, m.keyid, m.rta)
+        if m.grg_a == 1: # Activate
+            if m.grg_g == 1: # Group request
+                algid = (m.rta >> 16) & 0xff
+                ga    =  m.rta        & 0xffff
+                self.add_patch(m.sg, [ga])
+            else:          # Unit request (currently unhandled)
+                pass
+        else:          # Deactivate
+            if m.grg_g == 1: # Group request
+                algid = (m.rta >> 16) & 0xff
+                ga    =  m.rta        & 0xffff
+                self.del_patch(m.sg, [m.sg])
+            else:          # Unit request (currently unhandled)
+                pass
+        return 0
+
+    def tsbk_iden_up_vu(self, m_rxid, m):
+        toff_sign = (m.toff0 >> 13) & 1
+        toff = m.toff0 & 0x1fff
+        if toff_sign == 0:
+            toff = 0 - toff
+        txt = ["mob Tx-", "mob Tx+"]
+        self.freq_table[m.iden] = {}
+        self.freq_table[m.iden]['offset'] = toff * m.spac * 125
+        self.freq_table[m.iden]['step'] = m.spac * 125
+        self.freq_table[m.iden]['frequency'] = m.freq * 5
+        if self.debug >= 10:
+            log_msg('tsbk', 10, m_rxid, 'tsbk(0x34) iden_up_vu: id: %d toff: %f spac: %f freq: %f [%s]', m.iden, toff * m.spac * 0.125 * 1e-3, m.spac * 0.125, m.freq * 0.000005, txt[toff_sign])
+        return 0
+
+    def tsbk_iden_up_tdma(self, m_rxid, m):
+        iden = m.iden
+        toff_sign = (m.toff0 >> 13) & 1
+        toff = m.toff0 & 0x1fff
+        if toff_sign == 0:
+            toff = 0 - toff
+        slots_per_carrier = [1,1,1,2,4,2,2,2,2,2,2,2,2,2,2,2] # values above 5 are reserved and not valid
+        self.freq_table[iden] = {}
+        self.freq_table[iden]['offset'] = toff * m.spac * 125
+        self.freq_table[iden]['step'] = m.spac * 125
+        self.freq_table[iden]['frequency'] = m.f1 * 5
+        self.freq_table[iden]['tdma'] = slots_per_carrier[m.channel_type]
+        if self.debug >= 10:
+            log_msg('tsbk', 10, m_rxid, 'tsbk(0x33) iden_up_tdma: id: %d freq: %f toff: %f spac: %f slots/carrier: %d', iden, self.freq_table[iden]['frequency']/1e6, self.freq_table[iden]['offset']/1e6, self.freq_table[iden]['step']/1e3, self.freq_table[iden]['tdma'])
+        return 0
+
+    def tsbk_iden_up(self, m_rxid, m):
+        toff_sign = (m.toff0 >> 8) & 1
+        toff = m.toff0 & 0xff
+        if toff_sign == 0:
+            toff = 0 - toff
+        txt = ["mob xmit < recv", "mob xmit > recv"]
+        self.freq_table[m.iden] = {}
+        self.freq_table[m.iden]['offset'] = toff * 250000
+        self.freq_table[m.iden]['step'] = m.spac * 125
+        self.freq_table[m.iden]['frequency'] = m.freq * 5
+        if self.debug >= 10:
+            log_msg('tsbk', 10, m_rxid, 'tsbk(0x3d) iden_up id: %d toff: %f spac: %f freq: %f', m.iden, toff * 0.25, m.spac * 0.125, m.freq * 0.000005)
+        return 0
+
+    def tsbk_rfss_sts_bcst(self, m_rxid, m):
+        f1 = self.channel_id_to_frequency(m.chan)
+        if f1:
+            self.rfss_syid = m.syid
+            self.rfss_rfid = m.rfid
+            self.rfss_stid = m.stid
+            self.rfss_chan = f1
+            self.rfss_txchan = f1 + self.freq_table[m.chan >> 12]['offset']
+            add_unique_freq(self.cc_list, f1)
+        if self.debug >= 10:
+            log_msg('tsbk', 10, m_rxid, 'tsbk(0x3a) rfss_sts_bcst: syid: %x rfid: %x stid: %d ch1: %x(%s)', m.syid, m.rfid, m.stid, m.chan, self.channel_id_to_string(m.chan))
+        return 0
+
+    def tsbk_sccb(self, m_rxid, m):
+        f1 = self.channel_id_to_frequency(m.ch1)
+        f2 = self.channel_id_to_frequency(m.ch2)
+        if f1 and f2:
+            self.secondary[ f1 ] = 1
+            self.secondary[ f2 ] = 1
+            sorted_freqs = collections.OrderedDict(sorted(self.secondary.items()))
+            self.secondary = sorted_freqs
+            add_unique_freq(self.cc_list, f1)
+            add_unique_freq(self.cc_list, f2)
+        if self.debug >= 10:
+            log_msg('tsbk', 10, m_rxid, 'tsbk(0x39) sccb: rfid: %x stid: %d ch1: %x(%s) ch2: %x(%s)', m.rfid, m.stid, m.ch1, self.channel_id_to_string(m.ch1), m.ch2, self.channel_id_to_string(m.ch2))
+        return 0
+
+    def tsbk_net_sts_bcst(self, m_rxid, m):
+        f1 = self.channel_id_to_frequency(m.ch1)
+        if f1:
+            self.ns_syid = m.syid
+            self.ns_wacn = m.wacn
+            self.ns_chan = f1
+            self.ns_valid = True
+        if self.debug >= 10:
+            log_msg('tsbk', 10, m_rxid, 'tsbk(0x3b) net_sts_bcst: wacn: %x syid: %x ch1: %x(%s)', m.wacn, m.syid, m.ch1, self.channel_id_to_string(m.ch1))
+        return 0
+
+    def tsbk_adj_sts_bcst(self, m_rxid, m):
+        table = (m.ch1 >> 12) & 0xf
+        f1 = self.channel_id_to_frequency(m.ch1)
+        if f1 and table in self.freq_table:
+            self.adjacent[f1] = 'rfid: %d stid:%d uplink:%f tbl:%d' % (m.rfid, m.stid, (f1 + self.freq_table[table]['offset']) / 1000000.0, table)
+            self.adjacent_data[f1] = {'rfid': m.rfid, 'stid':m.stid, 'uplink': f1 + self.freq_table[table]['offset'], 'table': table}
+        if self.debug >= 10:
+            log_msg('tsbk', 10, m_rxid, 'tsbk(0x3c) adj_sts_bcst: rfid: %x stid: %d ch1: %x(%s)', m.rfid, m.stid, m.ch1, self.channel_id_to_string(m.ch1))
+            if table in self.freq_table:
+                log_msg('tsbk', 10, m_rxid, 'tsbk(0x3c) adj_sts_bcst: base freq: %s step: %s', self.freq_table[table]['frequency'] , self.freq_table[table]['step'])
+        return 0
+
     def decode_tdma_ptt(self, m_rxid, msg, curr_time):
         self.last_tsbk = time.time()
         self.stats['tsbk_count'] += 1
-        mi    = get_ordinals(msg[0:9])
-        algid = get_ordinals(msg[9:10])
-        keyid = get_ordinals(msg[10:12])
-        sa    = get_ordinals(msg[12:15])
-        ga    = get_ordinals(msg[15:17])
+        mi, algid, keyid, sa, ga = MAC_PTT_FIELDS.unpack(msg)
         if self.debug >= 10:
-            sys.stderr.write('%s [%d] mac_ptt: mi: %018x algid: %02x keyid:%04x ga: %d sa: %d\n' % (log_ts.get(), m_rxid, mi, algid, keyid, ga, sa))
+            log_msg('tdma', 10, m_rxid, 'mac_ptt: mi: %018x algid: %02x keyid:%04x ga: %d sa: %d', mi, algid, keyid, ga, sa)
         return self.update_talkgroup_srcaddr(curr_time, ga, sa)
 
     def decode_tdma_endptt(self, m_rxid, msg, curr_time):
         self.last_tsbk = time.time()
         self.stats['tsbk_count'] += 1
-        mi    = get_ordinals(msg[0:9])
-        sa    = get_ordinals(msg[12:15])
-        ga    = get_ordinals(msg[15:17])
+        mi, algid, keyid, sa, ga = MAC_PTT_FIELDS.unpack(msg)
         if self.debug >= 10:
-            sys.stderr.write('%s [%d] mac_end_ptt: ga: %d sa: %d\n' % (log_ts.get(), m_rxid, ga, sa))
+            log_msg('tdma', 10, m_rxid, 'mac_end_ptt: ga: %d sa: %d', ga, sa)
         return self.update_talkgroup_srcaddr(curr_time, ga, sa)
 
     def decode_tdma_msg(self, m_rxid, msg, curr_time):
-        updated = 0
         self.cc_timeouts = 0
         self.last_tsbk = time.time()
         self.stats['tsbk_count'] += 1
-        mfid = 0
-        op = get_ordinals(msg[:1])
-        b1b2 = (op >> 6) & 0x3
-        if b1b2 == 2:    # Manufacturer-specific opcode has MFID in second octet
-            mfid = get_ordinals(msg[1:2])
+        m = parse_tdma(msg)
+        if m is None:
+            #if self.debug >= 10:
+            if self.debug >= 1:
+                op = int.from_bytes(msg[:1], 'big')
+                mfid = int.from_bytes(msg[1:2], 'big') if (op >> 6) & 0x3 == 2 else 0
+                log_msg('tdma', 1, m_rxid, 'tdma(0x%02x) unhandled: mfid: 0x%x msg_data: 0x%x', op, mfid, int.from_bytes(msg, 'big'))
+            return 0
+        return getattr(self, m.handler)(m_rxid, m, curr_time)
 
-        # Opcode specific handlers
-        if op == 0x01:   # Group Voice Channel User Abbreviated
-            opts = get_ordinals(msg[1:2])
-            ga   = get_ordinals(msg[2:4])
-            sa   = get_ordinals(msg[4:7])
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tdma(0x01) grp_v_ch_usr: opts: 0x%02x ga: %d sa: %d\n' % (log_ts.get(), m_rxid, opts, ga, sa))
-            updated += self.update_talkgroup_srcaddr(curr_time, ga, sa, svcopts=opts)
-        elif op == 0x05 and mfid == 0x90: # Group Voice Channel Grant Update Multiple - Implicit
-            opt1 = get_ordinals(msg[1:2])
-            ch1  = get_ordinals(msg[2:4])
-            ga1  = get_ordinals(msg[4:6])
-            opt2 = get_ordinals(msg[6:7])
-            ch2  = get_ordinals(msg[7:9])
-            ga2  = get_ordinals(msg[9:11])
-            opt3 = get_ordinals(msg[11:12])
-            ch3  = get_ordinals(msg[12:14])
-            ga3  = get_ordinals(msg[14:16])
-            f1 = self.channel_id_to_frequency(ch1)
-            f2 = self.channel_id_to_frequency(ch2)
-            f3 = self.channel_id_to_frequency(ch3)
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tdma(0x05) grp_v_ch_grant_up: opt1: 0x%02x f1: %s ga1: %d opt2: 0x%02x f2: %s ga2: %d opt3: 0x%02x f3: %s ga3: %d\n' % (log_ts.get(), m_rxid, opt1, self.channel_id_to_string(ch1), ga1, opt2, self.channel_id_to_string(ch2), ga2, opt3, self.channel_id_to_string(ch3), ga3))
-            self.update_voice_frequency(f1, tgid=ga1, tdma_slot=self.get_tdma_slot(ch1), svcopts=opt1)
-            self.update_voice_frequency(f2, tgid=ga2, tdma_slot=self.get_tdma_slot(ch2), svcopts=opt2)
-            self.update_voice_frequency(f3, tgid=ga3, tdma_slot=self.get_tdma_slot(ch3), svcopts=opt3)
-            if f1 or f2 or f3:
-                updated += 1
-        elif op == 0x05 and mfid == 0x90: # MFID90 MAC_MOT_BSI
-            bsi = ""
-            i = 48
-            char_ord = get_ordinals(msg[3:9])
-            bsi = ""
-            i = 42
-            while (i >= 0):
-                bsi_char = (char_ord >> i) & 0x3f
-                if bsi_char != 0x00:
-                    bsi += chr(bsi_char + 43)
-                i -= 6
-            if self.debug >= 10 and bsi != "": # suppress NULL BSI
-                sys.stderr.write('%s [%d] tdma(0x05) mac_mot_bsi: bsi: %s\n' % (log_ts.get(), m_rxid, bsi))
-        elif op == 0x21: # Group Voice Channel User - Extended
-            opts = get_ordinals(msg[1:2])
-            ga   = get_ordinals(msg[2:4])
-            sa   = get_ordinals(msg[4:7])
-            suid = get_ordinals(msg[7:14])
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tdma(0x21) grp_v_ch_usr: opts: 0x%02x ga: %d sa: %d: suid: %d\n' % (log_ts.get(), m_rxid, opts, ga, sa, suid))
-            updated += self.update_talkgroup_srcaddr(curr_time, ga, sa, svcopts=opts)
-        elif op == 0x25: # Group Voice Channel Grant Update Multiple - Explicit
-            opt1 = get_ordinals(msg[1:2])
-            ch1t = get_ordinals(msg[2:4])
-            ch1r = get_ordinals(msg[4:6])
-            ga1  = get_ordinals(msg[6:8])
-            opt2 = get_ordinals(msg[8:9])
-            ch2t = get_ordinals(msg[9:11])
-            ch2r = get_ordinals(msg[11:13])
-            ga2  = get_ordinals(msg[13:15])
-            f1   = self.channel_id_to_frequency(ch1t)
-            f2   = self.channel_id_to_frequency(ch2t)
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tdma(0x25) grp_v_ch_grant_up: opt1: 0x%02x f1-t: %s f1-r: %s ga1: %d opt2: 0x%02x f2-t: %s f2-r: %s ga2: %d\n' % (log_ts.get(), m_rxid, opt1, self.channel_id_to_string(ch1t), self.channel_id_to_string(ch1r), ga1, opt2, self.channel_id_to_string(ch2t), self.channel_id_to_string(ch2r), ga2))
-            self.update_voice_frequency(f1, tgid=ga1, tdma_slot=self.get_tdma_slot(ch1t), svcopts=opt1)
-            self.update_voice_frequency(f2, tgid=ga2, tdma_slot=self.get_tdma_slot(ch2t), svcopts=opt2)
-            if f1 or f2:
-                updated += 1
-        elif op == 0x30: # Power Control Signal Quality
-            ta     = get_ordinals(msg[1:4])
-            rf_ber = get_ordinals(msg[4:5])  
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tdma(0x30) pwr_ctl_sig_qual: ta: %d rf: 0x%x: ber: 0x%x\n' % (log_ts.get(), m_rxid, ta, ((rf_ber >> 4) & 0xf), (rf_ber & 0xf)))
-        elif op == 0x31: # MAC_Release (subscriber call pre-emption)
-            uf = (get_ordinals(msg[1:2]) >> 7) & 0x1
-            ca = (get_ordinals(msg[1:2]) >> 6) & 0x1
-            sa = get_ordinals(msg[2:5])
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tdma(0x31) MAC_Release: uf: %d ca: %d sa: %d\n' % (log_ts.get(), m_rxid, uf, ca, sa))
-        elif op == 0x40: # Group Voice Grant Implicit
-            opts = get_ordinals(msg[1:2])
-            ch   = get_ordinals(msg[2:4])
-            ga   = get_ordinals(msg[4:6])
-            sa   = get_ordinals(msg[6:9])
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tdma(0x40) grp_v_ch_grant: opts: 0x%02x ch: %s ga: %d sa: %d\n' % (log_ts.get(), m_rxid, opts, self.channel_id_to_string(ch), ga, sa))
-            f = self.channel_id_to_frequency(ch)
-            self.update_voice_frequency(f, tgid=ga, tdma_slot=self.get_tdma_slot(ch), srcaddr=sa, svcopts=opts)
-            if f:
-                updated += 1
-        elif op == 0x42: # Group Voice Channel Grant Update Implicit
-            ch1  = get_ordinals(msg[1:3])
-            ga1  = get_ordinals(msg[3:5])
-            ch2  = get_ordinals(msg[5:7])
-            ga2  = get_ordinals(msg[7:9])
-            f1   = self.channel_id_to_frequency(ch1)
-            f2   = self.channel_id_to_frequency(ch2)
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tdma(0x42) grp_v_ch_grant_up: f1: %s ga1: %d f2: %s ga2: %d\n' % (log_ts.get(), m_rxid, self.channel_id_to_string(ch1), ga1, self.channel_id_to_string(ch2), ga2))
-            self.update_voice_frequency(f1, tgid=ga1, tdma_slot=self.get_tdma_slot(ch1))
-            self.update_voice_frequency(f2, tgid=ga2, tdma_slot=self.get_tdma_slot(ch2))
-            if f1 or f2:
-                updated += 1
-        elif op == 0x80 and mfid == 0x90: # MFID90 Group Regroup Voice Channel User Abbreviated
-            sg = get_ordinals(msg[3:5])
-            sa = get_ordinals(msg[5:8])
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tdma(0x80) mfid90 grp_regrp_v_ch_usr: sg: %d sa: %d\n' % (log_ts.get(), m_rxid, sg, sa))
-            updated += self.update_talkgroup_srcaddr(curr_time, sg, sa)
-        elif op == 0x81 and mfid == 0x90: # MFID90 Group Regroup Add Command
-            wg_len = (get_ordinals(msg[2:3]) & 0x3f)
-            wg_list = []
-            sg = get_ordinals(msg[3:5])
-            i = 5
-            while i < wg_len:
-                wg = get_ordinals(msg[i:i+2])
-                if wg not in wg_list:
-                    wg_list.append(wg)
-                i += 2
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tdma(0x81) mfid90 grp_regrp_add: sg: %d wg_list: %s\n' % (log_ts.get(), m_rxid, sg, wg_list))
-            self.add_patch(sg, wg_list)
-        elif op == 0x83 and mfid == 0x90: # MFID90 Group Regroup Voice Channel Update
-            sg = get_ordinals(msg[3:5])
-            ch = get_ordinals(msg[5:7])
-            f = self.channel_id_to_frequency(ch)
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tdma(0x83) grp_regrp_v_ch_up freq: %s sg: %d\n' %(log_ts.get(), m_rxid, self.channel_id_to_string(ch), sg))
-            self.update_voice_frequency(f, tgid=sg, tdma_slot=self.get_tdma_slot(ch))
-            if f:
-                updated += 1
-        elif op == 0x89 and mfid == 0x90: # MFID90 Group Regroup Delete Command
-            wg_len = (get_ordinals(msg[2:3]) & 0x3f)
-            wg_list = []
-            sg = get_ordinals(msg[3:5])
-            i = 5
-            while i < wg_len:
-                wg = get_ordinals(msg[i:i+2])
-                if wg not in wg_list:
-                    wg_list.append(wg)
+    def tdma_grp_v_ch_usr_abbr(self, m_rxid, m, curr_time):
+        if self.debug >= 10:
+            log_msg('tdma', 10, m_rxid, 'tdma(0x01) grp_v_ch_usr: opts: 0x%02x ga: %d sa: %d', m.opts, m.ga, m.sa)
+        return self.update_talkgroup_srcaddr(curr_time, m.ga, m.sa, svcopts=m.opts)
+
+    def tdma_grp_v_ch_grant_up_mult_imp(self, m_rxid, m, curr_time):
+        f1 = self.channel_id_to_frequency(m.ch1)
+        f2 = self.channel_id_to_frequency(m.ch2)
+        f3 = self.channel_id_to_frequency(m.ch3)
+        if self.debug >= 10:
+            log_msg('tdma', 10, m_rxid, 'tdma(0x05) grp_v_ch_grant_up: opt1: 0x%02x f1: %s ga1: %d opt2: 0x%02x f2: %s ga2: %d opt3: 0x%02x f3: %s ga3: %d', m.opt1, self.channel_id_to_string(m.ch1), m.ga1, m.opt2, self.channel_id_to_string(m.ch2), m.ga2, m.opt3, self.channel_id_to_string(m.ch3), m.ga3)
+        self.update_voice_frequency(f1, tgid=m.ga1, tdma_slot=self.get_tdma_slot(m.ch1), svcopts=m.opt1)
+        self.update_voice_frequency(f2, tgid=m.ga2, tdma_slot=self.get_tdma_slot(m.ch2), svcopts=m.opt2)
+        self.update_voice_frequency(f3, tgid=m.ga3, tdma_slot=self.get_tdma_slot(m.ch3), svcopts=m.opt3)
+        return 1 if (f1 or f2 or f3) else 0
+
+    def tdma_grp_v_ch_usr_ext(self, m_rxid, m, curr_time):
+        if self.debug >= 10:
+            log_msg('tdma', 10, m_rxid, 'tdma(0x21) grp_v_ch_usr: opts: 0x%02x ga: %d sa: %d: suid: %d', m.opts, m.ga, m.sa, m.suid)
+        return self.update_talkgroup_srcaddr(curr_time, m.ga, m.sa, svcopts=m.opts)
+
+    def tdma_grp_v_ch_grant_up_mult_exp(self, m_rxid, m, curr_time):
+        f1 = self.channel_id_to_frequency(m.ch1t)
+        f2 = self.channel_id_to_frequency(m.ch2t)
+        if self.debug >= 10:
+            log_msg('tdma', 10, m_rxid, 'tdma(0x25) grp_v_ch_grant_up: opt1: 0x%02x f1-t: %s f1-r: %s ga1: %d opt2: 0x%02x f2-t: %s f2-r: %s ga2: %d', m.opt1, self.channel_id_to_string(m.ch1t), self.channel_id_to_string(m.ch1r), m.ga1, m.opt2, self.channel_id_to_string(m.ch2t), self.channel_id_to_string(m.ch2r), m.ga2)
+        self.update_voice_frequency(f1, tgid=m.ga1, tdma_slot=self.get_tdma_slot(m.ch1t), svcopts=m.opt1)
+        self.update_voice_frequency(f2, tgid=m.ga2, tdma_slot=self.get_tdma_slot(m.ch2t), svcopts=m.opt2)
+        return 1 if (f1 or f2) else 0
+
+    def tdma_pwr_ctl_sig_qual(self, m_rxid, m, curr_time):
+        if self.debug >= 10:
+            log_msg('tdma', 10, m_rxid, 'tdma(0x30) pwr_ctl_sig_qual: ta: %d rf: 0x%x: ber: 0x%x', m.ta, m.rf, m.ber)
+        return 0
+
+    def tdma_mac_release(self, m_rxid, m, curr_time):   # subscriber call pre-emption
+        if self.debug >= 10:
+            log_msg('tdma', 10, m_rxid, 'tdma(0x31) MAC_Release: uf: %d ca: %d sa: %d', m.uf, m.ca, m.sa)
+        return 0
+
+    def tdma_grp_v_ch_grant_imp(self, m_rxid, m, curr_time):
+        if self.debug >= 10:
+            log_msg('tdma', 10, m_rxid, 'tdma(0x40) grp_v_ch_grant: opts: 0x%02x ch: %s ga: %d sa: %d', m.opts, self.channel_id_to_string(m.ch), m.ga, m.sa)
+        f = self.channel_id_to_frequency(m.ch)
+        self.update_voice_frequency(f, tgid=m.ga, tdma_slot=self.get_tdma_slot(m.ch), srcaddr=m.sa, svcopts=m.opts)
+        return 1 if f else 0
+
+    def tdma_grp_v_ch_grant_up_imp(self, m_rxid, m, curr_time):
+        f1 = self.channel_id_to_frequency(m.ch1)
+        f2 = self.channel_id_to_frequency(m.ch2)
+        if self.debug >= 10:
+            log_msg('tdma', 10, m_rxid, 'tdma(0x42) grp_v_ch_grant_up: f1: %s ga1: %d f2: %s ga2: %d', self.channel_id_to_string(m.ch1), m.ga1, self.channel_id_to_string(m.ch2), m.ga2)
+        self.update_voice_frequency(f1, tgid=m.ga1, tdma_slot=self.get_tdma_slot(m.ch1))
+        self.update_voice_frequency(f2, tgid=m.ga2, tdma_slot=self.get_tdma_slot(m.ch2))
+        return 1 if (f1 or f2) else 0
+
+    def tdma_mot_grg_v_ch_usr_abbr(self, m_rxid, m, curr_time):
+        if self.debug >= 10:
+            log_msg('tdma', 10, m_rxid, 'tdma(0x80) mfid90 grp_regrp_v_ch_usr: sg: %d sa: %d', m.sg, m.sa)
+        return self.update_talkgroup_srcaddr(curr_time, m.sg, m.sa)
+
+    def get_tdma_wg_list(self, m):  # working group list following the supergroup; variable length so read from message octets
+        wg_list = []
+        i = 5
+        while i < m.wg_len:
+            wg = int.from_bytes(m.data[i:i+2], 'big')
+            if wg not in wg_list:
+                wg_list.append(wg)
+            i += 2
+        return wg_list
+
+    def tdma_mot_grg_add_cmd(self, m_rxid, m, curr_time):
+        wg_list = self.get_tdma_wg_list(m)
+        if self.debug >= 10:
+            log_msg('tdma', 10, m_rxid, 'tdma(0x81) mfid90 grp_regrp_add: sg: %d wg_list: %s', m.sg, wg_list)
+        self.add_patch(m.sg, wg_list)
+        return 0
+
+    def tdma_mot_grg_v_ch_up(self, m_rxid, m, curr_time):
+        f = self.channel_id_to_frequency(m.ch)
+        if self.debug >= 10:
+            log_msg('tdma', 10, m_rxid, 'tdma(0x83) grp_regrp_v_ch_up freq: %s sg: %d', self.channel_id_to_string(m.ch), m.sg)
+        self.update_voice_frequency(f, tgid=m.sg, tdma_slot=self.get_tdma_slot(m.ch))
+        return 1 if f else 0
+
+    def tdma_mot_grg_del_cmd(self, m_rxid, m, curr_time):
+        wg_list = self.get_tdma_wg_list(m)
+        if self.debug >= 10:
+            log_msg('tdma', 10, m_rxid, 'tdma(0x89) mfid90 grp_regrp_del: sg: %d wg_list: %s', m.sg, wg_list)
+        self.del_patch(m.sg, wg_list)
+        return 0
+
+    def tdma_mot_talker_alias_hdr(self, m_rxid, m, curr_time):
+        msg = m.data
+        if self.debug >= 1:
+            log_msg('tdma', 1, m_rxid, 'tdma(0x%02x) mfid90 talker_alias_header: sn: %x, bn: %d ta_len %d msg_data: 0x%x', m.opcode, m.sn, m.bn, m.ta_len, int.from_bytes(msg, 'big'))
+        if m.bn == 0:
+            alias_hdr = int.from_bytes(msg[0:2] + msg[3:7] + bytes((0x00, 0x00)) + msg[8:17], 'big')  # convert header from TDMA to FDMA (LCW) format
+            self.rx_ctl.receivers[m_rxid]['rx_rcvr'].rx_mot_talker_alias_header(m.sn, m.bn, m.ta_len, alias_hdr)
+        return 0
+
+    def tdma_mot_talker_alias_blk(self, m_rxid, m, curr_time):
+        msg = m.data
+        if self.debug >= 1:
+            log_msg('tdma', 1, m_rxid, 'tdma(0x%02x) mfid90 talker_alias_block: sn: %x, bn: %d msg_data: 0x%x', m.opcode, m.sn, m.bn, int.from_bytes(msg, 'big'))
+        if m.bn > 0:
+            alias_block = int.from_bytes(msg[4:17], 'big') & 0x0fffffffffffffffffffffffff
+            self.rx_ctl.receivers[m_rxid]['rx_rcvr'].rx_mot_talker_alias_block(m.sn, m.bn, 100, alias_block)
+        return 0
+
+    def tdma_mot_grg_v_ch_usr_ext(self, m_rxid, m, curr_time):
+        if self.debug >= 10:
+            log_msg('tdma', 10, m_rxid, 'tdma(0xa0) mfid90 grp_regrp_v_ch_usr: sg: %d sa: %d, ssuid: %d', m.sg, m.sa, m.ssuid)
+        return self.update_talkgroup_srcaddr(curr_time, m.sg, m.sa)
+
+    def tdma_mot_grg_ch_grant_imp(self, m_rxid, m, curr_time):
+        f = self.channel_id_to_frequency(m.ch)
+        if self.debug >= 10:
+            log_msg('tdma', 10, m_rxid, 'tdma(0xa3) grp_regrp_v_ch_grant freq: %s sg: %d sa: %d', self.channel_id_to_string(m.ch), m.sg, m.sa)
+        self.update_voice_frequency(f, tgid=m.sg, tdma_slot=self.get_tdma_slot(m.ch), srcaddr=m.sa)
+        return 1 if f else 0
+
+    def tdma_mot_grg_ch_grant_exp(self, m_rxid, m, curr_time):
+        f = self.channel_id_to_frequency(m.ch1)
+        if self.debug >= 10:
+            log_msg('tdma', 10, m_rxid, 'tdma(0xa4) grp_regrp_v_ch_grant freq-t: %s freq-r: %s sg: %d sa: %d', self.channel_id_to_string(m.ch1), self.channel_id_to_string(m.ch2), m.sg, m.sa)
+        self.update_voice_frequency(f, tgid=m.sg, tdma_slot=self.get_tdma_slot(m.ch1), srcaddr=m.sa)
+        return 1 if f else 0
+
+    def tdma_mot_grg_ch_up(self, m_rxid, m, curr_time):
+        f1 = self.channel_id_to_frequency(m.ch1)
+        f2 = self.channel_id_to_frequency(m.ch2)
+        if self.debug >= 10:
+            log_msg('tdma', 10, m_rxid, 'tdma(0xa5) grp_regrp_ch_up f1: %s sg1: %d f2: %s sg2: %d', self.channel_id_to_string(m.ch1), m.sg1, self.channel_id_to_string(m.ch2), m.sg2)
+        self.update_voice_frequency(f1, tgid=m.sg1, tdma_slot=self.get_tdma_slot(m.ch1))
+        self.update_voice_frequency(f2, tgid=m.sg2, tdma_slot=self.get_tdma_slot(m.ch2))
+        return 1 if (f1 or f2) else 0
+
+    def tdma_grg_exenc_cmd(self, m_rxid, m, curr_time):
+        if (m.grg_opt & 0x2): # Group Address
+            wglst = []
+            i = 9
+            while i <= m.grg_len:
+                wg = int.from_bytes(m.data[i:i+2], 'big')
+                if wg:
+                    wglst.append(wg)
                 i += 2
             if self.debug >= 10:
-                sys.stderr.write('%s [%d] tdma(0x89) mfid90 grp_regrp_del: sg: %d wg_list: %s\n' % (log_ts.get(), m_rxid, sg, wg_list))
-            self.del_patch(sg, wg_list)
-        elif op == 0x91 and mfid == 0x90: # MFID90 Talker Alias Header
-            ta_len =  get_ordinals(msg[5:6])
-            bn     =  get_ordinals(msg[7:8])
-            sn     = (get_ordinals(msg[8:9]) >> 4) & 0xf
-            if self.debug >= 1:
-                m_data = get_ordinals(msg)
-                sys.stderr.write('%s [%d] tdma(0x%02x) mfid90 talker_alias_header: sn: %x, bn: %d ta_len %d msg_data: 0x%x\n' % (log_ts.get(), m_rxid, op, sn, bn, ta_len, m_data))
-            if bn == 0:
-                alias_hdr = get_ordinals(msg[0:2] + msg[3:7] + bytes((0x00, 0x00)) + msg[8:17])  # convert header from TDMA to FDMA (LCW) format
-                self.rx_ctl.receivers[m_rxid]['rx_rcvr'].rx_mot_talker_alias_header(sn, bn, ta_len, alias_hdr)
-        elif op == 0x95 and mfid == 0x90: # MFID90 Talker Alias Block
-            bn     =  get_ordinals(msg[3:4])
-            sn     = (get_ordinals(msg[4:5]) >> 4) & 0xf
-            if self.debug >= 1:
-                m_data = get_ordinals(msg)
-                sys.stderr.write('%s [%d] tdma(0x%02x) mfid90 talker_alias_block: sn: %x, bn: %d msg_data: 0x%x\n' % (log_ts.get(), m_rxid, op, sn, bn, m_data))
-            if bn > 0:
-                alias_block = get_ordinals(msg[4:17]) & 0x0fffffffffffffffffffffffff
-                self.rx_ctl.receivers[m_rxid]['rx_rcvr'].rx_mot_talker_alias_block(sn, bn, 100, alias_block)
-        elif op == 0xa0 and mfid == 0x90: # MFID90 Group Regroup Voice Channel User Extended
-            sg    = get_ordinals(msg[4:6])
-            sa    = get_ordinals(msg[6:9])
-            ssuid = get_ordinals(msg[9:16])
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tdma(0xa0) mfid90 grp_regrp_v_ch_usr: sg: %d sa: %d, ssuid: %d\n' % (log_ts.get(), m_rxid, sg, sa, ssuid))
-            updated += self.update_talkgroup_srcaddr(curr_time, sg, sa)
-        elif op == 0xa3 and mfid == 0x90: # MFID90 Group Regroup Channel Grant Implicit
-            ch = get_ordinals(msg[4:6])
-            sg = get_ordinals(msg[6:8])
-            sa = get_ordinals(msg[8:11])
-            f = self.channel_id_to_frequency(ch)
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tdma(0xa3) grp_regrp_v_ch_grant freq: %s sg: %d sa: %d\n' %(log_ts.get(), m_rxid, self.channel_id_to_string(ch), sg, sa))
-            self.update_voice_frequency(f, tgid=sg, tdma_slot=self.get_tdma_slot(ch), srcaddr=sa)
-            if f:
-                updated += 1
-        elif op == 0xa4 and mfid == 0x90: # MFID90 Group Regroup Channel Grant Explicit
-            ch1 = get_ordinals(msg[4:6])
-            ch2 = get_ordinals(msg[6:8])
-            sg = get_ordinals(msg[8:10])
-            sa = get_ordinals(msg[10:13])
-            f = self.channel_id_to_frequency(ch1)
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tdma(0xa4) grp_regrp_v_ch_grant freq-t: %s freq-r: %s sg: %d sa: %d\n' %(log_ts.get(), m_rxid, self.channel_id_to_string(ch1), self.channel_id_to_string(ch2), sg, sa))
-            self.update_voice_frequency(f, tgid=sg, tdma_slot=self.get_tdma_slot(ch1), srcaddr=sa)
-            if f:
-                updated += 1
-        elif op == 0xa5 and mfid == 0x90: # MFID90 Group Regroup Channel Update
-            sg1 = get_ordinals(msg[5:7])
-            sg2 = get_ordinals(msg[9:11])
-            ch1 = get_ordinals(msg[3:5])
-            ch2 = get_ordinals(msg[7:9])
-            f1 = self.channel_id_to_frequency(ch1)
-            f2 = self.channel_id_to_frequency(ch2)
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tdma(0xa5) grp_regrp_ch_up f1: %s sg1: %d f2: %s sg2: %d\n' %(log_ts.get(), m_rxid, self.channel_id_to_string(ch1), sg1, self.channel_id_to_string(ch2), sg2))
-            self.update_voice_frequency(f1, tgid=sg1, tdma_slot=self.get_tdma_slot(ch1))
-            self.update_voice_frequency(f2, tgid=sg2, tdma_slot=self.get_tdma_slot(ch2))
-            if f1 or f2:
-                updated += 1
-        elif op == 0xb0 and mfid == 0xa4: # MFIDA4 Group Regroup Explicit Encryption Command
-            grg_len = get_ordinals(msg[2:3]) & 0x3f
-            grg_opt = (get_ordinals(msg[3:4]) >> 5) & 0x07
-            grg_ssn = get_ordinals(msg[3:4]) & 0x1f
-            if (grg_opt & 0x2): # Group Address
-                sg    = get_ordinals(msg[4:6])
-                keyid = get_ordinals(msg[6:8])
-                algid = get_ordinals(msg[8:9])
-                wglst = []
-                i = 9
-                while i <= grg_len:
-                    wg = get_ordinals(msg[i:i+2])
-                    if wg:
-                        wglst.append(wg)
-                    i += 2
-                if self.debug >= 10:
-                    sys.stderr.write('%s [%d] tdma(0xb0) grg_regrp_exenc_cmd: grg_opt: %d grg_ssn: %d sg: %d keyid: %x algid: %x wgids: %s\n' % (log_ts.get(), m_rxid, grg_opt, grg_ssn, sg, keyid, algid, wglst))
-                if (grg_opt & 0x1): # Activate
-                    self.add_patch(sg, wglst)
-                else:               # Deactivate
-                    self.del_patch(sg, wglst)
-            else:               # Individual Address (not currently supported)
-                pass
-        elif op == 0xc0: # Group Voice Channel Grant Explicit
-            opts = get_ordinals(msg[1:2])
-            ch1t = get_ordinals(msg[2:4])
-            ch1r = get_ordinals(msg[4:6])
-            ga   = get_ordinals(msg[6:8])
-            sa   = get_ordinals(msg[8:11])
-            f    = self.channel_id_to_frequency(ch1t)
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tdma(0xc0) grp_v_ch_grant: opts: 0x%02x freq-t: %s freq-r: %s ga: %d sa: %d\n' % (log_ts.get(), m_rxid, opts, self.channel_id_to_string(ch1t), self.channel_id_to_string(ch1r), ga, sa))
-            self.update_voice_frequency(f, tgid=ga, tdma_slot=self.get_tdma_slot(ch1t), srcaddr=sa, svcopts=opts)
-            if f:
-                updated += 1
-        elif op == 0xc3: # Group Voice Channel Grant Update Explicit
-            opts = get_ordinals(msg[1:2])
-            ch1t = get_ordinals(msg[2:4])
-            ch1r = get_ordinals(msg[4:6])
-            ga   = get_ordinals(msg[6:8])
-            f    = self.channel_id_to_frequency(ch1t)
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tdma(0xc3) grp_v_ch_grant_up: opts: 0x%02x freq-t: %s freq-r: %s ga: %d\n' % (log_ts.get(), m_rxid, opts, self.channel_id_to_string(ch1t), self.channel_id_to_string(ch1r), ga))
-            self.update_voice_frequency(f, tgid=ga, tdma_slot=self.get_tdma_slot(ch1t), svcopts=opts)
-            if f:
-                updated += 1
-        elif op == 0xe9: # Secondary Control Channel Broadcast Explicit
-            rfid = get_ordinals(msg[1:2])
-            stid = get_ordinals(msg[2:3])
-            ch_t = get_ordinals(msg[3:5])
-            ch_r = get_ordinals(msg[5:7])
-            f    = self.channel_id_to_frequency(ch_t)
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tdma(0xe9) sccb: rfid: %x stid: %x freq-t: %s freq-r: %s\n' % (log_ts.get(), m_rxid, rfid, stid, self.channel_id_to_string(ch_t), self.channel_id_to_string(ch_r)))
-            if f:
-                self.secondary[ f ] = 1
-                sorted_freqs = collections.OrderedDict(sorted(self.secondary.items()))
-                self.secondary = sorted_freqs
-                add_unique_freq(self.cc_list, f)
-        elif op == 0xf3: # Identifier Update for TDMA Extended
-            iden    = (get_ordinals(msg[2:3]) >> 4) & 0xf
-            ch_type =  get_ordinals(msg[2:3]) & 0xf
-            tx_off  = (get_ordinals(msg[3:5]) >> 2) & 0x3fff
-            tx_off  = (0 - tx_off) if ((tx_off >> 13) & 0x1) else tx_off
-            ch_spac =  get_ordinals(msg[4:6]) & 0x3ff
-            base_f  =  get_ordinals(msg[6:10])
-            wacn_id = (get_ordinals(msg[10:13]) >> 4) & 0xfffff
-            sys_id  =  get_ordinals(msg[13:14]) & 0xfff
-            slots_per_carrier = [1,1,1,2,4,2,2,2,2,2,2,2,2,2,2,2] # values above 5 are reserved and not valid
-            self.freq_table[iden] = {}
-            self.freq_table[iden]['offset'] = tx_off * ch_spac * 125
-            self.freq_table[iden]['step'] = ch_spac * 125
-            self.freq_table[iden]['frequency'] = base_f * 5
-            self.freq_table[iden]['tdma'] = slots_per_carrier[ch_type]
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tdma(0xf3) iden_up_tdma: id: %d base_f: %f offset: %f spacing: %d slots/carrier %d\n' % (log_ts.get(), m_rxid, iden, base_f/1e6, tx_off/1e6, ch_spac/1e3, slots_per_carrier[ch_type]))
-        elif op == 0xfa: # RFSS Status Broadcast Explicit
-            syid = get_ordinals(msg[2:4]) & 0xfff
-            rfid = get_ordinals(msg[4:5])
-            stid = get_ordinals(msg[5:6])
-            ch_t = get_ordinals(msg[6:8])
-            ch_r = get_ordinals(msg[8:10])
-            f    = self.channel_id_to_frequency(ch_t)
-            if f:
-                self.rfss_syid = syid
-                self.rfss_rfid = rfid
-                self.rfss_stid = stid
-                self.rfss_chan = f
-                self.rfss_txchan = f + self.freq_table[ch_t >> 12]['offset']
-                add_unique_freq(self.cc_list, f)
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tdma(0xfa) rfss_sts_bcst: syid: %x rfid: %x stid: %x ch %x(%s)\n' % (log_ts.get(), m_rxid, syid, rfid, stid, ch_t, self.channel_id_to_string(ch_t)))
-        elif op == 0xfb: # Network Status Broadcast Explicit
-            wacn = (get_ordinals(msg[2:5]) >> 4) & 0xfffff
-            syid =  get_ordinals(msg[4:6]) & 0xfff
-            ch_t = get_ordinals(msg[6:8])
-            ch_r = get_ordinals(msg[8:10])
-            f    = self.channel_id_to_frequency(ch_t)
-            if f:
-                self.ns_syid = syid
-                self.ns_wacn = wacn
-                self.ns_chan = f
-                self.ns_valid = True
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tdma(0xfb) net_sts_bcst: wacn: %x syid: %x ch %x(%s)\n' % (log_ts.get(), m_rxid, wacn, syid, ch_t, self.channel_id_to_string(ch_t)))
-        elif op == 0xfc: # Adjacent Status Broadcast Explicit
-            syid  = get_ordinals(msg[2:4]) & 0xfff
-            rfid  = get_ordinals(msg[4:5])
-            stid  = get_ordinals(msg[5:6])
-            ch_t  = get_ordinals(msg[6:8])
-            ch_r  = get_ordinals(msg[8:10])
-            table = (ch_t >> 12) & 0xf
-            f     = self.channel_id_to_frequency(ch_t)
-            if f and table in self.freq_table:
-                self.adjacent[f] = 'rfid: %d stid:%d uplink:%f tbl:%d' % (rfid, stid, (f + self.freq_table[table]['offset']) / 1000000.0, table)
-                self.adjacent_data[f] = {'rfid': rfid, 'stid':stid, 'uplink': f + self.freq_table[table]['offset'], 'table': table}
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tdma(0xfc) adj_sts_bcst: syid: %x rfid: %x stid: %x ch %x(%s)\n' % (log_ts.get(), m_rxid, syid, rfid, stid, ch_t, self.channel_id_to_string(ch_t)))
-                if table in self.freq_table:
-                    sys.stderr.write('%s [%d] tdma(0xfc) adj_sts_bcst: base freq: %s step: %s\n' % (log_ts.get(), m_rxid, self.freq_table[table]['frequency'] , self.freq_table[table]['step'] ))
-        elif op == 0xfe: # Adjacent Status Broadcast Extended Explicit
-            syid  = get_ordinals(msg[2:4]) & 0xfff
-            rfid  = get_ordinals(msg[4:5])
-            stid  = get_ordinals(msg[5:6])
-            ch_t  = get_ordinals(msg[6:8])
-            ch_r  = get_ordinals(msg[8:10])
-            wacn  = (get_ordinals(msg[12:15]) >> 4) & 0xfffff
-            table = (ch_t >> 12) & 0xf
-            f     = self.channel_id_to_frequency(ch_t)
-            if f and table in self.freq_table:
-                self.adjacent[f] = 'rfid: %d stid:%d uplink:%f tbl:%d' % (rfid, stid, (f + self.freq_table[table]['offset']) / 1000000.0, table)
-                self.adjacent_data[f] = {'rfid': rfid, 'stid':stid, 'uplink': f + self.freq_table[table]['offset'], 'table': table}
-            if self.debug >= 10:
-                sys.stderr.write('%s [%d] tdma(0xfe) adj_sts_bcst: wacn: %x syid: %x rfid: %x stid: %x ch %x(%s)\n' % (log_ts.get(), m_rxid, wacn, syid, rfid, stid, ch_t, self.channel_id_to_string(ch_t)))
-                if table in self.freq_table:
-                    sys.stderr.write('%s [%d] tdma(0xfe) adj_sts_bcst: base freq: %s step: %s\n' % (log_ts.get(), m_rxid, self.freq_table[table]['frequency'] , self.freq_table[table]['step'] ))
-        else:
-            #if self.debug >= 10:
-            if self.debug >= 1:
-                m_data = get_ordinals(msg)
-                sys.stderr.write('%s [%d] tdma(0x%02x) unhandled: mfid: 0x%x msg_data: 0x%x\n' % (log_ts.get(), m_rxid, op, mfid, m_data))
-        return updated
+                log_msg('tdma', 10, m_rxid, 'tdma(0xb0) grg_regrp_exenc_cmd: grg_opt: %d grg_ssn: %d sg: %d keyid: %x algid: %x wgids: %s', m.grg_opt, m.grg_ssn, m.sg, m.keyid, m.algid, wglst)
+            if (m.grg_opt & 0x1): # Activate
+                self.add_patch(m.sg, wglst)
+            else:               # Deactivate
+                self.del_patch(m.sg, wglst)
+        else:               # Individual Address (not currently supported)
+            pass
+        return 0
+
+    def tdma_grp_v_ch_grant_exp(self, m_rxid, m, curr_time):
+        f = self.channel_id_to_frequency(m.ch1t)
+        if self.debug >= 10:
+            log_msg('tdma', 10, m_rxid, 'tdma(0xc0) grp_v_ch_grant: opts: 0x%02x freq-t: %s freq-r: %s ga: %d sa: %d', m.opts, self.channel_id_to_string(m.ch1t), self.channel_id_to_string(m.ch1r), m.ga, m.sa)
+        self.update_voice_frequency(f, tgid=m.ga, tdma_slot=self.get_tdma_slot(m.ch1t), srcaddr=m.sa, svcopts=m.opts)
+        return 1 if f else 0
+
+    def tdma_grp_v_ch_grant_up_exp(self, m_rxid, m, curr_time):
+        f = self.channel_id_to_frequency(m.ch1t)
+        if self.debug >= 10:
+            log_msg('tdma', 10, m_rxid, 'tdma(0xc3) grp_v_ch_grant_up: opts: 0x%02x freq-t: %s freq-r: %s ga: %d', m.opts, self.channel_id_to_string(m.ch1t), self.channel_id_to_string(m.ch1r), m.ga)
+        self.update_voice_frequency(f, tgid=m.ga, tdma_slot=self.get_tdma_slot(m.ch1t), svcopts=m.opts)
+        return 1 if f else 0
+
+    def tdma_sccb_exp(self, m_rxid, m, curr_time):
+        f = self.channel_id_to_frequency(m.ch_t)
+        if self.debug >= 10:
+            log_msg('tdma', 10, m_rxid, 'tdma(0xe9) sccb: rfid: %x stid: %x freq-t: %s freq-r: %s', m.rfid, m.stid, self.channel_id_to_string(m.ch_t), self.channel_id_to_string(m.ch_r))
+        if f:
+            self.secondary[ f ] = 1
+            sorted_freqs = collections.OrderedDict(sorted(self.secondary.items()))
+            self.secondary = sorted_freqs
+            add_unique_freq(self.cc_list, f)
+        return 0
+
+    def tdma_iden_up_tdma(self, m_rxid, m, curr_time):
+        iden = m.iden
+        tx_off = (0 - m.tx_off) if ((m.tx_off >> 13) & 0x1) else m.tx_off
+        slots_per_carrier = [1,1,1,2,4,2,2,2,2,2,2,2,2,2,2,2] # values above 5 are reserved and not valid
+        self.freq_table[iden] = {}
+        self.freq_table[iden]['offset'] = tx_off * m.ch_spac * 125
+        self.freq_table[iden]['step'] = m.ch_spac * 125
+        self.freq_table[iden]['frequency'] = m.base_f * 5
+        self.freq_table[iden]['tdma'] = slots_per_carrier[m.ch_type]
+        if self.debug >= 10:
+            log_msg('tdma', 10, m_rxid, 'tdma(0xf3) iden_up_tdma: id: %d base_f: %f offset: %f spacing: %d slots/carrier %d', iden, m.base_f/1e6, tx_off/1e6, m.ch_spac/1e3, slots_per_carrier[m.ch_type])
+        return 0
+
+    def tdma_rfss_sts_bcst(self, m_rxid, m, curr_time):
+        f = self.channel_id_to_frequency(m.ch_t)
+        if f:
+            self.rfss_syid = m.syid
+            self.rfss_rfid = m.rfid
+            self.rfss_stid = m.stid
+            self.rfss_chan = f
+            self.rfss_txchan = f + self.freq_table[m.ch_t >> 12]['offset']
+            add_unique_freq(self.cc_list, f)
+        if self.debug >= 10:
+            log_msg('tdma', 10, m_rxid, 'tdma(0xfa) rfss_sts_bcst: syid: %x rfid: %x stid: %x ch %x(%s)', m.syid, m.rfid, m.stid, m.ch_t, self.channel_id_to_string(m.ch_t))
+        return 0
+
+    def tdma_net_sts_bcst(self, m_rxid, m, curr_time):
+        f = self.channel_id_to_frequency(m.ch_t)
+        if f:
+            self.ns_syid = m.syid
+            self.ns_wacn = m.wacn
+            self.ns_chan = f
+            self.ns_valid = True
+        if self.debug >= 10:
+            log_msg('tdma', 10, m_rxid, 'tdma(0xfb) net_sts_bcst: wacn: %x syid: %x ch %x(%s)', m.wacn, m.syid, m.ch_t, self.channel_id_to_string(m.ch_t))
+        return 0
+
+    def tdma_adj_sts_bcst(self, m_rxid, m, curr_time):
+        self.update_adjacent(m.ch_t, m.rfid, m.stid)
+        if self.debug >= 10:
+            log_msg('tdma', 10, m_rxid, 'tdma(0xfc) adj_sts_bcst: syid: %x rfid: %x stid: %x ch %x(%s)', m.syid, m.rfid, m.stid, m.ch_t, self.channel_id_to_string(m.ch_t))
+            self.log_adjacent_table(m_rxid, m.opcode, m.ch_t)
+        return 0
+
+    def tdma_adj_sts_bcst_ext(self, m_rxid, m, curr_time):
+        self.update_adjacent(m.ch_t, m.rfid, m.stid)
+        if self.debug >= 10:
+            log_msg('tdma', 10, m_rxid, 'tdma(0xfe) adj_sts_bcst: wacn: %x syid: %x rfid: %x stid: %x ch %x(%s)', m.wacn, m.syid, m.rfid, m.stid, m.ch_t, self.channel_id_to_string(m.ch_t))
+            self.log_adjacent_table(m_rxid, m.opcode, m.ch_t)
+        return 0
+
+    def update_adjacent(self, ch_t, rfid, stid):
+        table = (ch_t >> 12) & 0xf
+        f     = self.channel_id_to_frequency(ch_t)
+        if f and table in self.freq_table:
+            self.adjacent[f] = 'rfid: %d stid:%d uplink:%f tbl:%d' % (rfid, stid, (f + self.freq_table[table]['offset']) / 1000000.0, table)
+            self.adjacent_data[f] = {'rfid': rfid, 'stid':stid, 'uplink': f + self.freq_table[table]['offset'], 'table': table}
+
+    def log_adjacent_table(self, m_rxid, op, ch_t):
+        table = (ch_t >> 12) & 0xf
+        if table in self.freq_table:
+            log_msg('tdma', 10, m_rxid, 'tdma(0x%02x) adj_sts_bcst: base freq: %s step: %s', op, self.freq_table[table]['frequency'] , self.freq_table[table]['step'])
 
     def decode_fdma_lcw(self, m_rxid, msg, curr_time):
         updated = 0
@@ -1464,12 +1636,9 @@ class p25_system(object):
             return 0
 
         if pb_sf_lco   == 0x00:     # Group Voice Channel User
-            mfid = get_ordinals(msg[1:2])
-            opts = get_ordinals(msg[2:3])
-            ga = get_ordinals(msg[4:6])
-            sa = get_ordinals(msg[6:9])
+            opts, s_flag, ga, sa = LCW_GRP_V_CH_USR.unpack(msg)
             if self.debug >= 10:
-                sys.stderr.write('%s [%d] lcw(0x00) grp_v_ch_usr: opts: 0x%02x ga: %d s: %d sa: %d\n' % (log_ts.get(), m_rxid, opts, ga, (get_ordinals(msg[3:4]) & 0x1), sa))
+                log_msg('lcw', 10, m_rxid, 'lcw(0x00) grp_v_ch_usr: opts: 0x%02x ga: %d s: %d sa: %d', opts, ga, s_flag, sa)
             updated += self.update_talkgroup_srcaddr(curr_time, ga, sa, svcopts=opts)
         elif pb_sf_lco   == 0x05:
             mfid = get_ordinals(msg[1:2])
@@ -1483,45 +1652,37 @@ class p25_system(object):
                         bsi += chr(bsi_char + 43)
                     i -= 6
                 if self.debug >= 10 and bsi != "": # suppress NULL BSI
-                    sys.stderr.write('%s [%d] lcw(0x05) lc_mot_bsi: bsi: %s\n' % (log_ts.get(), m_rxid, bsi))
+                    log_msg('lcw', 10, m_rxid, 'lcw(0x05) lc_mot_bsi: bsi: %s', bsi)
         elif pb_sf_lco == 0x42:     # Group Voice Channel Update
-            ch1 = get_ordinals(msg[1:3])
-            ga1 = get_ordinals(msg[3:5])
-            ch2 = get_ordinals(msg[5:7])
-            ga2 = get_ordinals(msg[7:9])
+            ch1, ga1, ch2, ga2 = LCW_GRP_V_CH_UP.unpack(msg)
             f1 = self.channel_id_to_frequency(ch1)
             f2 = self.channel_id_to_frequency(ch2)
             if self.debug >= 10:
-                sys.stderr.write('%s [%d] lcw(0x02) grp_v_ch_up f1: %s ga1: %d f2: %s ga2: %d\n' %(log_ts.get(), m_rxid, self.channel_id_to_string(ch1), ga1, self.channel_id_to_string(ch2), ga2))
+                log_msg('lcw', 10, m_rxid, 'lcw(0x02) grp_v_ch_up f1: %s ga1: %d f2: %s ga2: %d', self.channel_id_to_string(ch1), ga1, self.channel_id_to_string(ch2), ga2)
             self.update_voice_frequency(f1, tgid=ga1, tdma_slot=self.get_tdma_slot(ch1))
             self.update_voice_frequency(f2, tgid=ga2, tdma_slot=self.get_tdma_slot(ch2))
             if f1 or f2:
                 updated += 1
         elif pb_sf_lco == 0x44:   # Group Voice Channel Update Explicit
-            opts = get_ordinals(msg[2:3])
-            ga   = get_ordinals(msg[3:5])
-            ch1t = get_ordinals(msg[5:7])
-            ch1r = get_ordinals(msg[7:9])
+            opts, ga, ch1t, ch1r = LCW_GRP_V_CH_UP_EXP.unpack(msg)
             f    = self.channel_id_to_frequency(ch1t)
             if self.debug >= 10:
-                sys.stderr.write('%s [%d] lco(0x04) grp_v_ch_up: opts: 0x%02x freq-t: %s freq-r: %s ga: %d\n' % (log_ts.get(), m_rxid, opts, self.channel_id_to_string(ch1t), self.channel_id_to_string(ch1r), ga))
+                log_msg('p25', 10, m_rxid, 'lco(0x04) grp_v_ch_up: opts: 0x%02x freq-t: %s freq-r: %s ga: %d', opts, self.channel_id_to_string(ch1t), self.channel_id_to_string(ch1r), ga)
             self.update_voice_frequency(f, tgid=ga, tdma_slot=self.get_tdma_slot(ch1t), svcopts=opts)
             if f:
                 updated += 1
         elif pb_sf_lco == 0x49:   # Source ID Extension
-            netid = (get_ordinals(msg[2:5]) >> 4) & 0x0fffff
-            syid  = get_ordinals(msg[4:6]) & 0x0fff
-            sid   = get_ordinals(msg[6:9])
+            netid, syid, sid = LCW_SOURCE_ID_EXT.unpack(msg)
             if self.debug >= 10:
-                sys.stderr.write('%s [%d] lcw(0x09) lc_source_id_ext: netid: %d, sysid: %d, sid: %d\n' % (log_ts.get(), m_rxid, netid, syid, sid))
+                log_msg('lcw', 10, m_rxid, 'lcw(0x09) lc_source_id_ext: netid: %d, sysid: %d, sid: %d', netid, syid, sid)
         elif pb_sf_lco == 0x4f:   # Call Termination/Cancellation (included with DUID15/ETDU)
             sa   = get_ordinals(msg[6:9])
             if self.debug >= 10:
-                sys.stderr.write('%s [%d] lco(0x0f) call_term_rel: sa: %d\n' % (log_ts.get(), m_rxid, sa))
+                log_msg('p25', 10, m_rxid, 'lco(0x0f) call_term_rel: sa: %d', sa)
         else:
             if self.debug >= 10:
                 lcw_data = get_ordinals(msg[1:])
-                sys.stderr.write('%s [%d] lcw(0x%02x) unhandled: pb: %d sf: %d lcw_data: %016x\n' % (log_ts.get(), m_rxid, (pb_sf_lco & 0x3f), ((pb_sf_lco >> 7) & 0x1), ((pb_sf_lco >> 6) & 0x1), lcw_data))
+                log_msg('lcw', 10, m_rxid, 'lcw(0x%02x) unhandled: pb: %d sf: %d lcw_data: %016x', (pb_sf_lco & 0x3f), ((pb_sf_lco >> 7) & 0x1), ((pb_sf_lco >> 6) & 0x1), lcw_data)
         return updated
 
     def find_voice_freq(self, tgid=None):
@@ -1546,13 +1707,15 @@ class p25_system(object):
             sorted_freqs = collections.OrderedDict(sorted(self.voice_frequencies.items()))
             self.voice_frequencies = sorted_freqs
             if self.debug >= 5:
-                sys.stderr.write('%s [%s] new freq=%f\n' % (log_ts.get(), self.sysname, frequency/1000000.0))
+                log_msg('p25', 5, self.sysname, 'new freq=%f', frequency/1000000.0)
+            if self.event_store is not None:
+                self.event_store.put(EV_NEW_FREQ, self.sysname, freq=frequency)
         if 'tgid' not in self.voice_frequencies[frequency]:
             self.voice_frequencies[frequency]['tgid'] = [None, None]
             self.voice_frequencies[frequency]['ts'] = [0.0, 0.0]
         if prev_freq is not None and not (prev_freq == frequency and prev_slot == tdma_slot):
             if self.debug >= 5:
-                sys.stderr.write("%s [%s] VF change: tgid: %s, prev_freq: %f, prev_slot: %s, new_freq: %f, new_slot: %s\n" % (log_ts.get(), self.sysname, tgid, prev_freq/1000000.0, prev_slot, frequency/1000000.0, tdma_slot))
+                log_msg('p25', 5, self.sysname, "VF change: tgid: %s, prev_freq: %f, prev_slot: %s, new_freq: %f, new_slot: %s", tgid, prev_freq/1000000.0, prev_slot, frequency/1000000.0, tdma_slot)
             if prev_slot is None:
                 self.voice_frequencies[prev_freq]['tgid'] = [None, None]
             else:
@@ -1562,13 +1725,13 @@ class p25_system(object):
         self.voice_frequencies[frequency]['counter'] += 1
         if tdma_slot is None:   # FDMA mark both slots with same info
             if self.debug >= 10:
-                sys.stderr.write("%s [%s] VF ts ph1: tgid: %s, freq: %f\n" % (log_ts.get(), self.sysname, tgid, frequency/1000000.0))
+                log_msg('p25', 10, self.sysname, "VF ts ph1: tgid: %s, freq: %f", tgid, frequency/1000000.0)
             for slot in [0, 1]:
                 self.voice_frequencies[frequency]['tgid'][slot] = tgid
                 self.voice_frequencies[frequency]['ts'][slot] = curr_time
         else:                   # TDMA mark just slot in use
             if self.debug >= 10:
-                sys.stderr.write("%s [%s] VF ts ph2: tgid: %s, freq: %f, slot: %s\n" % (log_ts.get(), self.sysname, tgid, frequency/1000000.0, tdma_slot))
+                log_msg('p25', 10, self.sysname, "VF ts ph2: tgid: %s, freq: %f, slot: %s", tgid, frequency/1000000.0, tdma_slot)
             self.voice_frequencies[frequency]['tgid'][tdma_slot] = tgid
             self.voice_frequencies[frequency]['ts'][tdma_slot] = curr_time
 
@@ -1579,9 +1742,9 @@ class p25_system(object):
         for frequency in self.voice_frequencies:
             for slot in [0, 1]:
                 tgid = self.voice_frequencies[frequency]['tgid'][slot]
-                if tgid is not None and self.talkgroups[tgid]['receiver'] is None and curr_time >= self.voice_frequencies[frequency]['ts'][slot] + FREQ_EXPIRY_TIME:
+                if tgid is not None and self.talkgroups[tgid].receiver is None and curr_time >= self.voice_frequencies[frequency]['ts'][slot] + FREQ_EXPIRY_TIME:
                     if self.debug >= 10:
-                        sys.stderr.write("%s [%s] VF expire: tgid: %s, freq: %f, slot: %s, ts: %s\n" % (log_ts.get(), self.sysname, tgid, frequency/1000000.0, slot, log_ts.get(self.voice_frequencies[frequency]['ts'][slot])))
+                        log_msg('p25', 10, self.sysname, "VF expire: tgid: %s, freq: %f, slot: %s, ts: %s", tgid, frequency/1000000.0, slot, log_ts.get(self.voice_frequencies[frequency]['ts'][slot]))
                     self.voice_frequencies[frequency]['tgid'][slot] = None
 
     def update_talkgroups(self, frequency, tgid, tdma_slot, srcaddr, svcopts):
@@ -1592,86 +1755,108 @@ class p25_system(object):
             for ptgid in patch_list:
                 self.update_talkgroup(frequency, ptgid, tdma_slot, srcaddr, svcopts)
                 if self.debug >= 5:
-                    sys.stderr.write('%s [%s] update_talkgroups: sg(%d) patched tgid(%d)\n' % (log_ts.get(), self.sysname, tgid, ptgid))
+                    log_msg('p25', 5, self.sysname, 'update_talkgroups: sg(%d) patched tgid(%d)', tgid, ptgid)
 
     def update_talkgroup(self, frequency, tgid, tdma_slot, srcaddr, svcopts):
         ui_log_update = False
         with self.talkgroups_mutex:
             if self.debug >= 5:
                 if svcopts is None:
-                    sys.stderr.write('%s [%s] set tgid=%s, srcaddr=%s, svcopts=None\n' % (log_ts.get(), self.sysname, tgid, srcaddr))
+                    log_msg('p25', 5, self.sysname, 'set tgid=%s, srcaddr=%s, svcopts=None', tgid, srcaddr)
                 else:
-                    sys.stderr.write('%s [%s] set tgid=%s, srcaddr=%s, svcopts=0x%x\n' % (log_ts.get(), self.sysname, tgid, srcaddr, svcopts))
+                    log_msg('p25', 5, self.sysname, 'set tgid=%s, srcaddr=%s, svcopts=0x%x', tgid, srcaddr, svcopts)
+            if self.event_store is not None:
+                self.event_store.put(EV_SET_TGID, self.sysname, freq=frequency, slot=tdma_slot, tgid=tgid, srcaddr=srcaddr, svcopts=svcopts)
         
             if tgid not in self.talkgroups:
                 add_default_tgid(self.talkgroups, tgid)
                 if self.debug >= 5:
-                    sys.stderr.write('%s [%s] new tgid=%s %s prio %d\n' % (log_ts.get(), self.sysname, tgid, self.talkgroups[tgid]['tag'], self.talkgroups[tgid]['prio']))
+                    log_msg('p25', 5, self.sysname, 'new tgid=%s %s prio %d', tgid, self.talkgroups[tgid].tag, self.talkgroups[tgid].prio)
+                if self.event_store is not None:
+                    self.event_store.put(EV_NEW_TGID, self.sysname, tgid=tgid, prio=self.talkgroups[tgid].prio, tag=self.talkgroups[tgid].tag)
 
-            if self.talkgroups[tgid]['receiver'] is not None and srcaddr is not None and srcaddr > 0 and srcaddr < 0xffffff and self.talkgroups[tgid]['srcaddr'] != srcaddr:
+            if self.talkgroups[tgid].receiver is not None and srcaddr is not None and srcaddr > 0 and srcaddr < 0xffffff and self.talkgroups[tgid].srcaddr != srcaddr:
                 ui_log_update = True
 
             ts = time.time()
-            self.talkgroups[tgid]['time'] = ts
-            self.talkgroups[tgid]['counter'] += 1
-            self.talkgroups[tgid]['frequency'] = frequency
-            self.talkgroups[tgid]['tdma_slot'] = tdma_slot
+            self.talkgroups[tgid].time = ts
+            self.talkgroups[tgid].counter += 1
+            self.active_tgids[tgid] = ts
+            self.talkgroups[tgid].frequency = frequency
+            self.talkgroups[tgid].tdma_slot = tdma_slot
             if svcopts is not None:
-                self.talkgroups[tgid]['svcopts'] = svcopts
+                self.talkgroups[tgid].svcopts = svcopts
+            self.index_tgid(tgid)
             if srcaddr is not None:
-                if (self.talkgroups[tgid]['receiver'] is not None):
+                if (self.talkgroups[tgid].receiver is not None):
                     if (srcaddr > 0):
-                        self.talkgroups[tgid]['srcaddr'] = srcaddr      # don't overwrite with null srcaddr for active calls
+                        self.talkgroups[tgid].srcaddr = srcaddr      # don't overwrite with null srcaddr for active calls
                 else:
-                    self.talkgroups[tgid]['srcaddr'] = srcaddr
+                    self.talkgroups[tgid].srcaddr = srcaddr
                 self.update_wuid_ts(srcaddr, tgid, ts)
 
         if ui_log_update:   # log update to UI outside of the mutex protection
             self.rx_ctl.log_call(self.ns_syid,
-                                 self.talkgroups[tgid]['receiver'].msgq_id,
-                                 self.talkgroups[tgid]['frequency'],
-                                 self.talkgroups[tgid]['tdma_slot'],
-                                 self.talkgroups[tgid]['prio'],
+                                 self.talkgroups[tgid].receiver.msgq_id,
+                                 self.talkgroups[tgid].frequency,
+                                 self.talkgroups[tgid].tdma_slot,
+                                 self.talkgroups[tgid].prio,
                                  tgid,
-                                 self.talkgroups[tgid]['tag'],
+                                 self.talkgroups[tgid].tag,
                                  srcaddr,
                                  self.get_rid_tag(srcaddr))
 
     def update_talkgroup_srcaddr(self, curr_time, tgid, srcaddr, svcopts=None):
         ui_log_update = False
         if (tgid is None or tgid <= 0 or srcaddr is None or srcaddr <= 0 or srcaddr >= 0xffffff or
-            tgid not in self.talkgroups or self.talkgroups[tgid]['receiver'] is None):
+            tgid not in self.talkgroups or self.talkgroups[tgid].receiver is None):
             return 0
 
-        if self.talkgroups[tgid]['srcaddr'] != srcaddr:
+        if self.talkgroups[tgid].srcaddr != srcaddr:
             ui_log_update = True
 
         with self.talkgroups_mutex:
             if svcopts is not None:
-                self.talkgroups[tgid]['svcopts'] = svcopts
-            self.talkgroups[tgid]['srcaddr'] = srcaddr
+                self.talkgroups[tgid].svcopts = svcopts
+                self.index_tgid(tgid)
+            self.talkgroups[tgid].srcaddr = srcaddr
             add_default_rid(self.sourceids, srcaddr)
-            self.sourceids[srcaddr]['counter'] += 1
-            self.sourceids[srcaddr]['time'] = curr_time
-            if tgid not in self.sourceids[srcaddr]['tgs']:
-                self.sourceids[srcaddr]['tgs'][tgid] = 1;
-            else:
-                self.sourceids[srcaddr]['tgs'][tgid] += 1;
+            self.sourceids[srcaddr].counter += 1
+            self.sourceids[srcaddr].time = curr_time
+            self.sourceids[srcaddr].count_tgid(tgid)
             self.sourceid_history.record(srcaddr, tgid, curr_time)
 
         if ui_log_update:   # log update to UI outside of the mutex protection
             self.rx_ctl.log_call(self.ns_syid,
-                                 self.talkgroups[tgid]['receiver'].msgq_id,
-                                 self.talkgroups[tgid]['frequency'],
-                                 self.talkgroups[tgid]['tdma_slot'],
-                                 self.talkgroups[tgid]['prio'],
+                                 self.talkgroups[tgid].receiver.msgq_id,
+                                 self.talkgroups[tgid].frequency,
+                                 self.talkgroups[tgid].tdma_slot,
+                                 self.talkgroups[tgid].prio,
                                  tgid,
-                                 self.talkgroups[tgid]['tag'],
+                                 self.talkgroups[tgid].tag,
                                  srcaddr,
                                  self.get_rid_tag(srcaddr))
 
         return 1
 
+    def get_active_tgids(self, start_time):   # caller must hold talkgroups_mutex
+        stale_tgids = [tgid for tgid in self.active_tgids if self.active_tgids[tgid] < (start_time - TGID_EXPIRY_TIME)]
+        for tgid in stale_tgids:
+            del self.active_tgids[tgid]
+        return self.active_tgids
+
+    def index_tgid(self, tgid):               # caller must hold talkgroups_mutex
+        if tgid not in self.active_tgids:
+            return
+        for rcvr in self.receivers:
+            rcvr.index_tgid(tgid)
+
+    def add_receiver(self, rcvr):
+        self.receivers.append(rcvr)
+
+    def filters_changed(self):
+        self.filters_version += 1             # receiver lists may be shared, so every receiver re-filters its candidates
+
     def expire_talkgroups(self, curr_time):
         if curr_time < self.last_expiry_check + EXPIRY_TIMER:
             return
@@ -1682,15 +1867,15 @@ class p25_system(object):
         # step 1 - build an expiry list with the talkgroups_mutex locked
         with self.talkgroups_mutex:
             for tgid in self.talkgroups:
-                if (self.talkgroups[tgid]['receiver'] is not None) and (curr_time >= self.talkgroups[tgid]['time'] + TGID_EXPIRY_TIME):
+                if (self.talkgroups[tgid].receiver is not None) and (curr_time >= self.talkgroups[tgid].time + TGID_EXPIRY_TIME):
                     tg_expire_list.append(tgid)
 
         # step 2 - expire the individual talkgroups with the talkgroups_mutex unlocked
         for tgid in tg_expire_list:
-            if self.talkgroups[tgid]['receiver'] is not None:   # re-validate receiver still assigned to this tgid and was not released by a different thread
+            if self.talkgroups[tgid].receiver is not None:   # re-validate receiver still assigned to this tgid and was not released by a different thread
                 if self.debug > 1:
-                    sys.stderr.write("%s [%s] expiring tg(%d), freq(%f), slot(%s)\n" % (log_ts.get(), self.sysname, tgid, (self.talkgroups[tgid]['frequency']/1e6), get_slot(self.talkgroups[tgid]['tdma_slot'])))
-                self.talkgroups[tgid]['receiver'].expire_talkgroup(reason="expiry")
+                    log_msg('p25', 2, self.sysname, "expiring tg(%d), freq(%f), slot(%s)", tgid, (self.talkgroups[tgid].frequency/1e6), get_slot(self.talkgroups[tgid].tdma_slot))
+                self.talkgroups[tgid].receiver.expire_talkgroup(reason="expiry")
 
     def add_patch(self, sg, ga_list):
         with self.patches_mutex:
@@ -1705,7 +1890,7 @@ class p25_system(object):
                     if ga not in self.patches[sg]['ga']:
                         self.patches[sg]['ga'].add(ga)
                         if self.debug >= 5:
-                            sys.stderr.write("%s [%s] add_patch: tgid(%d) is patched to sg(%d)\n" % (log_ts.get(), self.sysname, ga, sg))
+                            log_msg('p25', 5, self.sysname, "add_patch: tgid(%d) is patched to sg(%d)", ga, sg)
 
             if len(self.patches[sg]['ga']) == 0:
                 del self.patches[sg]
@@ -1719,7 +1904,7 @@ class p25_system(object):
                 if ga in self.patches[sg]['ga']:
                     self.patches[sg]['ga'].discard(ga)
                     if self.debug >= 5:
-                        sys.stderr.write("%s [%s] del_patch: tgid(%d) is unpatched from sg(%d)\n" % (log_ts.get(), self.sysname, ga, sg))
+                        log_msg('p25', 5, self.sysname, "del_patch: tgid(%d) is unpatched from sg(%d)", ga, sg)
 
             if (sg in ga_list) or (len(self.patches[sg]['ga']) == 0):
                 del self.patches[sg]
@@ -1735,14 +1920,36 @@ class p25_system(object):
                     updated += 1
                     del self.patches[sg]
                     if self.debug >= 5:
-                        sys.stderr.write("%s [%s] expire_patches: expiring patch sg(%d)\n" % (log_ts.get(), self.sysname, sg))
+                        log_msg('p25', 5, self.sysname, "expire_patches: expiring patch sg(%d)", sg)
         return updated
 
+    def expire_rids(self, curr_time):
+        if curr_time < (self.rid_expiry_check + RID_EXPIRY_TIMER):
+            return
+        self.rid_expiry_check = curr_time
+
+        # radio ids loaded from the rid_tags_file are never expired
+        untagged = sorted([(r.time, rid) for (rid, r) in self.sourceids.items() if r.tag == ""])
+        n_expired = max(len(untagged) - self.rid_max, 0) if self.rid_max > 0 else 0
+        if self.rid_expiry > 0:
+            while n_expired < len(untagged) and curr_time >= untagged[n_expired][0] + self.rid_expiry:
+                n_expired += 1
+        if n_expired == 0:
+            return
+
+        with self.talkgroups_mutex:
+            for (ts, rid) in untagged[:n_expired]:
+                del self.sourceids[rid]
+        if self.debug >= 5:
+            log_msg('p25', 5, self.sysname, "expire_rids: expired %d of %d radio ids", n_expired, n_expired + len(self.sourceids))
+
     def get_rid_tag(self, srcaddr):
-        if srcaddr is None or srcaddr not in self.sourceids:
-            return ""
-        else:
-            return self.sourceids[srcaddr]['tag']
+        rid = self.sourceids.get(srcaddr) if srcaddr is not None else None
+        return rid.tag if rid is not None else ""
+
+    def get_tgid_tag(self, tgid):
+        tg = self.talkgroups.get(tgid)
+        return tg.tag if tg is not None else None
 
     def register_suid(self, wacn_id, sys_id, source_id, src_addr, ts):
         if (source_id == 0 or sys_id == 0 or wacn_id == 0 or src_addr == 0):
@@ -1757,7 +1964,9 @@ class p25_system(object):
                 self.registered_suids[suid] = {"rfid": self.rfss_rfid, "stid": self.rfss_stid, "wuid" : wuid, "tag" : tag, "aff_sgid" : 0, "ts": ts}
                 self.registered_wuids[wuid] = {"rfid": self.rfss_rfid, "stid": self.rfss_stid, "suid" : suid, "tag" : tag, "aff_aga"  : 0, "aff_ga"  : 0, "ts": ts}
                 if self.debug >= 10:
-                    sys.stderr.write("%s [%s] register_suid: suid(%s), wuid(%d)\n" % (log_ts.get(), self.sysname, suid, int(wuid, 16)))
+                    log_msg('p25', 10, self.sysname, "register_suid: suid(%s), wuid(%d)", suid, int(wuid, 16))
+                if self.event_store is not None:
+                    self.event_store.put(EV_REGISTER, self.sysname, srcaddr=src_addr, tag=suid)
             else:
                 self.registered_suids[suid]['ts'] = ts
                 self.registered_wuids[wuid]['ts'] = ts
@@ -1773,7 +1982,7 @@ class p25_system(object):
                 self.registered_suids.pop(suid, None)
                 self.registered_wuids.pop(wuid, None)
             if self.debug >= 10:
-                sys.stderr.write("%s [%s] deregister_suid: suid(%s), wuid(%d)\n" % (log_ts.get(), self.sysname, suid, int(wuid, 16)))
+                log_msg('p25', 10, self.sysname, "deregister_suid: suid(%s), wuid(%d)", suid, int(wuid, 16))
 
     def affiliate_sgid(self, wacn_id, sys_id, group_id, group_addr, ann_group_addr, src_addr, ts):
         if (sys_id == 0 or wacn_id == 0 or src_addr == 0):
@@ -1792,7 +2001,7 @@ class p25_system(object):
                 self.registered_wuids[wuid]["aff_aga"] = ann_group_addr
                 self.registered_wuids[wuid]["aff_ga"] = group_addr
                 if self.debug >= 10:
-                    sys.stderr.write("%s [%s] affiliate_sgid: suid(%s), sgid(%s), wuid(%d), aga(%d), ga(%d)\n" % (log_ts.get(), self.sysname, suid, sgid, int(wuid, 16), ann_group_addr, group_addr))
+                    log_msg('p25', 10, self.sysname, "affiliate_sgid: suid(%s), sgid(%s), wuid(%d), aga(%d), ga(%d)", suid, sgid, int(wuid, 16), ann_group_addr, group_addr)
             self.registered_suids[suid]['ts'] = ts
             self.registered_wuids[wuid]["ts"] = ts
         return sgid
@@ -1811,7 +2020,7 @@ class p25_system(object):
             self.registered_suids[suid]['ts'] = ts
             self.registered_wuids[wuid]["ts"] = ts
         if self.debug >= 10:
-            sys.stderr.write("%s [%s] update_wuid_ts: suid(%s), wuid(%d)\n" % (log_ts.get(), self.sysname, suid, int(wuid, 16)))
+            log_msg('p25', 10, self.sysname, "update_wuid_ts: suid(%s), wuid(%d)", suid, int(wuid, 16))
 
     def expire_registrations(self):
         expired_suids = []
@@ -1832,35 +2041,42 @@ class p25_system(object):
                 self.registered_suids.pop(suid, None)
                 self.registered_wuids.pop(wuid, None)
                 if self.debug >= 10:
-                    sys.stderr.write("%s [%s] expire_registrations: remove expired suid(%s), wuid(%d)\n" % (log_ts.get(), self.sysname, suid, int(wuid, 16)))
+                    log_msg('p25', 10, self.sysname, "expire_registrations: remove expired suid(%s), wuid(%d)", suid, int(wuid, 16))
 
     def dump_tgids(self):
-        sys.stderr.write("%s [%s] Known talkgroup ids: {\n" % (log_ts.get(), self.sysname))
-        for tgid in sorted(self.talkgroups.keys()):
-            sys.stderr.write('%d\t"%s"\t%d\t#%d\n' % (tgid, self.talkgroups[tgid]['tag'], self.talkgroups[tgid]['prio'], self.talkgroups[tgid]['counter']));
+        rows = self.talkgroups_mutex.read(lambda: [(tgid, self.talkgroups[tgid].tag, self.talkgroups[tgid].prio, self.talkgroups[tgid].counter) for tgid in sorted(self.talkgroups.keys())])
+        log_msg('p25', 0, self.sysname, "Known talkgroup ids: {")
+        for row in rows:
+            sys.stderr.write('%d\t"%s"\t%d\t#%d\n' % row);
         sys.stderr.write("}\n") 
 
     def dump_patches(self):
-        sys.stderr.write("%s [%s] Active patches: {\n" % (log_ts.get(), self.sysname))
-        for sgid in sorted(self.patches.keys()):
-            sys.stderr.write('%d\t%s\t"%s"\n' % (sgid, log_ts.get(self.patches[sgid]['ts']), self.patches[sgid]['ga']));
+        rows = self.patches_mutex.read(lambda: [(sgid, self.patches[sgid]['ts'], set(self.patches[sgid]['ga'])) for sgid in sorted(self.patches.keys())])
+        log_msg('p25', 0, self.sysname, "Active patches: {")
+        for (sgid, ts, ga) in rows:
+            sys.stderr.write('%d\t%s\t"%s"\n' % (sgid, log_ts.get(ts), ga));
         sys.stderr.write("}\n") 
 
     def dump_rids(self):
-        sys.stderr.write("%s [%s] Known radio ids: {\n" % (log_ts.get(), self.sysname))
-        for rid in sorted(self.sourceids.keys()):
-            sys.stderr.write('%d\t"%s"\t# tgids %s\n' % (rid, self.sourceids[rid]['tag'], self.sourceids[rid]['tgs']));
+        rows = self.talkgroups_mutex.read(lambda: [(rid, self.sourceids[rid].tag, self.sourceids[rid].get_tgs()) for rid in sorted(self.sourceids.keys())])
+        log_msg('p25', 0, self.sysname, "Known radio ids: {")
+        for row in rows:
+            sys.stderr.write('%d\t"%s"\t# tgids %s\n' % row);
         sys.stderr.write("}\n") 
 
     def dump_wuids(self):
-        sys.stderr.write("%s [%s] Registered subscriber unit ids: {\n" % (log_ts.get(), self.sysname))
-        for wuid in sorted(self.registered_wuids.keys()):
-            ts = self.registered_wuids[wuid]['ts']
+        wuid_data = self.suids_mutex.read(lambda: [(wuid, dict(self.registered_wuids[wuid])) for wuid in sorted(self.registered_wuids.keys())])
+        log_msg('p25', 0, self.sysname, "Registered subscriber unit ids: {")
+        for (wuid, w) in wuid_data:
+            ts = w['ts']
             fmt_ts = "{:s}{:s}".format(time.strftime("%m/%d/%y %H:%M:%S",time.localtime(ts)),"{:.6f}".format(ts - int(ts)).lstrip("0"))
-            sys.stderr.write('%d\ttag(%14s)\tsuid(%s)\taffil_grp(%5d)\tann_grp(%5d)\tlast(%s)\n' % (int(wuid, 16), self.registered_wuids[wuid]['tag'], self.registered_wuids[wuid]['suid'], self.registered_wuids[wuid]['aff_ga'], self.registered_wuids[wuid]['aff_aga'], fmt_ts));
+            sys.stderr.write('%d\ttag(%14s)\tsuid(%s)\taffil_grp(%5d)\tann_grp(%5d)\tlast(%s)\n' % (int(wuid, 16), w['tag'], w['suid'], w['aff_ga'], w['aff_aga'], fmt_ts));
         sys.stderr.write("}\n") 
 
     def to_json(self):  # ugly but required for compatibility with P25 trunking and terminal modules
+        return json.dumps(self.to_dict())
+
+    def to_dict(self):
         wacn_system_id_str = "%05X.%03X" % (self.ns_wacn, self.ns_syid) if self.ns_syid is not None else "---------"
         rfss_site_id_str   = "%d.%d" % (self.rfss_rfid, self.rfss_stid) if (self.rfss_rfid is not None and self.rfss_stid is not None) else "--"
 
@@ -1955,9 +2171,9 @@ class p25_system(object):
                     continue
                 try:
                     tgid_int = int(tgid)
-                    tag = self.talkgroups.get(tgid_int, {}).get('tag', None)
-                    srcaddr = self.talkgroups[tgid_int]['srcaddr']
-                    srctag = self.get_rid_tag(self.talkgroups[tgid_int]['srcaddr'])
+                    tag = self.get_tgid_tag(tgid_int)
+                    srcaddr = self.talkgroups[tgid_int].srcaddr
+                    srctag = self.get_rid_tag(self.talkgroups[tgid_int].srcaddr)
                 except (ValueError, TypeError) as e:
                     if self.debug >= 10:
                         sys.stderr.write(f"Error converting TGID '{tgid}' to int: {e}\n")
@@ -1973,29 +2189,11 @@ class p25_system(object):
 
         # Patches
         self.expire_patches()
-        for sg in sorted(self.patches.keys()):
-            d['patch_data'][sg] = {}
-            for ga in sorted(self.patches[sg]['ga']):
-                sg_dec = "%5d" % (sg)
-                ga_dec = "%5d" % (ga)
-                sg_tag = self.talkgroups.get(sg, {}).get('tag', None)
-                ga_tag = self.talkgroups.get(ga, {}).get('tag', None)
-                d['patch_data'][sg][ga] = {'sg': sg_dec, 'sgtag': sg_tag, 'ga': ga_dec, 'gatag': ga_tag}
+        d['patch_data'] = self.patches_mutex.read(self.get_patch_data)
 
         # Subscriber Registrations
         self.expire_registrations()
-        with self.suids_mutex:
-            for wuid in sorted(self.registered_wuids.keys()):
-                d['wuid_data'][wuid] = {'rfss'        : self.registered_wuids[wuid]['rfid'],
-                                        'site'        : self.registered_wuids[wuid]['stid'],
-                                        'suid'        : self.registered_wuids[wuid]['suid'],
-                                        'srcaddr'     : int(wuid, 16),
-                                        'tag'         : self.registered_wuids[wuid]['tag'],
-                                        'aff_ga'      : self.registered_wuids[wuid]['aff_ga'],
-                                        'aff_ga_tag'  : self.talkgroups.get(self.registered_wuids[wuid]['aff_ga'], {}).get('tag', None),
-                                        'aff_aga'     : self.registered_wuids[wuid]['aff_aga'],
-                                        'aff_aga_tag' : self.talkgroups.get(self.registered_wuids[wuid]['aff_aga'], {}).get('tag', None),
-                                        'time'        : self.registered_wuids[wuid]['ts']}
+        d['wuid_data'] = self.suids_mutex.read(self.get_wuid_data)
 
         # Adjacent sites
         d['adjacent_data'] = self.adjacent_data
@@ -2003,7 +2201,34 @@ class p25_system(object):
         # Band Plan (from iden_up)
         d['band_plan'] = self.freq_table
 
-        return json.dumps(d)
+        return d
+
+    def get_patch_data(self):   # called through patches_mutex.read()
+        patch_data = {}
+        for sg in sorted(self.patches.keys()):
+            patch_data[sg] = {}
+            for ga in sorted(self.patches[sg]['ga']):
+                sg_dec = "%5d" % (sg)
+                ga_dec = "%5d" % (ga)
+                sg_tag = self.get_tgid_tag(sg)
+                ga_tag = self.get_tgid_tag(ga)
+                patch_data[sg][ga] = {'sg': sg_dec, 'sgtag': sg_tag, 'ga': ga_dec, 'gatag': ga_tag}
+        return patch_data
+
+    def get_wuid_data(self):    # called through suids_mutex.read()
+        wuid_data = {}
+        for wuid in sorted(self.registered_wuids.keys()):
+            wuid_data[wuid] = {'rfss'        : self.registered_wuids[wuid]['rfid'],
+                               'site'        : self.registered_wuids[wuid]['stid'],
+                               'suid'        : self.registered_wuids[wuid]['suid'],
+                               'srcaddr'     : int(wuid, 16),
+                               'tag'         : self.registered_wuids[wuid]['tag'],
+                               'aff_ga'      : self.registered_wuids[wuid]['aff_ga'],
+                               'aff_ga_tag'  : self.get_tgid_tag(self.registered_wuids[wuid]['aff_ga']),
+                               'aff_aga'     : self.registered_wuids[wuid]['aff_aga'],
+                               'aff_aga_tag' : self.get_tgid_tag(self.registered_wuids[wuid]['aff_aga']),
+                               'time'        : self.registered_wuids[wuid]['ts']}
+        return wuid_data
 
 #################
 # Radio Id history class
@@ -2029,10 +2254,8 @@ class rid_history(object):
         for rid_entry in reversed(self.rid_history):
             if rid_entry['rid'] is None:
                 continue
-            if rid_entry['rid'] in self.rids:
-                rid_tag = self.rids[rid_entry['rid']]['tag']
-            else:
-                rid_tag = ""
+            rid = self.rids.get(rid_entry['rid'])
+            rid_tag = rid.tag if rid is not None else ""
             sys.stderr.write("@ %s rid(%s), rtag(%s), tg(%s)\n" % (log_ts.get(rid_entry['ts']), rid_entry['rid'], rid_tag.center(14)[:14], rid_entry['tgid']))
         sys.stderr.write("}\n")
 
@@ -2172,6 +2395,8 @@ class p25_receiver(object):
         self.blacklist = {}
         self.whitelist = None
         self.crypt_behavior = self.system.get_crypt_behavior()
+        self.candidates = {}            # tgid -> (prio, order) for recently granted tgids passing this receiver's filters
+        self.candidates_version = -1
         self.current_nac = 0
         self.current_tgid = None
         self.current_slot = None
@@ -2184,7 +2409,8 @@ class p25_receiver(object):
         self.mot_talker_alias = None
         
         self.fa_ctrl({'tuner': self.msgq_id, 'cmd': 'crypt_behavior', 'behavior': self.crypt_behavior})
-        sys.stderr.write("%s [%d] crypt behavior: %d\n" % (log_ts.get(), self.msgq_id, self.crypt_behavior))
+        log_msg('p25', 0, self.msgq_id, "crypt behavior: %d", self.crypt_behavior)
+        self.system.add_receiver(self)
 
     def set_debug(self, dbglvl):
         self.debug = dbglvl
@@ -2194,11 +2420,11 @@ class p25_receiver(object):
 
     def post_init(self):
         if self.debug >= 1:
-            sys.stderr.write("%s [%d] Initializing P25 receiver: %s\n" % (log_ts.get(), self.msgq_id, from_dict(self.config, 'name', str(self.msgq_id))))
+            log_msg('p25', 1, self.msgq_id, "Initializing P25 receiver: %s", from_dict(self.config, 'name', str(self.msgq_id)))
             if self.meta_q is None or self.meta_stream == "":
-                sys.stderr.write("%s [%d] metadata updates not enabled\n" % (log_ts.get(), self.msgq_id))
+                log_msg('p25', 1, self.msgq_id, "metadata updates not enabled")
             else:
-                sys.stderr.write("%s [%d] metadata stream: %s\n" % (log_ts.get(), self.msgq_id, self.meta_stream))
+                log_msg('p25', 1, self.msgq_id, "metadata stream: %s", self.meta_stream)
             
 
         self.load_bl_wl()
@@ -2211,16 +2437,17 @@ class p25_receiver(object):
 
     def load_bl_wl(self):
         if 'blacklist' in self.config and self.config['blacklist'] != "":
-            sys.stderr.write("%s [%d] reading channel blacklist file: %s\n" % (log_ts.get(), self.msgq_id, self.config['blacklist']))
+            log_msg('p25', 0, self.msgq_id, "reading channel blacklist file: %s", self.config['blacklist'])
             self.blacklist = get_int_dict(self.config['blacklist'], self.msgq_id)
         else:
             self.blacklist = self.system.get_blacklist()
 
         if 'whitelist' in self.config and self.config['whitelist'] != "":
-            sys.stderr.write("%s [%d] reading channel whitelist file: %s\n" % (log_ts.get(), self.msgq_id, self.config['whitelist']))
+            log_msg('p25', 0, self.msgq_id, "reading channel whitelist file: %s", self.config['whitelist'])
             self.whitelist = get_int_dict(self.config['whitelist'], self.msgq_id)
         else:
             self.whitelist = self.system.get_whitelist()
+        self.system.filters_changed()
 
     def set_nac(self, nac):
         if self.current_nac != nac:
@@ -2230,7 +2457,7 @@ class p25_receiver(object):
     def idle_rx(self):
         if not (self.tuner_idle or self.system.has_cc(self.msgq_id)): # don't idle a control channel or an already idle receiver
             if self.debug >= 5:
-                sys.stderr.write("%s [%d] idling receiver\n" % (log_ts.get(), self.msgq_id))
+                log_msg('p25', 5, self.msgq_id, "idling receiver")
             if self.fa_ctrl is not None:
                 self.fa_ctrl({'tuner': self.msgq_id, 'cmd': 'set_slotid', 'slotid': 4})      # disable receiver (idle)
             self.tuner_idle = True
@@ -2249,7 +2476,9 @@ class p25_receiver(object):
                 self.fa_ctrl({'tuner': self.msgq_id, 'cmd': 'set_slotid', 'slotid': 0})     # enable receiver
             self.tuner_idle = False
         if self.debug >= 5:
-            sys.stderr.write("%s [%d] set control channel=%f\n" % (log_ts.get(), self.msgq_id, freq/1e6))
+            log_msg('p25', 5, self.msgq_id, "set control channel=%f", freq/1e6)
+        if self.system.event_store is not None:
+            self.system.event_store.put(EV_CONTROL_CHANNEL, self.system.sysname, rcvr=self.msgq_id, freq=freq)
         tune_params = {'tuner':   self.msgq_id,
                        'sigtype': "P25",
                        'freq':    freq,
@@ -2271,7 +2500,7 @@ class p25_receiver(object):
             self.tuner_idle = False
         else:
             if self.debug >= 5:
-                sys.stderr.write("%s [%d] releasing control channel\n" % (log_ts.get(), self.msgq_id))
+                log_msg('p25', 5, self.msgq_id, "releasing control channel")
             self.system.release_cc(self.msgq_id)                 # release control channel responsibility
 
         if self.current_nac != self.system.get_nac():
@@ -2280,7 +2509,7 @@ class p25_receiver(object):
         if (freq != self.tuned_frequency) or (slot != self.current_slot):
             nac, wacn, sysid, valid = self.system.get_tdma_params()
             if slot is not None and not valid:                   # Can only tune tdma voice channel if nac/wacn/sysid are known
-                sys.stderr.write("%s [%d] cannot tune voice channel; wacn/sysid not yet known\n" % (log_ts.get(), self.msgq_id))
+                log_msg('p25', 0, self.msgq_id, "cannot tune voice channel; wacn/sysid not yet known")
                 return
 
             tune_params = {'tuner':   self.msgq_id,
@@ -2289,7 +2518,7 @@ class p25_receiver(object):
                            'tgid':    tgid,
                            'rate':    4800 if slot is None else 6000,
                            'tdma':    slot,
-                           'tag':     self.talkgroups[tgid]['tag'],
+                           'tag':     self.talkgroups[tgid].tag,
                            'system':  self.config['trunking_sysname'],
                            'nac':     nac,
                            'wacn':    wacn,
@@ -2304,11 +2533,13 @@ class p25_receiver(object):
             self.hold_tgid = None
             self.hold_until = time.time()
         with self.system.talkgroups_mutex:
-            self.talkgroups[tgid]['receiver'] = self
+            self.talkgroups[tgid].receiver = self
+        if self.system.call_recorder is not None:
+            self.system.call_recorder.call_start(self.msgq_id, self.config['trunking_sysname'], tgid, self.talkgroups[tgid].tag, freq, slot, self.talkgroups[tgid].srcaddr)
 
     def ui_command(self, cmd, data, curr_time):
         if self.debug > 10:
-            sys.stderr.write("%s [%d] ui_command: cmd(%s), data(%d), time(%f)\n" % (log_ts.get(), self.msgq_id, cmd, data, curr_time))
+            log_msg('p25', 11, self.msgq_id, "ui_command: cmd(%s), data(%d), time(%f)", cmd, data, curr_time)
         if cmd == 'hold':
             self.hold_talkgroup(int(data), curr_time)
         elif cmd == 'whitelist':
@@ -2341,11 +2572,11 @@ class p25_receiver(object):
             if self.current_tgid is None:
                 if self.system.has_cc(self.msgq_id):
                     if ((self.debug > 0) and (self.system.cc_retries == 0)) or (self.debug > 10):  # only log once per timeout unless log level > 10
-                        sys.stderr.write("%s [%d] control channel timeout, freq(%f)\n" % (log_ts.get(), self.msgq_id, (self.tuned_frequency/1e6)))
+                        log_msg('p25', 11, self.msgq_id, "control channel timeout, freq(%f)", (self.tuned_frequency/1e6))
                     self.tune_cc(self.system.timeout_cc(self.msgq_id))
             else:
                 if self.debug > 1:
-                    sys.stderr.write("%s [%d] voice channel timeout, freq(%f)\n" % (log_ts.get(), self.msgq_id, (self.tuned_frequency/1e6)))
+                    log_msg('p25', 2, self.msgq_id, "voice channel timeout, freq(%f)", (self.tuned_frequency/1e6))
                 self.vc_retries += 1
                 if self.vc_retries >= VC_TIMEOUT_RETRIES:
                     self.expire_talkgroup(reason="timeout")
@@ -2353,7 +2584,7 @@ class p25_receiver(object):
 
         elif m_type == -3: # P25 call data (srcaddr, grpaddr, encryption)
             if self.debug > 10:
-                sys.stderr.write("%s [%d] process_qmsg: P25 info: %s\n" % (log_ts.get(), self.msgq_id, msg.to_string()))
+                log_msg('p25', 11, self.msgq_id, "process_qmsg: P25 info: %s", msg.to_string())
             js = json.loads(msg.to_string())
             grpaddr = from_dict(js, 'grpaddr', 0)
             srcaddr = from_dict(js, 'srcaddr', 0)
@@ -2366,27 +2597,30 @@ class p25_receiver(object):
 
             if encrypted >= 0 and algid >= 0 and keyid >= 0: # log and save encryption information
                 with self.system.talkgroups_mutex:
-                    if self.debug >= 5 and (algid != self.talkgroups[self.current_tgid]['algid'] or keyid != self.talkgroups[self.current_tgid]['keyid']):
-                        sys.stderr.write('%s [%d] encrypt info: tg=%d, algid=0x%x, keyid=0x%x\n' % (log_ts.get(), self.msgq_id, self.current_tgid, algid, keyid))
-                    self.talkgroups[self.current_tgid]['encrypted'] = encrypted
-                    self.talkgroups[self.current_tgid]['algid'] = algid
-                    self.talkgroups[self.current_tgid]['keyid'] = keyid
+                    if algid != self.talkgroups[self.current_tgid].algid or keyid != self.talkgroups[self.current_tgid].keyid:
+                        if self.debug >= 5:
+                            log_msg('p25', 5, self.msgq_id, 'encrypt info: tg=%d, algid=0x%x, keyid=0x%x', self.current_tgid, algid, keyid)
+                        if self.system.event_store is not None:
+                            self.system.event_store.put(EV_ENCRYPT, self.system.sysname, rcvr=self.msgq_id, tgid=self.current_tgid, algid=algid, keyid=keyid)
+                    self.talkgroups[self.current_tgid].encrypted = encrypted
+                    self.talkgroups[self.current_tgid].algid = algid
+                    self.talkgroups[self.current_tgid].keyid = keyid
 
             updated += self.system.update_talkgroup_srcaddr(curr_time, self.current_tgid, srcaddr)
             
             #self.fa_ctrl({'tuner': self.msgq_id, 'cmd': 'crypt_behavior', 'behavior': self.crypt_behavior})
 
             if self.crypt_behavior > 1:
-                if self.talkgroups[self.current_tgid]['encrypted'] == 1:
+                if self.talkgroups[self.current_tgid].encrypted == 1:
                     updated += 1
                     if self.debug > 1:
-                        sys.stderr.write('%s [%d] skipping encrypted tg(%d)\n' % (log_ts.get(), self.msgq_id, self.current_tgid))
+                        log_msg('p25', 2, self.msgq_id, 'skipping encrypted tg(%d)', self.current_tgid)
                     self.add_skiplist(self.current_tgid, curr_time + TGID_SKIP_TIME)
 
         elif m_type == -4: # P25 sync established
             if self.tune_ts is not None:
                 if self.debug > 1:
-                    sys.stderr.write('%s [%d] sync established, tuning time %f seconds\n' % (log_ts.get(), self.msgq_id, (time.time() - self.tune_ts)))
+                    log_msg('p25', 2, self.msgq_id, 'sync established, tuning time %f seconds', (time.time() - self.tune_ts))
                 self.tune_ts = None
 
             if self.current_tgid is None:
@@ -2411,36 +2645,34 @@ class p25_receiver(object):
                 updated += 1
 
             elif m_type == 16: # MAC_PTT
-                mi    = get_ordinals(s[0:9])
-                algid = get_ordinals(s[9:10])
-                keyid = get_ordinals(s[10:12])
-                sa    = get_ordinals(s[12:15])
-                ga    = get_ordinals(s[15:17])
+                mi, algid, keyid, sa, ga = MAC_PTT_FIELDS.unpack(s)
                 if self.debug >= 10:
-                    sys.stderr.write('%s [%d] mac_ptt: mi: %018x algid: %02x keyid:%04x ga: %d sa: %d\n' % (log_ts.get(), m_rxid, mi, algid, keyid, ga, sa))
+                    log_msg('tdma', 10, m_rxid, 'mac_ptt: mi: %018x algid: %02x keyid:%04x ga: %d sa: %d', mi, algid, keyid, ga, sa)
                 updated += self.system.update_talkgroup_srcaddr(curr_time, ga, sa)
                 if algid != 0x80: # log and save encryption information
                     with self.system.talkgroups_mutex:
                         if ga in self.talkgroups:
-                            if self.debug >= 5 and (algid != self.talkgroups[ga]['algid'] or keyid != self.talkgroups[ga]['keyid']):
-                                sys.stderr.write('%s [%d] encrypt info: tg=%d, algid=0x%x, keyid=0x%x\n' % (log_ts.get(), self.msgq_id, ga, algid, keyid))
-                            self.talkgroups[ga]['encrypted'] = 1
-                            self.talkgroups[ga]['algid'] = algid
-                            self.talkgroups[ga]['keyid'] = keyid
+                            if algid != self.talkgroups[ga].algid or keyid != self.talkgroups[ga].keyid:
+                                if self.debug >= 5:
+                                    log_msg('p25', 5, self.msgq_id, 'encrypt info: tg=%d, algid=0x%x, keyid=0x%x', ga, algid, keyid)
+                                if self.system.event_store is not None:
+                                    self.system.event_store.put(EV_ENCRYPT, self.system.sysname, rcvr=self.msgq_id, tgid=ga, algid=algid, keyid=keyid)
+                            self.talkgroups[ga].encrypted = 1
+                            self.talkgroups[ga].algid = algid
+                            self.talkgroups[ga].keyid = keyid
                         else:
                             if self.debug >= 5:
-                                sys.stderr.write('%s [%d] encrypt info: unknown tg=%d, algid=0x%x, keyid=0x%x\n' % (log_ts.get(), self.msgq_id, ga, algid, keyid))
+                                log_msg('p25', 5, self.msgq_id, 'encrypt info: unknown tg=%d, algid=0x%x, keyid=0x%x', ga, algid, keyid)
                     if self.crypt_behavior > 1:
                         updated += 1
                         if self.debug > 1:
-                            sys.stderr.write('%s [%d] skipping encrypted tg(%d)\n' % (log_ts.get(), self.msgq_id, ga))
+                            log_msg('p25', 2, self.msgq_id, 'skipping encrypted tg(%d)', ga)
                         self.add_skiplist(ga, curr_time + TGID_SKIP_TIME)
 
             elif m_type == 17: # MAC_END_PTT
-                sa    = get_ordinals(s[12:15])
-                ga    = get_ordinals(s[15:17])
+                mi, algid, keyid, sa, ga = MAC_PTT_FIELDS.unpack(s)
                 if self.debug >= 10:
-                    sys.stderr.write('%s [%d] mac_end_ptt: ga: %d sa: %d\n' % (log_ts.get(), m_rxid, ga, sa))
+                    log_msg('tdma', 10, m_rxid, 'mac_end_ptt: ga: %d sa: %d', ga, sa)
                 self.system.update_talkgroup_srcaddr(curr_time, ga, sa)
                 self.expire_talkgroup(reason="duid15")
                 updated += 1
@@ -2460,13 +2692,14 @@ class p25_receiver(object):
     def add_skiplist(self, tgid, end_time=None):
         if not tgid or (tgid <= 0) or (tgid > 65534):
             if self.debug > 1:
-                sys.stderr.write("%s [%d] skiplist tgid(%d) out of range (1-65534)\n" % (log_ts.get(), self.msgq_id, tgid))
+                log_msg('p25', 2, self.msgq_id, "skiplist tgid(%d) out of range (1-65534)", tgid)
             return
         if tgid in self.skiplist:
             return
         self.skiplist[tgid] = end_time
+        self.system.filters_changed()
         if self.debug > 1:
-            sys.stderr.write("%s [%d] skiplisting: tgid(%d)\n" % (log_ts.get(), self.msgq_id, tgid))
+            log_msg('p25', 2, self.msgq_id, "skiplisting: tgid(%d)", tgid)
         if self.current_tgid and self.current_tgid in self.skiplist:
             self.expire_talkgroup(reason = "skiplisted")
             self.hold_mode = False
@@ -2476,21 +2709,22 @@ class p25_receiver(object):
     def add_blacklist(self, tgid, end_time=None):
         if not tgid or (tgid <= 0) or (tgid > 65534):
             if self.debug > 1:
-                sys.stderr.write("%s [%d] blacklist tgid(%d) out of range (1-65534)\n" % (log_ts.get(), self.msgq_id, tgid))
+                log_msg('p25', 2, self.msgq_id, "blacklist tgid(%d) out of range (1-65534)", tgid)
             return
         if tgid in self.blacklist:
             return
         if end_time is None and self.whitelist and tgid in self.whitelist:
             self.whitelist.pop(tgid)
             if self.debug > 1:
-                sys.stderr.write("%s [%d] de-whitelisting: tgid(%d)\n" % (log_ts.get(), self.msgq_id, tgid))
+                log_msg('p25', 2, self.msgq_id, "de-whitelisting: tgid(%d)", tgid)
             if len(self.whitelist) == 0:
                 self.whitelist = None
                 if self.debug > 1:
                     sys.stderr.write("%s removing empty whitelist\n" % log_ts.get())
         self.blacklist[tgid] = end_time
+        self.system.filters_changed()
         if self.debug > 1:
-            sys.stderr.write("%s [%d] blacklisting: tgid(%d)\n" % (log_ts.get(), self.msgq_id, tgid))
+            log_msg('p25', 2, self.msgq_id, "blacklisting: tgid(%d)", tgid)
         if self.current_tgid and self.current_tgid in self.blacklist:
             self.expire_talkgroup(reason = "blacklisted", auto_hold = False)
             self.hold_mode = False
@@ -2498,19 +2732,20 @@ class p25_receiver(object):
     def add_whitelist(self, tgid):
         if not tgid or (tgid <= 0) or (tgid > 65534):
             if self.debug > 1:
-                sys.stderr.write("%s [%d] whitelist tgid(%d) out of range (1-65534)\n" % (log_ts.get(), self.msgq_id, tgid))
+                log_msg('p25', 2, self.msgq_id, "whitelist tgid(%d) out of range (1-65534)", tgid)
             return
         if self.blacklist and tgid in self.blacklist:
             self.blacklist.pop(tgid)
             if self.debug > 1:
-                sys.stderr.write("%s [%d] de-blacklisting: tgid(%d)\n" % (log_ts.get(), self.msgq_id, tgid))
+                log_msg('p25', 2, self.msgq_id, "de-blacklisting: tgid(%d)", tgid)
         if self.whitelist is None:
             self.whitelist = {}
         if tgid in self.whitelist:
             return
         self.whitelist[tgid] = None
+        self.system.filters_changed()
         if self.debug > 1:
-            sys.stderr.write("%s [%d] whitelisting: tgid(%d)\n" % (log_ts.get(), self.msgq_id, tgid))
+            log_msg('p25', 2, self.msgq_id, "whitelisting: tgid(%d)", tgid)
         if self.current_tgid and self.current_tgid not in self.whitelist:
             self.expire_talkgroup(reason = "not whitelisted")
             self.hold_mode = False
@@ -2523,8 +2758,9 @@ class p25_receiver(object):
                             and self.blacklist[tg] < start_time]
         for tg in expired_tgs:
             self.blacklist.pop(tg)
+            self.system.filters_changed()
             if self.debug > 1:
-                sys.stderr.write("%s [%d] removing expired blacklist: tg(%d)\n" % (log_ts.get(), self.msgq_id, tg));
+                log_msg('p25', 2, self.msgq_id, "removing expired blacklist: tg(%d)", tg)
 
     def skiplist_update(self, start_time):
         expired_tgs = [tg for tg in list(self.skiplist.keys())
@@ -2532,8 +2768,38 @@ class p25_receiver(object):
                             and self.skiplist[tg] < start_time]
         for tg in expired_tgs:
             self.skiplist.pop(tg)
+            self.system.filters_changed()
             if self.debug > 1:
-                sys.stderr.write("%s [%d] removing expired skiplist: tg(%d)\n" % (log_ts.get(), self.msgq_id, tg));
+                log_msg('p25', 2, self.msgq_id, "removing expired skiplist: tg(%d)", tg)
+
+    def tgid_allowed(self, tgid):
+        if tgid in self.skiplist:
+            return False
+        if tgid in self.blacklist and (not self.whitelist or tgid not in self.whitelist):
+            return False
+        if self.whitelist and tgid not in self.whitelist:
+            return False
+        if (self.crypt_behavior > 1) and ((self.talkgroups[tgid].svcopts & 0x40) == 0x40):
+            return False
+        return True
+
+    def index_tgid(self, tgid):             # caller must hold talkgroups_mutex
+        if self.tgid_allowed(tgid):
+            self.candidates[tgid] = (self.talkgroups[tgid].prio, self.talkgroups[tgid].order)
+        elif tgid in self.candidates:
+            del self.candidates[tgid]
+
+    def get_candidates(self, start_time):   # caller must hold talkgroups_mutex
+        active_tgids = self.system.get_active_tgids(start_time)
+        if self.candidates_version != self.system.filters_version:  # lists changed; re-filter the recent grants
+            self.candidates_version = self.system.filters_version
+            self.candidates = {}
+            for tgid in active_tgids:
+                self.index_tgid(tgid)
+        else:
+            for tgid in [tgid for tgid in self.candidates if tgid not in active_tgids]:
+                del self.candidates[tgid]
+        return self.candidates
 
     def find_talkgroup(self, start_time, tgid=None, hold=False):
         tgt_tgid = None
@@ -2541,31 +2807,25 @@ class p25_receiver(object):
         self.blacklist_update(start_time)
 
         with self.system.talkgroups_mutex:
-            if (tgid is not None) and (tgid in self.talkgroups) and ((self.talkgroups[tgid]['receiver'] is None) or (self.talkgroups[tgid]['receiver'] == self)):
+            if (tgid is not None) and (tgid in self.talkgroups) and ((self.talkgroups[tgid].receiver is None) or (self.talkgroups[tgid].receiver == self)):
                 tgt_tgid = tgid
 
-            for active_tgid in self.talkgroups:
-                if hold:
-                    break
-                if self.talkgroups[active_tgid]['time'] < start_time:
-                    continue
-                if active_tgid in self.skiplist:
-                    continue
-                if active_tgid in self.blacklist and (not self.whitelist or active_tgid not in self.whitelist):
+            # candidates are recently granted tgids already filtered for this receiver; among equal
+            # priorities the one listed first in the talkgroups dict (tags file order) wins
+            best_tgid = None
+            candidates = {} if hold else self.get_candidates(start_time)
+            for active_tgid in candidates:
+                if self.talkgroups[active_tgid].time < start_time:
                     continue
-                if self.whitelist and active_tgid not in self.whitelist:
+                if self.talkgroups[active_tgid].receiver is not None:
                     continue
-                if (self.crypt_behavior > 1) and ((self.talkgroups[active_tgid]['svcopts'] & 0x40) == 0x40):
-                    continue
-                if tgt_tgid is None:
-                    if self.talkgroups[active_tgid]['receiver'] is None:
-                        tgt_tgid = active_tgid
-                        continue
-                elif (self.talkgroups[active_tgid]['prio'] < self.talkgroups[tgt_tgid]['prio']) and (self.talkgroups[active_tgid]['receiver'] is None):
-                    tgt_tgid = active_tgid
-                   
-            if tgt_tgid is not None and self.talkgroups[tgt_tgid]['time'] >= start_time:
-                return self.talkgroups[tgt_tgid]['frequency'], tgt_tgid, self.talkgroups[tgt_tgid]['tdma_slot'], self.talkgroups[tgt_tgid]['srcaddr']
+                if (best_tgid is None) or (candidates[active_tgid] < candidates[best_tgid]):
+                    best_tgid = active_tgid
+            if (best_tgid is not None) and ((tgt_tgid is None) or (self.talkgroups[best_tgid].prio < self.talkgroups[tgt_tgid].prio)):
+                tgt_tgid = best_tgid
+
+            if tgt_tgid is not None and self.talkgroups[tgt_tgid].time >= start_time:
+                return self.talkgroups[tgt_tgid].frequency, tgt_tgid, self.talkgroups[tgt_tgid].tdma_slot, self.talkgroups[tgt_tgid].srcaddr
         return None, None, None, None
 
     def scan_for_talkgroups(self, curr_time):
@@ -2582,25 +2842,25 @@ class p25_receiver(object):
 
         if self.current_tgid is None:
             if self.debug > 0:
-                sys.stderr.write("%s [%d] voice update:  tg(%d), rid(%d), freq(%f), slot(%s), prio(%d)\n" % (log_ts.get(), self.msgq_id, tgid, self.talkgroups[tgid]['srcaddr'], (freq/1e6), get_slot(slot), self.talkgroups[tgid]['prio']))
+                log_msg('p25', 1, self.msgq_id, "voice update:  tg(%d), rid(%d), freq(%f), slot(%s), prio(%d)", tgid, self.talkgroups[tgid].srcaddr, (freq/1e6), get_slot(slot), self.talkgroups[tgid].prio)
             self.tune_voice(freq, tgid, slot)
-            self.log_call(freq, slot, self.talkgroups[tgid]['prio'], tgid, self.talkgroups[tgid]['srcaddr'])
+            self.log_call(freq, slot, self.talkgroups[tgid].prio, tgid, self.talkgroups[tgid].srcaddr)
         else:
             if self.debug > 0:
-                sys.stderr.write("%s [%d] voice preempt: tg(%d), rid(%d), freq(%f), slot(%s), prio(%d)\n" % (log_ts.get(), self.msgq_id, tgid, self.talkgroups[tgid]['srcaddr'], (freq/1e6), get_slot(slot), self.talkgroups[tgid]['prio']))
+                log_msg('p25', 1, self.msgq_id, "voice preempt: tg(%d), rid(%d), freq(%f), slot(%s), prio(%d)", tgid, self.talkgroups[tgid].srcaddr, (freq/1e6), get_slot(slot), self.talkgroups[tgid].prio)
             self.expire_talkgroup(update_meta=False, reason="preempt")
             self.tune_voice(freq, tgid, slot)
-            self.log_call(freq, slot, self.talkgroups[tgid]['prio'], tgid, self.talkgroups[tgid]['srcaddr'])
+            self.log_call(freq, slot, self.talkgroups[tgid].prio, tgid, self.talkgroups[tgid].srcaddr)
 
-        meta_update(self.meta_q, tgid=tgid, tag=self.talkgroups[tgid]['tag'], rid=self.talkgroups[tgid]['srcaddr'], rtag=self.system.get_rid_tag(self.talkgroups[tgid]['srcaddr']), msgq_id=self.msgq_id, debug=self.debug)
+        meta_update(self.meta_q, tgid=tgid, tag=self.talkgroups[tgid].tag, rid=self.talkgroups[tgid].srcaddr, rtag=self.system.get_rid_tag(self.talkgroups[tgid].srcaddr), msgq_id=self.msgq_id, debug=self.debug)
 
     def check_expired_hold(self, curr_time):
         if self.debug > 10:
-            sys.stderr.write("%s [%d] check_expired_hold: hold_tgid(%s), hold_until(%s)\n" % (log_ts.get(), self.msgq_id, self.hold_tgid, self.hold_until))
+            log_msg('p25', 11, self.msgq_id, "check_expired_hold: hold_tgid(%s), hold_until(%s)", self.hold_tgid, self.hold_until)
         
         if self.hold_tgid is not None and (self.hold_until <= curr_time):
             if self.debug > 10:
-                sys.stderr.write("%s [%d] expire hold: tg(%d)\n" % (log_ts.get(), self.msgq_id, self.hold_tgid))
+                log_msg('p25', 11, self.msgq_id, "expire hold: tg(%d)", self.hold_tgid)
             self.hold_tgid = None
             self.hold_mode = False
             meta_update(self.meta_q, msgq_id=self.msgq_id, debug=self.debug)
@@ -2608,15 +2868,18 @@ class p25_receiver(object):
     def expire_talkgroup(self, tgid=None, update_meta = True, reason="unk", auto_hold = True):
         if self.current_tgid is None:
             return
+        if self.system.call_recorder is not None:
+            self.system.call_recorder.call_end(self.msgq_id)
             
         with self.system.talkgroups_mutex:
-            self.talkgroups[self.current_tgid]['receiver'] = None
-            self.talkgroups[self.current_tgid]['frequency'] = None
-            self.talkgroups[self.current_tgid]['tdma_slot'] = None
-            self.talkgroups[self.current_tgid]['srcaddr'] = 0
-            self.talkgroups[self.current_tgid]['svcopts'] = 0x4
+            self.talkgroups[self.current_tgid].receiver = None
+            self.talkgroups[self.current_tgid].frequency = None
+            self.talkgroups[self.current_tgid].tdma_slot = None
+            self.talkgroups[self.current_tgid].srcaddr = 0
+            self.talkgroups[self.current_tgid].svcopts = 0x4
+            self.system.index_tgid(self.current_tgid)
         if self.debug > 1:
-            sys.stderr.write("%s [%d] releasing:  tg(%d), freq(%f), slot(%s), reason(%s)\n" % (log_ts.get(), self.msgq_id, self.current_tgid, (self.tuned_frequency/1e6), get_slot(self.current_slot), reason))
+            log_msg('p25', 2, self.msgq_id, "releasing:  tg(%d), freq(%f), slot(%s), reason(%s)", self.current_tgid, (self.tuned_frequency/1e6), get_slot(self.current_slot), reason)
         if self.hold_mode is False:
             # Commanded tgid hold inactive
             if auto_hold:
@@ -2637,7 +2900,7 @@ class p25_receiver(object):
             return
 
         if self.hold_tgid is not None:
-            meta_update(self.meta_q, tgid=self.hold_tgid, tag=self.talkgroups[self.hold_tgid]['tag'], msgq_id=self.msgq_id, debug=self.debug)
+            meta_update(self.meta_q, tgid=self.hold_tgid, tag=self.talkgroups[self.hold_tgid].tag, msgq_id=self.msgq_id, debug=self.debug)
         else:
             meta_update(self.meta_q, msgq_id=self.msgq_id, debug=self.debug)
 
@@ -2648,7 +2911,7 @@ class p25_receiver(object):
         if tgid > 0:
             if self.whitelist is not None and tgid not in self.whitelist:
                 if self.debug > 1:
-                    sys.stderr.write("%s [%d] hold tg(%d) not in whitelist\n" % (log_ts.get(), self.msgq_id, tgid))
+                    log_msg('p25', 2, self.msgq_id, "hold tg(%d) not in whitelist", tgid)
                 return
             with self.system.talkgroups_mutex:
                 add_default_tgid(self.talkgroups, tgid)
@@ -2679,28 +2942,32 @@ class p25_receiver(object):
 
         if update_meta:
             if self.hold_tgid is not None and self.current_tgid != self.hold_tgid:
-                meta_update(self.meta_q, tgid=self.hold_tgid, tag=self.talkgroups[self.hold_tgid]['tag'], msgq_id=self.msgq_id, debug=self.debug)
+                meta_update(self.meta_q, tgid=self.hold_tgid, tag=self.talkgroups[self.hold_tgid].tag, msgq_id=self.msgq_id, debug=self.debug)
             elif self.hold_tgid is None:
                 meta_update(self.meta_q, msgq_id=self.msgq_id, debug=self.debug)
 
     def get_status(self):
-        with self.system.talkgroups_mutex:
-            _tgid = self.hold_tgid if self.hold_tgid is not None else self.current_tgid
-            cc_tag = "Control Channel" if self.system.has_cc(self.msgq_id) else "Idle" if self.tuner_idle else None
-            d = {}
-            d['freq'] = self.tuned_frequency
-            d['tdma'] = self.current_slot
-            d['tgid'] = _tgid
-            d['system'] = self.config['trunking_sysname']
-            d['tag'] = self.talkgroups[_tgid]['tag'] if _tgid is not None else cc_tag
-            d['srcaddr'] = self.talkgroups[self.current_tgid]['srcaddr'] if self.current_tgid is not None else 0
-            d['svcopts'] = self.talkgroups[self.current_tgid]['svcopts'] if self.current_tgid is not None else 0
-            d['srctag'] = self.system.get_rid_tag(self.talkgroups[self.current_tgid]['srcaddr']) if self.current_tgid is not None else ""
-            d['encrypted'] = self.talkgroups[self.current_tgid]['encrypted'] if self.current_tgid is not None else 0
-            d['emergency'] = (d['svcopts'] >> 7) & 0x1
-            d['hold_tgid'] = self.hold_tgid if self.hold_tgid is not None else 0
-            d['mode'] = None
-            d['stream'] = self.meta_stream
-            d['msgqid'] = self.msgq_id
-            return json.dumps(d)
+        return json.dumps(self.system.talkgroups_mutex.read(self.get_status_dict))
+
+    def get_status_dict(self):  # called through talkgroups_mutex.read() so the UI never blocks the decoder
+        current_tgid = self.current_tgid
+        hold_tgid = self.hold_tgid
+        _tgid = hold_tgid if hold_tgid is not None else current_tgid
+        cc_tag = "Control Channel" if self.system.has_cc(self.msgq_id) else "Idle" if self.tuner_idle else None
+        d = {}
+        d['freq'] = self.tuned_frequency
+        d['tdma'] = self.current_slot
+        d['tgid'] = _tgid
+        d['system'] = self.config['trunking_sysname']
+        d['tag'] = self.talkgroups[_tgid].tag if _tgid is not None else cc_tag
+        d['srcaddr'] = self.talkgroups[current_tgid].srcaddr if current_tgid is not None else 0
+        d['svcopts'] = self.talkgroups[current_tgid].svcopts if current_tgid is not None else 0
+        d['srctag'] = self.system.get_rid_tag(self.talkgroups[current_tgid].srcaddr) if current_tgid is not None else ""
+        d['encrypted'] = self.talkgroups[current_tgid].encrypted if current_tgid is not None else 0
+        d['emergency'] = (d['svcopts'] >> 7) & 0x1
+        d['hold_tgid'] = hold_tgid if hold_tgid is not None else 0
+        d['mode'] = None
+        d['stream'] = self.meta_stream
+        d['msgqid'] = self.msgq_id
+        return d
 
@@ -27,6 +27,7 @@ import time
 import json
 from helper_funcs import *
 from log_ts import log_ts
+from log_ring import log_msg
 from collections import deque
 from gnuradio import gr
 import gnuradio.op25_repeater as op25_repeater
@@ -159,7 +160,7 @@ class rx_ctl(object):
         if msgq_id in self.receivers and self.receivers[msgq_id]['rx_sys'] is not None:
             self.receivers[msgq_id]['rx_sys'].ui_command(cmd = cmd, data = data, curr_time = curr_time)    # Dispatch message to the intended receiver
 
-    def to_json(self):
+    def to_json(self, since = 0):   # delta updates not supported, always returns full trunk_update
         d = {'json_type': 'trunk_update'}
         syid = 0;
         for system in self.systems:
@@ -270,18 +271,18 @@ class osw_receiver(object):
             return
 
         if self.debug >= 1:
-            sys.stderr.write("%s [%d] Initializing Smartnet system\n" % (log_ts.get(), self.msgq_id))
+            log_msg('smartnet', 1, self.msgq_id, "Initializing Smartnet system")
 
         if 'tgid_tags_file' in self.config and self.config['tgid_tags_file'] != "":
-            sys.stderr.write("%s [%d] reading system tgid_tags_file: %s\n" % (log_ts.get(), self.msgq_id, self.config['tgid_tags_file']))
+            log_msg('smartnet', 0, self.msgq_id, "reading system tgid_tags_file: %s", self.config['tgid_tags_file'])
             self.read_tags_file(self.config['tgid_tags_file'])
 
         if 'blacklist' in self.config and self.config['blacklist'] != "":
-            sys.stderr.write("%s [%d] reading system blacklist file: %s\n" % (log_ts.get(), self.msgq_id, self.config['blacklist']))
+            log_msg('smartnet', 0, self.msgq_id, "reading system blacklist file: %s", self.config['blacklist'])
             self.blacklist = get_int_dict(self.config['blacklist'], self.msgq_id)
 
         if 'whitelist' in self.config and self.config['whitelist'] != "":
-            sys.stderr.write("%s [%d] reading system whitelist file: %s\n" % (log_ts.get(), self.msgq_id, self.config['whitelist']))
+            log_msg('smartnet', 0, self.msgq_id, "reading system whitelist file: %s", self.config['whitelist'])
             self.whitelist = get_int_dict(self.config['whitelist'], self.msgq_id)
 
         cc_list = from_dict(self.config, 'control_channel_list', "")
@@ -325,9 +326,9 @@ class osw_receiver(object):
                         self.talkgroups[tgid]['tag'] = tag
                         self.talkgroups[tgid]['prio'] = prio
                     if self.debug > 1:
-                        sys.stderr.write("%s [%d] setting tgid(%d), prio(%d), tag(%s)\n" % (log_ts.get(), self.msgq_id, tgid, prio, tag))
+                        log_msg('smartnet', 2, self.msgq_id, "setting tgid(%d), prio(%d), tag(%s)", tgid, prio, tag)
         except IOError as ex:
-            sys.stderr.write("%s [%d] Error: %s: %s\n" % (log_ts.get(), self.msgq_id, ex.strerror, tags_file))
+            log_msg('smartnet', 0, self.msgq_id, "Error: %s: %s", ex.strerror, tags_file)
 
     def tune_next_cc(self):
         self.cc_retries = 0
@@ -353,7 +354,7 @@ class osw_receiver(object):
         # Control Channel Timeout
         if m_type == M_SMARTNET_TIMEOUT:
             if self.debug > 10:
-                sys.stderr.write("%s [%d] control channel timeout\n" % (log_ts.get(), self.msgq_id))
+                log_msg('smartnet', 11, self.msgq_id, "control channel timeout")
             self.cc_retries += 1
             if self.cc_retries >= CC_TIMEOUT_RETRIES:
                 self.tune_next_cc()
@@ -383,7 +384,7 @@ class osw_receiver(object):
         # Some message we don't know about or expect
         else:
             if self.debug > 10:
-                sys.stderr.write("%s [%d] unknown queue message type %d\n" % (log_ts.get(), self.msgq_id, m_type))
+                log_msg('smartnet', 11, self.msgq_id, "unknown queue message type %d", m_type)
 
         rc = False
         rc |= self.process_osws()
@@ -502,7 +503,7 @@ class osw_receiver(object):
         if not self.is_chan(chan, is_tx):
             if self.debug >= 5:
                 type_str = "transmit" if is_tx else "receive"
-                sys.stderr.write("%s [%d] SMARTNET %s chan %d out of range\n" % (log_ts.get(), self.msgq_id, type_str, chan))
+                log_msg('smartnet', 5, self.msgq_id, "SMARTNET %s chan %d out of range", type_str, chan)
             return 0.0
 
         freq = 0.0
@@ -586,7 +587,7 @@ class osw_receiver(object):
                     freq = bp_high + (bp_high_spacing * (chan - bp_high_offset))
                 else:
                     if self.debug >= 5:
-                        sys.stderr.write("%s [%d] SMARTNET receive chan %d out of range\n" % (log_ts.get(), self.msgq_id, chan))
+                        log_msg('smartnet', 5, self.msgq_id, "SMARTNET receive chan %d out of range", chan)
             else:
                 # Transmit parameters default to being based off receive parameters
                 bp_tx_base         = float(from_dict(self.config, 'bp_tx_base',         self.get_expected_obt_tx_freq(bp_base)))
@@ -613,7 +614,7 @@ class osw_receiver(object):
                         freq = bp_tx_high + (bp_tx_high_spacing * (chan - bp_tx_high_offset))
                 else:
                     if self.debug >= 5:
-                        sys.stderr.write("%s [%d] SMARTNET transmit chan %d out of range\n" % (log_ts.get(), self.msgq_id, chan))
+                        log_msg('smartnet', 5, self.msgq_id, "SMARTNET transmit chan %d out of range", chan)
 
         # Round to 5 decimal places to eliminate accumulated floating point errors
         return round(freq, 5)
@@ -793,13 +794,13 @@ class osw_receiver(object):
 
         if self.debug >= 13:
             if is_rx_chan and is_tx_chan:
-                sys.stderr.write("%s [%d] SMARTNET RAW OSW (0x%04x,%s,0x%03x;rx:%f,tx:%f)\n" % (log_ts.get(), self.msgq_id, addr, grp_str, cmd, rx_freq, tx_freq))
+                log_msg('osw', 13, self.msgq_id, "SMARTNET RAW OSW (0x%04x,%s,0x%03x;rx:%f,tx:%f)", addr, grp_str, cmd, rx_freq, tx_freq)
             elif is_rx_chan:
-                sys.stderr.write("%s [%d] SMARTNET RAW OSW (0x%04x,%s,0x%03x;rx:%f)\n" % (log_ts.get(), self.msgq_id, addr, grp_str, cmd, rx_freq))
+                log_msg('osw', 13, self.msgq_id, "SMARTNET RAW OSW (0x%04x,%s,0x%03x;rx:%f)", addr, grp_str, cmd, rx_freq)
             elif is_tx_chan:
-                sys.stderr.write("%s [%d] SMARTNET RAW OSW (0x%04x,%s,0x%03x;tx:%f)\n" % (log_ts.get(), self.msgq_id, addr, grp_str, cmd, tx_freq))
+                log_msg('osw', 13, self.msgq_id, "SMARTNET RAW OSW (0x%04x,%s,0x%03x;tx:%f)", addr, grp_str, cmd, tx_freq)
             else:
-                sys.stderr.write("%s [%d] SMARTNET RAW OSW (0x%04x,%s,0x%03x)\n" % (log_ts.get(), self.msgq_id, addr, grp_str, cmd))
+                log_msg('osw', 13, self.msgq_id, "SMARTNET RAW OSW (0x%04x,%s,0x%03x)", addr, grp_str, cmd)
 
         self.osw_q.append((addr, (grp != 0), cmd, is_rx_chan, is_tx_chan, rx_freq, tx_freq, ts))
 
@@ -840,7 +841,7 @@ class osw_receiver(object):
             # If we only had a single queue reset message, continue to process the OSWs (queue was sized accordingly)
             if len(self.osw_q) == OSW_QUEUE_SIZE - 2:
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET QUEUE RESET DUE TO BAD OSW\n" % (log_ts.get(), self.msgq_id))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET QUEUE RESET DUE TO BAD OSW")
             # If we only had more than one queue reset message, we need to put one back and wait for more OSWs
             else:
                 self.osw_q.appendleft((queue_reset_addr, queue_reset_grp, queue_reset_cmd, queue_reset_ch_rx, queue_reset_ch_tx, queue_reset_f_rx, queue_reset_f_tx, queue_reset_t))
@@ -946,36 +947,36 @@ class osw_receiver(object):
 
                 if self.debug >= 11:
                     type_str = "UNKNOWN OSW AFTER BAD OSW" if is_queue_reset else "UNKNOWN OSW"
-                    sys.stderr.write("%s [%d] SMARTNET OBT %s (0x%04x,%s,0x%03x)\n" % (log_ts.get(), self.msgq_id, type_str, osw2_addr, grp2_str, osw2_cmd))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET OBT %s (0x%04x,%s,0x%03x)", type_str, osw2_addr, grp2_str, osw2_cmd)
         # One-OSW voice update
         elif osw2_ch_rx and osw2_grp:
             dst_tgid = osw2_addr
             vc_freq = osw2_f_rx
             rc |= self.update_voice_frequency(osw2_t, vc_freq, dst_tgid)
             if self.debug >= 11:
-                sys.stderr.write("%s [%d] SMARTNET %s GROUP UPDATE tgid(%05d/0x%03x) vc_freq(%f)\n" % (log_ts.get(), self.msgq_id, self.get_call_options_str(dst_tgid), dst_tgid, dst_tgid >> 4, vc_freq))
+                log_msg('osw', 11, self.msgq_id, "SMARTNET %s GROUP UPDATE tgid(%05d/0x%03x) vc_freq(%f)", self.get_call_options_str(dst_tgid), dst_tgid, dst_tgid >> 4, vc_freq)
         # One-OSW control channel broadcast
         elif osw2_ch_rx and not osw2_grp and ((osw2_addr & 0xff00) == 0x1f00):
             cc_freq = osw2_f_rx
             self.rx_cc_freq = cc_freq * 1e6
             if self.debug >= 11:
-                sys.stderr.write("%s [%d] SMARTNET CONTROL CHANNEL 1 cc_freq(%f)\n" % (log_ts.get(), self.msgq_id, cc_freq))
+                log_msg('osw', 11, self.msgq_id, "SMARTNET CONTROL CHANNEL 1 cc_freq(%f)", cc_freq)
         # One-OSW system idle
         elif osw2_cmd == 0x2f8 and not osw2_grp:
             grp_str = grp2_str
             data = osw2_addr
             if self.debug >= 11:
-                sys.stderr.write("%s [%d] SMARTNET IDLE data(%s,0x%04x)\n" % (log_ts.get(), self.msgq_id, grp_str, data))
+                log_msg('osw', 11, self.msgq_id, "SMARTNET IDLE data(%s,0x%04x)", grp_str, data)
         # One-OSW group busy queued
         elif osw2_cmd == 0x300 and osw2_grp:
             tgid = osw2_addr
             if self.debug >= 11:
-                sys.stderr.write("%s [%d] SMARTNET GROUP BUSY QUEUED tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, tgid, tgid >> 4))
+                log_msg('osw', 11, self.msgq_id, "SMARTNET GROUP BUSY QUEUED tgid(%05d/0x%03x)", tgid, tgid >> 4)
         # One-OSW emergency busy queued
         elif osw2_cmd == 0x303 and osw2_grp:
             tgid = osw2_addr
             if self.debug >= 11:
-                sys.stderr.write("%s [%d] SMARTNET EMERGENCY BUSY QUEUED tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, tgid, tgid >> 4))
+                log_msg('osw', 11, self.msgq_id, "SMARTNET EMERGENCY BUSY QUEUED tgid(%05d/0x%03x)", tgid, tgid >> 4)
         # Two- or three-OSW message
         elif osw2_cmd == 0x308:
             # Get next OSW in the queue
@@ -990,7 +991,7 @@ class osw_receiver(object):
                 self.rx_sys_id = system
                 self.rx_cc_freq = cc_freq * 1e6
                 if self.debug == 11:
-                    sys.stderr.write("%s [%d] SMARTNET CONTROL CHANNEL 2 sys(0x%04x) cc_freq(%f) data(0x%02x)\n" % (log_ts.get(), self.msgq_id, system, cc_freq, data))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET CONTROL CHANNEL 2 sys(0x%04x) cc_freq(%f) data(0x%02x)", system, cc_freq, data)
             # Two-OSW analog group voice grant
             elif osw1_ch_rx and osw1_grp and (osw1_addr != 0) and (osw2_addr != 0):
                 src_rid = osw2_addr
@@ -998,20 +999,20 @@ class osw_receiver(object):
                 vc_freq = osw1_f_rx
                 rc |= self.update_voice_frequency(osw1_t, vc_freq, dst_tgid, src_rid, mode=0)
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET ANALOG %s GROUP GRANT src(%05d) tgid(%05d/0x%03x) vc_freq(%f)\n" % (log_ts.get(), self.msgq_id, self.get_call_options_str(dst_tgid), src_rid, dst_tgid, dst_tgid >> 4, vc_freq))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET ANALOG %s GROUP GRANT src(%05d) tgid(%05d/0x%03x) vc_freq(%f)", self.get_call_options_str(dst_tgid), src_rid, dst_tgid, dst_tgid >> 4, vc_freq)
             # Two-OSW analog private call voice grant/update (sent for duration of the call)
             elif osw1_ch_rx and not osw1_grp and (osw1_addr != 0) and (osw2_addr != 0):
                 dst_rid = osw2_addr
                 src_rid = osw1_addr
                 vc_freq = osw1_f_rx
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET ANALOG PRIVATE CALL src(%05d) dst(%05d) vc_freq(%f)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_rid, vc_freq))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET ANALOG PRIVATE CALL src(%05d) dst(%05d) vc_freq(%f)", src_rid, dst_rid, vc_freq)
             # Two-OSW interconnect call voice grant/update (sent for duration of the call)
             elif osw1_ch_rx and not osw1_grp and (osw1_addr != 0) and (osw2_addr == 0):
                 src_rid = osw1_addr
                 vc_freq = osw1_f_rx
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET INTERCONNECT CALL src(%05d) vc_freq(%f)\n" % (log_ts.get(), self.msgq_id, src_rid, vc_freq))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET INTERCONNECT CALL src(%05d) vc_freq(%f)", src_rid, vc_freq)
             # One- or two-OSW system idle
             elif osw1_cmd == 0x2f8:
                 # Get next OSW in the queue
@@ -1027,7 +1028,7 @@ class osw_receiver(object):
                     grp_str = grp1_str
                     data = osw1_addr
                     if self.debug >= 11:
-                        sys.stderr.write("%s [%d] SMARTNET IDLE ANALOG src(%05d) data(%s,0x%04x)\n" % (log_ts.get(), self.msgq_id, src_rid, grp_str, data))
+                        log_msg('osw', 11, self.msgq_id, "SMARTNET IDLE ANALOG src(%05d) data(%s,0x%04x)", src_rid, grp_str, data)
                 # One-OSW system idle that was delayed by one OSW and is now stuck in the middle of a different two- or
                 # three-OSW message.
                 #
@@ -1044,25 +1045,25 @@ class osw_receiver(object):
                     grp_str = grp1_str
                     data = osw1_addr
                     if self.debug >= 11:
-                        sys.stderr.write("%s [%d] SMARTNET IDLE DELAYED 1-1 data(%s,0x%04x)\n" % (log_ts.get(), self.msgq_id, grp_str, data))
+                        log_msg('osw', 11, self.msgq_id, "SMARTNET IDLE DELAYED 1-1 data(%s,0x%04x)", grp_str, data)
             # Two-OSW group busy queued
             elif osw1_cmd == 0x300 and osw1_grp:
                 src_rid = osw2_addr
                 tgid = osw1_addr
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET GROUP BUSY QUEUED src(%05d) tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, src_rid, tgid, tgid >> 4))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET GROUP BUSY QUEUED src(%05d) tgid(%05d/0x%03x)", src_rid, tgid, tgid >> 4)
             # Two-OSW private call busy queued
             elif osw1_cmd == 0x302 and not osw1_grp:
                 src_rid = osw2_addr
                 tgt_rid = osw1_addr
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET PRIVATE CALL BUSY QUEUED src(%05d) tgt(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid, tgt_rid))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET PRIVATE CALL BUSY QUEUED src(%05d) tgt(%05d)", src_rid, tgt_rid)
             # Two-OSW emergency busy queued
             elif osw1_cmd == 0x303 and osw1_grp:
                 src_rid = osw2_addr
                 tgid = osw1_addr
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET EMERGENCY BUSY QUEUED src(%05d) tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, src_rid, tgid, tgid >> 4))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET EMERGENCY BUSY QUEUED src(%05d) tgid(%05d/0x%03x)", src_rid, tgid, tgid >> 4)
             # Possible out-of-order two-OSW system idle
             elif osw1_cmd == 0x308:
                 # Get next OSW in the queue
@@ -1084,7 +1085,7 @@ class osw_receiver(object):
                     grp_str = grp0_str
                     data = osw0_addr
                     if self.debug >= 11:
-                        sys.stderr.write("%s [%d] SMARTNET IDLE INTERLEAVED src(%05d) data(%s,0x%04x)\n" % (log_ts.get(), self.msgq_id, src_rid, grp_str, data))
+                        log_msg('osw', 11, self.msgq_id, "SMARTNET IDLE INTERLEAVED src(%05d) data(%s,0x%04x)", src_rid, grp_str, data)
                 # It's beyond repair, just mark it unknown
                 else:
                     # Track that we got an unknown OSW and put back unused OSW0 and OSW1
@@ -1094,13 +1095,13 @@ class osw_receiver(object):
 
                     if self.debug >= 11:
                         type_str = "UNKNOWN OSW AFTER BAD OSW" if is_queue_reset else "UNKNOWN OSW"
-                        sys.stderr.write("%s [%d] SMARTNET %s (0x%04x,%s,0x%03x)\n" % (log_ts.get(), self.msgq_id, type_str, osw2_addr, grp2_str, osw2_cmd))
+                        log_msg('osw', 11, self.msgq_id, "SMARTNET %s (0x%04x,%s,0x%03x)", type_str, osw2_addr, grp2_str, osw2_cmd)
             # Two-OSW dynamic regroup
             elif osw1_cmd == 0x30a and not osw2_grp and not osw1_grp:
                 src_rid = osw2_addr
                 tgid = osw1_addr
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET DYNAMIC REGROUP src(%05d) tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, src_rid, tgid, tgid >> 4))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET DYNAMIC REGROUP src(%05d) tgid(%05d/0x%03x)", src_rid, tgid, tgid >> 4)
             # One of many possible two- or three-OSW meanings...
             elif osw1_cmd == 0x30b:
                 # Get next OSW in the queue
@@ -1121,7 +1122,7 @@ class osw_receiver(object):
                     osw0_addr, osw0_grp, osw0_cmd, osw0_ch_rx, osw0_ch_tx, osw0_f_rx, osw0_f_tx, osw0_t = self.osw_q.popleft()
                     grp0_str = self.get_group_str(osw0_grp)
                     if self.debug >= 11:
-                        sys.stderr.write("%s [%d] SMARTNET IDLE DELAYED 2-1 data(%s,0x%04x)\n" % (log_ts.get(), self.msgq_id, grp_str, data))
+                        log_msg('osw', 11, self.msgq_id, "SMARTNET IDLE DELAYED 2-1 data(%s,0x%04x)", grp_str, data)
 
                 # Three-OSW system ID + control channel broadcast
                 if (
@@ -1136,7 +1137,7 @@ class osw_receiver(object):
                     self.rx_sys_id = system
                     self.rx_cc_freq = cc_freq * 1e6
                     if self.debug >= 11:
-                        sys.stderr.write("%s [%d] SMARTNET CONTROL CHANNEL 3 sys(0x%04x) cc_freq(%f) data(0x%02x)\n" % (log_ts.get(), self.msgq_id, system, cc_freq, data))
+                        log_msg('osw', 11, self.msgq_id, "SMARTNET CONTROL CHANNEL 3 sys(0x%04x) cc_freq(%f) data(0x%02x)", system, cc_freq, data)
                 # Two-OSW messages
                 else:
                     # Put back unused OSW0
@@ -1149,7 +1150,7 @@ class osw_receiver(object):
                         self.rx_sys_id = system
                         self.rx_cc_freq = cc_freq * 1e6
                         if self.debug >= 11:
-                            sys.stderr.write("%s [%d] SMARTNET CONTROL CHANNEL 2 sys(0x%04x) cc_freq(%f)\n" % (log_ts.get(), self.msgq_id, system, cc_freq))
+                            log_msg('osw', 11, self.msgq_id, "SMARTNET CONTROL CHANNEL 2 sys(0x%04x) cc_freq(%f)", system, cc_freq)
                     # System ID + adjacent/alternate control channel broadcast
                     elif (osw1_addr & 0xfc00) == 0x6000:
                         type_str = "ADJACENT" if osw1_grp else "ALTERNATE"
@@ -1161,7 +1162,7 @@ class osw_receiver(object):
                         if not osw1_grp:
                             self.add_alternate_cc_freq(osw1_t, cc_rx_freq, cc_tx_freq)
                         if self.debug >= 11:
-                            sys.stderr.write("%s [%d] SMARTNET %s CONTROL CHANNEL sys(0x%04x) cc_freq(%f)\n" % (log_ts.get(), self.msgq_id, type_str, system, cc_rx_freq))
+                            log_msg('osw', 11, self.msgq_id, "SMARTNET %s CONTROL CHANNEL sys(0x%04x) cc_freq(%f)", type_str, system, cc_rx_freq)
                     # Extended functions on groups
                     elif osw1_grp:
                         # Patch/multiselect cancel
@@ -1170,209 +1171,209 @@ class osw_receiver(object):
                             tgid = osw2_addr & 0xfff0
                             rc |= self.delete_patches(tgid)
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET %s CANCEL tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, type_str, tgid, tgid >> 4))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET %s CANCEL tgid(%05d/0x%03x)", type_str, tgid, tgid >> 4)
                         # Unknown extended function
                         else:
                             tgid = osw2_addr
                             opcode = osw1_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET GROUP EXTENDED FUNCTION tgid(%05d/0x%03x) opcode(0x%04x)\n" % (log_ts.get(), self.msgq_id, tgid, tgid >> 4, opcode))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET GROUP EXTENDED FUNCTION tgid(%05d/0x%03x) opcode(0x%04x)", tgid, tgid >> 4, opcode)
                     # Extended functions on individuals
                     else:
                         # Radio check
                         if osw1_addr == 0x261b:
                             tgt_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET RADIO CHECK tgt(%05d)\n" % (log_ts.get(), self.msgq_id, tgt_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET RADIO CHECK tgt(%05d)", tgt_rid)
                         # Deaffiliation
                         elif osw1_addr == 0x261c:
                             src_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DEAFFILIATION src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET DEAFFILIATION src(%05d)", src_rid)
                         # Status acknowledgement
                         elif osw1_addr >= 0x26e0 and osw1_addr <= 0x26e7:
                             src_rid = osw2_addr
                             status = (osw1_addr & 0x7) + 1
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET STATUS ACK src(%05d) status(%01d)\n" % (log_ts.get(), self.msgq_id, src_rid, status))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET STATUS ACK src(%05d) status(%01d)", src_rid, status)
                         # Emergency acknowledgement
                         elif osw1_addr == 0x26e8:
                             src_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET EMERGENCY ALARM ACK src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET EMERGENCY ALARM ACK src(%05d)", src_rid)
                         # Message acknowledgement
                         elif osw1_addr >= 0x26f0 and osw1_addr <= 0x26ff:
                             src_rid = osw2_addr
                             message = (osw0_addr & 0xf) + 1
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET MESSAGE ACK src(%05d) msg(%d)\n" % (log_ts.get(), self.msgq_id, src_rid, message))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET MESSAGE ACK src(%05d) msg(%d)", src_rid, message)
                         # Invalid talkgroup (e.g. TGID 0xfff)
                         elif osw1_addr == 0x2c04:
                             src_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED INVALID TALKGROUP src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET DENIED INVALID TALKGROUP src(%05d)", src_rid)
                         # Announcement listen only
                         elif osw1_addr == 0x2c11:
                             src_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED ANNOUNCEMENT LISTEN ONLY src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET DENIED ANNOUNCEMENT LISTEN ONLY src(%05d)", src_rid)
                         # Clear TX only
                         elif osw1_addr == 0x2c12:
                             src_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED CLEAR TX ONLY src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET DENIED CLEAR TX ONLY src(%05d)", src_rid)
                         # Listen only
                         elif osw1_addr == 0x2c13:
                             src_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED LISTEN ONLY src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET DENIED LISTEN ONLY src(%05d)", src_rid)
                         # No private call
                         elif osw1_addr == 0x2c14:
                             src_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED NO PRIVATE CALL src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET DENIED NO PRIVATE CALL src(%05d)", src_rid)
                         # Private call invalid ID
                         elif osw1_addr == 0x2c15:
                             src_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED PRIVATE CALL INVALID ID src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET DENIED PRIVATE CALL INVALID ID src(%05d)", src_rid)
                         # No interconnect
                         elif osw1_addr == 0x2c16:
                             src_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED NO INTERCONNECT src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET DENIED NO INTERCONNECT src(%05d)", src_rid)
                         # Unsupported mode (CVSD, digital)
                         elif osw1_addr == 0x2c20:
                             src_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED UNSUPPORTED MODE src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET DENIED UNSUPPORTED MODE src(%05d)", src_rid)
                         # Private call target offline
                         elif osw1_addr == 0x2c41:
                             src_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED PRIVATE CALL TARGET OFFLINE src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET DENIED PRIVATE CALL TARGET OFFLINE src(%05d)", src_rid)
                         # Group busy (call in progress)
                         elif osw1_addr == 0x2c47:
                             src_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED GROUP BUSY CALL IN PROGRESS src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET DENIED GROUP BUSY CALL IN PROGRESS src(%05d)", src_rid)
                         # Private call ring target offline
                         elif osw1_addr == 0x2c48:
                             src_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED PRIVATE CALL RING TARGET OFFLINE src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET DENIED PRIVATE CALL RING TARGET OFFLINE src(%05d)", src_rid)
                         # Radio ID and/or talkgroup forbidden on site
                         elif osw1_addr == 0x2c4a:
                             src_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED FORBIDDEN ON SITE src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET DENIED FORBIDDEN ON SITE src(%05d)", src_rid)
                         # Call alert invalid ID
                         elif osw1_addr == 0x2c4e:
                             src_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED CALL ALERT INVALID ID src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET DENIED CALL ALERT INVALID ID src(%05d)", src_rid)
                         # Call alert target offline
                         elif osw1_addr == 0x2c4f:
                             src_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED CALL ALERT TARGET OFFLINE src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET DENIED CALL ALERT TARGET OFFLINE src(%05d)", src_rid)
                         # Denied radio wrong modulation (e.g. radio digital, talkgroup analog)
                         elif osw1_addr == 0x2c56:
                             src_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED RADIO WRONG MODULATION src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET DENIED RADIO WRONG MODULATION src(%05d)", src_rid)
                         # OmniLink trespass rejected
                         elif osw1_addr == 0x2c60:
                             src_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED OMNILINK TRESPASS src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET DENIED OMNILINK TRESPASS src(%05d)", src_rid)
                         # Denied radio ID
                         elif osw1_addr == 0x2c65:
                             src_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED RADIO ID src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET DENIED RADIO ID src(%05d)", src_rid)
                         # Denied talkgroup ID
                         elif osw1_addr == 0x2c66:
                             src_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED TALKGROUP ID src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET DENIED TALKGROUP ID src(%05d)", src_rid)
                         # Group busy (call is just starting)
                         elif osw1_addr == 0x2c90:
                             src_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED GROUP BUSY CALL STARTING src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET DENIED GROUP BUSY CALL STARTING src(%05d)", src_rid)
                         # Private call target busy
                         elif osw1_addr == 0x2c96:
                             src_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED PRIVATE CALL TARGET BUSY src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET DENIED PRIVATE CALL TARGET BUSY src(%05d)", src_rid)
                         # Failsoft assign
                         elif osw1_addr == 0x8301:
                             tgt_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET FAILSOFT ASSIGN tgt(%05d)\n" % (log_ts.get(), self.msgq_id, tgt_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET FAILSOFT ASSIGN tgt(%05d)", tgt_rid)
                         # Selector unlocked
                         elif osw1_addr == 0x8302:
                             src_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET SELECTOR UNLOCKED src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET SELECTOR UNLOCKED src(%05d)", src_rid)
                         # Selector locked
                         elif osw1_addr == 0x8303:
                             src_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET SELECTOR LOCKED src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET SELECTOR LOCKED src(%05d)", src_rid)
                         # Failsoft canceled
                         elif osw1_addr == 0x8305:
                             src_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET FAILSOFT CANCELED src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET FAILSOFT CANCELED src(%05d)", src_rid)
                         # Radio inhibited
                         elif osw1_addr == 0x8307:
                             src_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET RADIO INHIBITED src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET RADIO INHIBITED src(%05d)", src_rid)
                         # Radio uninhibited
                         elif osw1_addr == 0x8308:
                             src_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET RADIO UNINHIBITED src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET RADIO UNINHIBITED src(%05d)", src_rid)
                         # Selector unlock
                         elif osw1_addr == 0x8312:
                             tgt_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET SELECTOR UNLOCK tgt(%05d)\n" % (log_ts.get(), self.msgq_id, tgt_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET SELECTOR UNLOCK tgt(%05d)", tgt_rid)
                         # Selector lock
                         elif osw1_addr == 0x8313:
                             tgt_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET SELECTOR LOCK tgt(%05d)\n" % (log_ts.get(), self.msgq_id, tgt_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET SELECTOR LOCK tgt(%05d)", tgt_rid)
                         # Failsoft cancel
                         elif osw1_addr == 0x8315:
                             tgt_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET FAILSOFT CANCEL tgt(%05d)\n" % (log_ts.get(), self.msgq_id, tgt_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET FAILSOFT CANCEL tgt(%05d)", tgt_rid)
                         # Radio inhibit
                         elif osw1_addr == 0x8317:
                             tgt_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET RADIO INHIBIT tgt(%05d)\n" % (log_ts.get(), self.msgq_id, tgt_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET RADIO INHIBIT tgt(%05d)", tgt_rid)
                         # Radio uninhibit
                         elif osw1_addr == 0x8318:
                             tgt_rid = osw2_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET RADIO UNINHIBIT tgt(%05d)\n" % (log_ts.get(), self.msgq_id, tgt_rid))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET RADIO UNINHIBIT tgt(%05d)", tgt_rid)
                         # Denial
                         elif (osw1_addr & 0xfc00) == 0x2c00:
                             src_rid = osw2_addr
                             reason = osw1_addr & 0x3ff
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET DENIED src(%05d) code(0x%03x)\n" % (log_ts.get(), self.msgq_id, src_rid, reason))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET DENIED src(%05d) code(0x%03x)", src_rid, reason)
                         # Unknown extended function
                         else:
                             src_rid = osw2_addr
                             opcode = osw1_addr
                             if self.debug >= 11:
-                                sys.stderr.write("%s [%d] SMARTNET INDIVIDUAL EXTENDED FUNCTION src(%05d) opcode(0x%04x)\n" % (log_ts.get(), self.msgq_id, src_rid, opcode))
+                                log_msg('osw', 11, self.msgq_id, "SMARTNET INDIVIDUAL EXTENDED FUNCTION src(%05d) opcode(0x%04x)", src_rid, opcode)
             # Two-OSW status / emergency / dynamic regroup acknowledgement
             elif osw1_cmd == 0x30d and not osw2_grp and not osw1_grp:
                 src_rid = osw2_addr
@@ -1381,62 +1382,62 @@ class osw_receiver(object):
                 if self.debug >= 11:
                     if opcode < 0x8:
                         status = opcode + 1
-                        sys.stderr.write("%s [%d] SMARTNET STATUS src(%05d) tgid(%05d/0x%03x) status(%01d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_tgid, dst_tgid >> 4, status))
+                        log_msg('osw', 11, self.msgq_id, "SMARTNET STATUS src(%05d) tgid(%05d/0x%03x) status(%01d)", src_rid, dst_tgid, dst_tgid >> 4, status)
                     elif opcode == 0x8:
-                        sys.stderr.write("%s [%d] SMARTNET EMERGENCY ALARM src(%05d) tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_tgid, dst_tgid >> 4))
+                        log_msg('osw', 11, self.msgq_id, "SMARTNET EMERGENCY ALARM src(%05d) tgid(%05d/0x%03x)", src_rid, dst_tgid, dst_tgid >> 4)
                     elif opcode == 0xa:
-                        sys.stderr.write("%s [%d] SMARTNET DYNAMIC REGROUP ACK src(%05d) tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_tgid, dst_tgid >> 4))
+                        log_msg('osw', 11, self.msgq_id, "SMARTNET DYNAMIC REGROUP ACK src(%05d) tgid(%05d/0x%03x)", src_rid, dst_tgid, dst_tgid >> 4)
                     else:
-                        sys.stderr.write("%s [%d] SMARTNET UNKNOWN STATUS src(%05d) tgid(%05d/0x%03x) opcode(%02d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_tgid, dst_tgid >> 4, opcode))
+                        log_msg('osw', 11, self.msgq_id, "SMARTNET UNKNOWN STATUS src(%05d) tgid(%05d/0x%03x) opcode(%02d)", src_rid, dst_tgid, dst_tgid >> 4, opcode)
             # Two-OSW affiliation
             elif osw1_cmd == 0x310 and not osw2_grp and not osw1_grp:
                 src_rid = osw2_addr
                 dst_tgid = osw1_addr & 0xfff0
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET AFFILIATION src(%05d) tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_tgid, dst_tgid >> 4))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET AFFILIATION src(%05d) tgid(%05d/0x%03x)", src_rid, dst_tgid, dst_tgid >> 4)
             # Two-OSW message
             elif osw1_cmd == 0x311 and not osw2_grp and not osw1_grp:
                 src_rid = osw2_addr
                 dst_tgid = osw1_addr & 0xfff0
                 message = (osw1_addr & 0xf) + 1
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET MESSAGE src(%05d) tgid(%05d/0x%03x) msg(%02d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_tgid, dst_tgid >> 4, message))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET MESSAGE src(%05d) tgid(%05d/0x%03x) msg(%02d)", src_rid, dst_tgid, dst_tgid >> 4, message)
             # Two-OSW encrypted private call ring
             elif osw1_cmd == 0x315 and not osw2_grp and not osw1_grp:
                 dst_rid = osw2_addr
                 src_rid = osw1_addr
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET ANALOG ENCRYPTED PRIVATE CALL RING src(%05d) dst(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_rid))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET ANALOG ENCRYPTED PRIVATE CALL RING src(%05d) dst(%05d)", src_rid, dst_rid)
             # Two-OSW clear private call ring
             elif osw1_cmd == 0x317 and not osw2_grp and not osw1_grp:
                 dst_rid = osw2_addr
                 src_rid = osw1_addr
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET ANALOG CLEAR PRIVATE CALL RING src(%05d) dst(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_rid))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET ANALOG CLEAR PRIVATE CALL RING src(%05d) dst(%05d)", src_rid, dst_rid)
             # Two-OSW private call ring acknowledgement
             elif osw1_cmd == 0x318 and not osw2_grp and not osw1_grp:
                 dst_rid = osw2_addr
                 src_rid = osw1_addr
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET PRIVATE CALL RING ACK src(%05d) dst(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_rid))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET PRIVATE CALL RING ACK src(%05d) dst(%05d)", src_rid, dst_rid)
             # Two-OSW call alert
             elif osw1_cmd == 0x319 and not osw2_grp and not osw1_grp:
                 dst_rid = osw2_addr
                 src_rid = osw1_addr
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET CALL ALERT src(%05d) dst(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_rid))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET CALL ALERT src(%05d) dst(%05d)", src_rid, dst_rid)
             # Two-OSW call alert acknowledgement
             elif osw1_cmd == 0x31a and not osw2_grp and not osw1_grp:
                 dst_rid = osw2_addr
                 src_rid = osw1_addr
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET CALL ALERT ACK src(%05d) dst(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_rid))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET CALL ALERT ACK src(%05d) dst(%05d)", src_rid, dst_rid)
             # Two-OSW OmniLink trespass permitted
             elif osw1_cmd == 0x31b and not osw2_grp and not osw1_grp:
                 src_rid = osw2_addr
                 system = osw1_addr
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET OMNILINK TRESPASS PERMITTED sys(0x%04x) src(%05d)\n" % (log_ts.get(), self.msgq_id, system, src_rid))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET OMNILINK TRESPASS PERMITTED sys(0x%04x) src(%05d)", system, src_rid)
             # Three-OSW system information
             elif osw1_cmd == 0x320:
                 # Get OSW0
@@ -1457,7 +1458,7 @@ class osw_receiver(object):
                     osw0_addr, osw0_grp, osw0_cmd, osw0_ch_rx, osw0_ch_tx, osw0_f_rx, osw0_f_tx, osw0_t = self.osw_q.popleft()
                     grp0_str = self.get_group_str(osw0_grp)
                     if self.debug >= 11:
-                        sys.stderr.write("%s [%d] SMARTNET IDLE DELAYED 2-2 data(%s,0x%04x)\n" % (log_ts.get(), self.msgq_id, grp_str, data))
+                        log_msg('osw', 11, self.msgq_id, "SMARTNET IDLE DELAYED 2-2 data(%s,0x%04x)", grp_str, data)
 
                 # The information returned here may be for this site, or may be for other adjacent sites
                 if osw0_cmd == 0x30b and osw0_addr & 0xfc00 == 0x6000:
@@ -1477,7 +1478,7 @@ class osw_receiver(object):
                         self.rx_site_id = site
                         self.add_alternate_cc_freq(osw1_t, cc_rx_freq, cc_tx_freq)
                     if self.debug >= 11:
-                        sys.stderr.write("%s [%d] SMARTNET %s sys(0x%04x) site(%02d) band(%s) features(%s) cc_freq(%f)\n" % (log_ts.get(), self.msgq_id, type_str, system, site, self.get_band_str(band), self.get_features_str(feat), cc_rx_freq))
+                        log_msg('osw', 11, self.msgq_id, "SMARTNET %s sys(0x%04x) site(%02d) band(%s) features(%s) cc_freq(%f)", type_str, system, site, self.get_band_str(band), self.get_features_str(feat), cc_rx_freq)
                 else:
                     # Track that we got an unknown OSW and put back unused OSW0
                     is_unknown_osw = True
@@ -1513,13 +1514,13 @@ class osw_receiver(object):
                 hour      = (osw1_addr & 0x1f00) >> 8
                 minute    = osw1_addr & 0xff
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET DATE/TIME %04d-%02d-%02d %02d:%02d (%s)\n" % (log_ts.get(), self.msgq_id, year, month, day, hour, minute, dayofweek_str))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET DATE/TIME %04d-%02d-%02d %02d:%02d (%s)", year, month, day, hour, minute, dayofweek_str)
             # Two-OSW emergency PTT
             elif osw1_cmd == 0x32e and osw2_grp and osw1_grp:
                 src_rid = osw2_addr
                 dst_tgid = osw1_addr & 0xfff0
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET EMEREGENCY PTT src(%05d) tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_tgid, dst_tgid >> 4))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET EMEREGENCY PTT src(%05d) tgid(%05d/0x%03x)", src_rid, dst_tgid, dst_tgid >> 4)
             # Two-OSW patch/multiselect
             elif osw1_cmd == 0x340 and osw2_grp and osw1_grp and (self.is_patch_group(osw2_addr) or self.is_multiselect_group(osw2_addr)):
                 type_str = self.get_call_options_str(osw2_addr, include_clear=False)
@@ -1529,9 +1530,9 @@ class osw_receiver(object):
                 rc |= self.add_patch(osw1_t, tgid, sub_tgid, mode)
                 if self.debug >= 11:
                     if tgid == sub_tgid:
-                        sys.stderr.write("%s [%d] SMARTNET %s tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, type_str, tgid, tgid >> 4))
+                        log_msg('osw', 11, self.msgq_id, "SMARTNET %s tgid(%05d/0x%03x)", type_str, tgid, tgid >> 4)
                     else:
-                        sys.stderr.write("%s [%d] SMARTNET %s tgid(%05d/0x%03x) sub_tgid(%05d/0x%03x)\n" % (log_ts.get(), self.msgq_id, type_str, tgid, tgid >> 4, sub_tgid, sub_tgid >> 4))
+                        log_msg('osw', 11, self.msgq_id, "SMARTNET %s tgid(%05d/0x%03x) sub_tgid(%05d/0x%03x)", type_str, tgid, tgid >> 4, sub_tgid, sub_tgid >> 4)
             else:
                 # Track that we got an unknown OSW; OSW1 did not match, so put it back in the queue
                 is_unknown_osw = True
@@ -1539,7 +1540,7 @@ class osw_receiver(object):
 
                 if self.debug >= 11:
                     type_str = "UNKNOWN OSW AFTER BAD OSW" if is_queue_reset else "UNKNOWN OSW"
-                    sys.stderr.write("%s [%d] SMARTNET %s (0x%04x,%s,0x%03x)\n" % (log_ts.get(), self.msgq_id, type_str, osw2_addr, grp2_str, osw2_cmd))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET %s (0x%04x,%s,0x%03x)", type_str, osw2_addr, grp2_str, osw2_cmd)
         # Two-OSW message
         elif osw2_cmd == 0x321:
             # Get next OSW in the queue
@@ -1552,14 +1553,14 @@ class osw_receiver(object):
                 vc_freq = osw1_f_rx
                 rc |= self.update_voice_frequency(osw1_t, vc_freq, dst_tgid, src_rid, mode=1)
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET DIGITAL %s GROUP GRANT src(%05d) tgid(%05d/0x%03x) vc_freq(%f)\n" % (log_ts.get(), self.msgq_id, self.get_call_options_str(dst_tgid), src_rid, dst_tgid, dst_tgid >> 4, vc_freq))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET DIGITAL %s GROUP GRANT src(%05d) tgid(%05d/0x%03x) vc_freq(%f)", self.get_call_options_str(dst_tgid), src_rid, dst_tgid, dst_tgid >> 4, vc_freq)
             # Two-OSW digital private call voice grant/update (sent for duration of the call)
             elif osw1_ch_rx and not osw1_grp and (osw1_addr != 0) and (osw2_addr != 0):
                 dst_rid = osw2_addr
                 src_rid = osw1_addr
                 vc_freq = osw1_f_rx
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET DIGITAL PRIVATE CALL src(%05d) dst(%05d) vc_freq(%f)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_rid, vc_freq))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET DIGITAL PRIVATE CALL src(%05d) dst(%05d) vc_freq(%f)", src_rid, dst_rid, vc_freq)
             # One- or two-OSW system idle
             elif osw1_cmd == 0x2f8:
                 # Get next OSW in the queue
@@ -1575,7 +1576,7 @@ class osw_receiver(object):
                     grp_str = grp1_str
                     data = osw1_addr
                     if self.debug >= 11:
-                        sys.stderr.write("%s [%d] SMARTNET IDLE DIGITAL src(%05d) data(%s,0x%04x)\n" % (log_ts.get(), self.msgq_id, src_rid, grp_str, data))
+                        log_msg('osw', 11, self.msgq_id, "SMARTNET IDLE DIGITAL src(%05d) data(%s,0x%04x)", src_rid, grp_str, data)
                 # One-OSW system idle that was delayed by one OSW and is now stuck in the middle of a different two- or
                 # three-OSW message.
                 #
@@ -1592,19 +1593,19 @@ class osw_receiver(object):
                     grp_str = grp1_str
                     data = osw1_addr
                     if self.debug >= 11:
-                        sys.stderr.write("%s [%d] SMARTNET IDLE DELAYED 1-2 data(%s,0x%04x)\n" % (log_ts.get(), self.msgq_id, grp_str, data))
+                        log_msg('osw', 11, self.msgq_id, "SMARTNET IDLE DELAYED 1-2 data(%s,0x%04x)", grp_str, data)
             # Two-OSW encrypted private call ring
             elif osw1_cmd == 0x315 and not osw2_grp and not osw1_grp:
                 dst_rid = osw2_addr
                 src_rid = osw1_addr
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET DIGITAL ENCRYPTED PRIVATE CALL RING src(%05d) dst(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_rid))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET DIGITAL ENCRYPTED PRIVATE CALL RING src(%05d) dst(%05d)", src_rid, dst_rid)
             # Two-OSW clear private call ring
             elif osw1_cmd == 0x317 and not osw2_grp and not osw1_grp:
                 dst_rid = osw2_addr
                 src_rid = osw1_addr
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET DIGITAL CLEAR PRIVATE CALL RING src(%05d) dst(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid, dst_rid))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET DIGITAL CLEAR PRIVATE CALL RING src(%05d) dst(%05d)", src_rid, dst_rid)
             else:
                 # Track that we got an unknown OSW; OSW1 did not match, so put it back in the queue
                 is_unknown_osw = True
@@ -1612,29 +1613,29 @@ class osw_receiver(object):
 
                 if self.debug >= 11:
                     type_str = "UNKNOWN OSW AFTER BAD OSW" if is_queue_reset else "UNKNOWN OSW"
-                    sys.stderr.write("%s [%d] SMARTNET %s (0x%04x,%s,0x%03x)\n" % (log_ts.get(), self.msgq_id, type_str, osw2_addr, grp2_str, osw2_cmd))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET %s (0x%04x,%s,0x%03x)", type_str, osw2_addr, grp2_str, osw2_cmd)
         # One-OSW interconnect reject
         elif osw2_cmd == 0x324 and not osw2_grp:
             src_rid = osw2_addr
             if self.debug >= 11:
-                sys.stderr.write("%s [%d] SMARTNET INTERCONNECT REJECT src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+                log_msg('osw', 11, self.msgq_id, "SMARTNET INTERCONNECT REJECT src(%05d)", src_rid)
         # One-OSW send affiliation request
         elif osw2_cmd == 0x32a and osw2_grp:
             tgt_rid = osw2_addr
             if self.debug >= 11:
-                sys.stderr.write("%s [%d] SMARTNET SEND AFFILIATION REQUEST tgt(%05d)\n" % (log_ts.get(), self.msgq_id, tgt_rid))
+                log_msg('osw', 11, self.msgq_id, "SMARTNET SEND AFFILIATION REQUEST tgt(%05d)", tgt_rid)
         # One-OSW system ID / scan marker
         elif osw2_cmd == 0x32b and not osw2_grp:
             system   = osw2_addr
             type_str = "II"
             self.rx_sys_id = system
             if self.debug >= 11:
-                sys.stderr.write("%s [%d] SMARTNET SYSTEM sys(0x%04x) type(%s)\n" % (log_ts.get(), self.msgq_id, system, type_str))
+                log_msg('osw', 11, self.msgq_id, "SMARTNET SYSTEM sys(0x%04x) type(%s)", system, type_str)
         # One-OSW roaming
         elif osw2_cmd == 0x32c and not osw2_grp:
             src_rid = osw2_addr
             if self.debug >= 11:
-                sys.stderr.write("%s [%d] SMARTNET ROAMING src(%05d)\n" % (log_ts.get(), self.msgq_id, src_rid))
+                log_msg('osw', 11, self.msgq_id, "SMARTNET ROAMING src(%05d)", src_rid)
         # One-OSW AMSS (Automatic Multiple Site Select) message
         elif osw2_cmd >= 0x360 and osw2_cmd <= 0x39f:
             # Sites are encoded as 0-indexed but usually referred to as 1-indexed
@@ -1646,7 +1647,7 @@ class osw_receiver(object):
                 data_str = " data(%s,0x%04x)" % (grp2_str, osw2_addr)
             self.rx_site_id = site
             if self.debug >= 11:
-                sys.stderr.write("%s [%d] SMARTNET AMSS site(%02d)%s\n" % (log_ts.get(), self.msgq_id, site, data_str))
+                log_msg('osw', 11, self.msgq_id, "SMARTNET AMSS site(%02d)%s", site, data_str)
         # One-OSW BSI / diagnostic
         elif osw2_cmd == 0x3a0 and osw2_grp:
             # Note that this is still highly speculative - it seems correct for the values that are defined below, but
@@ -1673,21 +1674,21 @@ class osw_receiver(object):
                     component_str = "unknown 0x%02x" % (component)
 
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET DIAGNOSTIC STATUS opcode(0x%01x) component(%s) status(%s)\n" % (log_ts.get(), self.msgq_id, opcode, component_str, status_str))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET DIAGNOSTIC STATUS opcode(0x%01x) component(%s) status(%s)", opcode, component_str, status_str)
             elif opcode == 0xe or opcode == 0xf:
                 action_str = "BSI" if opcode == 0xf else "END BSI"
                 if self.debug >= 11:
                     if self.is_chan(osw2_addr & 0x3ff):
                         data = (osw2_addr & 0xc00) >> 10
                         vc_freq = self.get_freq(osw2_addr & 0x3ff)
-                        sys.stderr.write("%s [%d] SMARTNET %s data(0x%01x) vc_freq(%f)\n" % (log_ts.get(), self.msgq_id, action_str, data, vc_freq))
+                        log_msg('osw', 11, self.msgq_id, "SMARTNET %s data(0x%01x) vc_freq(%f)", action_str, data, vc_freq)
                     else:
                         data = osw2_addr & 0xfff
-                        sys.stderr.write("%s [%d] SMARTNET %s data(0x%03x)\n" % (log_ts.get(), self.msgq_id, action_str, data, vc_freq))
+                        log_msg('osw', 11, self.msgq_id, "SMARTNET %s data(0x%03x)", action_str, data, vc_freq)
             else:
                 data = osw2_addr & 0x3ff
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET DIAGNOSTIC opcode(0x%01x) data(0x%03x)\n" % (log_ts.get(), self.msgq_id, opcode, data))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET DIAGNOSTIC opcode(0x%01x) data(0x%03x)", opcode, data)
         # One-OSW system status update
         elif osw2_cmd == 0x3bf or osw2_cmd == 0x3c0:
             scope = "SYSTEM" if osw2_cmd == 0x3c0 else "NETWORK"
@@ -1702,7 +1703,7 @@ class osw_receiver(object):
                 connect_tone_str     = self.get_connect_tone(connect_tone)
                 interconnect_timeout = (data & 0x1f)
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET %s STATUS type(%s) connect_tone(%.02f) dispatch_timeout(%d) interconnect_timeout(%d) bitG(%s)\n" % (log_ts.get(), self.msgq_id, scope, type_str, connect_tone_str, dispatch_timeout, interconnect_timeout, bitG))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET %s STATUS type(%s) connect_tone(%.02f) dispatch_timeout(%d) interconnect_timeout(%d) bitG(%s)", scope, type_str, connect_tone_str, dispatch_timeout, interconnect_timeout, bitG)
             elif opcode == 2:
                 no_secure        = (data & 0x1000) >> 12
                 secure_upgrade   = (data & 0x800) >> 11
@@ -1748,13 +1749,13 @@ class osw_receiver(object):
                     sys.stderr.write(" simulcast(%d) site_trunk(%d) bit6_5(0x%01x) bit3(%d) bit0(%d) bitG(%s)\n" % (simulcast, site_trunk, bit6_5, bit3, bit0, bitG))
             else:
                 if self.debug >= 11:
-                    sys.stderr.write("%s [%d] SMARTNET %s STATUS opcode(0x%x) data(0x%04x) bitG(%s)\n" % (log_ts.get(), self.msgq_id, scope, grp2_str, opcode, data, bitG))
+                    log_msg('osw', 11, self.msgq_id, "SMARTNET %s STATUS opcode(0x%x) data(0x%04x) bitG(%s)", scope, grp2_str, opcode, data, bitG)
         else:
             # Track that we got an unknown OSW
             is_unknown_osw = True
             if self.debug >= 11:
                 type_str = "UNKNOWN OSW AFTER BAD OSW" if is_queue_reset else "UNKNOWN OSW"
-                sys.stderr.write("%s [%d] SMARTNET %s (0x%04x,%s,0x%03x)\n" % (log_ts.get(), self.msgq_id, type_str, osw2_addr, grp2_str, osw2_cmd))
+                log_msg('osw', 11, self.msgq_id, "SMARTNET %s (0x%04x,%s,0x%03x)", type_str, osw2_addr, grp2_str, osw2_cmd)
 
         # If we got an unknown OSW after a queue reset, put back the queue reset message so that we know the next
         # unknown OSW is likely caused by the queue reset as well
@@ -1778,7 +1779,7 @@ class osw_receiver(object):
             sorted_freqs = collections.OrderedDict(sorted(self.voice_frequencies.items()))
             self.voice_frequencies = sorted_freqs
             if self.debug >= 5:
-                sys.stderr.write('%s [%d] new freq=%f\n' % (log_ts.get(), self.msgq_id, (frequency/1e6)))
+                log_msg('smartnet', 5, self.msgq_id, 'new freq=%f', (frequency/1e6))
 
         # If we get a valid mode, store it
         if mode != -1:
@@ -1807,7 +1808,7 @@ class osw_receiver(object):
             for sub_tgid in patch_list:
                 self.update_talkgroup(ts, frequency, sub_tgid, srcaddr, mode)
                 if self.debug >= 5:
-                    sys.stderr.write('%s [%d] update_talkgroups: tgid(%d) patched sub_tgid(%d)\n' % (log_ts.get(), self.msgq_id, tgid, sub_tgid))
+                    log_msg('smartnet', 5, self.msgq_id, 'update_talkgroups: tgid(%d) patched sub_tgid(%d)', tgid, sub_tgid)
         return rc
 
     def update_talkgroup(self, ts, frequency, tgid, srcaddr, mode=-1):
@@ -1815,15 +1816,15 @@ class osw_receiver(object):
         tgid_stat = tgid & 0x000f
         with self.talkgroups_mutex:
             if self.debug >= 5:
-                sys.stderr.write('%s [%d] set tgid=%s, status=0x%x, srcaddr=%s\n' % (log_ts.get(), self.msgq_id, base_tgid, tgid_stat, srcaddr))
+                log_msg('smartnet', 5, self.msgq_id, 'set tgid=%s, status=0x%x, srcaddr=%s', base_tgid, tgid_stat, srcaddr)
 
             if base_tgid not in self.talkgroups:
                 self.add_default_tgid(base_tgid)
                 if self.debug >= 5:
-                    sys.stderr.write('%s [%d] new tgid=%s %s prio %d\n' % (log_ts.get(), self.msgq_id, base_tgid, self.talkgroups[base_tgid]['tag'], self.talkgroups[base_tgid]['prio']))
+                    log_msg('smartnet', 5, self.msgq_id, 'new tgid=%s %s prio %d', base_tgid, self.talkgroups[base_tgid]['tag'], self.talkgroups[base_tgid]['prio'])
             elif ts < self.talkgroups[base_tgid]['release_time']: # screen out late arriving OSWs where subsequent action has already been taken
                 if self.debug >= 5:
-                    sys.stderr.write('%s [%d] ignorning stale OSW for tgid=%s, time_diff=%f\n' % (log_ts.get(), self.msgq_id, base_tgid, (ts - self.talkgroups[base_tgid]['release_time'])))
+                    log_msg('smartnet', 5, self.msgq_id, 'ignorning stale OSW for tgid=%s, time_diff=%f', base_tgid, (ts - self.talkgroups[base_tgid]['release_time']))
                 return False
             self.talkgroups[base_tgid]['time'] = time.time()
             self.talkgroups[base_tgid]['release_time'] = 0
@@ -1863,7 +1864,7 @@ class osw_receiver(object):
         for tgid in tg_expire_list:
             if self.talkgroups[tgid]['receiver'] is not None: 
                 if self.debug > 1:
-                    sys.stderr.write("%s [%d] expiring tg(%d), freq(%f)\n" % (log_ts.get(), self.msgq_id, tgid, (self.talkgroups[tgid]['frequency']/1e6)))
+                    log_msg('smartnet', 2, self.msgq_id, "expiring tg(%d), freq(%f)", tgid, (self.talkgroups[tgid]['frequency']/1e6))
                 self.talkgroups[tgid]['receiver'].expire_talkgroup(reason="expiry")
                 rc = True
         return rc
@@ -1878,7 +1879,7 @@ class osw_receiver(object):
                 self.patches[tgid][sub_tgid] = {'time': ts, 'mode': mode}
                 if self.debug >= 5:
                     action_str = "updated" if is_update else "added"
-                    sys.stderr.write("%s [%d] add_patch: %s patch to tgid(%d) from sub_tgid(%d)\n" % (log_ts.get(), self.msgq_id, action_str, tgid, sub_tgid))
+                    log_msg('smartnet', 5, self.msgq_id, "add_patch: %s patch to tgid(%d) from sub_tgid(%d)", action_str, tgid, sub_tgid)
 
         return True
 
@@ -1889,7 +1890,7 @@ class osw_receiver(object):
         with self.patches_mutex:
             del self.patches[tgid]
             if self.debug >= 5:
-                sys.stderr.write("%s [%d] delete_patches: deleted all patches to tgid(%d)\n" % (log_ts.get(), self.msgq_id, tgid))
+                log_msg('smartnet', 5, self.msgq_id, "delete_patches: deleted all patches to tgid(%d)", tgid)
 
         return True
 
@@ -1902,11 +1903,11 @@ class osw_receiver(object):
                         deleted += 1
                         del self.patches[tgid][sub_tgid]
                         if self.debug >= 5:
-                            sys.stderr.write("%s [%d] expire_patches: expired patch to tgid(%d) from sub_tgid(%d)\n" % (log_ts.get(), self.msgq_id, tgid, sub_tgid))
+                            log_msg('smartnet', 5, self.msgq_id, "expire_patches: expired patch to tgid(%d) from sub_tgid(%d)", tgid, sub_tgid)
                 if len(list(self.patches[tgid].keys())) == 0:
                     del self.patches[tgid]
                     if self.debug >= 5:
-                        sys.stderr.write("%s [%d] expire_patches: expired all patches to tgid(%d)\n" % (log_ts.get(), self.msgq_id, tgid))
+                        log_msg('smartnet', 5, self.msgq_id, "expire_patches: expired all patches to tgid(%d)", tgid)
 
         return deleted
 
@@ -1916,7 +1917,7 @@ class osw_receiver(object):
         self.alternate_cc_freqs[cc_freq_key] = {'time': ts, 'cc_rx_freq': cc_rx_freq, 'cc_tx_freq': cc_tx_freq}
         if self.debug >= 5:
             action_str = "updated" if is_update else "added"
-            sys.stderr.write("%s [%d] add_alternate_cc_freq: %s alternate cc_freq(%f)\n" % (log_ts.get(), self.msgq_id, action_str, cc_rx_freq))
+            log_msg('smartnet', 5, self.msgq_id, "add_alternate_cc_freq: %s alternate cc_freq(%f)", action_str, cc_rx_freq)
         return True
 
     def expire_alternate_cc_freqs(self, curr_time):
@@ -1924,7 +1925,7 @@ class osw_receiver(object):
             if curr_time > self.alternate_cc_freqs[freq]['time'] + ALT_CC_EXPIRY_TIME:
                 del self.alternate_cc_freqs[freq]
                 if self.debug >= 5:
-                    sys.stderr.write("%s [%d] expire_alternate_cc_freqs: expired cc_freq(%f)\n" % (log_ts.get(), self.msgq_id, freq / 1e6))
+                    log_msg('smartnet', 5, self.msgq_id, "expire_alternate_cc_freqs: expired cc_freq(%f)", freq / 1e6)
         return True
 
     def add_adjacent_site(self, ts, site, cc_rx_freq, cc_tx_freq):
@@ -1932,7 +1933,7 @@ class osw_receiver(object):
         self.adjacent_sites[site] = {'time': ts, 'cc_rx_freq': cc_rx_freq, 'cc_tx_freq': cc_tx_freq}
         if self.debug >= 5:
             action_str = "updated" if is_update else "added"
-            sys.stderr.write("%s [%d] add_adjacent_site: %s adjacent site(%d)\n" % (log_ts.get(), self.msgq_id, action_str, site))
+            log_msg('smartnet', 5, self.msgq_id, "add_adjacent_site: %s adjacent site(%d)", action_str, site)
         return True
 
     def expire_adjacent_sites(self, curr_time):
@@ -1940,7 +1941,7 @@ class osw_receiver(object):
             if curr_time > self.adjacent_sites[site]['time'] + ADJ_SITE_EXPIRY_TIME:
                 del self.adjacent_sites[site]
                 if self.debug >= 5:
-                    sys.stderr.write("%s [%d] expire_adjacent_sites: expired site(%d)\n" % (log_ts.get(), self.msgq_id, site))
+                    log_msg('smartnet', 5, self.msgq_id, "expire_adjacent_sites: expired site(%d)", site)
         return True
 
     def dump_tgids(self):
@@ -2095,7 +2096,7 @@ class voice_receiver(object):
 
     def post_init(self):
         if self.debug >= 1:
-            sys.stderr.write("%s [%d] Initializing voice channel\n" % (log_ts.get(), self.msgq_id))
+            log_msg('smartnet', 1, self.msgq_id, "Initializing voice channel")
         self.fa_ctrl({'tuner': self.msgq_id, 'cmd': 'set_slotid', 'slotid': 4})     # disable voice
         if self.control is not None:
             self.talkgroups = self.control.get_talkgroups()
@@ -2106,13 +2107,13 @@ class voice_receiver(object):
     def load_bl_wl(self):
         self.skiplist = self.control.get_skiplist()
         if 'blacklist' in self.config and self.config['blacklist'] != "":
-            sys.stderr.write("%s [%d] reading channel blacklist file: %s\n" % (log_ts.get(), self.msgq_id, self.config['blacklist']))
+            log_msg('smartnet', 0, self.msgq_id, "reading channel blacklist file: %s", self.config['blacklist'])
             self.blacklist = get_int_dict(self.config['blacklist'], self.msgq_id)
         else:
             self.blacklist = self.control.get_blacklist()
 
         if 'whitelist' in self.config and self.config['whitelist'] != "":
-            sys.stderr.write("%s [%d] reading channel whitelist file: %s\n" % (log_ts.get(), self.msgq_id, self.config['whitelist']))
+            log_msg('smartnet', 0, self.msgq_id, "reading channel whitelist file: %s", self.config['whitelist'])
             self.whitelist = get_int_dict(self.config['whitelist'], self.msgq_id)
         else:
             self.whitelist = self.control.get_whitelist()
@@ -2146,7 +2147,7 @@ class voice_receiver(object):
         elif (m_type == -4): # P25 sync established (indicates this is a digital channel)
             if self.current_tgid is not None:
                 if self.debug >= 9:
-                    sys.stderr.write("%s [%d] digital sync detected:  tg(%d), freq(%f), mode(%d)\n" % (log_ts.get(), self.msgq_id, self.current_tgid, (self.tuned_frequency/1e6), self.talkgroups[self.current_tgid]['mode']))
+                    log_msg('smartnet', 9, self.msgq_id, "digital sync detected:  tg(%d), freq(%f), mode(%d)", self.current_tgid, (self.tuned_frequency/1e6), self.talkgroups[self.current_tgid]['mode'])
                 self.nbfm_ctrl(self.msgq_id, False)                 # disable nbfm
                 with self.control.talkgroups_mutex:
                     self.talkgroups[self.current_tgid]['mode'] = 1  # set mode to digital
@@ -2160,13 +2161,13 @@ class voice_receiver(object):
     def add_skiplist(self, tgid, end_time=None):
         if not tgid or (tgid <= 0) or (tgid > 65534):
             if self.debug > 1:
-                sys.stderr.write("%s [%d] skiplist tgid(%d) out of range (1-65534)\n" % (log_ts.get(), self.msgq_id, tgid))
+                log_msg('smartnet', 2, self.msgq_id, "skiplist tgid(%d) out of range (1-65534)", tgid)
             return
         if tgid in self.skiplist:
             return
         self.skiplist[tgid] = end_time
         if self.debug > 1:
-            sys.stderr.write("%s [%d] skiplisting: tgid(%d)\n" % (log_ts.get(), self.msgq_id, tgid))
+            log_msg('smartnet', 2, self.msgq_id, "skiplisting: tgid(%d)", tgid)
         if self.current_tgid and self.current_tgid in self.skiplist:
             self.expire_talkgroup(reason = "skiplisted")
             self.hold_mode = False
@@ -2176,21 +2177,21 @@ class voice_receiver(object):
     def add_blacklist(self, tgid, end_time=None):
         if not tgid or (tgid <= 0) or (tgid > 65534):
             if self.debug > 0:
-                sys.stderr.write("%s [%d] blacklist tgid(%d) out of range (1-65534)\n" % (log_ts.get(), self.msgq_id, tgid))
+                log_msg('smartnet', 1, self.msgq_id, "blacklist tgid(%d) out of range (1-65534)", tgid)
             return
         if tgid in self.blacklist:
             return
         if end_time is None and self.whitelist and tgid in self.whitelist:
             self.whitelist.pop(tgid)
             if self.debug > 1:
-                sys.stderr.write("%s [%d] de-whitelisting: tgid(%d)\n" % (log_ts.get(), self.msgq_id, tgid))
+                log_msg('smartnet', 2, self.msgq_id, "de-whitelisting: tgid(%d)", tgid)
             if len(self.whitelist) == 0:
                 self.whitelist = None
                 if self.debug > 1:
                     sys.stderr.write("%s removing empty whitelist\n" % log_ts.get())
         self.blacklist[tgid] = end_time
         if self.debug > 1:
-            sys.stderr.write("%s [%d] blacklisting tgid(%d)\n" % (log_ts.get(), self.msgq_id, tgid))
+            log_msg('smartnet', 2, self.msgq_id, "blacklisting tgid(%d)", tgid)
         if self.current_tgid and self.current_tgid in self.blacklist:
             self.expire_talkgroup(reason = "blacklisted")
             self.hold_mode = False
@@ -2200,19 +2201,19 @@ class voice_receiver(object):
     def add_whitelist(self, tgid):
         if not tgid or (tgid <= 0) or (tgid > 65534):
             if self.debug > 0:
-                sys.stderr.write("%s [%d] whitelist tgid(%d) out of range (1-65534)\n" % (log_ts.get(), self.msgq_id, tgid))
+                log_msg('smartnet', 1, self.msgq_id, "whitelist tgid(%d) out of range (1-65534)", tgid)
             return
         if self.blacklist and tgid in self.blacklist:
             self.blacklist.pop(tgid)
             if self.debug > 1:
-                sys.stderr.write("%s [%d] de-blacklisting tgid(%d)\n" % (log_ts.get(), self.msgq_id, tgid))
+                log_msg('smartnet', 2, self.msgq_id, "de-blacklisting tgid(%d)", tgid)
         if self.whitelist is None:
             self.whitelist = {}
         if tgid in self.whitelist:
             return
         self.whitelist[tgid] = None
         if self.debug > 1:
-            sys.stderr.write("%s [%d] whitelisting tgid(%d)\n" % (log_ts.get(), self.msgq_id, tgid))
+            log_msg('smartnet', 2, self.msgq_id, "whitelisting tgid(%d)", tgid)
         if self.current_tgid and self.current_tgid not in self.whitelist:
             self.expire_talkgroup(reason = "not whitelisted")
             self.hold_mode = False
@@ -2233,7 +2234,7 @@ class voice_receiver(object):
         for tg in expired_tgs:
             self.skiplist.pop(tg)
             if self.debug > 1:
-                sys.stderr.write("%s [%d] removing expired skiplist: tg(%d)\n" % (log_ts.get(), self.msgq_id, tg));
+                log_msg('smartnet', 2, self.msgq_id, "removing expired skiplist: tg(%d)", tg)
 
     def find_talkgroup(self, start_time, tgid=None, hold=False):
         tgt_tgid = None
@@ -2276,12 +2277,12 @@ class voice_receiver(object):
 
         if self.current_tgid is None:
             if self.debug > 0:
-                sys.stderr.write("%s [%d] voice update:  tg(%d), freq(%f), mode(%d)\n" % (log_ts.get(), self.msgq_id, tgid, (freq/1e6), self.talkgroups[tgid]['mode']))
+                log_msg('smartnet', 1, self.msgq_id, "voice update:  tg(%d), freq(%f), mode(%d)", tgid, (freq/1e6), self.talkgroups[tgid]['mode'])
             self.tune_voice(freq, tgid)
             self.log_call(freq, self.talkgroups[tgid]['prio'], tgid, self.talkgroups[tgid]['srcaddr'])
         else:
             if self.debug > 0:
-                sys.stderr.write("%s [%d] voice preempt: tg(%d), freq(%f), mode(%d)\n" % (log_ts.get(), self.msgq_id, tgid, (freq/1e6), self.talkgroups[tgid]['mode']))
+                log_msg('smartnet', 1, self.msgq_id, "voice preempt: tg(%d), freq(%f), mode(%d)", tgid, (freq/1e6), self.talkgroups[tgid]['mode'])
             self.expire_talkgroup(update_meta=False, reason="preempt")
             self.tune_voice(freq, tgid)
             self.log_call(freq, self.talkgroups[tgid]['prio'], tgid, self.talkgroups[tgid]['srcaddr'])
@@ -2292,7 +2293,7 @@ class voice_receiver(object):
         if tgid > 0:
             if self.whitelist is not None and tgid not in self.whitelist:
                 if self.debug > 1:
-                    sys.stderr.write("%s [%d] hold tg(%d) not in whitelist\n" % (log_ts.get(), self.msgq_id, tgid))
+                    log_msg('smartnet', 2, self.msgq_id, "hold tg(%d) not in whitelist", tgid)
                 return
             with self.control.talkgroups_mutex:
                 self.control.add_default_tgid(tgid)
@@ -2346,7 +2347,7 @@ class voice_receiver(object):
             self.talkgroups[self.current_tgid]['srcaddr'] = 0
             self.talkgroups[self.current_tgid]['release_time'] = expire_time
         if self.debug > 1:
-            sys.stderr.write("%s [%d] releasing:  tg(%d), freq(%f), reason(%s)\n" % (log_ts.get(), self.msgq_id, self.current_tgid, (self.tuned_frequency/1e6), reason))
+            log_msg('smartnet', 2, self.msgq_id, "releasing:  tg(%d), freq(%f), reason(%s)", self.current_tgid, (self.tuned_frequency/1e6), reason)
         if auto_hold:
             self.hold_tgid = self.current_tgid
             self.hold_until = expire_time + TGID_HOLD_TIME
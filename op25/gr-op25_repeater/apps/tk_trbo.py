@@ -27,11 +27,17 @@ import json
 import traceback
 from helper_funcs import *
 from log_ts import log_ts
+from log_ring import log_msg
 
 CC_HUNT_TIMEOUTS = 3   # number of sync timeouts to wait until control channel hunt
 VC_SRCH_TIME     = 3.0 # seconds to wait from VC tuning until hunt
 TGID_HOLD_TIME   = 2.0 # seconds to wait until releasing tgid after last GRANT message
 
+# Fixed layouts unpacked in one pass by bit_struct; (bit offset, width) from the msb
+CPLUS_GRANT_FIELDS = bit_struct(9,  [(16, 24), (40, 24), (64, 4), (68, 1)])           # src_addr, grp_addr, lcn, slot
+LC_FIELDS          = bit_struct(9,  [(2, 6), (8, 8), (16, 8), (24, 24), (48, 24)])    # flco, fid, svcopt, dstaddr, srcaddr
+PI_FIELDS          = bit_struct(10, [(0, 8), (16, 8), (24, 32), (56, 24)])            # algid, keyid, mi, dstaddr
+
 class dmr_chan:
     def __init__(self, debug=0, lcn=0, freq=0):
         class _grant_info(object):
@@ -76,7 +82,7 @@ class dmr_receiver:
 
     def post_init(self):
         if self.debug >= 1:
-            sys.stderr.write("%s [%d] Initializing DMR receiver\n" % (log_ts.get(), self.msgq_id))
+            log_msg('dmr', 1, self.msgq_id, "Initializing DMR receiver")
         if self.msgq_id == 0:
             self.tune_next_chan(msgq_id=0, chan=0, slot=0)
         else:
@@ -95,18 +101,15 @@ class dmr_receiver:
         return json.dumps(d)
 
     def process_grant(self, m_buf):
-            src_addr = get_ordinals(m_buf[2:5])
-            grp_addr = get_ordinals(m_buf[5:8])
-            lcn      = get_ordinals(m_buf[8]) >> 4
-            slot     = (get_ordinals(m_buf[8]) >> 3) & 0x1
+            src_addr, grp_addr, lcn, slot = CPLUS_GRANT_FIELDS.unpack(m_buf)
             chan, freq = self.find_freq(lcn)
             if freq is not None:
                 lcn_sl = (lcn << 1) + slot
                 if self.debug >= 9:
-                    sys.stderr.write("%s [%d] CONNECT PLUS CHANNEL GRANT: srcAddr(%06x), grpAddr(%06x), lcn(%d), slot(%d), freq(%f)\n" % (log_ts.get(), self.msgq_id, src_addr, grp_addr, lcn, slot, (freq/1e6)))
+                    log_msg('dmr', 9, self.msgq_id, "CONNECT PLUS CHANNEL GRANT: srcAddr(%06x), grpAddr(%06x), lcn(%d), slot(%d), freq(%f)", src_addr, grp_addr, lcn, slot, (freq/1e6))
                 if (grp_addr not in self.active_tgids) or ((grp_addr in self.active_tgids) and (lcn_sl != self.active_tgids[grp_addr])):
                     if self.debug >= 1:
-                        sys.stderr.write("%s [%d] Voice update:  tg(%d), freq(%f), slot(%d), lcn(%d)\n" % (log_ts.get(), self.msgq_id, grp_addr, (freq/1e6), slot, lcn))
+                        log_msg('dmr', 1, self.msgq_id, "Voice update:  tg(%d), freq(%f), slot(%d), lcn(%d)", grp_addr, (freq/1e6), slot, lcn)
                     self.frequency_set({'tuner': 1,
                                         'freq': freq,
                                         'slot': (slot + 1),
@@ -119,7 +122,7 @@ class dmr_receiver:
                 self.chans[lcn].slot[slot].grp_addr = grp_addr
                 self.chans[lcn].slot[slot].src_addr = src_addr
             elif self.debug >=9:
-                sys.stderr.write("%s [%d] CONNECT PLUS CHANNEL GRANT: srcAddr(%06x), grpAddr(%06x), unknown lcn(%d), slot(%d)\n" % (log_ts.get(), self.msgq_id, src_addr, grp_addr, lcn, slot))
+                log_msg('dmr', 9, self.msgq_id, "CONNECT PLUS CHANNEL GRANT: srcAddr(%06x), grpAddr(%06x), unknown lcn(%d), slot(%d)", src_addr, grp_addr, lcn, slot)
 
     def find_freq(self, lcn):
         if lcn in self.chans:
@@ -151,7 +154,7 @@ class dmr_receiver:
         self.frequency_set(tune_params)
 
         if (self.msgq_id == 0) and (self.debug >= 1):
-            sys.stderr.write("%s [%d] Searching for control channel: lcn(%d), freq(%f)\n" % (log_ts.get(), self.msgq_id, self.chan_list[self.current_chan], (self.chans[self.chan_list[self.current_chan]].frequency/1e6)))
+            log_msg('dmr', 1, self.msgq_id, "Searching for control channel: lcn(%d), freq(%f)", self.chan_list[self.current_chan], (self.chans[self.chan_list[self.current_chan]].frequency/1e6))
 
     def ui_command(self, msg):
         pass          # TODO: handle these requests
@@ -164,7 +167,7 @@ class dmr_receiver:
 
         if m_type == -1:    # Sync Timeout
             if self.debug >= 9:
-                sys.stderr.write("%s [%d] Timeout waiting for sync sequence\n" % (log_ts.get(), self.msgq_id))
+                log_msg('dmr', 9, self.msgq_id, "Timeout waiting for sync sequence")
 
             if self.msgq_id == 0: # primary/control channel
                 self.cc_timeouts += 1
@@ -189,7 +192,7 @@ class dmr_receiver:
             d_buf = "0x"
             for byte in m_buf:
                 d_buf += format(get_ordinals(byte),"02x")
-            sys.stderr.write("%s [%d] DMR PDU: lcn(%d), state(%d), type(%d), slot(%d), data(%s)\n" % (log_ts.get(), self.msgq_id, self.chan_list[self.current_chan], self.current_state, m_type, m_slot, d_buf))
+            log_msg('dmr', 10, self.msgq_id, "DMR PDU: lcn(%d), state(%d), type(%d), slot(%d), data(%s)", self.chan_list[self.current_chan], self.current_state, m_type, m_slot, d_buf)
 
         if m_type == 0:   # CACH SLC
             self.rx_CACH_SLC(m_buf)
@@ -217,7 +220,7 @@ class dmr_receiver:
         # If this is Capacity Plus, try to keep the first receiver tuned to a control channel
         if (self.current_type == 1) and (self.msgq_id == 0) and (self.current_state > self.states.CC):
             if self.debug >= 1:
-                sys.stderr.write("%s [%d] Looking for control channel\n" % (log_ts.get(), self.msgq_id))
+                log_msg('dmr', 1, self.msgq_id, "Looking for control channel")
             self.cc_timeouts = 0
             self.current_state = self.states.IDLE
             self.tune_next_chan()
@@ -230,55 +233,55 @@ class dmr_receiver:
 
         if slco == 0:    # Null Msg (Idle Channel)
             if self.debug >= 9:
-                sys.stderr.write("%s [%d] SLCO NULL MSG\n" % (log_ts.get(), self.msgq_id))
+                log_msg('dmr', 9, self.msgq_id, "SLCO NULL MSG")
         elif slco == 1:  # Act Update
                 ts1_act = d0 >> 4;
                 ts2_act = d0 & 0xf;
                 if self.debug >= 9:
-                    sys.stderr.write("%s [%d] ACTIVITY UPDATE TS1(%x), TS2(%x), HASH1(%02x), HASH2(%02x)\n" % (log_ts.get(), self.msgq_id, ts1_act, ts2_act, d1, d2))
+                    log_msg('dmr', 9, self.msgq_id, "ACTIVITY UPDATE TS1(%x), TS2(%x), HASH1(%02x), HASH2(%02x)", ts1_act, ts2_act, d1, d2)
         elif slco == 9:  # Connect Plus Voice Channel
             netId = (d0 << 4) + (d1 >> 4)
             siteId = ((d1 & 0xf) << 4) + (d2 >> 4)
             if self.current_type < 0:
                 self.current_type = 1
                 if self.debug >= 2:
-                    sys.stderr.write("%s [%d] System type is TRBO Connect Plus\n" % (log_ts.get(), self.msgq_id))
+                    log_msg('dmr', 2, self.msgq_id, "System type is TRBO Connect Plus")
             # Sometimes only a voice channel exists and no control channel is present.  It's probably better to lock
             # on to a voice channel and wait for it to either dissapear or become a control channel rather than aimlessly
             # cycling the tuning looking for the non-existent control channel.
             self.current_state=self.states.VC
             if self.debug >= 9:
-                sys.stderr.write("%s [%d] CONNECT PLUS VOICE CHANNEL: state(%d), netId(%d), siteId(%d)\n" % (log_ts.get(), self.msgq_id, self.current_state, netId, siteId))
+                log_msg('dmr', 9, self.msgq_id, "CONNECT PLUS VOICE CHANNEL: state(%d), netId(%d), siteId(%d)", self.current_state, netId, siteId)
         elif slco == 10: # Connect Plus Control Channel
             netId = (d0 << 4) + (d1 >> 4)
             siteId = ((d1 & 0xf) << 4) + (d2 >> 4)
             if self.current_type < 0:
                 self.current_type = 1
                 if self.debug >= 2:
-                    sys.stderr.write("%s [%d] System type is TRBO Connect Plus\n" % (log_ts.get(), self.msgq_id))
+                    log_msg('dmr', 2, self.msgq_id, "System type is TRBO Connect Plus")
             if self.msgq_id == 0:
                 if self.current_state != self.states.CC:
                     self.current_state=self.states.CC # Found control channel
                     if self.debug >= 1:
-                        sys.stderr.write("%s [%d] Found control channel: lcn(%d), freq(%f)\n" % (log_ts.get(), self.msgq_id, self.chan_list[self.current_chan], (self.chans[self.chan_list[self.current_chan]].frequency/1e6)))
+                        log_msg('dmr', 1, self.msgq_id, "Found control channel: lcn(%d), freq(%f)", self.chan_list[self.current_chan], (self.chans[self.chan_list[self.current_chan]].frequency/1e6))
             else:
                 if self.current_state != self.states.VC:
                     self.current_state=self.states.VC # Control channel can also carry voice
             if self.debug >= 9:
-                sys.stderr.write("%s [%d] CONNECT PLUS CONTROL CHANNEL: state(%d), netId(%d), siteId(%d)\n" % (log_ts.get(), self.msgq_id, self.current_state, netId, siteId))
+                log_msg('dmr', 9, self.msgq_id, "CONNECT PLUS CONTROL CHANNEL: state(%d), netId(%d), siteId(%d)", self.current_state, netId, siteId)
         elif slco == 15: # Capacity Plus Channel
             lcn = d1
             if self.current_type < 0:
                 self.current_type = 0
                 self.fa_ctrl({'tuner': 0, 'cmd': 'set_slotid', 'slotid': 3})
                 if self.debug >= 2:
-                    sys.stderr.write("%s [%d] System type is TRBO Connect Plus\n" % (log_ts.get(), self.msgq_id))
+                    log_msg('dmr', 2, self.msgq_id, "System type is TRBO Connect Plus")
             self.rest_lcn = d1
             if self.debug >= 9:
-                sys.stderr.write("%s [%d] CAPACITY PLUS REST CHANNEL: lcn(%d)\n" % (log_ts.get(), self.msgq_id, lcn))
+                log_msg('dmr', 9, self.msgq_id, "CAPACITY PLUS REST CHANNEL: lcn(%d)", lcn)
         else:
             if self.debug >= 9:
-                sys.stderr.write("%s [%d] UNKNOWN CACH SLCO(%d)\n" % (log_ts.get(), self.msgq_id, slco))
+                log_msg('dmr', 9, self.msgq_id, "UNKNOWN CACH SLCO(%d)", slco)
             return
 
     def rx_SLOT_CSBK(self, m_slot, m_buf):
@@ -292,7 +295,7 @@ class dmr_receiver:
             nb4 = get_ordinals(m_buf[5]) & 0x3f
             nb5 = get_ordinals(m_buf[6]) & 0x3f
             if self.debug >= 10:
-                sys.stderr.write("%s [%d] CONNECT PLUS NEIGHBOR SITES: %d, %d, %d, %d, %d\n" % (log_ts.get(), self.msgq_id, nb1, nb2, nb3, nb4, nb5))
+                log_msg('dmr', 10, self.msgq_id, "CONNECT PLUS NEIGHBOR SITES: %d, %d, %d, %d, %d", nb1, nb2, nb3, nb4, nb5)
 
         elif (op == 3) and (fid == 6) and (self.msgq_id == 0): # ConnectPlus Channel Grant (control channel only)
             self.process_grant(m_buf)
@@ -307,51 +310,36 @@ class dmr_receiver:
             if nn > 6:
                 nn = 6
             if self.debug >= 9:
-                sys.stderr.write("%s [%d] CAPACITY PLUS SYS/SITES: rest(%d), beacon(%d), siteId(%d), nn(%d)\n" % (log_ts.get(), self.msgq_id, rest, bcn, site, nn))
+                log_msg('dmr', 9, self.msgq_id, "CAPACITY PLUS SYS/SITES: rest(%d), beacon(%d), siteId(%d), nn(%d)", rest, bcn, site, nn)
 
         elif (op == 62):                 # 
             pass
 
     def rx_SLOT_VLC(self, m_slot, m_buf):
-        flco    = get_ordinals(m_buf[0]) & 0x3f
-        fid     = get_ordinals(m_buf[1])
-        svcopt  = get_ordinals(m_buf[2])
-        dstaddr = get_ordinals(m_buf[3:6])
-        srcaddr = get_ordinals(m_buf[6:9])
+        flco, fid, svcopt, dstaddr, srcaddr = LC_FIELDS.unpack(m_buf)
         if self.debug >= 9:
-            sys.stderr.write("%s [%d] VOICE HDR LC: slot(%d), flco(%02x), fid(%02x), svcopt(%02x), srcAddr(%06x), grpAddr(%06x)\n" % (log_ts.get(), self.msgq_id, m_slot, flco, fid, svcopt, srcaddr, dstaddr))
+            log_msg('dmr', 9, self.msgq_id, "VOICE HDR LC: slot(%d), flco(%02x), fid(%02x), svcopt(%02x), srcAddr(%06x), grpAddr(%06x)", m_slot, flco, fid, svcopt, srcaddr, dstaddr)
 
         # TODO: handle flco
 
     def rx_SLOT_TLC(self, m_slot, m_buf):
-        flco    = get_ordinals(m_buf[0]) & 0x3f
-        fid     = get_ordinals(m_buf[1])
-        svcopt  = get_ordinals(m_buf[2])
-        dstaddr = get_ordinals(m_buf[3:6])
-        srcaddr = get_ordinals(m_buf[6:9])
+        flco, fid, svcopt, dstaddr, srcaddr = LC_FIELDS.unpack(m_buf)
         if self.debug >= 9:
-            sys.stderr.write("%s [%d] VOICE TERM LC: slot(%d), flco(%02x), fid(%02x), svcopt(%02x), srcAddr(%06x), grpAddr(%06x)\n" % (log_ts.get(), self.msgq_id, m_slot, flco, fid, svcopt, srcaddr, dstaddr))
+            log_msg('dmr', 9, self.msgq_id, "VOICE TERM LC: slot(%d), flco(%02x), fid(%02x), svcopt(%02x), srcAddr(%06x), grpAddr(%06x)", m_slot, flco, fid, svcopt, srcaddr, dstaddr)
 
         # TODO: handle flco
 
     def rx_SLOT_ELC(self, m_slot, m_buf):
-        flco    = get_ordinals(m_buf[0]) & 0x3f
-        fid     = get_ordinals(m_buf[1])
-        svcopt  = get_ordinals(m_buf[2])
-        dstaddr = get_ordinals(m_buf[3:6])
-        srcaddr = get_ordinals(m_buf[6:9])
+        flco, fid, svcopt, dstaddr, srcaddr = LC_FIELDS.unpack(m_buf)
         if self.debug >= 9:
-            sys.stderr.write("%s [%d] VOICE EMB LC: slot(%d), flco(%02x), fid(%02x), svcopt(%02x), srcAddr(%06x), grpAddr(%06x)\n" % (log_ts.get(), self.msgq_id, m_slot, flco, fid, svcopt, srcaddr, dstaddr))
+            log_msg('dmr', 9, self.msgq_id, "VOICE EMB LC: slot(%d), flco(%02x), fid(%02x), svcopt(%02x), srcAddr(%06x), grpAddr(%06x)", m_slot, flco, fid, svcopt, srcaddr, dstaddr)
 
         # TODO: handle flco
 
     def rx_SLOT_PI(self, m_slot, m_buf):
-        algid   = get_ordinals(m_buf[0])
-        keyid   = get_ordinals(m_buf[2])
-        mi      = get_ordinals(m_buf[3:7])
-        dstaddr = get_ordinals(m_buf[7:10])
+        algid, keyid, mi, dstaddr = PI_FIELDS.unpack(m_buf)
         if self.debug >= 9:
-            sys.stderr.write("%s [%d] PI HEADER: slot(%d), algId(%02x), keyId(%02x), mi(%08x), grpAddr(%06x)\n" % (log_ts.get(), self.msgq_id, m_slot, algid, keyid, mi, dstaddr))
+            log_msg('dmr', 9, self.msgq_id, "PI HEADER: slot(%d), algId(%02x), keyId(%02x), mi(%08x), grpAddr(%06x)", m_slot, algid, keyid, mi, dstaddr)
 
     def get_status(self):
         d = {}
@@ -444,7 +432,7 @@ class rx_ctl(object):
         d = {'json_type': 'call_log', 'log': []}    # stub function for compatibility (does nothing)
         return json.dumps(d)
 
-    def to_json(self):
+    def to_json(self, since = 0):   # delta updates not supported, always returns full trunk_update
         d = {'json_type': 'trunk_update'}
         syid = 0;
         for rcvr in self.receivers:
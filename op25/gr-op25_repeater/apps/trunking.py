@@ -1265,7 +1265,6 @@ class rx_ctl (object):
         self.nacs = []
         self.logfile_workers = logfile_workers
         self.working_frequencies = {}
-        self.xor_cache = {}
         self.last_garbage_collect = 0
         self.last_tune_time = 0.0;
         self.last_tune_freq = 0;
@@ -1785,9 +1784,7 @@ class rx_ctl (object):
                 index = tdma_slot
                 symbol_rate = 6000
                 xorhash = '%x%x%x' % (self.current_nac, tsys.ns_syid, tsys.ns_wacn)
-                if xorhash not in self.xor_cache:
-                    self.xor_cache[xorhash] = lfsr.p25p2_lfsr(self.current_nac, tsys.ns_syid, tsys.ns_wacn).xor_chars
-                decoder.set_xormask(self.xor_cache[xorhash], xorhash, index=index)
+                decoder.set_xormask(lfsr.xor_chars(self.current_nac, tsys.ns_syid, tsys.ns_wacn), xorhash, index=index)
             demod.set_omega(symbol_rate)
             decoder.set_output(filename, index=index)
 
@@ -46,13 +46,16 @@
 # the Free Software Foundation, Inc., 51 Franklin Street,
 # Boston, MA 02110-1301, USA.
 
-import sys, struct
+import sys, os
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from crc_funcs import CRC16_CCITT, CRC32, CRC9
 
 quiet = False
 outfile = ""
 flip = 0x000
 quiet = True
-outfile = open('p25.out', 'w')
 
 
 #####################
@@ -95,11 +98,7 @@ def print_spec(data):
 
     # also produce binary output if requested
     if outfile:
-        for i in range(0, len(data), 4):
-            byte = 0
-            for j in range(4):
-                byte |= data[i+j] << (6 - j*2)
-            outfile.write(struct.pack('B1', (byte ^ flip & 0xff)))
+        write_dibits(outfile, data, flip=flip)
 
 # Split an integer into list of bytes.
 def split_bytes(data, len):
@@ -111,10 +110,7 @@ def split_bytes(data, len):
 # Split an integer into list of dibits.
 # count should be set to the number of dibits to extract.
 def split_dibits(data, count):
-    dibits = []
-    for i in range(count*2 - 2, -2, -2):
-        dibits.append((data >> i) & 0x03)
-    return dibits
+    return [(data >> i) & 0x03 for i in range(count*2 - 2, -2, -2)]
 
 # Split an integer into list of tribits.
 # count should be set to the number of tribits to extract.
@@ -154,12 +150,58 @@ def insert_status(data, ssyms):
 # error control coding #
 ########################
 
+# Codeword for every data word of a linear block code, given the generator
+# matrix rows (msb first).  Encoding is then a single table lookup.
+def encode_table(matrix):
+    k = len(matrix)
+    table = [0] * (1 << k)
+    for data in range(1, 1 << k):
+        low = data & -data                  # reuse the codeword of data without its lowest set bit
+        table[data] = table[data ^ low] ^ matrix[k - low.bit_length()]
+    return tuple(table)
+
+# GF(2^6) antilog (doubled so that log sums need no modulo) and log tables
+GF6_EXP = [0] * 126
+GF6_LOG = [0] * 64
+_x = 1
+for _i in range(63):
+    GF6_EXP[_i] = GF6_EXP[_i + 63] = _x
+    GF6_LOG[_x] = _i
+    _x <<= 1
+    if _x & 0x40:
+        _x ^= 0x43 # primitive polynomial: x^6 + x + 1
+
+# Reed-Solomon generator matrix products: for each data hexbit position, the
+# parity of every possible hexbit value with all n codeword hexbits packed
+# into one integer, so encoding is one lookup and xor per data hexbit.
+def rs_tables(matrix):
+    n = len(matrix[0])
+    tables = []
+    for row in matrix:
+        table = []
+        for hexbit in range(64):
+            word = 0
+            for i in range(n):
+                word = (word << 6) | gf6mult(hexbit, row[i])
+            table.append(word)
+        tables.append(tuple(table))
+    return tuple(tables)
+
+def rs_encode(tables, data):    # returns the packed codeword
+    k = len(tables)
+    word = 0
+    for j in range(k):
+        word ^= tables[j][(data >> ((k - 1 - j) * 6)) & 0x3f]
+    return word
+
+def split_hexbits(word, count):
+    return [(word >> i) & 0x3f for i in range((count - 1) * 6, -6, -6)]
+
 # (64,16,23) BCH encoder
 # spec sometimes refers to this as (63,16,23) plus a parity bit
 # argument is an integer
 # returns an integer
-def bch_64_16_23_encode(data):
-    matrix = (
+BCH_64_16_23_MATRIX = (
         0x8000cd930bdd3b2a, 0x4000ab5a8e33a6be,
         0x2000983e4cc4e874, 0x10004c1f2662743a,
         0x0800eb9c98ec0136, 0x0400b85d47ab3bb0,
@@ -168,32 +210,25 @@ def bch_64_16_23_encode(data):
         0x0020630b6fd3c448, 0x00103185b7e9e224,
         0x000818c2dbf4f112, 0x0004c1f2662743a2,
         0x0002ad6a38ce9afb, 0x00019b2617ba7657)
+BCH_64_16_23_HI = encode_table(BCH_64_16_23_MATRIX[0:8])    # codewords for the high data octet
+BCH_64_16_23_LO = encode_table(BCH_64_16_23_MATRIX[8:16])   # codewords for the low data octet
+
+def bch_64_16_23_encode(data):
     assert data < 2**16
-    codeword = 0
-    for i in range(16):
-        if data & (0x8000 >> i):
-            codeword ^= matrix[i]
-    return codeword
+    return BCH_64_16_23_HI[data >> 8] ^ BCH_64_16_23_LO[data & 0xff]
 
 # GF(2^6) multiply (for Reed-Solomon encoder)
 def gf6mult(a, b):
     assert a < 2**6
     assert b < 2**6
-    p = 0
-    for i in range(6):
-        if b & 1:
-            p ^= a
-        a <<= 1
-        if a & 0x40:
-            a ^= 0x43 # primitive polynomial: x^6 + x + 1
-        b >>= 1
-    return p
+    if a == 0 or b == 0:
+        return 0
+    return GF6_EXP[GF6_LOG[a] + GF6_LOG[b]]
 
 # (36,20,17) shortened Reed-Solomon encoder
 # argument is an integer
 # returns an integer
-def rs_36_20_17_encode(data):
-    matrix = (
+RS_36_20_17_MATRIX = (
         (1,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0o74,0o37,0o34,0o06,0o02,0o07,0o44,0o64,0o26,0o14,0o26,0o44,0o54,0o13,0o77,0o05),
         (0,1,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0o04,0o17,0o50,0o24,0o11,0o05,0o30,0o57,0o33,0o03,0o02,0o02,0o15,0o16,0o25,0o26),
         (0,0,1,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0o07,0o23,0o37,0o46,0o56,0o75,0o43,0o45,0o55,0o21,0o50,0o31,0o45,0o27,0o71,0o62),
@@ -214,19 +249,16 @@ def rs_36_20_17_encode(data):
         (0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,1,0,0,0o71,0o21,0o70,0o44,0o56,0o04,0o30,0o74,0o04,0o23,0o71,0o70,0o63,0o45,0o56,0o43),
         (0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,1,0,0o02,0o01,0o53,0o74,0o02,0o14,0o52,0o74,0o12,0o57,0o24,0o63,0o15,0o42,0o52,0o33),
         (0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,1,0o34,0o35,0o02,0o23,0o21,0o27,0o22,0o33,0o64,0o42,0o05,0o73,0o51,0o46,0o73,0o60))
+RS_36_20_17_TABLES = rs_tables(RS_36_20_17_MATRIX)
+
+def rs_36_20_17_encode(data):
     assert data < 2**120
-    codeword = [0,] * 36
-    for i in range(36):
-        for j in range(20):
-            hexbit = (data >> ((19 - j) * 6)) & 0x3f
-            codeword[i] ^= gf6mult(hexbit, matrix[j][i])
-    return codeword
+    return split_hexbits(rs_encode(RS_36_20_17_TABLES, data), 36)
 
 # (24,12,13) shortened Reed-Solomon encoder
 # argument is an integer
 # returns an integer
-def rs_24_12_13_encode(data):
-    matrix = (
+RS_24_12_13_MATRIX = (
         (1,0,0,0,0,0,0,0,0,0,0,0,0o62,0o44,0o03,0o25,0o14,0o16,0o27,0o03,0o53,0o04,0o36,0o47),
         (0,1,0,0,0,0,0,0,0,0,0,0,0o11,0o12,0o11,0o11,0o16,0o64,0o67,0o55,0o01,0o76,0o26,0o73),
         (0,0,1,0,0,0,0,0,0,0,0,0,0o03,0o01,0o05,0o75,0o14,0o06,0o20,0o44,0o66,0o06,0o70,0o66),
@@ -239,19 +271,16 @@ def rs_24_12_13_encode(data):
         (0,0,0,0,0,0,0,0,0,1,0,0,0o72,0o14,0o65,0o54,0o35,0o25,0o41,0o16,0o15,0o40,0o71,0o26),
         (0,0,0,0,0,0,0,0,0,0,1,0,0o73,0o65,0o36,0o61,0o42,0o22,0o17,0o04,0o44,0o20,0o25,0o05),
         (0,0,0,0,0,0,0,0,0,0,0,1,0o71,0o05,0o55,0o03,0o71,0o34,0o60,0o11,0o74,0o02,0o41,0o50))
+RS_24_12_13_TABLES = rs_tables(RS_24_12_13_MATRIX)
+
+def rs_24_12_13_encode(data):
     assert data < 2**72
-    codeword = [0,] * 24
-    for i in range(24):
-        for j in range(12):
-            hexbit = (data >> ((11 - j) * 6)) & 0x3f
-            codeword[i] ^= gf6mult(hexbit, matrix[j][i])
-    return codeword
+    return split_hexbits(rs_encode(RS_24_12_13_TABLES, data), 24)
 
 # (24,16,9) shortened Reed-Solomon encoder
 # argument is an integer
 # returns an integer
-def rs_24_16_9_encode(data):
-    matrix = (
+RS_24_16_9_MATRIX = (
         (1,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0o51,0o45,0o67,0o15,0o64,0o67,0o52,0o12),
         (0,1,0,0,0,0,0,0,0,0,0,0,0,0,0,0,0o57,0o25,0o63,0o73,0o71,0o22,0o40,0o15),
         (0,0,1,0,0,0,0,0,0,0,0,0,0,0,0,0,0o05,0o01,0o31,0o04,0o16,0o54,0o25,0o76),
@@ -268,26 +297,21 @@ def rs_24_16_9_encode(data):
         (0,0,0,0,0,0,0,0,0,0,0,0,0,1,0,0,0o55,0o43,0o34,0o71,0o57,0o76,0o50,0o64),
         (0,0,0,0,0,0,0,0,0,0,0,0,0,0,1,0,0o24,0o23,0o23,0o05,0o50,0o70,0o42,0o23),
         (0,0,0,0,0,0,0,0,0,0,0,0,0,0,0,1,0o67,0o75,0o45,0o60,0o57,0o24,0o06,0o26))
+RS_24_16_9_TABLES = rs_tables(RS_24_16_9_MATRIX)
+
+def rs_24_16_9_encode(data):
     assert data < 2**96
-    codeword = [0,] * 24
-    for i in range(24):
-        for j in range(16):
-            hexbit = (data >> ((15 - j) * 6)) & 0x3f
-            codeword[i] ^= gf6mult(hexbit, matrix[j][i])
-    return codeword
+    return split_hexbits(rs_encode(RS_24_16_9_TABLES, data), 24)
 
 # (24,12,8) extended Golay encoder
 # argument is an integer
 # returns an integer
+GOLAY_24_12_8_TABLE = encode_table((0o40006165, 0o20003073, 0o10007550, 0o4003664, 0o2001732,
+        0o1006631, 0o403315, 0o201547, 0o106706, 0o45227, 0o24476, 0o14353))
+
 def golay_24_12_8_encode(data):
-    matrix = (0o40006165, 0o20003073, 0o10007550, 0o4003664, 0o2001732,
-        0o1006631, 0o403315, 0o201547, 0o106706, 0o45227, 0o24476, 0o14353)
     assert data < 2**12
-    codeword = 0
-    for i in range(12):
-        if data & (0o4000 >> i):
-            codeword ^= matrix[i]
-    return codeword
+    return GOLAY_24_12_8_TABLE[data]
 
 # (23,12,7) Golay encoder
 # argument is an integer
@@ -305,40 +329,31 @@ def golay_18_6_8_encode(data):
 # (16,8,5) shortened cyclic encoder
 # argument is an integer
 # returns an integer
+CYCLIC_16_8_5_TABLE = encode_table((0x804e, 0x4027, 0x208f, 0x10db,
+        0x08f1, 0x04e4, 0x0272, 0x0139))
+
 def cyclic_16_8_5_encode(data):
-    matrix = (0x804e, 0x4027, 0x208f, 0x10db,
-        0x08f1, 0x04e4, 0x0272, 0x0139)
     assert data < 2**8
-    codeword = 0
-    for i in range(8):
-        if data & (0x80 >> i):
-            codeword ^= matrix[i]
-    return codeword
+    return CYCLIC_16_8_5_TABLE[data]
 
 # (10,6,3) shortened Hamming encoder
 # argument is an integer
 # returns an integer
+HAMMING_10_6_3_TABLE = encode_table((0x20e, 0x10d, 0x08b, 0x047, 0x023, 0x01c))
+
 def hamming_10_6_3_encode(data):
-    matrix = (0x20e, 0x10d, 0x08b, 0x047, 0x023, 0x01c)
     assert data < 2**6
-    codeword = 0
-    for i in range(6):
-        if data & (0x20 >> i):
-            codeword ^= matrix[i]
-    return codeword
+    return HAMMING_10_6_3_TABLE[data]
 
 # (15,11,3) Hamming encoder
 # argument is an integer
 # returns an integer
+HAMMING_15_11_3_TABLE = encode_table((0x400f, 0x200e, 0x100d, 0x080c, 0x040b,
+        0x020a, 0x0109, 0x0087, 0x0046, 0x0025, 0x0013))
+
 def hamming_15_11_3_encode(data):
-    matrix = (0x400f, 0x200e, 0x100d, 0x080c, 0x040b,
-        0x020a, 0x0109, 0x0087, 0x0046, 0x0025, 0x0013)
     assert data < 2**11
-    codeword = 0
-    for i in range(11):
-        if data & (0x400 >> i):
-            codeword ^= matrix[i]
-    return codeword
+    return HAMMING_15_11_3_TABLE[data]
 
 # sequence of cyclic encodings for LDU1
 # argument is an integer
@@ -363,9 +378,8 @@ def ldu2_cyclic(lsd):
 # returns an integer
 def header_golay(rs_codeword):
     out = 0
-    for i in range(36):
-        out <<= 18
-        out |= golay_18_6_8_encode(rs_codeword[i])
+    for hexbit in rs_codeword:
+        out = (out << 18) | GOLAY_24_12_8_TABLE[hexbit]
     return out
 
 # sequence of hamming encodings for LDU1 and LDU2
@@ -373,9 +387,8 @@ def header_golay(rs_codeword):
 # returns an integer
 def ldu_hamming(rs_codeword):
     out = 0
-    for i in range(24):
-        out <<= 10
-        out |= hamming_10_6_3_encode(rs_codeword[i])
+    for hexbit in rs_codeword:
+        out = (out << 10) | HAMMING_10_6_3_TABLE[hexbit]
     return out
 
 # sequence of golay encodings for xTDU
@@ -385,44 +398,35 @@ def xtdu_golay(rs_codeword):
     out = 0
     for i in range(0, 24, 2):
         out <<= 24
-        data = (rs_codeword[i] << 6) + rs_codeword[i+1]
-        out |= golay_24_12_8_encode(data)
+        out |= GOLAY_24_12_8_TABLE[(rs_codeword[i] << 6) + rs_codeword[i+1]]
     return out
 
 # interleave a sequence of 98 symbols (for trellis encoded data)
 # argument is list of dibits
 # returns list of dibits
+DATA_INTERLEAVE = tuple([j + k for j in range(0, 97, 8) for k in (0, 1)] +
+                        [i + j + k for i in range(2, 7, 2) for j in range(0, 89, 8) for k in (0, 1)])
+
 def data_interleave(input):
     assert len(input) == 98
-    output = []
-    for j in range(0,97,8):
-            output.extend(input[j:j+2])
-    for i in range(2,7,2):
-        for j in range(0,89,8):
-            output.extend(input[i+j:i+j+2])
-    return output
+    return [input[i] for i in DATA_INTERLEAVE]
 
 # 1/2 rate trellis encode a sequence of dibits
 # argument is list of dibits
 # returns list of dibits
-def trellis_1_2_encode(input):
-    # append flushing dibit
-    input = list(input)
-    input.append(0)
-
-    output = []
-    state = 0
-
-    # state transition table, including constellation to dibit pair mapping
-    table = (
+# state transition table, including constellation to dibit pair mapping
+TRELLIS_1_2 = (
         ((0, 2), (3, 0), (0, 1), (3, 3)),
         ((3, 2), (0, 0), (3, 1), (0, 3)),
         ((2, 1), (1, 3), (2, 2), (1, 0)),
         ((1, 1), (2, 3), (1, 2), (2, 0)))
 
-    for i in range(len(input)):
-        output.extend(table[state][input[i]])
-        state = input[i]
+def trellis_1_2_encode(input):
+    # append flushing dibit; the state is the previous input
+    input = list(input) + [0]
+    output = []
+    for (state, dibit) in zip([0] + input[:-1], input):
+        output.extend(TRELLIS_1_2[state][dibit])
 
     # return dibits
     return output
@@ -430,16 +434,8 @@ def trellis_1_2_encode(input):
 # 3/4 rate trellis encode a sequence of tribits
 # argument is list of tribits
 # returns list of dibits
-def trellis_3_4_encode(input):
-    # append flushing tribit
-    input = list(input)
-    input.append(0)
-
-    output = []
-    state = 0
-
-    # state transition table, including constellation to dibit pair mapping
-    table = (
+# state transition table, including constellation to dibit pair mapping
+TRELLIS_3_4 = (
         ((0, 2), (3, 1), (3, 2), (0, 1), (1, 3), (2, 0), (2, 3), (1, 0)),
         ((3, 2), (0, 1), (1, 3), (2, 0), (2, 3), (1, 0), (0, 2), (3, 1)),
         ((2, 2), (1, 1), (1, 2), (2, 1), (3, 3), (0, 0), (0, 3), (3, 0)),
@@ -449,9 +445,12 @@ def trellis_3_4_encode(input):
         ((1, 3), (2, 0), (2, 3), (1, 0), (0, 2), (3, 1), (3, 2), (0, 1)),
         ((2, 3), (1, 0), (0, 2), (3, 1), (3, 2), (0, 1), (1, 3), (2, 0)))
 
-    for i in range(len(input)):
-        output.extend(table[state][input[i]])
-        state = input[i]
+def trellis_3_4_encode(input):
+    # append flushing tribit; the state is the previous input
+    input = list(input) + [0]
+    output = []
+    for (state, tribit) in zip([0] + input[:-1], input):
+        output.extend(TRELLIS_3_4[state][tribit])
 
     # return dibits
     return output
@@ -462,14 +461,7 @@ def trellis_3_4_encode(input):
 def crc_ccitt(data):
     assert data >= 0
     assert data <= 0xffffffffffffffffffff
-    g = (1 << 12) | (1 << 5) | 1
-    crc = 0;
-    for i in range(79, -1, -1):
-        crc <<= 1
-        if (((crc >> 16) ^ (data >> i)) & 1):
-            crc ^= g
-    crc = (crc & 0xffff) ^ 0xffff
-    return crc
+    return CRC16_CCITT.compute(data, 80)
 
 # 32 bit CRC over variable number of data bits
 # arguments are integers
@@ -479,14 +471,7 @@ def crc_32(data, length):
     assert length <= 4096
     assert data >= 0
     assert data < 2**length
-    g = 0x04c11db7
-    crc = 0;
-    for i in range(length - 1, -1, -1):
-        crc <<= 1
-        if (((crc >> 32) ^ (data >> i)) & 1):
-            crc ^= g
-    crc = (crc & 0xffffffff) ^ 0xffffffff
-    return crc
+    return CRC32.compute(data, length)
 
 # 9 bit CRC over 7 bit serial number and 128 data bits
 # arguments are integers
@@ -497,14 +482,7 @@ def crc_9(serial, data):
     assert data >= 0
     assert data <= 0xffffffffffffffffffffffffffffffff
     data |= (serial << 128)
-    g = (1 << 6) | (1 << 4) | (1 << 3) | 1
-    crc = 0;
-    for i in range(134, -1, -1):
-        crc <<= 1
-        if (((crc >> 9) ^ (data >> i)) & 1):
-            crc ^= g
-    crc = (crc & 0x1ff) ^ 0x1ff
-    return crc
+    return CRC9.compute(data, 135)
 
 
 ##############################
@@ -869,6 +847,155 @@ def construct_ef(efclass, operand, arguments):
     return ef
 
 
+######################################
+# packet symbols without text output #
+######################################
+
+# Write dibits to a binary file (file name or object opened for binary write).
+# Packed output is four dibits per byte, msb first, as written by print_spec.
+# Unpacked output is one dibit per byte, the format read by op25_c4fm_mod.py
+# and by the "symbols" device type.
+def write_dibits(f, dibits, packed=True, flip=0):
+    data = np.asarray(dibits, dtype=np.uint8)
+    if packed:
+        assert len(data) % 4 == 0
+        data = (data[0::4] << 6) | (data[1::4] << 4) | (data[2::4] << 2) | data[3::4]
+        data ^= flip & 0xff
+    else:
+        data = data ^ (flip & 0x3)
+    if isinstance(f, str):
+        with open(f, 'wb') as fp:
+            fp.write(data.tobytes())
+    else:
+        f.write(data.tobytes())
+
+# The following return a complete packet, status symbols included, as a list
+# of dibits.  Arguments are integers (the HDU, LC, ES and TSBK codewords are
+# built by the construct_ functions above).
+
+def hdu_symbols(nac, ss, hdr):
+    symbols = start_packet(nac, 0x0)
+    rs_codeword = rs_36_20_17_encode(hdr)
+    symbols.extend(split_dibits(header_golay(rs_codeword), 324))
+    return insert_status(symbols, (ss,) * 11)
+
+# nine IMBE frames with the LC or ES hexbits between the second through
+# seventh, and the low speed data between the eighth and ninth
+def ldu_symbols(nac, ss, duid, imbe, flip_first, rs_syms, lsd_syms):
+    symbols = start_packet(nac, duid)
+    imbe_syms = (split_dibits(imbe, 72), split_dibits(imbe ^ 2, 72))   # flipping sync bit
+    for i in range(9):
+        symbols.extend(imbe_syms[(i + flip_first) & 1])
+        if i >= 1 and i <= 6:
+            symbols.extend(rs_syms[(i - 1) * 20:i * 20])
+        elif i == 7:
+            symbols.extend(lsd_syms)
+    return insert_status(symbols, (ss,) * 24)
+
+def ldu1_symbols(nac, ss, imbe, lsd, lc):
+    rs_codeword = rs_24_12_13_encode(lc)
+    return ldu_symbols(nac, ss, 0x5, imbe, 0,
+                       split_dibits(ldu_hamming(rs_codeword), 120),
+                       split_dibits(ldu1_cyclic(lsd), 16))
+
+def ldu2_symbols(nac, ss, imbe, lsd, es):
+    rs_codeword = rs_24_16_9_encode(es)
+    return ldu_symbols(nac, ss, 0xa, imbe, 1,
+                       split_dibits(ldu_hamming(rs_codeword), 120),
+                       split_dibits(ldu2_cyclic(lsd), 16))
+
+def stdu_symbols(nac, ss):
+    return insert_status(start_packet(nac, 0x3), (ss,) * 2)
+
+def xtdu_symbols(nac, ss, lc):
+    symbols = start_packet(nac, 0xf)
+    rs_codeword = rs_24_12_13_encode(lc)
+    symbols.extend(split_dibits(xtdu_golay(rs_codeword), 144))
+    return insert_status(symbols, (ss,) * 6)
+
+def tsdu_symbols(nac, ss, tsbks):
+    symbols = start_packet(nac, 0x7)
+    for tsbk in tsbks:
+        symbols.extend(data_interleave(trellis_1_2_encode(split_dibits(tsbk, 48))))
+    numss = (56 + (len(tsbks) * 98) + 34) // 35
+    return insert_status(symbols, (ss,) * numss)
+
+################################
+# bulk symbol stream synthesis #
+################################
+
+# These build long streams (thousands of packets) as numpy dibit arrays for
+# load testing receivers, to be written out with write_dibits().  Output is
+# identical to concatenating the per-packet _symbols functions above.
+
+TRELLIS_1_2_ARRAY = np.array(TRELLIS_1_2, dtype=np.uint8)
+DATA_INTERLEAVE_ARRAY = np.array(DATA_INTERLEAVE, dtype=np.intp)
+
+_status_maps = {}
+
+# Index map which inserts status symbols into a packet of data_len dibits:
+# entries < data_len select a data dibit, data_len is a pad dibit and
+# data_len + 1 is the status symbol.  Derived once from insert_status.
+def status_map(data_len, numss):
+    key = (data_len, numss)
+    if key not in _status_maps:
+        syms = insert_status(list(range(1, data_len + 1)), (-1,) * numss)
+        _status_maps[key] = np.array([data_len + 1 if s < 0 else (data_len if s == 0 else s - 1) for s in syms], dtype=np.intp)
+    return _status_maps[key]
+
+# Trellis encode and interleave an array of TSBK codewords (one row of 12
+# octets per TSBK).  Returns an array of 98 dibits per TSBK.
+def tsbk_dibits(octets):
+    bits = np.unpackbits(octets, axis=1)
+    dibits = np.zeros((len(octets), 50), dtype=np.uint8)   # previous state, 48 dibits, flushing dibit
+    dibits[:, 1:49] = (bits[:, 0::2] << 1) | bits[:, 1::2]
+    trellis = TRELLIS_1_2_ARRAY[dibits[:, :-1], dibits[:, 1:]].reshape(len(octets), 98)
+    return trellis[:, DATA_INTERLEAVE_ARRAY]
+
+# Stream of TSDUs carrying a list of (opcode, mfid, arg) messages, packed
+# blocks (1 to 3) TSBKs per TSDU; the last TSDU may be shorter.
+# Returns a numpy array of dibits.
+def tsdu_stream(nac, ss, msgs, blocks=3):
+    assert blocks >= 1 and blocks <= 3
+    count = len(msgs)
+    if count == 0:
+        return np.zeros(0, dtype=np.uint8)
+    octets = np.empty((count, 12), dtype=np.uint8)
+    for i, (opcode, mfid, arg) in enumerate(msgs):
+        lb = ((i + 1) % blocks == 0) or (i == count - 1)
+        tsbk = construct_tsbk(lb, 0, opcode, mfid, arg)
+        octets[i] = np.frombuffer(tsbk.to_bytes(12, 'big'), dtype=np.uint8)
+    coded = tsbk_dibits(octets)
+    header = np.array(start_packet(nac, 0x7), dtype=np.uint8)
+    streams = []
+    full = count // blocks
+    for (first, n_tsdu, n_blocks) in ((0, full, blocks), (full * blocks, 1 if count % blocks else 0, count % blocks)):
+        if n_tsdu == 0:
+            continue
+        data_len = 56 + n_blocks * 98
+        packets = np.empty((n_tsdu, data_len + 2), dtype=np.uint8)
+        packets[:, 0:56] = header
+        packets[:, 56:data_len] = coded[first:first + n_tsdu * n_blocks].reshape(n_tsdu, n_blocks * 98)
+        packets[:, data_len] = 0
+        packets[:, data_len + 1] = ss
+        streams.append(packets[:, status_map(data_len, (data_len + 34) // 35)].reshape(-1))
+    return np.concatenate(streams)
+
+# Voice call of the given number of superframes (LDU1 + LDU2) repeating one
+# IMBE codeword, preceded by an HDU if hdr is given and optionally followed by
+# an sTDU.  hdr is the HDU codeword (as assembled in construct_hdu()); lc and
+# es are the codewords returned by construct_lc() and construct_es().
+# Returns a numpy array of dibits.
+def voice_stream(nac, ss, imbe, lsd, lc, es, superframes, hdr=None, terminator=True):
+    streams = []
+    if hdr is not None:
+        streams.append(np.array(hdu_symbols(nac, ss, hdr), dtype=np.uint8))
+    superframe = np.array(ldu1_symbols(nac, ss, imbe, lsd, lc) + ldu2_symbols(nac, ss, imbe, lsd, es), dtype=np.uint8)
+    streams.append(np.tile(superframe, superframes))
+    if terminator:
+        streams.append(np.array(stdu_symbols(nac, ss), dtype=np.uint8))
+    return np.concatenate(streams)
+
 ##############################
 # construct complete packets #
 ##############################
@@ -888,8 +1015,6 @@ def construct_hdu(nac, ss, mi, mfid, algid, kid, tgid):
 
     ssyms = (ss,) * 11
 
-    symbols = start_packet(nac, duid)
-
     # HDU codeword
     hdr = 0
     hdr |= mi    << 48
@@ -898,8 +1023,7 @@ def construct_hdu(nac, ss, mi, mfid, algid, kid, tgid):
     hdr |= kid   << 16
     hdr |= tgid
 
-    rs_codeword = rs_36_20_17_encode(hdr)
-    symbols.extend(split_dibits(header_golay(rs_codeword), 324))
+    symbols = hdu_symbols(nac, ss, hdr)
 
     text_out("\tDUID  = %01x\n" % duid)
     text_out("\tNAC   = %03x\n" % nac)
@@ -910,7 +1034,7 @@ def construct_hdu(nac, ss, mi, mfid, algid, kid, tgid):
     text_out("\tKID   = %04x\n" % kid)
     text_out("\tTGID  = %04x\n" % tgid)
     text_out("\tSymbol data:\n")
-    print_spec(insert_status(symbols, ssyms))
+    print_spec(symbols)
 
 # Logical Link Data Unit 1
 def construct_ldu1(nac, ss, imbe, lsd, lco, mfid, svcopt, s, tgid, dst, src):
@@ -939,35 +1063,11 @@ def construct_ldu1(nac, ss, imbe, lsd, lco, mfid, svcopt, s, tgid, dst, src):
     text_out("\tIMBE  = %036x\n" % imbe)
     text_out("\tLSD   = %08x\n" % lsd)
 
-    symbols = start_packet(nac, duid)
-
     # Link Control Word
     lc = construct_lc(lco, mfid, svcopt, s, tgid, dst, src)
-    rs_codeword = rs_24_12_13_encode(lc)
-    lcw_syms = split_dibits(ldu_hamming(rs_codeword), 120)
-
-    # Low Speed Data
-    lsd_syms = split_dibits(ldu1_cyclic(lsd), 16)
-
-    symbols.extend(split_dibits(imbe, 72))
-    symbols.extend(split_dibits(imbe ^ 2, 72)) # flipping sync bit
-    symbols.extend(lcw_syms[0:20])
-    symbols.extend(split_dibits(imbe, 72))
-    symbols.extend(lcw_syms[20:40])
-    symbols.extend(split_dibits(imbe ^ 2, 72))
-    symbols.extend(lcw_syms[40:60])
-    symbols.extend(split_dibits(imbe, 72))
-    symbols.extend(lcw_syms[60:80])
-    symbols.extend(split_dibits(imbe ^ 2, 72))
-    symbols.extend(lcw_syms[80:100])
-    symbols.extend(split_dibits(imbe, 72))
-    symbols.extend(lcw_syms[100:120])
-    symbols.extend(split_dibits(imbe ^ 2, 72))
-    symbols.extend(lsd_syms)
-    symbols.extend(split_dibits(imbe, 72))
 
     text_out("\tSymbol data:\n")
-    print_spec(insert_status(symbols, ssyms))
+    print_spec(ldu1_symbols(nac, ss, imbe, lsd, lc))
 
 # Logical Link Data Unit 2
 def construct_ldu2(nac, ss, imbe, lsd, mi, algid, kid):
@@ -991,35 +1091,11 @@ def construct_ldu2(nac, ss, imbe, lsd, mi, algid, kid):
     text_out("\tIMBE  = %036x\n" % imbe)
     text_out("\tLSD   = %08x\n" % lsd)
 
-    symbols = start_packet(nac, duid)
-
     # Encryption Sync Word
     es = construct_es(mi, algid, kid)
-    rs_codeword = rs_24_16_9_encode(es)
-    es_syms = split_dibits(ldu_hamming(rs_codeword), 120)
-
-    # Low Speed Data
-    lsd_syms = split_dibits(ldu2_cyclic(lsd), 16)
-
-    symbols.extend(split_dibits(imbe ^ 2, 72)) # flipping sync bit
-    symbols.extend(split_dibits(imbe, 72))
-    symbols.extend(es_syms[0:20])
-    symbols.extend(split_dibits(imbe ^ 2, 72))
-    symbols.extend(es_syms[20:40])
-    symbols.extend(split_dibits(imbe, 72))
-    symbols.extend(es_syms[40:60])
-    symbols.extend(split_dibits(imbe ^ 2, 72))
-    symbols.extend(es_syms[60:80])
-    symbols.extend(split_dibits(imbe, 72))
-    symbols.extend(es_syms[80:100])
-    symbols.extend(split_dibits(imbe ^ 2, 72))
-    symbols.extend(es_syms[100:120])
-    symbols.extend(split_dibits(imbe, 72))
-    symbols.extend(lsd_syms)
-    symbols.extend(split_dibits(imbe ^ 2, 72))
 
     text_out("\tSymbol data:\n")
-    print_spec(insert_status(symbols, ssyms))
+    print_spec(ldu2_symbols(nac, ss, imbe, lsd, es))
 
 # Simple Terminator Data Unit
 def construct_stdu(nac, ss):
@@ -1032,13 +1108,11 @@ def construct_stdu(nac, ss):
 
     ssyms = (ss,) * 2
 
-    symbols = start_packet(nac, duid)
-
     text_out("\tDUID  = %01x\n" % duid)
     text_out("\tNAC   = %03x\n" % nac)
     text_out("\tSSym  = %d %d\n" % ssyms)
     text_out("\tSymbol data:\n")
-    print_spec(insert_status(symbols, ssyms))
+    print_spec(stdu_symbols(nac, ss))
 
 # Terminator Data Unit with Link Control
 #
@@ -1064,14 +1138,10 @@ def construct_xtdu(nac, ss, lco, mfid, svcopt, s, tgid, dst, src):
     text_out("\tNAC   = %03x\n" % nac)
     text_out("\tSSym  = %d %d %d %d %d %d\n" % ssyms)
 
-    symbols = start_packet(nac, duid)
-
     lc = construct_lc(lco, mfid, svcopt, s, tgid, dst, src)
-    rs_codeword = rs_24_12_13_encode(lc)
-    symbols.extend(split_dibits(xtdu_golay(rs_codeword), 144))
 
     text_out("\tSymbol data:\n")
-    print_spec(insert_status(symbols, ssyms))
+    print_spec(xtdu_symbols(nac, ss, lc))
 
 # Trunking Signaling Data Unit
 #
@@ -1091,7 +1161,7 @@ def construct_tsdu(nac, ss, blocks, mfid, opcode, arg):
 
     duid  = 0x7
 
-    numss = (56 + (blocks * 98) + 34) / 35
+    numss = (56 + (blocks * 98) + 34) // 35
     ssyms = (ss,) * numss
 
     text_out("\tDUID  = %01x\n" % duid)
@@ -1101,16 +1171,14 @@ def construct_tsdu(nac, ss, blocks, mfid, opcode, arg):
         text_out(" %d" % ssyms[i])
     text_out("\n")
 
-    symbols = start_packet(nac, duid)
-
     # append TSBKs
+    tsbks = []
     for i in range(blocks):
         last_block = (i == (blocks - 1))
-        tsbk = construct_tsbk(last_block, 0, opcode, mfid, arg)
-        symbols.extend(data_interleave(trellis_1_2_encode(split_dibits(tsbk, 48))))
+        tsbks.append(construct_tsbk(last_block, 0, opcode, mfid, arg))
 
     text_out("\tSymbol data:\n")
-    print_spec(insert_status(symbols, ssyms))
+    print_spec(tsdu_symbols(nac, ss, tsbks))
 
 # Trunking Signaling Data Unit
 #
@@ -1137,7 +1205,7 @@ def construct_tsdu3(nac, ss, blocks, mfid, opcodes, args):
 
     duid  = 0x7
 
-    numss = (56 + (blocks * 98) + 34) / 35
+    numss = (56 + (blocks * 98) + 34) // 35
     ssyms = (ss,) * numss
 
     text_out("\tDUID  = %01x\n" % duid)
@@ -1147,16 +1215,14 @@ def construct_tsdu3(nac, ss, blocks, mfid, opcodes, args):
         text_out(" %d" % ssyms[i])
     text_out("\n")
 
-    symbols = start_packet(nac, duid)
-
     # append TSBKs
+    tsbks = []
     for i in range(blocks):
         last_block = (i == (blocks - 1))
-        tsbk = construct_tsbk(last_block, 0, opcodes[i], mfid, args[i])
-        symbols.extend(data_interleave(trellis_1_2_encode(split_dibits(tsbk, 48))))
+        tsbks.append(construct_tsbk(last_block, 0, opcodes[i], mfid, args[i]))
 
     text_out("\tSymbol data:\n")
-    print_spec(insert_status(symbols, ssyms))
+    print_spec(tsdu_symbols(nac, ss, tsbks))
 
 # Confirmed Packet Data Unit
 def construct_cpdu(nac, ss, data, length, an, io, sapid,
@@ -1181,7 +1247,7 @@ def construct_cpdu(nac, ss, data, length, an, io, sapid,
 
     # account for length of packet CRC appended to data
     length += 4
-    blocks = (length + 15) / 16
+    blocks = (length + 15) // 16
     assert blocks <= 127
 
     # account for padding to end of next full block
@@ -1197,7 +1263,7 @@ def construct_cpdu(nac, ss, data, length, an, io, sapid,
     data <<= (4 * 8)
     data |= packet_crc
 
-    numss = (56 + ((blocks + 1) * 98) + 34) / 35
+    numss = (56 + ((blocks + 1) * 98) + 34) // 35
     ssyms = (ss,) * numss
 
     text_out("\tDUID = %01x\n" % duid)
@@ -1271,7 +1337,7 @@ def construct_rpdu(nac, ss, data, length, io, rclass, rtype,
     if (length > 0):
         # account for length of packet CRC appended to data
         length += 4
-        blocks = (length + 11) / 12
+        blocks = (length + 11) // 12
 
         packet_crc = crc_32(data, (length - 4) * 8)
         data <<= (4 * 8)
@@ -1279,7 +1345,7 @@ def construct_rpdu(nac, ss, data, length, io, rclass, rtype,
     else:
         blocks = 0
 
-    numss = (56 + ((blocks + 1) * 98) + 34) / 35
+    numss = (56 + ((blocks + 1) * 98) + 34) // 35
     ssyms = (ss,) * numss
 
     text_out("\tDUID = %01x\n" % duid)
@@ -1331,7 +1397,7 @@ def construct_updu(nac, ss, data, length, io, sapid, mfid, llid, dho):
 
     # account for length of packet CRC appended to data
     length += 4
-    blocks = (length + 11) / 12
+    blocks = (length + 11) // 12
     assert blocks <= 127
 
     # account for padding to end of next full block
@@ -1345,7 +1411,7 @@ def construct_updu(nac, ss, data, length, io, sapid, mfid, llid, dho):
     data <<= (4 * 8)
     data |= packet_crc
 
-    numss = (56 + ((blocks + 1) * 98) + 34) / 35
+    numss = (56 + ((blocks + 1) * 98) + 34) // 35
     ssyms = (ss,) * numss
 
     text_out("\tDUID = %01x\n" % duid)
@@ -1397,7 +1463,7 @@ def construct_ambt(nac, ss, data, length, io, sapid, mfid, llid, opcode, dbtm):
 
     # account for length of packet CRC appended to data
     length += 4
-    blocks = (length + 11) / 12
+    blocks = (length + 11) // 12
     assert blocks <= 3
 
     # make sure the data fill the blocks
@@ -1408,7 +1474,7 @@ def construct_ambt(nac, ss, data, length, io, sapid, mfid, llid, opcode, dbtm):
     data <<= (4 * 8)
     data |= packet_crc
 
-    numss = (56 + ((blocks + 1) * 98) + 34) / 35
+    numss = (56 + ((blocks + 1) * 98) + 34) // 35
     ssyms = (ss,) * numss
 
     text_out("\tDUID = %01x\n" % duid)
@@ -1690,6 +1756,71 @@ def format_group_voice_channel_grant_update(ch1, ga1, ch2, ga2):
     args = (args << 16) + ga2
     return opcode, args
 
+def format_iden_up_tdma(identifier, channel_type, tx_offset, spacing, frequency):
+    assert identifier   <= 0xf
+    assert channel_type <= 0xf
+    assert tx_offset    <= 0x3fff
+    assert spacing      <= 0x3ff
+    assert frequency    <= 0xffffffff
+
+    opcode = 0x33
+    args = identifier
+    args = (args << 4) + channel_type
+    args = (args << 14) + tx_offset
+    args = (args << 10) + spacing
+    args = (args << 32) + frequency
+    return opcode, args
+
+def format_group_voice_channel_grant(svcopt, ch, ga, sa):
+    assert svcopt <= 0xff
+    assert ch     <= 0xffff
+    assert ga     <= 0xffff
+    assert sa     <= 0xffffff
+    opcode = 0
+    args = svcopt
+    args = (args << 16) + ch
+    args = (args << 16) + ga
+    args = (args << 24) + sa
+    return opcode, args
+
+# Motorola (mfid 0x90) patch messages
+
+def format_mot_grg_add_cmd(sg, ga1, ga2, ga3):
+    assert sg  <= 0xffff
+    assert ga1 <= 0xffff
+    assert ga2 <= 0xffff
+    assert ga3 <= 0xffff
+    opcode = 0
+    args = sg
+    args = (args << 16) + ga1
+    args = (args << 16) + ga2
+    args = (args << 16) + ga3
+    return opcode, args
+
+def format_mot_grg_ch_grant(svcopt, ch, sg, sa):
+    assert svcopt <= 0xff
+    assert ch     <= 0xffff
+    assert sg     <= 0xffff
+    assert sa     <= 0xffffff
+    opcode = 2
+    args = svcopt
+    args = (args << 16) + ch
+    args = (args << 16) + sg
+    args = (args << 24) + sa
+    return opcode, args
+
+def format_mot_grg_ch_grant_update(ch1, sg1, ch2, sg2):
+    assert ch1 <= 0xffff
+    assert sg1 <= 0xffff
+    assert ch2 <= 0xffff
+    assert sg2 <= 0xffff
+    opcode = 3
+    args = ch1
+    args = (args << 16) + sg1
+    args = (args << 16) + ch2
+    args = (args << 16) + sg2
+    return opcode, args
+
 def make_fakecc_tsdu(params):
     opcodes = []
     args = []
@@ -1697,14 +1828,14 @@ def make_fakecc_tsdu(params):
         int(12.5 / 0.125),
         (25 * 4),
         int(12.5 / 0.125),
-        902012500/5)
+        902012500//5)
     opcodes.append(op)
     args.append(arg)
     op, arg = format_network_status_broadcast(
         0,
         params['wacn'],
         params['system_id'],
-        (params['cc_freq'] - 902012500) / 12500,
+        (params['cc_freq'] - 902012500) // 12500,
         0x70)
     opcodes.append(op)
     args.append(arg)
@@ -1713,7 +1844,7 @@ def make_fakecc_tsdu(params):
         params['system_id'],
         params['subsystem_id'],
         params['site_id'],
-        (params['cc_freq'] - 902012500) / 12500,
+        (params['cc_freq'] - 902012500) // 12500,
         0x70)
     opcodes.append(op)
     args.append(arg)
@@ -1723,7 +1854,7 @@ def make_fakecc_tsdu(params):
     mfid = 0
     construct_tsdu3(nac, ss, blocks, mfid, opcodes, args)
     ga = 666
-    ch = (params['vc_freq'] - 902012500) / 12500
+    ch = (params['vc_freq'] - 902012500) // 12500
     opcode, args = format_group_voice_channel_grant_update(ch, ga, ch, ga)
     construct_tsdu (nac, ss, blocks, mfid, opcode, args)
 
@@ -1835,7 +1966,7 @@ if __name__ == "__main__":
     parser.add_option("-s", "--silence", action="store_true", dest="silence",
         default=False, help="audio silence (Default: false)")
     parser.add_option("-o", "--output-file", type="string", default=None,
-        help="Binary output file (Default: None)")
+        help="Binary output file (Default: p25.out)")
     parser.add_option("-q", "--quiet", action="store_true", dest="quiet",
         default=False, help="Supress text output (Default: false)")
     parser.add_option("-f", "--flip", action="store_true", dest="flip",
@@ -1858,10 +1989,10 @@ if __name__ == "__main__":
     assert options.src     <= 0xffffff
     assert options.dst     <= 0xffffff
     assert options.lsd     <= 0xffffffff
-    assert options.lsd1    <= 0xffff
-    assert options.lsd2    <= 0xffff
+    assert options.lsd1 is None or options.lsd1 <= 0xffff
+    assert options.lsd2 is None or options.lsd2 <= 0xffff
     assert options.pri     <= 0x7
-    assert options.svcopt  <= 0xff
+    assert options.svcopt is None or options.svcopt <= 0xff
     assert options.ntsbk   >= 1
     assert options.ntsbk   <= 3
     assert options.sapid   <= 0x3f
@@ -1879,10 +2010,12 @@ if __name__ == "__main__":
 
     if options.output_file:
         if options.output_file == '-':
-            outfile = sys.stdout
+            outfile = sys.stdout.buffer
             quiet = True
         else:
-            outfile = open(options.output_file, 'w')
+            outfile = open(options.output_file, 'wb')
+    else:                   # default output of the command line tool; importing the module writes nothing
+        outfile = open('p25.out', 'wb')
 
     # set up inversion of frequency deviations
     if options.flip:
@@ -1910,7 +2043,7 @@ if __name__ == "__main__":
     # Auto-detect the length in bytes of --data.  The --length option overrides
     # this, which is useful when you want leading zeros.
     if (options.data > 0) and (options.length == 0):
-        options.length = (options.data.bit_length() + 7) / 8
+        options.length = (options.data.bit_length() + 7) // 8
 
     # make sure we have IMBE data if we need it
     if options.ldu1 or options.ldu2 or options.superframes:
@@ -0,0 +1,380 @@
+#!/usr/bin/env python
+
+# Synthetic P25 control channel traffic generator
+#
+# Copyright 2025 Graham J. Norbury - gnorbury@bondcar.com
+#
+# This file is part of OP25
+#
+# OP25 is free software; you can redistribute it and/or modify it
+# under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# OP25 is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY
+# or FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public
+# License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with OP25; see the file COPYING. If not, write to the Free
+# Software Foundation, Inc., 51 Franklin Street, Boston, MA
+# 02110-1301, USA.
+#
+# Builds a control channel carrying a configurable call load (grants per
+# second across a set of talkgroups, with optional patches, encrypted calls
+# and Phase 2 TDMA voice channels) for load testing multi_rx.py and the
+# trunking modules without RF.  Calls are granted on the control channel and
+# kept alive with grant updates; broadcast messages fill the idle TSBKs.
+#
+# Outputs (any combination):
+#   --symbols  raw symbol file (one dibit per byte) for a channel "raw_input"
+#   --iq       C4FM modulated IQ file (16 bit signed) for the "iqsrc" device
+#   --capture  trunking message capture for util/tk-replay.py
+#   --truth    tab separated list of the calls placed
+#
+# Phase 2 MAC PDUs (group voice channel user messages for calls on TDMA
+# channels) are only present in the message capture since p25craft has no
+# TDMA encoder.  util/load-test.py runs scenarios through the trunking
+# module to find the highest grant rate that is followed without misses.
+#
+# Example usage (from the apps/tx directory):
+# ./traffic_gen.py --rate 5 --talkgroups 50 --duration 60 --symbols cc.sym --truth calls.tsv
+# ./traffic_gen.py --rate 5 --patches 4 --encrypted 0.2 --tdma-channels 4 --tdma 0.5 --capture cc.bin
+# ./traffic_gen.py --rate 2 --duration 30 --iq cc.iq --iq-rate 480000
+#
+
+import sys
+import os
+import time
+import heapq
+import random
+from optparse import OptionParser
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import p25craft
+from p25craft import (format_iden_up, format_iden_up_tdma, format_network_status_broadcast,
+                      format_rfss_status_broadcast, format_group_voice_channel_grant,
+                      format_group_voice_channel_grant_update, format_mot_grg_add_cmd,
+                      format_mot_grg_ch_grant, format_mot_grg_ch_grant_update)
+from qmsg_capture import CAPTURE_MAGIC, CAPTURE_HDR
+
+SYMBOL_RATE = 4800          # P25 Phase 1 symbols per second
+TSBKS_PER_TSDU = 3          # Every control channel TSDU carries three TSBKs
+TSDU_SYMBOLS = 360          # Frame sync and NID, three trellis coded TSBKs and status symbols
+TSDU_TIME = TSDU_SYMBOLS / float(SYMBOL_RATE)   # Seconds per TSDU (75ms)
+CHANNEL_SPACING = 12500     # Hz between channels in both channel plans
+FDMA_IDEN = 0               # Channel identifier (band plan) of the control and FDMA voice channels
+TDMA_IDEN = 1               # Channel identifier of the two slot TDMA voice channels
+TDMA_CHANNEL_TYPE = 3       # iden_up_tdma channel type: 12.5kHz, 2 slots per carrier
+MOT_MFID = 0x90             # Manufacturer id of the patch (regroup) messages
+SVC_ENCRYPTED = 0x40        # Service options "protected" bit
+LEAD_IN = 1.0               # Seconds of broadcast messages before the first call
+PATCH_INTERVAL = 5.0        # Seconds between patch announcements (tk_p25 expires patches after 20s)
+CC_STATUS_SYMBOL = 2        # Status symbol sent on the control channel (as make_fakecc_tsdu)
+
+# trunking message capture types (see tk_p25.py process_qmsg)
+QMSG_TSBK = 7
+QMSG_TDMA = 18
+
+class call(object):
+    __slots__ = ('start', 'end', 'tgid', 'srcaddr', 'ch', 'freq', 'slot', 'svcopts', 'patch', 'grant_time')
+
+    def __init__(self, start, end, tgid, srcaddr, ch, freq, slot, svcopts, patch):
+        self.start = start
+        self.end = end
+        self.tgid = tgid
+        self.srcaddr = srcaddr
+        self.ch = ch
+        self.freq = freq
+        self.slot = slot
+        self.svcopts = svcopts
+        self.patch = patch          # list of patched member talkgroups if tgid is a supergroup
+        self.grant_time = None      # control channel time the grant was sent (None if never sent)
+
+class scenario(object):
+    def __init__(self, rate=5.0, talkgroups=20, duration=60.0, call_time=3.0, update_interval=0.5,
+                 voice_channels=8, tdma_channels=0, tdma=0.0, encrypted=0.0, patches=0, patched=0.0,
+                 poisson=False, nac=0x293, wacn=0xbee00, sysid=0x290, rfss=1, site=1,
+                 base_freq=851012500, tg_base=1000, rid_base=100000, seed=1):
+        self.rate = rate
+        self.talkgroups = talkgroups
+        self.duration = duration
+        self.call_time = call_time
+        self.update_interval = update_interval
+        self.voice_channels = voice_channels
+        self.tdma_channels = tdma_channels
+        self.tdma = tdma
+        self.encrypted = encrypted
+        self.patches = patches
+        self.patched = patched
+        self.poisson = poisson
+        self.nac = nac
+        self.wacn = wacn
+        self.sysid = sysid
+        self.rfss = rfss
+        self.site = site
+        self.base_freq = base_freq
+        self.tg_base = tg_base
+        self.rid_base = rid_base
+        self.seed = seed
+
+        self.cc_freq = base_freq    # channel 0 of the FDMA plan; voice channels follow, then the TDMA carriers
+        self.tdma_base = base_freq + (voice_channels + 1) * CHANNEL_SPACING
+        self.supergroups = {}       # sg -> member talkgroups
+        for i in range(patches):
+            sg = tg_base + talkgroups + i
+            self.supergroups[sg] = [tg_base + ((i * 2 + j) % talkgroups) for j in range(2)]
+
+        self.calls = []
+        self.tsbks = []             # (opcode, mfid, arg) in transmit order, TSBKS_PER_TSDU per TSDU
+        self.macs = []              # (time, frequency, slot, octets) Phase 2 MAC PDUs
+        self.busy = 0               # calls not placed for lack of a free channel or talkgroup
+        self.backlog = 0            # messages still queued when the control channel ended
+        self.sent = {}              # message kind -> count
+
+    def channel_plan(self):     # [(channel id, frequency, tdma slot)] for every voice channel
+        plan = [((FDMA_IDEN << 12) | ch, self.base_freq + ch * CHANNEL_SPACING, None) for ch in range(1, self.voice_channels + 1)]
+        tdma = []
+        for carrier in range(self.tdma_channels):
+            for slot in range(2):
+                tdma.append(((TDMA_IDEN << 12) | (carrier * 2 + slot), self.tdma_base + carrier * CHANNEL_SPACING, slot))
+        return plan, tdma
+
+    def broadcasts(self):       # filler messages: channel plans and system identity
+        cc_ch = FDMA_IDEN << 12
+        msgs = [format_iden_up(FDMA_IDEN, CHANNEL_SPACING // 125, 0, CHANNEL_SPACING // 125, self.base_freq // 5)]
+        if self.tdma_channels:
+            msgs.append(format_iden_up_tdma(TDMA_IDEN, TDMA_CHANNEL_TYPE, 0, CHANNEL_SPACING // 125, self.tdma_base // 5))
+        msgs.append(format_network_status_broadcast(0, self.wacn, self.sysid, cc_ch, 0x70))
+        msgs.append(format_rfss_status_broadcast(0, 1, 1, self.sysid, self.rfss, self.site, cc_ch, 0x70))
+        return [(opcode, 0, arg) for (opcode, arg) in msgs]
+
+    def place_calls(self):
+        rng = random.Random(self.seed)
+        fdma, tdma = self.channel_plan()
+        released = {}               # channel id -> time free
+        active = {}                 # tgid -> call end
+        srcaddr = self.rid_base
+        t = LEAD_IN
+        while t < self.duration:
+            start = t
+            t += rng.expovariate(self.rate) if self.poisson else 1.0 / self.rate
+            end = start + self.call_time
+
+            pool = tdma if (tdma and (not fdma or rng.random() < self.tdma)) else fdma
+            free = [c for c in pool if released.get(c[0], 0.0) <= start]
+            if self.supergroups and rng.random() < self.patched:
+                candidates = [sg for sg in self.supergroups if active.get(sg, 0.0) <= start]
+            else:
+                candidates = [self.tg_base + i for i in range(self.talkgroups) if active.get(self.tg_base + i, 0.0) <= start]
+            if len(free) == 0 or len(candidates) == 0:
+                self.busy += 1
+                continue
+            ch, freq, slot = free[rng.randrange(len(free))]
+            tgid = candidates[rng.randrange(len(candidates))]
+            svcopts = SVC_ENCRYPTED if rng.random() < self.encrypted else 0
+            released[ch] = end
+            active[tgid] = end
+            self.calls.append(call(start, end, tgid, srcaddr, ch, freq, slot, svcopts, self.supergroups.get(tgid)))
+            srcaddr += 1            # unique per call so grants can be matched to decoded events
+
+    def queue_messages(self):   # heap of (due time, sequence, kind, (opcode, mfid, arg), call)
+        queue = []
+        seq = 0
+        for c in self.calls:
+            if c.patch is not None:
+                opcode, arg = format_mot_grg_ch_grant(c.svcopts, c.ch, c.tgid, c.srcaddr)
+                queue.append((c.start, seq, 'grant', (opcode, MOT_MFID, arg), c))
+            else:
+                opcode, arg = format_group_voice_channel_grant(c.svcopts, c.ch, c.tgid, c.srcaddr)
+                queue.append((c.start, seq, 'grant', (opcode, 0, arg), c))
+            seq += 1
+
+        # grant updates for calls in progress, two calls per message
+        tick = LEAD_IN + self.update_interval
+        active = []
+        nxt = 0
+        while tick < self.duration + self.call_time:
+            while nxt < len(self.calls) and self.calls[nxt].start < tick:
+                active.append(self.calls[nxt])
+                nxt += 1
+            active = [c for c in active if c.end > tick]
+            for patched in (False, True):
+                calls = [c for c in active if (c.patch is not None) == patched]
+                for i in range(0, len(calls), 2):
+                    c1 = calls[i]
+                    c2 = calls[i + 1] if i + 1 < len(calls) else c1
+                    if patched:
+                        opcode, arg = format_mot_grg_ch_grant_update(c1.ch, c1.tgid, c2.ch, c2.tgid)
+                        queue.append((tick, seq, 'update', (opcode, MOT_MFID, arg), None))
+                    else:
+                        opcode, arg = format_group_voice_channel_grant_update(c1.ch, c1.tgid, c2.ch, c2.tgid)
+                        queue.append((tick, seq, 'update', (opcode, 0, arg), None))
+                    seq += 1
+            for c in active:        # group voice channel user MAC PDU on the TDMA voice channel
+                if c.slot is not None:
+                    self.macs.append((tick, c.freq, c.slot, bytes([0x01, c.svcopts]) + c.tgid.to_bytes(2, 'big') + c.srcaddr.to_bytes(3, 'big')))
+            tick += self.update_interval
+
+        # patch announcements
+        tick = 0.0
+        while tick < self.duration + self.call_time:
+            for sg in sorted(self.supergroups):
+                ga = self.supergroups[sg] + [self.supergroups[sg][-1]] * (3 - len(self.supergroups[sg]))
+                opcode, arg = format_mot_grg_add_cmd(sg, ga[0], ga[1], ga[2])
+                queue.append((tick, seq, 'patch', (opcode, MOT_MFID, arg), None))
+                seq += 1
+            tick += PATCH_INTERVAL
+        heapq.heapify(queue)
+        return queue
+
+    def generate(self):
+        self.place_calls()
+        queue = self.queue_messages()
+        filler = self.broadcasts()
+        n_filler = 0
+        n_tsdu = int((self.duration + self.call_time) / TSDU_TIME) + 1
+        for k in range(n_tsdu):
+            now = k * TSDU_TIME
+            for i in range(TSBKS_PER_TSDU):
+                if queue and queue[0][0] <= now:
+                    due, seq, kind, msg, c = heapq.heappop(queue)
+                    if c is not None:
+                        c.grant_time = now
+                else:
+                    kind, msg = 'broadcast', filler[n_filler % len(filler)]
+                    n_filler += 1
+                self.tsbks.append(msg)
+                self.sent[kind] = self.sent.get(kind, 0) + 1
+        self.backlog = len(queue)
+        self.macs.sort(key=lambda m: m[0])
+
+    def tsbk_time(self, idx):   # control channel time of the idx'th TSBK
+        return (idx // TSBKS_PER_TSDU) * TSDU_TIME
+
+    def symbols(self):          # numpy array of dibits
+        return p25craft.tsdu_stream(self.nac, CC_STATUS_SYMBOL, self.tsbks, TSBKS_PER_TSDU)
+
+    def qmsgs(self, start_time, cc_rxid=0, mac_rxid=0):   # [(ts, type, arg1, arg2, payload)] as recorded by qmsg_capture
+        nac = self.nac.to_bytes(2, 'big')
+        records = []
+        for idx, (opcode, mfid, arg) in enumerate(self.tsbks):
+            lb = (idx % TSBKS_PER_TSDU) == (TSBKS_PER_TSDU - 1)
+            tsbk = (lb << 79) | (opcode << 72) | (mfid << 64) | arg     # crc is not passed to the trunking module
+            ts = start_time + self.tsbk_time(idx)
+            records.append((ts, QMSG_TSBK, float(cc_rxid << 1), ts, nac + tsbk.to_bytes(10, 'big')))
+        for (t, freq, slot, octets) in self.macs:
+            ts = start_time + t
+            records.append((ts, QMSG_TDMA, float((mac_rxid << 1) | slot), ts, nac + octets))
+        records.sort(key=lambda r: r[0])
+        return records
+
+    def summary(self):
+        granted = [c for c in self.calls if c.grant_time is not None]
+        delays = sorted([c.grant_time - c.start for c in granted])
+        load = 100.0 * (len(self.tsbks) - self.sent.get('broadcast', 0)) / max(1, len(self.tsbks))
+        s = "calls: %d placed, %d busy, %d granted  control channel: %d TSBKs, %.1f%% loaded, %d backlog" % (len(self.calls), self.busy, len(granted), len(self.tsbks), load, self.backlog)
+        if delays:
+            s += "  grant delay: mean %.3fs max %.3fs" % (sum(delays) / len(delays), delays[-1])
+        return s
+
+def write_capture(filename, records):
+    with open(filename, 'wb') as fp:
+        fp.write(CAPTURE_MAGIC)
+        for (ts, m_type, arg1, arg2, payload) in records:
+            fp.write(CAPTURE_HDR.pack(ts, m_type, arg1, arg2, len(payload)))
+            fp.write(payload)
+
+def write_truth(filename, sc):
+    with open(filename, 'w') as fp:
+        fp.write("start\tgrant\tend\ttgid\tsrcaddr\tfreq\tslot\tsvcopts\tpatch\n")
+        for c in sc.calls:
+            fp.write("%.3f\t%s\t%.3f\t%d\t%d\t%d\t%s\t0x%02x\t%s\n" % (c.start, "-" if c.grant_time is None else "%.3f" % c.grant_time, c.end,
+                     c.tgid, c.srcaddr, c.freq, "-" if c.slot is None else c.slot, c.svcopts, "" if c.patch is None else ",".join([str(ga) for ga in c.patch])))
+
+# C4FM modulate a raw symbol file to 16 bit signed IQ, using the same
+# modulator chain and gains as dv_tx.py
+def write_iq(symbol_file, iq_file, iq_rate):
+    import math
+    from gnuradio import gr, blocks, filter, analog
+    from op25_c4fm_mod import p25_mod_bf
+
+    modulator_rate = 48000
+    if iq_rate % modulator_rate != 0:
+        sys.stderr.write("IQ sample rate must be a multiple of %d\n" % modulator_rate)
+        sys.exit(1)
+    tb = gr.top_block()
+    src = blocks.file_source(gr.sizeof_char, symbol_file, False)
+    mod = p25_mod_bf(output_sample_rate=modulator_rate, rc='rc')
+    amp = blocks.multiply_const_ff(4.5)
+    interp = filter.rational_resampler_fff(iq_rate // modulator_rate, 1)
+    fm = analog.frequency_modulator_fc(2 * math.pi * 12.5e3 / iq_rate * 0.33)
+    scale = blocks.multiply_const_cc(0.7 * 32767)
+    to_short = blocks.complex_to_interleaved_short(False)
+    sink = blocks.file_sink(gr.sizeof_short, iq_file)
+    tb.connect(src, mod, amp, interp, fm, scale, to_short, sink)
+    tb.run()
+
+def add_options(parser):    # scenario options shared with util/load-test.py
+    parser.add_option("-r", "--rate", type="float", default=5.0, help="grants per second")
+    parser.add_option("-t", "--talkgroups", type="int", default=20, help="number of talkgroups")
+    parser.add_option("-d", "--duration", type="float", default=60.0, help="seconds of calls")
+    parser.add_option("-l", "--call-time", type="float", default=3.0, help="seconds per call")
+    parser.add_option("-u", "--update-interval", type="float", default=0.5, help="seconds between grant updates for calls in progress")
+    parser.add_option("-v", "--voice-channels", type="int", default=8, help="number of FDMA voice channels")
+    parser.add_option("--tdma-channels", type="int", default=0, help="number of two slot TDMA voice carriers")
+    parser.add_option("--tdma", type="float", default=0.0, help="fraction of calls placed on TDMA channels")
+    parser.add_option("--encrypted", type="float", default=0.0, help="fraction of calls that are encrypted")
+    parser.add_option("--patches", type="int", default=0, help="number of patched supergroups")
+    parser.add_option("--patched", type="float", default=0.0, help="fraction of calls placed on supergroups")
+    parser.add_option("--poisson", action="store_true", default=False, help="poisson call arrivals instead of evenly spaced")
+    parser.add_option("--nac", type="int", default=0x293, help="network access code")
+    parser.add_option("--wacn", type="int", default=0xbee00, help="wacn")
+    parser.add_option("--sysid", type="int", default=0x290, help="system id")
+    parser.add_option("--base-freq", type="int", default=851012500, help="control channel frequency (Hz); voice channels follow at 12.5kHz")
+    parser.add_option("--seed", type="int", default=1, help="random seed")
+
+def from_options(options, rate=None):
+    return scenario(rate=options.rate if rate is None else rate, talkgroups=options.talkgroups, duration=options.duration,
+                    call_time=options.call_time, update_interval=options.update_interval, voice_channels=options.voice_channels,
+                    tdma_channels=options.tdma_channels, tdma=options.tdma, encrypted=options.encrypted,
+                    patches=options.patches, patched=options.patched, poisson=options.poisson, nac=options.nac,
+                    wacn=options.wacn, sysid=options.sysid, base_freq=options.base_freq, seed=options.seed)
+
+def main():
+    parser = OptionParser()
+    add_options(parser)
+    parser.add_option("--symbols", type="string", default=None, help="write raw symbol (dibit per byte) file")
+    parser.add_option("--iq", type="string", default=None, help="write 16 bit signed IQ file (requires gnuradio)")
+    parser.add_option("--iq-rate", type="int", default=480000, help="IQ file sample rate")
+    parser.add_option("--capture", type="string", default=None, help="write trunking message capture file")
+    parser.add_option("--truth", type="string", default=None, help="write tab separated list of calls placed")
+    (options, args) = parser.parse_args()
+
+    sc = from_options(options)
+    t0 = time.time()
+    sc.generate()
+    sys.stderr.write("%s (%.2fs)\n" % (sc.summary(), time.time() - t0))
+    sys.stderr.write("control channel: %f MHz  nac: 0x%x\n" % (sc.cc_freq / 1e6, sc.nac))
+
+    symbol_file = options.symbols
+    if options.symbols or options.iq:
+        t0 = time.time()
+        syms = sc.symbols()
+        if symbol_file is None:
+            symbol_file = options.iq + ".sym"
+        p25craft.write_dibits(symbol_file, syms, packed=False)
+        sys.stderr.write("wrote %d symbols (%.1fs of air time) to %s in %.2fs\n" % (len(syms), len(syms) / float(SYMBOL_RATE), symbol_file, time.time() - t0))
+    if options.iq:
+        write_iq(symbol_file, options.iq, options.iq_rate)
+        if options.symbols is None:
+            os.remove(symbol_file)
+        sys.stderr.write("wrote IQ to %s (iq_size 2, iq_signed, rate %d)\n" % (options.iq, options.iq_rate))
+    if options.capture:
+        write_capture(options.capture, sc.qmsgs(time.time()))
+    if options.truth:
+        write_truth(options.truth, sc)
+
+if __name__ == "__main__":
+    main()
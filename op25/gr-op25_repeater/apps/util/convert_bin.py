@@ -45,85 +45,57 @@ exit 127
 #
 # Tool for converting raw dibit files between OP25 format and SDRTrunk format
 #
+# The source is converted in chunks through a memory map (see
+# symbol_file.py) with progress and throughput reported on stderr.
+#
+# Example usage (from the apps directory):
+# util/convert_bin.py ch0-raw.bin ch0-sdrtrunk.bits
+#
 
 import sys
+import os
+import time
 
-def get_ordinals(s):
-    t = 0
-    if type(s) is int:                                  # integer
-        return s
-    elif type(s) is not str and isinstance(s, bytes):   # byte list
-        for c in s:
-            t = (t << 8) + c
-    else:                                               # string list
-        for c in s:
-            t = (t << 8) + ord(c)
-    return t
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import symbol_file
 
+PROGRESS_INTERVAL = 1.0     # Seconds between progress reports
 
-# Read first 64 bytes of source file and see if it contains anything other than dibits
-def identify_file(src):
-    mode = 0
-    try:
-        with open(src, 'rb') as srcfile:
-            data = srcfile.read(64)
-            for d in data:
-                if (get_ordinals(d) >> 2) > 0:
-                    mode = 1
-                    break
-    except IOError:
-        sys.stderr.write("%s: Unable to open file: %s\n" % (sys.argv[0], src))
+class progress_report(object):
+    def __init__(self):
+        self.last = 0.0
+
+    def __call__(self, n_in, total, elapsed):
+        if elapsed - self.last < PROGRESS_INTERVAL and n_in < total:
+            return
+        self.last = elapsed
+        sys.stderr.write("\r%5.1f%%  %d of %d bytes  %.1f MB/sec" % (100.0 * n_in / total, n_in, total, n_in / 1e6 / max(elapsed, 1e-6)))
+        if n_in >= total:
+            sys.stderr.write("\n")
+
+def main():
+    if len(sys.argv) != 3:
+        sys.stderr.write("Invalid args.\n  %s <source> <destination>\n" % sys.argv[0])
         sys.exit(1)
 
-    return mode
+    srcfile = sys.argv[1]
+    dstfile = sys.argv[2]
 
-def convert_file(mode, src, dst):
     try:
-        with open(src, 'rb') as srcfile, open(dst, 'wb') as dstfile:
-            idx = 0
-            d_out = 0
-            data = srcfile.read()
-            for d in data:
-                if mode == 0:   # OP25 single dibit format to SDRTrunk packed dibits
-                    d_out = (d_out << 2) + (get_ordinals(d) & 3)
-                    idx += 1
-                    if idx < 4:
-                        continue
-                    if sys.version[0] > '2':
-                        dstfile.write(bytes(chr(d_out), 'iso8859-1'))
-                    else:
-                        dstfile.write(chr(d_out))
-                    idx = 0
-                    d_out = 0
-                else:           # SDRTrunk packed dibit format to OP25 single dibit
-                    d_in = get_ordinals(d)
-                    if sys.version[0] > '2':
-                        dstfile.write(bytes((chr((d_in >> 6) & 3) + chr((d_in >> 4) & 3) + chr((d_in >> 2) & 3) + chr(d_in & 3)), 'iso8859-1'))
-                    else:
-                        dstfile.write(chr((d_in >> 6) & 3) + chr((d_in >> 4) & 3) + chr((d_in >> 2) & 3) + chr(d_in & 3))
-            if (mode == 0) and (idx > 0):
-                d_out <<= (2 * (4 - idx))
-                if sys.version[0] > '2':
-                    dstfile.write(bytes(chr(d_out), 'iso8859-1'))
-                else:
-                    dstfile.write(chr(d_out))
+        mode = symbol_file.identify_file(srcfile)
+    except IOError:
+        sys.stderr.write("%s: Unable to open file: %s\n" % (sys.argv[0], srcfile))
+        sys.exit(1)
+    sys.stdout.write("Mode %d\n" % mode)
 
+    t_start = time.time()
+    try:
+        n_in, n_out = symbol_file.convert_file(mode, srcfile, dstfile, progress=progress_report())
     except (IOError) as ex:
         sys.stderr.write("%s: %s\n" % (sys.argv[0], ex))
         sys.exit(1)
- 
-
-###################
-# Main body
-
-if len(sys.argv) != 3:
-    sys.stderr.write("Invalid args.\n  %s <source> <destination>\n" % sys.argv[0])
-    sys.exit(1)
-
-srcfile = sys.argv[1]
-dstfile = sys.argv[2]
-
-mode = identify_file(srcfile)
-sys.stdout.write("Mode %d\n" % mode)
-convert_file(mode, srcfile, dstfile)
+    elapsed = max(time.time() - t_start, 1e-6)
+    sys.stdout.write("Converted %d bytes to %d bytes in %.2f sec (%.1f MB/sec)\n" % (n_in, n_out, elapsed, n_in / 1e6 / elapsed))
 
+if __name__ == "__main__":
+    main()
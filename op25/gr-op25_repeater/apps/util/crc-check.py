@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+
+#
+# Cross-check and benchmark of the table driven CRCs in crc_funcs.py
+#
+# Each CRC is compared against a bit-at-a-time reference (the algorithms
+# previously used by helper_funcs.py and tx/p25craft.py) over random
+# messages of random bit lengths, then both are timed.
+#
+# Example usage (from the apps directory):
+# python3 util/crc-check.py -n 10000
+#
+
+import sys
+import os
+import time
+import random
+from optparse import OptionParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from crc_funcs import CRC16_CCITT, CRC9, CRC32
+
+def bitwise_crc(width, poly, xorout):   # msb first, zero initial value
+    def compute(data, n_bits):
+        crc = 0
+        for i in range(n_bits - 1, -1, -1):
+            crc <<= 1
+            if ((crc >> width) ^ (data >> i)) & 1:
+                crc ^= poly
+        return (crc & ((1 << width) - 1)) ^ xorout
+    return compute
+
+CHECKS = [ ('crc16_ccitt', CRC16_CCITT, bitwise_crc(16, 0x1021, 0xffff), 80),
+           ('crc9',        CRC9,        bitwise_crc(9, 0x059, 0x1ff), 135),
+           ('crc32',       CRC32,       bitwise_crc(32, 0x04c11db7, 0xffffffff), 1024) ]
+
+def elapsed(fn, data, n_bits, count):
+    t_start = time.time()
+    for i in range(count):
+        fn(data, n_bits)
+    return (time.time() - t_start) / count
+
+def main():
+    parser = OptionParser()
+    parser.add_option("-n", "--count", type="int", default=10000, help="random messages checked per crc")
+    parser.add_option("-s", "--seed", type="int", default=1, help="random seed")
+    (options, args) = parser.parse_args()
+
+    random.seed(options.seed)
+    failed = 0
+    for (name, table, reference, bench_bits) in CHECKS:
+        for i in range(options.count):
+            n_bits = random.randint(1, 2048)
+            data = random.getrandbits(n_bits)
+            if table.compute(data, n_bits) != reference(data, n_bits):
+                sys.stdout.write("%s mismatch: bits %d data 0x%x\n" % (name, n_bits, data))
+                failed += 1
+                break
+        data = random.getrandbits(bench_bits)
+        t_ref = elapsed(reference, data, bench_bits, 200)
+        t_table = elapsed(table.compute, data, bench_bits, 200)
+        sys.stdout.write("%-12s %d messages checked  %4d bits: bitwise %8.2f us  table %8.2f us  (%.1fx)\n" % (name, options.count, bench_bits, t_ref * 1e6, t_table * 1e6, t_ref / t_table))
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
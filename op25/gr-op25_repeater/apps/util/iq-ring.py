@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+
+#
+# List and extract IQ capture rings written by multi_rx (iq_ring_dir)
+#
+# "list" shows each segment with its time span, the device tunings recorded
+# in its index and the frequency each channel was tuned to (only tunings to
+# one frequency with -f).  "extract" copies the samples from a start time for a duration,
+# following on through later segments, to a single file that op25_iqsrc can
+# replay with the printed device settings.
+#
+# Example usage (from the apps directory):
+# python3 util/iq-ring.py -d /var/op25/ring -p dev0 list
+# python3 util/iq-ring.py -d /var/op25/ring -p dev0 -f 851.0125 list
+# python3 util/iq-ring.py -d /var/op25/ring -p dev0 -s "2025-06-01 14:03:10" -t 30 -o call.iq extract
+#
+
+import sys
+import os
+import time
+import json
+from optparse import OptionParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import capture_ring
+
+COPY_SIZE = 1048576         # Bytes copied per read
+
+def fmt_time(ts):
+    return time.strftime(capture_ring.TIME_FORMAT, time.localtime(ts)) + ("%.3f" % (ts % 1))[1:]
+
+def list_ring(directory, prefix, tuned=None):
+    for (seq, iq_file, entries) in capture_ring.read_ring(directory, prefix):
+        sys.stdout.write("%s  %s - %s  %d bytes  rate %d\n" % (os.path.basename(iq_file), fmt_time(entries[0][0]), fmt_time(entries[-1][0]), entries[-1][1], entries[0][2]))
+        last = None
+        for (ts, offset, rate, center, freq) in entries:
+            if (center, freq) != last:
+                sys.stdout.write("    %s  offset %d  center %f  device %f\n" % (fmt_time(ts), offset, center / 1e6, freq / 1e6))
+                last = (center, freq)
+        for (ts, offset, msgq_id, freq) in capture_ring.read_tunes(capture_ring.segment_file(directory, prefix, seq, "idx")):
+            if tuned is None or freq == tuned:
+                sys.stdout.write("    %s  offset %d  channel %d  tuned %f\n" % (fmt_time(ts), offset, msgq_id, freq / 1e6))
+
+def extract(directory, prefix, start, duration, out_file):
+    seg = capture_ring.locate(directory, prefix, start)
+    remaining = int(duration * seg['rate']) * capture_ring.SAMPLE_BYTES
+    segments = dict([(seq, (iq_file, entries)) for (seq, iq_file, entries) in capture_ring.read_ring(directory, prefix)])
+    seq = seg['seq']
+    offset = seg['offset']
+    written = 0
+    with open(out_file, 'wb') as out:
+        while remaining > 0 and seq in segments:
+            iq_file, entries = segments[seq]
+            end = entries[-1][1]
+            with open(iq_file, 'rb') as fp:
+                fp.seek(offset)
+                while remaining > 0 and offset < end:
+                    data = fp.read(min(COPY_SIZE, remaining, end - offset))
+                    if len(data) == 0:
+                        break
+                    out.write(data)
+                    offset += len(data)
+                    written += len(data)
+                    remaining -= len(data)
+            seq += 1
+            offset = 0
+    sys.stdout.write("%d samples (%.1f sec) from %s written to %s\n" % (written // capture_ring.SAMPLE_BYTES, written / float(capture_ring.SAMPLE_BYTES) / seg['rate'], fmt_time(seg['ts']), out_file))
+    sys.stdout.write("iqsrc device settings: %s\n" % json.dumps({"args": "iqsrc", "iq_file": out_file, "iq_size": capture_ring.SAMPLE_BYTES // 2, "iq_signed": True,
+                                                                  "rate": int(round(seg['rate'])), "frequency": seg['center'], "offset": 0}))
+
+def main():
+    parser = OptionParser(usage="%prog [options] list|extract")
+    parser.add_option("-d", "--directory", type="string", default=".", help="ring directory (iq_ring_dir)")
+    parser.add_option("-p", "--prefix", type="string", default="dev0", help="segment file prefix (iq_ring_prefix)")
+    parser.add_option("-f", "--frequency", type="float", default=None, help="list only channel tunings to this frequency (MHz)")
+    parser.add_option("-s", "--start", type="string", default=None, help="start time, seconds since the epoch or \"YYYY-MM-DD HH:MM:SS\"")
+    parser.add_option("-t", "--duration", type="float", default=10.0, help="seconds to extract")
+    parser.add_option("-o", "--output", type="string", default="ring.iq", help="output file name")
+    (options, args) = parser.parse_args()
+    if len(args) != 1 or args[0] not in ('list', 'extract'):
+        parser.print_help()
+        sys.exit(1)
+
+    if args[0] == 'list':
+        list_ring(options.directory, options.prefix, None if options.frequency is None else int(round(options.frequency * 1e6)))
+        return
+    if options.start is None:
+        sys.stderr.write("extract requires a start time (-s)\n")
+        sys.exit(1)
+    try:
+        extract(options.directory, options.prefix, capture_ring.parse_time(options.start), options.duration, options.output)
+    except ValueError as ex:
+        sys.stderr.write("%s\n" % ex)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
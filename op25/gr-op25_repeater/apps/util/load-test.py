@@ -0,0 +1,310 @@
+#!/usr/bin/env python
+
+#
+# Trunking load test using synthetic control channel traffic
+#
+# Generates tx/traffic_gen.py scenarios at a range of grant rates and runs
+# each one through the trunking module's rx_ctl.process_qmsg().  Control
+# channel TSBKs are delivered to whichever receiver is parked on the control
+# channel, Phase 2 MAC PDUs and call terminations to the receivers tuned to
+# the voice channel, and idle voice channels time out as they would on air.
+# A call is "followed" if a receiver was on its channel and talkgroup at any
+# time while the call was in progress.
+#
+# By default each scenario runs offline on the scenario clock, so processing
+# time is never a factor and missed calls only show when there are too few
+# voice receivers: this measures tuner capacity.  With --speed N the
+# messages are released at N times real time into a bounded queue, as the
+# decoders feed multi_rx's rx_q, and dispatched from a separate thread.
+# Messages arriving while the queue is full are dropped, as frame_assembler
+# does, and the dispatch lag of each message behind its scheduled time is
+# measured.  Calls missed beyond the offline run of the same scenario are
+# then due to processing falling behind.
+#
+# Reports placed, granted, followed and missed calls per rate and the
+# highest rate whose miss fraction stays at or below the threshold (paced
+# runs: whose extra misses stay at or below the threshold with no drops).
+# Without -c a config is synthesized with one control channel receiver and
+# -n voice receivers; with -c the config's first trunking system is pointed
+# at the synthetic control channel.
+#
+# Example usage (from the apps directory):
+# python3 util/load-test.py -n 3 --rates 1,2,4,8 --duration 120
+# python3 util/load-test.py -c cfg.json --rates 2,4 --patches 2 --patched 0.3 --encrypted 0.1
+# python3 util/load-test.py -n 8 --rates 5,10,20,40 --duration 60 --speed 10
+#
+
+import sys
+import os
+import copy
+import time
+import json
+import queue
+import threading
+import importlib
+from optparse import OptionParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tx'))
+import log_ts
+from helper_funcs import from_dict
+import traffic_gen
+tk_replay = importlib.import_module('tk-replay')
+
+IDLE_INTERVAL = 0.5         # Seconds between channel timeouts sent to receivers on an idle voice channel
+RX_QUEUE_SIZE = 100         # Depth of multi_rx's rx_q; messages arriving while it is full are dropped
+SYSNAME = 'loadtest'        # Trunking system name of a synthesized config
+
+# event kinds, in delivery order for events at the same time
+EV_END = 0
+EV_GRANT = 1
+EV_TSBK = 2
+EV_MAC = 3
+EV_IDLE = 4
+
+def make_config(cc_freq, nac, receivers):
+    channels = [{"name": "cc", "trunking_sysname": SYSNAME, "frequency": cc_freq}]
+    for i in range(receivers):
+        channels.append({"name": "voice%d" % (i + 1), "trunking_sysname": SYSNAME, "frequency": 0})
+    return {"channels": channels,
+            "trunking": {"module": "tk_p25.py", "chans": [{"sysname": SYSNAME, "control_channel_list": "%f" % (cc_freq / 1e6), "nac": "0x%x" % nac}]}}
+
+def scenario_events(sc):    # [(time, kind, seq, data)] sorted by time
+    events = []
+    for idx, msg in enumerate(sc.tsbks):
+        lb = (idx % traffic_gen.TSBKS_PER_TSDU) == (traffic_gen.TSBKS_PER_TSDU - 1)
+        events.append((sc.tsbk_time(idx), EV_TSBK, idx, (lb, msg)))
+    for idx, (t, freq, slot, octets) in enumerate(sc.macs):
+        events.append((t, EV_MAC, idx, (freq, slot, octets)))
+    for idx, c in enumerate(sc.calls):
+        if c.grant_time is not None:    # the voice channel carries the call from its grant to its end
+            events.append((c.grant_time, EV_GRANT, idx, c))
+            events.append((c.end, EV_END, idx, c))
+    t = 0.0
+    idx = 0
+    while t < sc.duration + sc.call_time:
+        events.append((t, EV_IDLE, idx, None))
+        t += IDLE_INTERVAL
+        idx += 1
+    events.sort(key=lambda e: (e[0], e[1], e[2]))
+    return events
+
+class paced_time(object):  # replacement for the time module; time() runs at 'speed' times real time from 'start'
+    def __init__(self, speed):
+        self.speed = speed
+        self.start = 0.0
+        self.wall_start = time.time()
+
+    def run_start(self, start):
+        self.start = start
+        self.wall_start = time.time()
+
+    def due(self, t):           # wall clock time at which scenario time t is reached
+        return self.wall_start + t / self.speed
+
+    @property
+    def now(self):
+        return self.start + (time.time() - self.wall_start) * self.speed
+
+    def time(self):
+        return self.now
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+class load_run(object):
+    def __init__(self, trunking, config, sc, clock, debug=0):
+        self.sc = sc
+        self.clock = clock
+        self.nac = sc.nac.to_bytes(2, 'big')
+        self.rx = tk_replay.replay_rx(config, clock)
+        self.trunk_rx = trunking.rx_ctl(frequency_set = self.rx.change_freq, nbfm_ctrl = self.rx.nbfm_control, fa_ctrl = self.rx.fa_control, debug = debug, chans = config['trunking']['chans'])
+        self.rx.trunk_rx = self.trunk_rx
+        msgq_id = 0
+        for cfg in config['channels']:  # same receiver numbering as rx_block.configure_channels()
+            self.trunk_rx.add_receiver(msgq_id, config=cfg, meta_q=None, freq=int(from_dict(cfg, 'frequency', 0)))
+            msgq_id += 1
+        self.receivers = self.trunk_rx.systems[config['trunking']['chans'][0]['sysname']]['receivers']
+        self.active = {}            # (freq, slot) -> call in progress
+        self.followed = set()       # srcaddr of followed calls
+        self.lost = 0               # TSBKs sent while no receiver was on the control channel
+        self.messages = 0
+        self.rx_q = None            # paced runs: bounded queue between the scenario and the dispatch thread
+        self.due = 0.0              # paced runs: wall clock time the current event is scheduled for
+        self.dropped = 0
+        self.lags = []
+
+    def send(self, rcvr, m_type, slot, payload):
+        arg1 = float((rcvr.msgq_id << 1) | (slot or 0))
+        msg = tk_replay.replay_msg(m_type & 0xffff, arg1, self.clock.now, payload)   # protocol 0 (P25), as get_msg_type()
+        self.messages += 1
+        if self.rx_q is None:
+            self.trunk_rx.process_qmsg(msg)
+            return
+        try:
+            self.rx_q.put_nowait((self.due, msg))
+        except queue.Full:
+            self.dropped += 1
+
+    def dispatch(self):         # paced runs: the du_queue_watcher of this test
+        while True:
+            item = self.rx_q.get()
+            if item is None:
+                break
+            due, msg = item
+            self.lags.append(time.time() - due)
+            self.trunk_rx.process_qmsg(msg)
+            self.check_following()
+
+    def on_channel(self, freq, slot):   # voice receivers currently following a call on freq/slot
+        return [rcvr for rcvr in self.receivers if rcvr.current_tgid is not None and rcvr.tuned_frequency == freq and (slot is None or rcvr.current_slot == slot)]
+
+    def check_following(self):
+        for rcvr in self.receivers:
+            if rcvr.current_tgid is None:
+                continue
+            c = self.active.get((rcvr.tuned_frequency, rcvr.current_slot))
+            if c is not None and (rcvr.current_tgid == c.tgid or (c.patch is not None and rcvr.current_tgid in c.patch)):
+                self.followed.add(c.srcaddr)
+
+    def run(self, start_time):
+        self.clock.now = start_time
+        self.trunk_rx.post_init()
+        for (t, kind, seq, data) in scenario_events(self.sc):
+            self.clock.now = start_time + t
+            self.deliver(kind, data)
+
+    def run_paced(self, start_time):
+        self.rx_q = queue.Queue(RX_QUEUE_SIZE)
+        self.clock.run_start(start_time)
+        self.trunk_rx.post_init()
+        dispatcher = threading.Thread(target=self.dispatch)
+        dispatcher.start()
+        for (t, kind, seq, data) in scenario_events(self.sc):
+            self.due = self.clock.due(t)
+            wait = self.due - time.time()
+            if wait > 0:
+                time.sleep(wait)
+            self.deliver(kind, data)
+        self.rx_q.put(None)
+        dispatcher.join()
+
+    def deliver(self, kind, data):
+        if kind == EV_TSBK:
+            lb, (opcode, mfid, arg) = data
+            tsbk = (lb << 79) | (opcode << 72) | (mfid << 64) | arg
+            cc = [rcvr for rcvr in self.receivers if rcvr.current_tgid is None and rcvr.tuned_frequency == self.sc.cc_freq]
+            if len(cc) == 0:
+                self.lost += 1
+                return
+            self.send(cc[0], traffic_gen.QMSG_TSBK, None, self.nac + tsbk.to_bytes(10, 'big'))
+        elif kind == EV_MAC:
+            freq, slot, octets = data
+            for rcvr in self.on_channel(freq, slot):
+                self.send(rcvr, traffic_gen.QMSG_TDMA, slot, self.nac + octets)
+        elif kind == EV_GRANT:
+            self.active[(data.freq, data.slot)] = data
+        elif kind == EV_END:
+            for rcvr in self.on_channel(data.freq, data.slot):
+                self.send(rcvr, 15, data.slot, self.nac)   # call termination with release
+            if self.active.get((data.freq, data.slot)) is data:
+                del self.active[(data.freq, data.slot)]
+        elif kind == EV_IDLE:
+            for rcvr in self.receivers:
+                if rcvr.current_tgid is not None and (rcvr.tuned_frequency, rcvr.current_slot) not in self.active:
+                    self.send(rcvr, -1, rcvr.current_slot, b'')  # voice channel timeout
+        self.check_following()
+
+    def results(self):
+        granted = [c for c in self.sc.calls if c.grant_time is not None]
+        clear = [c for c in granted if not c.svcopts & traffic_gen.SVC_ENCRYPTED]
+        missed = [c for c in clear if c.srcaddr not in self.followed]
+        delays = [c.grant_time - c.start for c in granted]
+        return {'placed': len(self.sc.calls), 'busy': self.sc.busy, 'granted': len(granted),
+                'encrypted': len(granted) - len(clear), 'followed': len(clear) - len(missed), 'missed': len(missed),
+                'miss_pct': 100.0 * len(missed) / max(1, len(clear)),
+                'delay': sum(delays) / max(1, len(delays)), 'max_delay': max(delays) if delays else 0.0,
+                'load': 100.0 * (len(self.sc.tsbks) - self.sc.sent.get('broadcast', 0)) / max(1, len(self.sc.tsbks)),
+                'lost': self.lost, 'tunes': self.rx.tunes, 'messages': self.messages, 'dropped': self.dropped,
+                'lag': sum(self.lags) / max(1, len(self.lags)), 'max_lag': max(self.lags) if self.lags else 0.0}
+
+def use_clock(trunking, clock):
+    trunking.time = clock
+    log_ts.time = clock
+
+def main():
+    parser = OptionParser()
+    traffic_gen.add_options(parser)
+    parser.add_option("-c", "--config-file", type="string", default=None, help="multi_rx config file name (default: synthesized)")
+    parser.add_option("-n", "--receivers", type="int", default=2, help="voice receivers in a synthesized config")
+    parser.add_option("--rates", type="string", default="0.5,1,2,4,8", help="comma separated grant rates to test")
+    parser.add_option("--threshold", type="float", default=1.0, help="highest acceptable percentage of missed clear calls")
+    parser.add_option("--verbosity", type="int", default=0, help="trunking module debug level")
+    parser.add_option("--speed", type="float", default=0.0, help="release messages at this multiple of real time and measure dispatch lag (default: offline)")
+    (options, args) = parser.parse_args()
+
+    rates = [float(r) for r in options.rates.split(',')]
+    sc = traffic_gen.from_options(options)
+    if options.config_file is None:
+        config = make_config(sc.cc_freq, sc.nac, options.receivers)
+    else:
+        config = json.loads(open(options.config_file, encoding="utf-8-sig").read())
+        config['trunking']['chans'][0]['control_channel_list'] = "%f" % (sc.cc_freq / 1e6)
+        config['trunking']['chans'][0]['nac'] = "0x%x" % sc.nac
+    tk_mod = str(from_dict(config['trunking'], 'module', 'tk_p25.py'))
+    if tk_mod.endswith('.py'):
+        tk_mod = tk_mod[:-3]
+    trunking = importlib.import_module(tk_mod)
+
+    clock = tk_replay.replay_time()
+    paced = paced_time(options.speed) if options.speed > 0 else None
+
+    print("module: %s  receivers: %d  duration: %.0fs  call time: %.1fs  talkgroups: %d  voice channels: %d fdma, %d tdma" % (tk_mod,
+          len(config['channels']), options.duration, options.call_time, options.talkgroups, options.voice_channels, options.tdma_channels * 2))
+    if paced is None:
+        print("tuner capacity: offline on the scenario clock, misses are calls with no free receiver")
+        print("%8s %7s %6s %8s %6s %9s %7s %7s %9s %9s %7s %9s" % ("rate", "placed", "busy", "granted", "enc", "followed", "missed", "miss%", "delay ms", "cc load%", "lost", "elapsed"))
+    else:
+        print("processing: paced at %gx real time through a %d message queue, extra%% is misses beyond the offline run" % (options.speed, RX_QUEUE_SIZE))
+        print("%8s %7s %8s %6s %9s %7s %7s %7s %8s %9s %9s %8s %9s" % ("rate", "placed", "granted", "enc", "followed", "missed", "miss%", "extra%", "dropped", "lag ms", "max lag", "lost", "elapsed"))
+    sustained = None
+    for rate in rates:
+        sc = traffic_gen.from_options(options, rate=rate)
+        sc.generate()
+        use_clock(trunking, clock)
+        run = load_run(trunking, copy.deepcopy(config), sc, clock, options.verbosity)
+        t0 = time.time()
+        run.run(time.time())
+        elapsed = time.time() - t0
+        r = run.results()
+        if paced is None:
+            print("%8.2f %7d %6d %8d %6d %9d %7d %7.1f %9.1f %9.1f %7d %8.2fs" % (rate, r['placed'], r['busy'], r['granted'], r['encrypted'],
+                  r['followed'], r['missed'], r['miss_pct'], r['delay'] * 1e3, r['load'], r['lost'], elapsed))
+            if r['miss_pct'] <= options.threshold and (sustained is None or rate > sustained):
+                sustained = rate
+            continue
+
+        sc = traffic_gen.from_options(options, rate=rate)    # same seed, same scenario
+        sc.generate()
+        use_clock(trunking, paced)
+        run = load_run(trunking, copy.deepcopy(config), sc, paced, options.verbosity)
+        t0 = time.time()
+        run.run_paced(time.time())
+        elapsed = time.time() - t0
+        p = run.results()
+        extra = max(0.0, p['miss_pct'] - r['miss_pct'])
+        print("%8.2f %7d %8d %6d %9d %7d %7.1f %7.1f %8d %9.1f %9.1f %8d %8.2fs" % (rate, p['placed'], p['granted'], p['encrypted'],
+              p['followed'], p['missed'], p['miss_pct'], extra, p['dropped'], p['lag'] * 1e3, p['max_lag'] * 1e3, p['lost'], elapsed))
+        if extra <= options.threshold and p['dropped'] == 0 and (sustained is None or rate > sustained):
+            sustained = rate
+    if paced is not None:
+        what = "kept up with at %gx real time within %.1f%% extra missed calls and no dropped messages" % (options.speed, options.threshold)
+    else:
+        what = "followed by the receivers available within %.1f%% missed calls" % options.threshold
+    if sustained is None:
+        print("no rate tested was %s" % what)
+    else:
+        print("highest rate %s: %.2f grants/sec" % (what, sustained))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+
+#
+# Micro-benchmark for log timestamp formatting
+#
+# Compares log lines per second produced with the original log_ts.get()
+# implementation (strftime/localtime on every call) against the cached
+# per-second formatter in log_ts.py, for each TS_FORMAT setting.  Each
+# line is formatted the way the trunking modules log a decoded message.
+#
+# Example usage (from the apps directory):
+# python3 util/log-bench.py -t 2
+#
+
+import sys
+import os
+import time
+from optparse import OptionParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import log_ts
+
+TS_FORMATS = {0: 'epoch', 1: 'formatted'}
+
+def legacy_get(ts_format):  # log_ts.get() prior to the cached formatter
+    def get(supplied_ts=None):
+        if supplied_ts is None:
+            ts = time.time()
+        else:
+            ts = supplied_ts
+
+        if ts_format == 0:
+            formatted_ts = "{:.6f}".format(ts)
+        else:
+            formatted_ts = "{:s}{:s}".format(time.strftime("%m/%d/%y %H:%M:%S",time.localtime(ts)),"{:.6f}".format(ts - int(ts)).lstrip("0"))
+
+        return formatted_ts
+    return get
+
+def bench_get(get, duration, supplied):
+    lines = 0
+    t_start = time.time()
+    t_end = t_start + duration
+    while True:
+        for i in range(1000):
+            s = '%s [%d] tsbk(0x%02x) grp_v_ch_grant: opts: 0x%02x freq: %s ga: %d sa: %d\n' % (get(supplied), 0, 0, 0, '851.012500', 1234, 5678901)
+        lines += 1000
+        if time.time() >= t_end:
+            break
+    return lines / (time.time() - t_start)
+
+def main():
+    parser = OptionParser()
+    parser.add_option("-t", "--time", type="float", default=2.0, help="seconds per test")
+    parser.add_option("-s", "--supplied", action="store_true", default=False, help="format a supplied timestamp (as for message receive times) instead of time.time()")
+    (options, args) = parser.parse_args()
+
+    supplied = time.time() if options.supplied else None
+    for ts_format in sorted(TS_FORMATS):
+        old = bench_get(legacy_get(ts_format), options.time, supplied)
+        new = bench_get(log_ts.ts_formatter(ts_format).get, options.time, supplied)
+        sys.stdout.write("%-10s legacy %10.0f lines/sec  cached %10.0f lines/sec  (%.2fx)\n" % (TS_FORMATS[ts_format], old, new, new / old))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+
+#
+# Micro-benchmark for the gr_gnuplot plot rendering pipeline
+#
+# Feeds random sample buffers through gr_gnuplot.wrap_gp.plot() for each
+# plot mode and reports samples per second.  Gnuplot output is discarded.
+# Run against two revisions of gr_gnuplot.py to compare before and after.
+#
+# Example usage (from the apps directory):
+# python3 util/plot-bench.py -t 5
+#
+
+import sys
+import os
+import time
+import subprocess
+from optparse import OptionParser
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import gr_gnuplot
+
+def attach_null_gp(self):
+    self.gp = subprocess.Popen(['cat'], stdin=subprocess.PIPE, stdout=subprocess.DEVNULL)
+
+# mode: (buffer size, complex input)
+PLOT_MODES = { 'eye':           (100 * gr_gnuplot._def_sps * gr_gnuplot._def_sps_mult, False),
+               'constellation': (1000, True),
+               'symbol':        (2400, False),
+               'fft':           (gr_gnuplot.FFT_BINS, True),
+               'mixer':         (gr_gnuplot.FFT_BINS, True),
+               'fll':           (gr_gnuplot.FFT_BINS, True) }
+
+def bench_mode(mode, duration):
+    bufsz, is_complex = PLOT_MODES[mode]
+    gp = gr_gnuplot.wrap_gp(sps=gr_gnuplot._def_sps * gr_gnuplot._def_sps_mult, plot_name="bench", chan=0)
+    gp.set_center_freq(851000000)
+    gp.set_width(2400000)
+    if is_complex:
+        buf = (np.random.randn(bufsz) + 1j * np.random.randn(bufsz)).astype(np.complex64)
+    else:
+        buf = (np.random.randn(bufsz) * 3.0).astype(np.float32)
+    samples = 0
+    t_start = time.time()
+    while time.time() < t_start + duration:
+        samples += gp.plot(buf, bufsz, mode=mode)
+    elapsed = time.time() - t_start
+    gp.kill()
+    return samples / elapsed
+
+def main():
+    parser = OptionParser()
+    parser.add_option("-m", "--modes", type="string", default=",".join(PLOT_MODES.keys()), help="comma separated plot modes")
+    parser.add_option("-t", "--time", type="float", default=2.0, help="seconds per mode")
+    (options, args) = parser.parse_args()
+
+    gr_gnuplot.wrap_gp.attach_gp = attach_null_gp
+    for mode in options.modes.split(','):
+        if mode not in PLOT_MODES:
+            sys.stderr.write("unknown plot mode: %s\n" % mode)
+            continue
+        sys.stdout.write("%-14s %12.0f samples/sec\n" % (mode, bench_mode(mode, options.time)))
+
+if __name__ == "__main__":
+    main()
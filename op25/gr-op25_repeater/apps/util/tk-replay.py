@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+
+#
+# Offline replay benchmark for the trunking state machines
+#
+# Feeds a trunking message capture (recorded by multi_rx.py when the
+# trunking section of the config file contains "capture_file") back through
+# the configured trunking module's rx_ctl.process_qmsg() as fast as possible.
+# Tuning requests go to stub frequency_set/fa_ctrl/nbfm_ctrl callbacks and are
+# logged instead of retuning hardware.  Reports messages per second, per
+# message type/opcode decode time, latency percentiles and tune decisions.
+#
+# The trunking module sees the capture timestamps in place of time.time(),
+# so timers expire as they did during the live session.  Write the tune log
+# with -o from two revisions and diff them to compare talkgroup following.
+#
+# Example usage (from the apps directory):
+# python3 util/tk-replay.py -c cfg.json -i capture.bin -o tunes.log
+#
+
+import sys
+import os
+import time
+import json
+import ctypes
+import importlib
+from optparse import OptionParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import log_ts
+from helper_funcs import from_dict
+from qmsg_capture import read_capture
+
+PROTOCOLS = {0: 'p25', 1: 'dmr', 2: 'smartnet'}
+PERCENTILES = [50, 90, 99, 99.9]
+
+class replay_msg(object):   # stands in for gr.message; the trunking modules only use these accessors
+    __slots__ = ('m_type', 'm_arg1', 'm_arg2', 'm_data')
+
+    def __init__(self, m_type, arg1, arg2, data):
+        self.m_type = m_type
+        self.m_arg1 = arg1
+        self.m_arg2 = arg2
+        self.m_data = data
+
+    def type(self):
+        return self.m_type
+
+    def arg1(self):
+        return self.m_arg1
+
+    def arg2(self):
+        return self.m_arg2
+
+    def to_string(self):
+        return self.m_data
+
+class replay_time(object): # replacement for the time module; time() follows the capture timestamps
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self):
+        return self.now
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+class replay_rx(object):   # stub replacements for the multi_rx rx_block callbacks
+    def __init__(self, config, clock, tune_log=None):
+        self.config = config
+        self.clock = clock
+        self.tune_log = tune_log
+        self.n_chans = len(config['channels'])
+        self.trunk_rx = None
+        self.tunes = 0
+        self.tunes_by_tuner = {}
+        self.fa_cmds = 0
+
+    def change_freq(self, params):
+        tuner = params['tuner']
+        if (tuner < 0) or (tuner >= self.n_chans):
+            return False
+        self.tunes += 1
+        self.tunes_by_tuner[tuner] = self.tunes_by_tuner.get(tuner, 0) + 1
+        if self.tune_log is not None:
+            self.tune_log.write("%.6f tuner=%d freq=%d tgid=%s slot=%s\n" % (self.clock.now, tuner, params['freq'], from_dict(params, 'tgid', None), from_dict(params, 'tdma', from_dict(params, 'slot', None))))
+
+        for key, attr in [('chan', 'current_chan'), ('state', 'current_state'), ('type', 'current_type'), ('time', 'tune_time')]:
+            if key in params:   # mirror rx_block.change_freq() feedback used by tk_trbo
+                setattr(self.trunk_rx.receivers[tuner], attr, params[key])
+        return True
+
+    def fa_control(self, params):
+        self.fa_cmds += 1
+
+    def nbfm_control(self, msgq_id, action):
+        pass
+
+def msg_key(m_type, s):    # classify a message by protocol, type and (where cheap to find) opcode
+    m_proto = ctypes.c_int16(m_type >> 16).value
+    m_type = ctypes.c_int16(m_type & 0xffff).value
+    if m_proto == 0 and m_type == 7 and len(s) > 2:     # TSBK
+        return "p25 tsbk 0x%02x" % (s[2] & 0x3f)
+    elif m_proto == 0 and m_type == 12 and len(s) > 9:  # MBT
+        return "p25 mbt 0x%02x" % (s[9] & 0x3f)
+    elif m_proto == 0 and m_type == 18 and len(s) > 2:  # TDMA MAC
+        return "p25 tdma 0x%02x" % s[2]
+    return "%s type %d" % (PROTOCOLS.get(m_proto, str(m_proto)), m_type)
+
+def percentile(sorted_vals, pct):
+    if len(sorted_vals) == 0:
+        return 0.0
+    return sorted_vals[min(len(sorted_vals) - 1, int(len(sorted_vals) * pct / 100.0))]
+
+def main():
+    parser = OptionParser()
+    parser.add_option("-c", "--config-file", type="string", default=None, help="multi_rx config file name")
+    parser.add_option("-i", "--input", type="string", default=None, help="trunking message capture file")
+    parser.add_option("-o", "--tune-log", type="string", default=None, help="write tune decisions to file")
+    parser.add_option("-n", "--top", type="int", default=20, help="number of message types to report")
+    parser.add_option("-v", "--verbosity", type="int", default=0, help="trunking module debug level")
+    parser.add_option("-w", "--wall-clock", action="store_true", default=False, help="use real time instead of capture timestamps")
+    (options, args) = parser.parse_args()
+    if options.config_file is None or options.input is None:
+        parser.print_help()
+        sys.exit(1)
+
+    config = json.loads(open(options.config_file, encoding="utf-8-sig").read())
+    if 'trunking' not in config:
+        config['trunking'] = {"module": "tk_p25.py", "chans": []}
+    tk_mod = str(from_dict(config['trunking'], 'module', 'tk_p25.py'))
+    if tk_mod.endswith('.py'):
+        tk_mod = tk_mod[:-3]
+    trunking = importlib.import_module(tk_mod)
+
+    clock = replay_time()
+    if not options.wall_clock:
+        trunking.time = clock
+        log_ts.time = clock
+
+    msgs = [(ts, replay_msg(m_type, arg1, arg2, s), msg_key(m_type, s)) for (ts, m_type, arg1, arg2, s) in read_capture(options.input)]
+    if len(msgs) == 0:
+        sys.stderr.write("No messages in capture file %s\n" % options.input)
+        sys.exit(1)
+    clock.now = msgs[0][0]
+
+    tune_log = open(options.tune_log, 'w') if options.tune_log is not None else None
+    rx = replay_rx(config, clock, tune_log)
+    trunk_rx = trunking.rx_ctl(frequency_set = rx.change_freq, nbfm_ctrl = rx.nbfm_control, fa_ctrl = rx.fa_control, debug = options.verbosity, chans = config['trunking']['chans'])
+    rx.trunk_rx = trunk_rx
+    msgq_id = 0
+    for cfg in config['channels']:  # same receiver numbering as rx_block.configure_channels()
+        trunk_rx.add_receiver(msgq_id, config=cfg, meta_q=None, freq=int(from_dict(cfg, 'frequency', 0)))
+        msgq_id += 1
+    trunk_rx.post_init()
+    init_tunes = rx.tunes
+
+    perf = time.perf_counter
+    durations = [0.0] * len(msgs)
+    by_key = {}
+    t_start = perf()
+    for idx in range(len(msgs)):
+        ts, msg, key = msgs[idx]
+        clock.now = ts
+        t0 = perf()
+        trunk_rx.process_qmsg(msg)
+        dt = perf() - t0
+        durations[idx] = dt
+        if key not in by_key:
+            by_key[key] = []
+        by_key[key].append(dt)
+    elapsed = perf() - t_start
+
+    if tune_log is not None:
+        tune_log.close()
+
+    span = msgs[-1][0] - msgs[0][0]
+    print("module: %s  messages: %d  capture span: %.1fs" % (tk_mod, len(msgs), span))
+    print("elapsed: %.3fs  rate: %.0f msgs/sec  speedup: %.0fx real time" % (elapsed, len(msgs) / elapsed, span / elapsed if elapsed > 0 else 0))
+    durations.sort()
+    print("latency (us): " + "  ".join(["p%s: %.1f" % (pct, percentile(durations, pct) * 1e6) for pct in PERCENTILES]) + "  max: %.1f" % (durations[-1] * 1e6))
+    print("tune decisions: %d (+%d at startup)  by tuner: %s  fa_ctrl commands: %d" % (rx.tunes - init_tunes, init_tunes, json.dumps(rx.tunes_by_tuner, sort_keys=True), rx.fa_cmds))
+    print("")
+    print("%-22s %10s %10s %10s %10s" % ("message", "count", "mean us", "p99 us", "total ms"))
+    for key in sorted(by_key, key=lambda k: sum(by_key[k]), reverse=True)[:options.top]:
+        vals = sorted(by_key[key])
+        print("%-22s %10d %10.1f %10.1f %10.1f" % (key, len(vals), sum(vals) / len(vals) * 1e6, percentile(vals, 99) * 1e6, sum(vals) * 1e3))
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,7 @@
 
 #include <time.h>
 #include <sys/time.h>
+#include <stdlib.h>
 #include <string.h>
 #include <string>
 #include <vector>
@@ -44,6 +45,13 @@ inline std::string uint8_vector_to_hex_string(const std::vector<uint8_t>& v)
     return result;
 }
 
+// Timestamp format, matching TS_FORMAT in apps/log_ts.py
+// 0 = legacy epoch seconds
+// 1 = formatted mm/dd/yy hh:mm:ss.usec
+// The OP25_TS_FORMAT environment variable overrides the default.
+#define LOG_TS_FORMAT_EPOCH 0
+#define LOG_TS_FORMAT_LOCAL 1
+
 class log_ts
 {
 private:
@@ -51,10 +59,38 @@ private:
 	struct tm curr_loc_time;
 	double tstamp;
 	char log_tstring[40];
+	int ts_format;
+	time_t prefix_sec;      // second for which the formatted date/time prefix in log_tstring is valid
+	size_t prefix_len;
+
+	// format curr_time into log_tstring, reusing the date/time prefix while the second is unchanged
+	inline size_t format_ts()
+	{
+		if (ts_format == LOG_TS_FORMAT_LOCAL)
+		{
+			if ((prefix_len == 0) || (curr_time.tv_sec != prefix_sec))
+			{
+				localtime_r(&curr_time.tv_sec, &curr_loc_time);
+				prefix_len = strftime(log_tstring, sizeof(log_tstring), "%m/%d/%y %H:%M:%S", &curr_loc_time);
+				prefix_sec = curr_time.tv_sec;
+			}
+			if (prefix_len > 0)
+				return prefix_len + sprintf((log_tstring + prefix_len), ".%06lu", curr_time.tv_usec);
+		}
+		prefix_len = 0;
+		return sprintf(log_tstring, "%010lu.%06lu", curr_time.tv_sec, curr_time.tv_usec);
+	}
 
 public:
-	inline log_ts()
+	inline log_ts() :
+		ts_format(LOG_TS_FORMAT_LOCAL),
+		prefix_sec(0),
+		prefix_len(0)
 	{
+		const char* env_format = getenv("OP25_TS_FORMAT");
+		if ((env_format != NULL) && (*env_format != 0))
+			ts_format = atoi(env_format);
+
 		if (gettimeofday(&curr_time, 0) == 0)
 		{
 			memcpy(&marker_time, &curr_time, sizeof(struct timeval));
@@ -70,15 +106,11 @@ public:
 	{
 		if (gettimeofday(&curr_time, 0) == 0)
 		{
-			localtime_r(&curr_time.tv_sec, &curr_loc_time);
-			size_t i = strftime(log_tstring, sizeof(log_tstring), "%m/%d/%y %H:%M:%S", &curr_loc_time);
-			if (i > 0)
-				sprintf((log_tstring + i), ".%06lu", curr_time.tv_usec);
-			else
-				sprintf(log_tstring, "%010lu.%06lu", curr_time.tv_sec, curr_time.tv_usec);
+			format_ts();
 		}
 		else
 		{
+			prefix_len = 0;
 			log_tstring[0] = 0;
 		}
 
@@ -89,15 +121,12 @@ public:
 	{
 		if (gettimeofday(&curr_time, 0) == 0)
 		{
-			localtime_r(&curr_time.tv_sec, &curr_loc_time);
-			size_t i = strftime(log_tstring, sizeof(log_tstring), "%m/%d/%y %H:%M:%S", &curr_loc_time);
-			if (i > 0)
-				sprintf((log_tstring + i), ".%06lu [%d]", curr_time.tv_usec, id);
-			else
-				sprintf(log_tstring, "%010lu.%06lu [%d]", curr_time.tv_sec, curr_time.tv_usec, id);
+			size_t i = format_ts();
+			sprintf((log_tstring + i), " [%d]", id);
 		}
 		else
 		{
+			prefix_len = 0;
 			sprintf(log_tstring, "[%d]", id);
 		}
 
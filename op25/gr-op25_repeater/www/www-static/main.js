@@ -39,6 +39,10 @@ var send_qfull = 0;
 var send_queue = [];
 var request_count = 0;
 var SEND_QLIMIT = 5;
+var event_source = null;			// server push channel, polling is used when unavailable
+var trunk_state = null;				// trunk_update with deltas applied
+var trunk_version = 0;				// version of trunk_state, 0 requests a full trunk_update
+const TRUNK_DELTA_SECTIONS = ["frequencies", "frequency_data", "patch_data", "wuid_data"];
 var c_freq = 0;
 var c_ppm = null;
 var c_system = null;
@@ -258,12 +262,34 @@ document.addEventListener("DOMContentLoaded", function() {
 
 
 function do_onload() {
+    events_connect();
     send_command("get_terminal_config", 0, 0);
     setInterval(do_update, 1000);
     send_command("get_full_config", 0, 0);
     send_command("get_ws_instances", 0, 0);
 }
 
+function events_connect() {
+    if (typeof(EventSource) === "undefined")
+        return;
+    event_source = new EventSource("/events");
+    event_source.onmessage = function(e) {
+        try {
+            handle_response([JSON.parse(e.data)]);
+        } catch (err) {
+            console.error("Error inside events handler:", err.stack || err);
+        }
+    };
+    event_source.onerror = function() {
+        if (event_source.readyState == EventSource.CLOSED)	// server refused, fall back to polling
+            event_source = null;
+    };
+}
+
+function events_active() {
+    return (event_source != null) && (event_source.readyState == EventSource.OPEN);
+}
+
 function is_digit(s) {
     if (s >= "0" && s <= "9")
         return true;
@@ -1569,11 +1595,60 @@ function call_log(d) {
 	
 }  // end call_log
 
+function trunk_delta(d) {	// json_type: "trunk_update", either full or changes since version d.base
+
+    if (!d.delta) {
+        trunk_state = d;
+        trunk_version = (d.version != undefined) ? d.version : 0;
+        trunk_update(d);
+        return;
+    }
+    if (trunk_state == null || d.base != trunk_version) {	// missed an update, ask for a full one
+        trunk_version = 0;
+        if (events_active())
+            send_command("update", 0, (channel_list.length == 0) ? 0 : Number(channel_list[channel_index]));
+        return;
+    }
+    for (var key in d) {
+        if (!is_digit(key.charAt(0))) {
+            if (key != "delta" && key != "base")
+                trunk_state[key] = d[key];
+            continue;
+        }
+        if (trunk_state[key] == undefined)
+            trunk_state[key] = {};
+        var dst = trunk_state[key];
+        for (var k in d[key]) {
+            if (k == "removed")
+                continue;
+            if (TRUNK_DELTA_SECTIONS.includes(k)) {
+                if (dst[k] == undefined)
+                    dst[k] = {};
+                Object.assign(dst[k], d[key][k]);
+            }
+            else {
+                dst[k] = d[key][k];
+            }
+        }
+        var removed = d[key]["removed"] || {};
+        for (var section in removed) {
+            for (var i = 0; i < removed[section].length; i++) {
+                if (section == "")
+                    delete dst[removed[section][i]];
+                else if (dst[section] != undefined)
+                    delete dst[section][removed[section][i]];
+            }
+        }
+    }
+    trunk_version = d.version;
+    trunk_update(trunk_state);
+}
+
 function handle_response(dl) {
 	
     const dispatch = {
         call_log: call_log,
-        trunk_update: trunk_update,
+        trunk_update: trunk_delta,
         change_freq: change_freq,
         channel_update: channel_update,
         rx_update: rx_update,
@@ -1599,15 +1674,20 @@ function do_update() {
 	}
 
 	
-    if (channel_list.length == 0) {
-        send_command("update", 0, 0);
+    if (events_active()) {
+        // updates are pushed by the server
+        if (smartColors.length == 0)
+        	send_command("get_terminal_config", 0, 0);
+    }
+    else if (channel_list.length == 0) {
+        send_command("update", trunk_version, 0);
 
         if (smartColors.length == 0)
         	send_command("get_terminal_config", 0, 0);
         
     }
     else {
-        send_command("update", 0, Number(channel_list[channel_index]));
+        send_command("update", trunk_version, Number(channel_list[channel_index]));
         if (smartColors.length == 0)
         	send_command("get_terminal_config", 0, 0);
     }
@@ -1633,7 +1713,7 @@ async function send_process() {
     const wtxt = document.getElementById('warning-text');
 
     try {
-        const response = await fetch("/", {
+        const response = await fetch(events_active() ? "/?events" : "/", {
             method: "POST",
             headers: { "Content-Type": "application/json" },
             body: cmd